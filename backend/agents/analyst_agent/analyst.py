@@ -257,7 +257,7 @@ Reply with ONLY the 3 queries (one per line), maximum 15 words each:
 """
 
         try:
-            ai_response = self.gemini_client.models.generate_content(
+            ai_response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=query_prompt,
                 config=types.GenerateContentConfig(
@@ -325,7 +325,7 @@ Analyze and reply with ONLY this JSON (no other text):
 """
         
         try:
-            ai_response = self.gemini_client.models.generate_content(
+            ai_response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=ai_prompt,
                 config=types.GenerateContentConfig(**config.GEMINI_GENERATION_CONFIG)
@@ -403,7 +403,7 @@ IMPORTANT: Return ONLY valid JSON, no additional text or explanations.
 """
         
         try:
-            response = self.gemini_client.models.generate_content(
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=analysis_prompt,
                 config=types.GenerateContentConfig(**config.GEMINI_GENERATION_CONFIG)
@@ -456,7 +456,7 @@ Keep it under 100 words total.
 """
 
         try:
-            response = self.gemini_client.models.generate_content(
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=summary_prompt,
                 config=types.GenerateContentConfig(
@@ -512,7 +512,9 @@ Be specific, concise, and enthusiastic about their financial journey!
         detailed_response = await self.generate_ai_response(
             "",  # System prompt is in config
             response_prompt,
-            ""   # Market context already in prompt
+            "",  # Market context already in prompt
+            user_query=user_query,
+            data_context=f"{financial_context}\x00{market_context}"
         )
         
         # Combine executive summary with detailed response
@@ -558,7 +560,7 @@ Return ONLY search query (max 20 words):"""
         try:
             logger.info(f"Using Gemini 2.5 Flash for intelligent query generation: {user_query[:50]}...")
             
-            ai_response = self.gemini_client.models.generate_content(
+            ai_response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=query_generation_prompt,
                 config=types.GenerateContentConfig(
@@ -11,7 +11,6 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional, AsyncGenerator
 from dataclasses import dataclass, field
 import logging
-from google import genai
 from google.genai import types
 
 import sys
@@ -20,6 +19,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.fi_mcp.client import FinancialData
 from core.google_grounding.grounding_client import GoogleGroundingClient, GroundingResult
+from core.llm_gateway import get_gemini_gateway
 from config.settings import config, AgentConfig
 from utils.response_cache import response_cache
 
@@ -67,8 +67,9 @@ class BaseFinancialAgent(ABC):
         # Initialize Google Grounding client
         self.grounding_client = GoogleGroundingClient()
         
-        # Initialize Gemini client for general reasoning
-        self.gemini_client = genai.Client(api_key=config.GOOGLE_API_KEY)
+        # Gemini calls go through the shared gateway so they never block the event loop
+        self.llm_gateway = get_gemini_gateway()
+        self.gemini_client = self.llm_gateway.client
         
         logger.info(f"Initialized {self.name} with personality: {self.personality}")
     
@@ -115,7 +116,7 @@ class BaseFinancialAgent(ABC):
                 search_prompt = f"{query} India financial market 2025 expert analysis"
             
             # Make the grounded request using official documentation method
-            response = self.gemini_client.models.generate_content(
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=search_prompt,
                 config=config_grounding
@@ -397,12 +398,26 @@ class BaseFinancialAgent(ABC):
         
         return "User's financial profile: " + ", ".join(summary_parts) if summary_parts else "General user"
     
-    async def generate_ai_response(self, system_prompt: str, user_context: str, market_context: str = "") -> str:
-        """Generate AI-powered response using Gemini with REAL Google Search Grounding"""
+    async def generate_ai_response(self, system_prompt: str, user_context: str, market_context: str = "",
+                                   user_query: str = None, data_context: str = None) -> str:
+        """
+        Generate AI-powered response using Gemini with REAL Google Search Grounding
         
-        # Check cache first
-        cache_key = f"{user_context[:100]}_{market_context[:50]}"
-        cached_response = response_cache.get(cache_key)
+        Callers answering a user's question pass it as user_query, together with the
+        financial data and market intelligence the prompt was built from as
+        data_context. The cache then keys on the (normalizable) question plus that
+        data, hashed verbatim, so rephrasings of the same question hit. Without a
+        user_query the whole prompt is the verbatim key.
+        """
+        
+        # Check cache first, scoped to the current user's namespace
+        if user_query is not None:
+            cache_query = user_query
+            cache_context = f"{self.agent_type}\x00{system_prompt}\x00{market_context}\x00{data_context or ''}"
+        else:
+            cache_query = self.agent_type
+            cache_context = f"{system_prompt}\x00{market_context}\x00{user_context}"
+        cached_response = response_cache.get(cache_query, cache_context)
         if cached_response:
             return cached_response
         
@@ -431,7 +446,7 @@ IMPORTANT: Use Google Search to find current, accurate information about market
 """
             
             # Generate AI response with REAL grounding
-            response = self.gemini_client.models.generate_content(
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=full_prompt,
                 config=gen_config
@@ -453,20 +468,20 @@ IMPORTANT: Use Google Search to find current, accurate information about market
                 result = self._add_agent_personality(response.text)
             
             # Cache the response
-            response_cache.set(cache_key, result)
+            response_cache.set(cache_query, result, cache_context)
             return result
             
         except Exception as e:
             logger.error(f"{self.name}: AI generation with grounding failed: {e}")
             # Try without grounding as fallback
             try:
-                response = self.gemini_client.models.generate_content(
+                response = await self.llm_gateway.generate_content(
                     model="gemini-2.5-flash",
                     contents=full_prompt,
                     config=types.GenerateContentConfig(**config.GEMINI_GENERATION_CONFIG)
                 )
                 result = self._add_agent_personality(response.text)
-                response_cache.set(cache_key, result)
+                response_cache.set(cache_query, result, cache_context)
                 return result
             except Exception as e2:
                 logger.error(f"{self.name}: Fallback AI generation also failed: {e2}")
@@ -587,7 +602,7 @@ Maintain your {self.personality} personality while being collaborative.
 """
         
         try:
-            ai_collaboration = self.gemini_client.models.generate_content(
+            ai_collaboration = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=collaboration_prompt,
                 config=types.GenerateContentConfig(
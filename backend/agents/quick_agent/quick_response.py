@@ -65,7 +65,7 @@ Provide fast, actionable response using real-time market data from Google Search
             # Generate response with Google Search grounding
             logger.info("⚡ Generating quick response with Google Search grounding...")
             
-            response = self.gemini_client.models.generate_content(
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=quick_prompt,
                 config=types.GenerateContentConfig(
@@ -57,7 +57,7 @@ Return exactly 7 search queries, one per line:
 """
         
         try:
-            response = self.gemini_client.models.generate_content(
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=comprehensive_prompt,
                 config=types.GenerateContentConfig(
@@ -243,7 +243,7 @@ Provide the most comprehensive and detailed strategic assessment possible.
 """
         
         try:
-            ai_response = self.gemini_client.models.generate_content(
+            ai_response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=enhanced_ai_prompt,
                 config=types.GenerateContentConfig(
@@ -285,7 +285,7 @@ Return enhanced JSON with more detailed strategic_opportunities and priority_foc
 """
         
         try:
-            response = self.gemini_client.models.generate_content(
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=enhancement_prompt
             )
@@ -414,7 +414,7 @@ Focus on providing maximum value through comprehensive research depth and qualit
         
         try:
             # Generate comprehensive strategic research response
-            strategic_response = self.gemini_client.models.generate_content(
+            strategic_response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=advanced_research_prompt,
                 config=types.GenerateContentConfig(
@@ -480,7 +480,7 @@ Generate at least 1500 additional words of high-quality strategic research.
 """
         
         try:
-            enhancement_response = self.gemini_client.models.generate_content(
+            enhancement_response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=enhancement_prompt,
                 config=types.GenerateContentConfig(
@@ -606,7 +606,7 @@ Focus on maximum quality, depth, and actionable insights.
 """
         
         try:
-            response = self.gemini_client.models.generate_content(
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=enhanced_analysis_prompt,
                 config=types.GenerateContentConfig(
@@ -675,6 +675,9 @@ Focus on maximum quality, depth, and actionable insights.
     async def generate_response(self, user_query: str, financial_data: FinancialData, grounded_intelligence: Dict[str, Any]) -> str:
         """Generate comprehensive strategic response with maximum quality focus"""
         
+        financial_context = self._format_financial_data_for_strategic_planning(financial_data)
+        strategic_context = self._format_enhanced_strategic_intelligence(grounded_intelligence)
+        
         # Enhanced response generation for maximum quality
         comprehensive_response_prompt = f"""
 You are an Elite Strategic Financial Planner providing the most comprehensive analysis possible.
@@ -682,10 +685,10 @@ You are an Elite Strategic Financial Planner providing the most comprehensive an
 USER QUERY: {user_query}
 
 COMPREHENSIVE FINANCIAL POSITION:
-{self._format_financial_data_for_strategic_planning(financial_data)}
+{financial_context}
 
 COMPREHENSIVE STRATEGIC INTELLIGENCE:
-{self._format_enhanced_strategic_intelligence(grounded_intelligence)}
+{strategic_context}
 
 COMPREHENSIVE STRATEGIC PLAN REQUIREMENTS:
 
@@ -730,7 +733,9 @@ Focus on maximum quality, depth, and practical implementation guidance.
         return await self.generate_ai_response(
             "",  # System prompt in config
             comprehensive_response_prompt,
-            ""   # Context in prompt
+            "",  # Context in prompt
+            user_query=user_query,
+            data_context=f"{financial_context}\x00{strategic_context}"
         )
     
     def _format_enhanced_strategic_intelligence(self, intelligence: Dict[str, Any]) -> str:
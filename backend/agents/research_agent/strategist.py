@@ -240,7 +240,7 @@ Return ONLY search queries, one per line.
 """
         
         try:
-            response = self.gemini_client.models.generate_content(
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -283,7 +283,7 @@ Return only valid JSON.
 """
         
         try:
-            ai_response = self.gemini_client.models.generate_content(
+            ai_response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=ai_prompt
             )
@@ -362,7 +362,7 @@ Provide response in JSON format:
 """
         
         try:
-            response = self.gemini_client.models.generate_content(
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=analysis_prompt
             )
@@ -427,7 +427,9 @@ Structure your response with:
         return await self.generate_ai_response(
             "",  # System prompt in config
             response_prompt,
-            ""   # Context in prompt
+            "",  # Context in prompt
+            user_query=user_query,
+            data_context=f"{financial_context}\x00{strategic_context}"
         )
     
     def _format_strategic_intelligence(self, intelligence: Dict[str, Any]) -> str:
@@ -480,7 +482,7 @@ Be thorough and data-driven using the live market intelligence provided.
         
         try:
             # Generate strategic research response
-            strategic_response = self.gemini_client.models.generate_content(
+            strategic_response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=strategic_prompt,
                 config=types.GenerateContentConfig(
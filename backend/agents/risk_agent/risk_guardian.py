@@ -370,7 +370,7 @@ Return exactly 6 search queries, one per line:
 """
         
         try:
-            ai_response = self.gemini_client.models.generate_content(
+            ai_response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=enhanced_ai_prompt,
                 config=types.GenerateContentConfig(
@@ -458,7 +458,7 @@ Provide comprehensive risk analysis in JSON format:
 """
         
         try:
-            ai_response = self.gemini_client.models.generate_content(
+            ai_response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=enhanced_ai_prompt,
                 config=types.GenerateContentConfig(
@@ -507,7 +507,7 @@ Return enhanced JSON with more comprehensive vulnerabilities, priorities, and st
 """
         
         try:
-            response = self.gemini_client.models.generate_content(
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=enhancement_prompt
             )
@@ -631,7 +631,7 @@ Provide response in JSON format:
 """
         
         try:
-            response = self.gemini_client.models.generate_content(
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=analysis_prompt
             )
@@ -699,7 +699,9 @@ Structure your response with:
         return await self.generate_ai_response(
             "",  # System prompt in config
             response_prompt,
-            ""   # Context in prompt
+            "",  # Context in prompt
+            user_query=user_query,
+            data_context=f"{financial_context}\x00{risk_context}"
         )
     
     def _format_risk_intelligence(self, intelligence: Dict[str, Any]) -> str:
@@ -765,7 +767,7 @@ Be thorough and analytical using the research and market data provided."""
             logger.info(f"🛡️ Risk Agent: Processing prompt of {len(risk_prompt)} characters")
             
             # Generate comprehensive risk assessment
-            risk_response = self.gemini_client.models.generate_content(
+            risk_response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=risk_prompt,
                 config=types.GenerateContentConfig(
@@ -15,8 +15,8 @@ from typing import Dict, List, Any, Optional, Tuple
 # Add parent directories to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from google import genai
 from google.genai import types
+from core.llm_gateway import get_gemini_gateway
 
 
 class StockRecommendationAgent:
@@ -43,9 +43,9 @@ class StockRecommendationAgent:
         if not self.api_key:
             raise ValueError("Google AI API key is required")
             
-        # Initialize Gemini client
-        genai.configure(api_key=self.api_key)
-        self.client = genai.Client()
+        # Initialize Gemini client via the shared non-blocking gateway
+        self.llm_gateway = get_gemini_gateway(self.api_key)
+        self.client = self.llm_gateway.client
         
         # Generation config for recommendations
         self.config = types.GenerateContentConfig(
@@ -137,8 +137,7 @@ class StockRecommendationAgent:
         
         try:
             # Generate recommendation using Gemini
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=prompt,
                 config=self.config
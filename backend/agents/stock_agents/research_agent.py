@@ -15,8 +15,8 @@ from typing import Dict, List, Any, Optional
 # Add parent directories to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from google import genai
 from google.genai import types
+from core.llm_gateway import get_gemini_gateway
 from core.google_grounding.grounding_client import GroundingClient
 
 
@@ -39,9 +39,9 @@ class StockResearchAgent:
         if not self.api_key:
             raise ValueError("Google AI API key is required")
             
-        # Initialize Gemini client
-        genai.configure(api_key=self.api_key)
-        self.client = genai.Client()
+        # Initialize Gemini client via the shared non-blocking gateway
+        self.llm_gateway = get_gemini_gateway(self.api_key)
+        self.client = self.llm_gateway.client
         
         # Initialize grounding client
         self.grounding_client = GroundingClient(api_key=self.api_key)
@@ -182,8 +182,7 @@ class StockResearchAgent:
             """
             
             # Execute grounded search
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=prompt,
                 config=self.config
@@ -269,8 +268,7 @@ class StockResearchAgent:
             """
             
             # Generate synthesis
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash", 
                 contents=synthesis_prompt,
                 config=types.GenerateContentConfig(temperature=0.2, max_output_tokens=1500)
@@ -13,8 +13,8 @@ from typing import Dict, List, Any, Optional
 # Add parent directories to path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from google import genai
 from google.genai import types
+from core.llm_gateway import get_gemini_gateway
 from config.settings import config
 
 
@@ -30,8 +30,9 @@ class StockAnalysisAgent:
         if not self.api_key:
             raise ValueError("Google AI API key is required for stock analysis")
             
-        # Initialize Gemini client (using the same pattern as other agents)
-        self.client = genai.Client(api_key=self.api_key)
+        # Initialize Gemini client via the shared non-blocking gateway
+        self.llm_gateway = get_gemini_gateway(self.api_key)
+        self.client = self.llm_gateway.client
         
         self.name = "Stock Analysis Specialist"
         self.personality = "analytical stock expert, data-driven, provides clear actionable insights"
@@ -179,8 +180,7 @@ class StockAnalysisAgent:
             
             await log(f"🤖 Querying Gemini AI for research insights...")
             
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=research_query,
                 config=simple_research_config
@@ -325,8 +325,7 @@ class StockAnalysisAgent:
             
             await log(f"🤖 Generating AI recommendation with Gemini 2.5...")
             
-            response = await asyncio.to_thread(
-                self.client.models.generate_content,
+            response = await self.llm_gateway.generate_content(
                 model="gemini-2.5-flash",
                 contents=recommendation_prompt,
                 config=simple_config
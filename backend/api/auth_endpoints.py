@@ -13,6 +13,7 @@ import logging
 from datetime import datetime
 
 from services.auth_service import get_auth_service, AuthService
+from services.password_hasher import PasswordHasherBusy
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +86,14 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     
     return verification_result['user']
 
+def _auth_overloaded() -> HTTPException:
+    """503 returned instead of queueing when the password hashing pool is full"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy. Please try again shortly.",
+        headers={"Retry-After": "1"}
+    )
+
 @router.post("/register", response_model=AuthResponse)
 async def register_user(
     request: RegisterRequest,
@@ -101,7 +110,7 @@ async def register_user(
         user_agent = client_request.headers.get("user-agent", "Unknown")
         
         # Register user
-        result = auth_service.register_user(
+        result = await auth_service.register_user_async(
             email=request.email,
             password=request.password,
             full_name=request.full_name,
@@ -129,6 +138,9 @@ async def register_user(
             
     except HTTPException:
         raise
+    except PasswordHasherBusy as e:
+        logger.warning(f"⚠️ Registration shed, password hashing saturated: {e}")
+        raise _auth_overloaded()
     except Exception as e:
         logger.error(f"❌ Registration endpoint error: {e}")
         raise HTTPException(
@@ -152,7 +164,7 @@ async def login_user(
         user_agent = client_request.headers.get("user-agent", "Unknown")
         
         # Authenticate user
-        result = auth_service.login_user(
+        result = await auth_service.login_user_async(
             email=request.email,
             password=request.password,
             ip_address=ip_address,
@@ -179,6 +191,9 @@ async def login_user(
             
     except HTTPException:
         raise
+    except PasswordHasherBusy as e:
+        logger.warning(f"⚠️ Login shed, password hashing saturated: {e}")
+        raise _auth_overloaded()
     except Exception as e:
         logger.error(f"❌ Login endpoint error: {e}")
         raise HTTPException(
@@ -343,6 +358,7 @@ async def auth_status():
                 "Session management",
                 "Comprehensive audit logging"
             ],
+            "password_hasher": auth_service.password_hasher.get_stats(),
             "timestamp": datetime.utcnow().isoformat()
         }
         
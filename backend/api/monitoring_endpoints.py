@@ -523,6 +523,27 @@ async def get_chat_service_stats():
             detail=f"Failed to retrieve chat service statistics: {str(e)}"
         )
 
+@monitoring_router.get("/auth/stats", response_model=Dict[str, Any])
+async def get_auth_stats():
+    """Get token verification latency, verified-token cache hit rate and revocation index size"""
+    try:
+        from services.auth_service import get_auth_service
+        
+        stats = get_auth_service().get_token_verification_stats()
+        return {
+            'status': 'healthy',
+            'timestamp': datetime.utcnow().isoformat(),
+            'token_verification': stats,
+            'cache_hit_rate': stats['cache']['hit_rate']
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to get auth stats: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve auth statistics: {str(e)}"
+        )
+
 @monitoring_router.post("/chat-service/cache/clear")
 async def clear_chat_cache():
     """Clear chat service cache manually"""
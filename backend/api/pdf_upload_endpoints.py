@@ -5,18 +5,28 @@ PDF Upload and Processing API Endpoints for Artha AI
 FastAPI endpoints for uploading and processing financial PDF documents.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import asyncio
+import json
 import logging
 import io
+import os
 
+from core.metrics import instrument_stream
 from services.pdf_processor_service import get_pdf_processor_service, PDFProcessorService
+from services.pdf_extraction_pool import PDFExtractionBusy
+from services.pdf_ingestion import (
+    InvalidUpload, PDFIngestionBusy, UploadTooLarge, get_pdf_ingestion_manager, spool_upload
+)
 
 logger = logging.getLogger(__name__)
 
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # 10MB
+
 # Create router
 router = APIRouter(prefix="/api/pdf", tags=["pdf-upload"])
 
@@ -37,6 +47,18 @@ class PDFAnalysisRequest(BaseModel):
     analysis_type: str = "comprehensive"  # comprehensive, summary, insights_only
     user_query: Optional[str] = None
 
+def _pdf_overloaded() -> HTTPException:
+    """503 returned instead of queueing when the PDF extraction pool is full"""
+    return HTTPException(
+        status_code=503,
+        detail="PDF processing is busy. Please try again shortly.",
+        headers={"Retry-After": "5"}
+    )
+
+def _exceeds_upload_limit(file: UploadFile) -> bool:
+    """Multipart parts are already spooled to disk, so their size is known before reading"""
+    return file.size is not None and file.size > MAX_UPLOAD_BYTES
+
 @router.post("/upload", response_model=PDFUploadResponse)
 async def upload_financial_pdf(
     file: UploadFile = File(...),
@@ -56,13 +78,13 @@ async def upload_financial_pdf(
                 detail="Only PDF files are supported"
             )
         
-        # Validate file size (10MB limit)
-        file_content = await file.read()
-        if len(file_content) > 10 * 1024 * 1024:  # 10MB
+        # Validate file size (10MB limit) before reading the spooled part into memory
+        if _exceeds_upload_limit(file):
             raise HTTPException(
                 status_code=400,
                 detail="File size exceeds 10MB limit"
             )
+        file_content = await file.read()
         
         # Process the PDF
         pdf_processor = get_pdf_processor_service()
@@ -90,6 +112,9 @@ async def upload_financial_pdf(
         
     except HTTPException:
         raise
+    except PDFExtractionBusy as e:
+        logger.warning(f"⚠️ PDF upload shed, extraction pool saturated: {e}")
+        raise _pdf_overloaded()
     except Exception as e:
         logger.error(f"❌ PDF upload failed: {e}")
         raise HTTPException(
@@ -112,9 +137,9 @@ async def analyze_pdf_with_ai(
         if not file.filename.lower().endswith('.pdf'):
             raise HTTPException(status_code=400, detail="Only PDF files are supported")
         
-        file_content = await file.read()
-        if len(file_content) > 10 * 1024 * 1024:
+        if _exceeds_upload_limit(file):
             raise HTTPException(status_code=400, detail="File size exceeds 10MB limit")
+        file_content = await file.read()
         
         # Process PDF
         pdf_processor = get_pdf_processor_service()
@@ -145,6 +170,9 @@ async def analyze_pdf_with_ai(
         
     except HTTPException:
         raise
+    except PDFExtractionBusy as e:
+        logger.warning(f"⚠️ AI analysis shed, extraction pool saturated: {e}")
+        raise _pdf_overloaded()
     except Exception as e:
         logger.error(f"❌ AI analysis failed: {e}")
         raise HTTPException(status_code=500, detail=f"AI analysis failed: {str(e)}")
@@ -164,32 +192,39 @@ async def upload_multiple_pdfs(
                 detail="Maximum 5 files allowed per batch"
             )
         
-        results = []
         pdf_processor = get_pdf_processor_service()
-        
-        for file in files:
+
+        async def process_file(file: UploadFile) -> Dict[str, Any]:
             logger.info(f"📄 Processing batch file: {file.filename}")
             
             if not file.filename.lower().endswith('.pdf'):
-                results.append({
+                return {
                     "filename": file.filename,
                     "success": False,
                     "message": "Invalid file type - only PDF files are supported"
-                })
-                continue
+                }
             
-            file_content = await file.read()
-            if len(file_content) > 10 * 1024 * 1024:
-                results.append({
+            if _exceeds_upload_limit(file):
+                return {
                     "filename": file.filename,
                     "success": False,
                     "message": "File size exceeds 10MB limit"
-                })
-                continue
+                }
+            file_content = await file.read()
             
-            # Process the PDF
-            result = await pdf_processor.process_financial_pdf(file_content, file.filename)
-            results.append(result)
+            try:
+                result = await pdf_processor.process_financial_pdf(file_content, file.filename)
+            except PDFExtractionBusy:
+                return {
+                    "filename": file.filename,
+                    "success": False,
+                    "message": "PDF processing is busy. Please retry this file shortly."
+                }
+            result.setdefault("filename", file.filename)
+            return result
+        
+        # Files are extracted concurrently; the extraction pool bounds how many run at once
+        results = await asyncio.gather(*(process_file(file) for file in files))
         
         # Generate batch summary
         successful_files = [r for r in results if r['success']]
@@ -215,6 +250,89 @@ async def upload_multiple_pdfs(
         logger.error(f"❌ Batch upload failed: {e}")
         raise HTTPException(status_code=500, detail=f"Batch upload failed: {str(e)}")
 
+@router.post("/ingest", status_code=202)
+async def ingest_financial_pdf(request: Request, filename: str = Query("statement.pdf")):
+    """
+    Stream a raw PDF body (Content-Type: application/pdf) into a background processing job.
+    The body is spooled to disk and rejected as soon as it passes the size limit; follow
+    progress at events_url (SSE) or poll status_url.
+    """
+    if not filename.lower().endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="Only PDF files are supported")
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in ("application/pdf", "application/octet-stream"):
+        raise HTTPException(status_code=415, detail="Send the PDF as the raw request body (application/pdf)")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="File size exceeds 10MB limit")
+    
+    manager = get_pdf_ingestion_manager()
+    if not manager.has_capacity():
+        raise _pdf_overloaded()
+    
+    try:
+        path, size = await spool_upload(request.stream(), MAX_UPLOAD_BYTES)
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail="File size exceeds 10MB limit")
+    except InvalidUpload as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        job = manager.submit(path, filename, size)
+    except PDFIngestionBusy as e:
+        os.unlink(path)
+        logger.warning(f"⚠️ PDF ingestion shed: {e}")
+        raise _pdf_overloaded()
+    
+    return {
+        "success": True,
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/api/pdf/jobs/{job.job_id}",
+        "events_url": f"/api/pdf/jobs/{job.job_id}/events"
+    }
+
+def _get_ingestion_job(job_id: str):
+    job = get_pdf_ingestion_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingestion job not found or expired")
+    return job
+
+@router.get("/jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """
+    Status of an ingestion job, with the full extraction result once complete
+    """
+    return _get_ingestion_job(job_id).snapshot()
+
+@router.get("/jobs/{job_id}/events")
+async def stream_ingestion_events(job_id: str, request: Request):
+    """
+    Server-sent events for an ingestion job: a snapshot, then page events with the
+    transactions found on each page, then complete or failed. Honours Last-Event-ID.
+    """
+    job = _get_ingestion_job(job_id)
+    last_event_id = request.headers.get("last-event-id", "")
+    last_seq = int(last_event_id) if last_event_id.isdigit() else None
+    
+    async def event_stream():
+        async for seq, event in job.subscribe(last_seq):
+            if event is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"id: {seq}\ndata: {json.dumps(event)}\n\n"
+        yield "data: [DONE]\n\n"
+    
+    return StreamingResponse(
+        instrument_stream("pdf_ingest", event_stream()),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
 @router.get("/supported-formats")
 async def get_supported_formats():
     """
@@ -264,6 +382,9 @@ async def get_processing_status():
             ],
             "supported_formats": pdf_processor.supported_formats,
             "max_file_size_mb": pdf_processor.max_file_size // (1024 * 1024),
+            "extraction_pool": pdf_processor.extraction_pool.get_stats(),
+            "parse_cache": pdf_processor.parse_cache.get_stats() if pdf_processor.parse_cache else None,
+            "ingestion": get_pdf_ingestion_manager().get_stats(),
             "timestamp": datetime.utcnow().isoformat()
         }
         
@@ -220,8 +220,8 @@ async def get_portfolio_performance(
         
         days = period_days.get(period, 30)
         
-        # Get history and analytics
-        history_result = portfolio_service.get_portfolio_history(current_user['id'], days)
+        # Get period summary and analytics
+        summary_result = portfolio_service.get_performance_summary(current_user['id'], days)
         analytics_result = portfolio_service.get_detailed_analytics(current_user['id'])
         
         performance_data = {
@@ -229,8 +229,8 @@ async def get_portfolio_performance(
             "period_days": days
         }
         
-        if history_result['success']:
-            performance_data.update(history_result.get('summary', {}))
+        if summary_result['success']:
+            performance_data.update(summary_result.get('summary', {}))
         
         if analytics_result['success']:
             analytics = analytics_result.get('analytics', {})
@@ -433,6 +433,7 @@ async def portfolio_service_status():
             ],
             "supported_formats": ["json", "csv"],
             "max_history_days": 1095,
+            "analytics_cache": portfolio_service.analytics.get_stats(),
             "timestamp": datetime.utcnow().isoformat()
         }
         
@@ -33,6 +33,7 @@ import os
 import json
 import logging
 import asyncio
+import secrets
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
@@ -40,7 +41,7 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Depends, Request, BackgroundTasks, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, Field, validator
 import uvicorn
@@ -117,6 +118,22 @@ try:
 except ImportError as e:
     logger.warning(f"⚠️ aiohttp not available: {e}")
 
+from core.http_pool import get_http_pool, close_http_pools, get_http_pool_stats
+from core.metrics import CONTENT_TYPE_LATEST, instrument_stream, metrics
+from core.model_registry import GenerativeModelRegistry
+from core.rate_limit import RateLimit, get_rate_limiter
+from utils.response_cache import response_cache, response_cache_namespace
+from middleware.metrics_middleware import MetricsMiddleware
+
+CHAT_QUERIES = metrics.counter(
+    "artha_chat_queries_total", "Chat queries by the agent that answered and outcome", ("agent", "outcome")
+)
+CHAT_QUERY_SECONDS = metrics.histogram(
+    "artha_chat_query_duration_seconds", "End-to-end chat query latency by agent", ("agent",)
+)
+# Optional bearer token for /metrics; unset leaves the endpoint open (e.g. behind a private network)
+METRICS_AUTH_TOKEN = os.getenv("METRICS_AUTH_TOKEN", "")
+
 try:
     import google.generativeai as genai
     from google.generativeai.types import HarmCategory, HarmBlockThreshold
@@ -127,7 +144,7 @@ except ImportError as e:
     logger.warning(f"⚠️ Google Gemini AI not available: {e}")
 
 try:
-    from core.fi_mcp.production_client import get_user_financial_data, FinancialData
+    from core.fi_mcp.production_client import get_user_financial_data, get_financial_data_fetch_stats, FinancialData
     FI_MONEY_AVAILABLE = True
     logger.info("✅ Fi Money MCP client imported successfully")
 except ImportError as e:
@@ -334,6 +351,13 @@ except ImportError as e:
 # Import services
 try:
     from services.chat_service import ChatService
+    from services.chat_write_queue import ChatWriteBehindQueue
+    from database.pg_pool import get_pg_pool, close_pg_pool
+    from services.password_hasher import get_password_hasher
+    from services.pdf_extraction_pool import get_pdf_extraction_pool
+    from services.pdf_parse_cache import get_pdf_parse_cache
+    from services.pdf_ingestion import get_pdf_ingestion_manager
+    from services.auth_service import get_auth_service
     from services.pdf_service import PDFGenerationService
     SERVICES_AVAILABLE = True
     logger.info("✅ Services imported successfully")
@@ -411,18 +435,37 @@ def handle_simple_greeting(query: str, user_data: Dict[str, Any] = None) -> dict
     }
 
 
+# Per-user chat request limit (shared with other workers when RATE_LIMIT_BACKEND=redis)
+CHAT_USER_RATE_LIMIT = RateLimit(requests=10, period=60)
+
+# Persist chat turns through the write-behind queue (false = write before responding)
+CHAT_WRITE_BEHIND = os.getenv("CHAT_WRITE_BEHIND", "true").lower() == "true"
+
+# Chat models: Gemini 2.5 Pro for think_mode, Flash otherwise
+CHAT_MODELS = ("gemini-2.5-pro", "gemini-2.5-flash")
+
+# Static preamble, bound to the cached model as its system instruction so it
+# is a stable prompt prefix instead of being rebuilt into every prompt
+ARTHA_SYSTEM_INSTRUCTION = (
+    "You are Artha AI, a sophisticated financial advisor for Indian markets.\n"
+    "Provide personalized, actionable financial advice based on the user's actual financial data."
+)
+
+
 class ArthaAIChatSystem:
     """Enhanced Artha AI Chat System with multi-agent routing"""
     
     def __init__(self):
         self.conversation_history = []
-        self.rate_limit_requests = {}
+        self.rate_limiter = get_rate_limiter()
         self.chat_service = ChatService() if SERVICES_AVAILABLE else None
+        # Chat turns are persisted by a background writer, off the response path
+        self.chat_writer = (ChatWriteBehindQueue(self.chat_service)
+                            if self.chat_service and CHAT_WRITE_BEHIND else None)
         self.pdf_service = PDFGenerationService() if SERVICES_AVAILABLE else None
         
-        # Initialize HTTP session for connection pooling
-        self.http_session = None
-        self._init_http_session()
+        # Shared keep-alive connection pool (also used by the Fi MCP client)
+        self.http_pool = get_http_pool()
         
         # Initialize Gemini client
         if GEMINI_AVAILABLE:
@@ -436,51 +479,58 @@ class ArthaAIChatSystem:
                 self.gemini_client = None
         else:
             self.gemini_client = None
-    
-    def _init_http_session(self):
-        """Initialize aiohttp session for connection pooling"""
-        try:
-            import aiohttp
-            # Configure connection pooling for better performance
-            connector = aiohttp.TCPConnector(
-                limit=100,  # Total connection pool size
-                limit_per_host=30,  # Max connections per host
-                ttl_dns_cache=300,  # DNS cache TTL
-                use_dns_cache=True,
-                keepalive_timeout=30,
-                enable_cleanup_closed=True
-            )
-            
-            # Set timeout configuration
-            timeout = aiohttp.ClientTimeout(
-                total=60,  # Total timeout
-                connect=10,  # Connection timeout
-                sock_read=30  # Socket read timeout
-            )
-            
-            self.http_session = aiohttp.ClientSession(
-                connector=connector,
-                timeout=timeout,
-                headers={'User-Agent': 'Artha-AI/1.0'}
-            )
-            logger.info("✅ HTTP session with connection pooling initialized")
-        except Exception as e:
-            logger.warning(f"⚠️ Failed to initialize HTTP session: {e}")
-            self.http_session = None
+        
+        # Models are built once per (name, config) and reused across requests and retries
+        self.model_registry = GenerativeModelRegistry(
+            factory=lambda **kwargs: self.gemini_client.GenerativeModel(**kwargs)
+        )
+        if self.gemini_client:
+            self.model_options = {
+                "safety_settings": {
+                    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+                    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+                    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+                    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+                },
+                "generation_config": {
+                    "temperature": 0.7,
+                    "top_p": 0.9,
+                    "top_k": 40,
+                    "max_output_tokens": 8192,
+                },
+                "system_instruction": ARTHA_SYSTEM_INSTRUCTION
+            }
+            self.model_registry.warm(CHAT_MODELS, **self.model_options)
+        else:
+            self.model_options = {}
     
     async def cleanup(self):
-        """Cleanup resources including HTTP session"""
-        if self.http_session:
-            try:
-                await self.http_session.close()
-                logger.info("✅ HTTP session closed")
-            except Exception as e:
-                logger.error(f"❌ Error closing HTTP session: {e}")
+        """Cleanup resources: flush pending chat writes, then close the shared HTTP pool"""
+        if self.chat_writer:
+            await self.chat_writer.stop()
+        if SERVICES_AVAILABLE:
+            close_pg_pool()
+        await close_http_pools()
     
     async def process_query(self, query: str, user_id: str = None, conversation_id: str = None,
                           think_mode: bool = False, agent: str = None, demo_mode: bool = False,
                           pdf_context: str = None, user_data: Dict[str, Any] = None) -> Dict[str, Any]:
         """Process user query with enhanced routing logic and comprehensive error handling"""
+        start = time.perf_counter()
+        # Agents cache LLM answers; scope them to this user so they are never served to another
+        with response_cache_namespace(user_id or "anonymous"):
+            result = await self._route_query(query, user_id, conversation_id, think_mode, agent,
+                                             demo_mode, pdf_context, user_data)
+        # Labelled by who actually answered, so investment fallbacks count as Gemini
+        agent_used = result.get("agent_used") or ("greeting" if result.get("greeting") else "none")
+        outcome = result.get("error_type") or ("error" if result.get("error") else "ok")
+        CHAT_QUERIES.labels(agent_used, outcome).inc()
+        CHAT_QUERY_SECONDS.labels(agent_used).observe(time.perf_counter() - start)
+        return result
+    
+    async def _route_query(self, query: str, user_id: str, conversation_id: str, think_mode: bool,
+                           agent: str, demo_mode: bool, pdf_context: str,
+                           user_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
             # Input validation
             if not query or not query.strip():
@@ -511,7 +561,7 @@ class ArthaAIChatSystem:
             
             # Rate limiting check with enhanced error handling
             try:
-                if not self._check_rate_limit(user_id or "anonymous"):
+                if not await self._check_rate_limit(user_id or "anonymous"):
                     logger.warning(f"⚠️ Rate limit exceeded for user: {user_id or 'anonymous'}")
                     return {
                         "response": "You're sending requests too quickly. Please wait a moment before trying again.",
@@ -531,10 +581,10 @@ class ArthaAIChatSystem:
                     logger.error(f"❌ Investment agent failed: {investment_error}")
                     logger.info("🔄 Falling back to Gemini processing")
                     # Fallback to Gemini
-                    return await self._process_gemini_query(query, user_id, conversation_id, think_mode, demo_mode, pdf_context)
+                    return await self._process_gemini_query(query, user_id, conversation_id, think_mode, demo_mode, pdf_context, user_data)
             
             # Default to Gemini routing based on think_mode
-            return await self._process_gemini_query(query, user_id, conversation_id, think_mode, demo_mode, pdf_context)
+            return await self._process_gemini_query(query, user_id, conversation_id, think_mode, demo_mode, pdf_context, user_data)
             
         except HTTPException:
             # Re-raise HTTP exceptions
@@ -592,7 +642,8 @@ class ArthaAIChatSystem:
             return await self._process_gemini_query(query, user_id, None, False, demo_mode, pdf_context)
     
     async def _process_gemini_query(self, query: str, user_id: str, conversation_id: str, 
-                                  think_mode: bool, demo_mode: bool, pdf_context: str = None) -> Dict[str, Any]:
+                                  think_mode: bool, demo_mode: bool, pdf_context: str = None,
+                                  user_data: Dict[str, Any] = None) -> Dict[str, Any]:
         """Process query using Gemini AI with enhanced error handling and fallback mechanisms"""
         try:
             if not self.gemini_client:
@@ -612,11 +663,8 @@ class ArthaAIChatSystem:
                 logger.info(f"✅ Financial data loaded for Gemini processing (demo: {demo_mode})")
                 
                 # Load user data for personalization
-                if user_data:
-                    user_name = user_data.get('full_name') or user_data.get('firstName', 'User')
-                    user_context = f"User: {user_name}"
-                    if user_data.get('age'):
-                        user_context += f", Age: {user_data['age']}"
+                user_context = self._build_user_context(user_data)
+                if user_context:
                     logger.info(f"✅ User context loaded: {user_context}")
                     
             except Exception as data_error:
@@ -631,7 +679,7 @@ class ArthaAIChatSystem:
             for attempt in range(max_retries + 1):
                 try:
                     # Check rate limiting before each attempt
-                    if not self._check_rate_limit(user_id):
+                    if not await self._check_rate_limit(user_id or "anonymous"):
                         logger.warning(f"⚠️ Rate limit exceeded for user {user_id}")
                         response = "I'm currently processing many requests. Please wait a moment and try again."
                         break
@@ -657,20 +705,7 @@ class ArthaAIChatSystem:
                 response = "I apologize, but I'm unable to generate a response at the moment. Please try again."
             
             # Store in conversation history with error handling
-            try:
-                self.conversation_history.append({
-                    "timestamp": datetime.now().isoformat(),
-                    "query": query[:500],  # Limit stored query length
-                    "response": response[:1000],  # Limit stored response length
-                    "think_mode": think_mode,
-                    "user_id": user_id
-                })
-                
-                # Keep only last 10 conversations in memory
-                if len(self.conversation_history) > 10:
-                    self.conversation_history = self.conversation_history[-10:]
-            except Exception as history_error:
-                logger.warning(f"⚠️ Failed to store conversation in memory: {history_error}")
+            self._remember_exchange(query, response, think_mode, user_id)
             
             # Save to persistent storage if available
             if self.chat_service and user_id:
@@ -697,7 +732,6 @@ class ArthaAIChatSystem:
     
     async def _generate_gemini_response(self, query: str, financial_data, think_mode: bool, pdf_context: str = None, user_context: str = "") -> str:
         """Generate response using Gemini AI with enhanced stability and error handling"""
-        start_time = time.time()
         attempt_start = None
         
         try:
@@ -707,22 +741,8 @@ class ArthaAIChatSystem:
             # Create enhanced prompt with financial context and user data
             prompt = self._create_enhanced_prompt(query, financial_data, pdf_context, user_context)
             
-            # Configure model with proper timeout and generation settings
-            model = self.gemini_client.GenerativeModel(
-                model_name=model_name,
-                safety_settings={
-                    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                },
-                generation_config={
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "top_k": 40,
-                    "max_output_tokens": 8192,
-                }
-            )
+            # Reuse the registry's model for this name and configuration
+            model = self._get_model(model_name)
             
             # Generate response with timeout and timing
             attempt_start = time.time()
@@ -735,37 +755,194 @@ class ArthaAIChatSystem:
             # Validate response
             if not response or not response.text or not response.text.strip():
                 logger.warning("⚠️ Gemini returned empty response, using fallback")
-                total_time = time.time() - start_time
-                self._log_api_metrics(model_name, attempt_time, total_time, "empty_response", len(query))
+                self._record_api_metrics(model_name, attempt_time, "empty_response")
                 return self._generate_fallback_response(query, financial_data, pdf_context)
             
-            # Log successful API call metrics
-            total_time = time.time() - start_time
-            response_length = len(response.text.strip())
-            self._log_api_metrics(model_name, attempt_time, total_time, "success", len(query), response_length)
+            # Record successful API call latency
+            self._record_api_metrics(model_name, attempt_time, "success")
             
             return response.text.strip()
             
         except asyncio.TimeoutError:
             attempt_time = time.time() - attempt_start if attempt_start else 0
-            total_time = time.time() - start_time
-            self._log_api_metrics(model_name, attempt_time, total_time, "timeout", len(query))
+            self._record_api_metrics(model_name, attempt_time, "timeout")
             logger.error("❌ Gemini API timeout after 30 seconds")
             return self._generate_fallback_response(query, financial_data, pdf_context)
         except Exception as e:
             attempt_time = time.time() - attempt_start if attempt_start else 0
-            total_time = time.time() - start_time
-            self._log_api_metrics(model_name, attempt_time, total_time, "error", len(query), error_msg=str(e))
+            self._record_api_metrics(model_name, attempt_time, "error")
             logger.error(f"❌ Gemini response generation failed: {e}")
             # Don't expose internal errors to users
             return self._generate_fallback_response(query, financial_data, pdf_context)
     
+    def _get_model(self, model_name: str):
+        """Shared Gemini model with the chat safety, generation and system settings"""
+        return self.model_registry.get(model_name, **self.model_options)
+    
+    async def stream_query(self, query: str, user_id: str = None, conversation_id: str = None,
+                           think_mode: bool = False, agent: str = None, demo_mode: bool = False,
+                           pdf_context: str = None, user_data: Dict[str, Any] = None):
+        """
+        Streaming counterpart of process_query.
+        
+        Yields {"type": "content", "content": ...} events as Gemini produces them,
+        followed by a single {"type": "metrics", ...} event with TTFT and tokens/sec.
+        Greetings, rate-limit notices and the investment agent are not streamed by
+        their source, so they arrive as a single content event.
+        """
+        if not query or not query.strip():
+            yield {"type": "content", "content": "Please provide a question or request for me to help you with."}
+            return
+        
+        if len(query) > 5000:
+            logger.warning(f"⚠️ Query too long ({len(query)} chars), truncating")
+            query = query[:5000] + "..."
+        
+        if (is_simple_greeting(query)
+                or (agent == "investment" and INVESTMENT_AGENT_AVAILABLE)
+                or not self.gemini_client):
+            result = await self.process_query(query, user_id, conversation_id, think_mode, agent,
+                                              demo_mode, pdf_context, user_data)
+            yield {"type": "content", "content": result.get("response", "")}
+            return
+        
+        if not await self._check_rate_limit(user_id or "anonymous"):
+            logger.warning(f"⚠️ Rate limit exceeded for user: {user_id or 'anonymous'}")
+            yield {"type": "content", "content": "You're sending requests too quickly. Please wait a moment before trying again."}
+            return
+        
+        financial_data = None
+        try:
+            financial_data = await self._get_financial_data_with_demo_support(demo_mode)
+        except Exception as data_error:
+            logger.warning(f"⚠️ Failed to load financial data: {data_error}")
+        
+        chunks = []
+        async for event in self._stream_gemini_response(query, financial_data, think_mode, pdf_context,
+                                                         self._build_user_context(user_data)):
+            if event["type"] == "content":
+                chunks.append(event["content"])
+            yield event
+        
+        response = "".join(chunks).strip()
+        if response:
+            self._remember_exchange(query, response, think_mode, user_id)
+            if self.chat_service and user_id:
+                try:
+                    await self._save_to_history(user_id, query, response, "gemini", conversation_id)
+                except Exception as save_error:
+                    logger.warning(f"⚠️ Failed to save conversation to persistent storage: {save_error}")
+    
+    async def _stream_gemini_response(self, query: str, financial_data, think_mode: bool,
+                                      pdf_context: str = None, user_context: str = ""):
+        """Forward Gemini stream chunks as they arrive and report TTFT / tokens per second"""
+        model_name = "gemini-2.5-pro" if think_mode else "gemini-2.5-flash"
+        prompt = self._create_enhanced_prompt(query, financial_data, pdf_context, user_context)
+        
+        start_time = time.time()
+        first_chunk_time = None
+        response_length = 0
+        output_tokens = 0
+        status = "success"
+        
+        try:
+            model = self._get_model(model_name)
+            stream = await asyncio.wait_for(model.generate_content_async(prompt, stream=True), timeout=30.0)
+            chunk_iter = stream.__aiter__()
+            
+            while True:
+                try:
+                    # Same 30s budget as the non-streaming path, applied per chunk
+                    chunk = await asyncio.wait_for(chunk_iter.__anext__(), timeout=30.0)
+                except StopAsyncIteration:
+                    break
+                
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunk without text parts (e.g. a safety or finish-reason-only chunk)
+                    continue
+                if not text:
+                    continue
+                
+                if first_chunk_time is None:
+                    first_chunk_time = time.time()
+                response_length += len(text)
+                yield {"type": "content", "content": text}
+            
+            usage = getattr(stream, "usage_metadata", None)
+            output_tokens = getattr(usage, "candidates_token_count", 0) or 0
+            
+            if first_chunk_time is None:
+                status = "empty_response"
+                logger.warning("⚠️ Gemini returned empty stream, using fallback")
+                yield {"type": "content", "content": self._generate_fallback_response(query, financial_data, pdf_context)}
+        
+        except asyncio.TimeoutError:
+            status = "timeout"
+            logger.error("❌ Gemini API stream timed out after 30 seconds")
+        except Exception as e:
+            status = "error"
+            logger.error(f"❌ Gemini streaming failed: {e}")
+        
+        if status in ("timeout", "error"):
+            if first_chunk_time is None:
+                yield {"type": "content", "content": self._generate_fallback_response(query, financial_data, pdf_context)}
+            else:
+                # Part of the answer is already on the wire; close it off rather than restart
+                yield {"type": "content", "content": "\n\n_(Response interrupted. Please try again for the complete answer.)_"}
+        
+        end_time = time.time()
+        total_time = end_time - start_time
+        ttft = (first_chunk_time - start_time) if first_chunk_time else None
+        if not output_tokens:
+            # usage_metadata is missing on interrupted streams; ~4 chars per token
+            output_tokens = response_length // 4
+        generation_time = end_time - first_chunk_time if first_chunk_time else 0
+        tokens_per_sec = output_tokens / generation_time if generation_time > 0 else 0.0
+        
+        self._record_api_metrics(model_name, total_time, status, ttft=ttft, tokens_per_sec=tokens_per_sec)
+        yield {
+            "type": "metrics",
+            "model": model_name,
+            "status": status,
+            "ttft_ms": round(ttft * 1000, 2) if ttft is not None else None,
+            "total_time_ms": round(total_time * 1000, 2),
+            "output_tokens": output_tokens,
+            "tokens_per_sec": round(tokens_per_sec, 2)
+        }
+    
+    def _build_user_context(self, user_data: Optional[Dict[str, Any]]) -> str:
+        """Short personalization line for the prompt"""
+        if not user_data:
+            return ""
+        user_name = user_data.get('full_name') or user_data.get('firstName', 'User')
+        user_context = f"User: {user_name}"
+        if user_data.get('age'):
+            user_context += f", Age: {user_data['age']}"
+        return user_context
+    
+    def _remember_exchange(self, query: str, response: str, think_mode: bool, user_id: str):
+        """Keep the last few exchanges in memory for prompt context"""
+        try:
+            self.conversation_history.append({
+                "timestamp": datetime.now().isoformat(),
+                "query": query[:500],  # Limit stored query length
+                "response": response[:1000],  # Limit stored response length
+                "think_mode": think_mode,
+                "user_id": user_id
+            })
+            
+            # Keep only last 10 conversations in memory
+            if len(self.conversation_history) > 10:
+                self.conversation_history = self.conversation_history[-10:]
+        except Exception as history_error:
+            logger.warning(f"⚠️ Failed to store conversation in memory: {history_error}")
+    
     def _create_enhanced_prompt(self, query: str, financial_data, pdf_context: str = None, user_context: str = "") -> str:
         """Create enhanced prompt with financial context and PDF data"""
-        prompt_parts = [
-            "You are Artha AI, a sophisticated financial advisor for Indian markets.",
-            "Provide personalized, actionable financial advice based on the user's actual financial data."
-        ]
+        # The Artha AI preamble is the model's system instruction (ARTHA_SYSTEM_INSTRUCTION)
+        prompt_parts = []
         
         # Add user context
         if user_context:
@@ -787,35 +964,15 @@ class ArthaAIChatSystem:
         
         prompt_parts.append(f"\nUser Query: {query}")
         
-        return "\n".join(prompt_parts)
+        return "\n".join(prompt_parts).lstrip()
     
-    def _log_api_metrics(self, model_name: str, attempt_time: float, total_time: float, 
-                        status: str, query_length: int, response_length: int = 0, error_msg: str = None):
-        """Log API performance metrics for monitoring"""
+    def _record_api_metrics(self, model_name: str, attempt_time: float, status: str,
+                            ttft: float = None, tokens_per_sec: float = None):
+        """Record a Gemini call into the per-model latency histograms (failures are logged by the caller)"""
         try:
-            metrics = {
-                "timestamp": datetime.now().isoformat(),
-                "model": model_name,
-                "attempt_time_ms": round(attempt_time * 1000, 2),
-                "total_time_ms": round(total_time * 1000, 2),
-                "status": status,
-                "query_length": query_length,
-                "response_length": response_length
-            }
-            
-            if error_msg:
-                metrics["error"] = error_msg[:200]  # Truncate long error messages
-            
-            # Log with appropriate level based on status
-            if status == "success":
-                logger.info(f"📊 API Metrics: {metrics}")
-            elif status == "timeout":
-                logger.warning(f"⏱️ API Timeout: {metrics}")
-            else:
-                logger.error(f"❌ API Error: {metrics}")
-                
+            self.model_registry.record(model_name, status, attempt_time, ttft=ttft, tokens_per_sec=tokens_per_sec)
         except Exception as e:
-            logger.error(f"Failed to log API metrics: {e}")
+            logger.error(f"Failed to record API metrics: {e}")
     
     def _format_financial_data(self, financial_data) -> str:
         """Format financial data for prompt inclusion"""
@@ -847,48 +1004,6 @@ class ArthaAIChatSystem:
         
         return SampleFinancialData()
     
-    def _check_rate_limit(self, user_id: str) -> bool:
-        """Check if user has exceeded rate limits"""
-        try:
-            current_time = datetime.now()
-            
-            # Initialize user rate limit data if not exists
-            if user_id not in self.rate_limit_requests:
-                self.rate_limit_requests[user_id] = {
-                    "requests": [],
-                    "last_request": current_time
-                }
-            
-            user_data = self.rate_limit_requests[user_id]
-            
-            # Clean old requests (older than 1 minute)
-            cutoff_time = current_time - timedelta(minutes=1)
-            user_data["requests"] = [
-                req_time for req_time in user_data["requests"] 
-                if req_time > cutoff_time
-            ]
-            
-            # Check rate limits: max 10 requests per minute, min 2 seconds between requests
-            if len(user_data["requests"]) >= 10:
-                logger.warning(f"Rate limit exceeded: {len(user_data['requests'])} requests in last minute")
-                return False
-            
-            # Check minimum interval between requests
-            time_since_last = (current_time - user_data["last_request"]).total_seconds()
-            if time_since_last < 2.0:
-                logger.warning(f"Request too frequent: {time_since_last:.1f}s since last request")
-                return False
-            
-            # Update rate limit data
-            user_data["requests"].append(current_time)
-            user_data["last_request"] = current_time
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Rate limit check failed: {e}")
-            return True  # Allow request if rate limiting fails
-    
     def _generate_fallback_response(self, query: str, financial_data=None, pdf_context: str = None) -> str:
         """Generate a fallback response when AI services fail"""
         try:
@@ -917,39 +1032,17 @@ class ArthaAIChatSystem:
             logger.error(f"❌ Fallback response generation failed: {e}")
             return "I apologize, but I'm currently unable to process your request. Please try again later or contact support if the issue persists."
     
-    def _check_rate_limit(self, user_id: str) -> bool:
-        """Simple rate limiting implementation"""
-        current_time = datetime.now().timestamp()
-        if user_id not in self.rate_limit_requests:
-            self.rate_limit_requests[user_id] = []
-        
-        # Remove requests older than 1 minute
-        self.rate_limit_requests[user_id] = [
-            req_time for req_time in self.rate_limit_requests[user_id]
-            if current_time - req_time < 60
-        ]
-        
-        # Check if under limit (10 requests per minute)
-        if len(self.rate_limit_requests[user_id]) >= 10:
-            return False
-        
-        self.rate_limit_requests[user_id].append(current_time)
-        return True
+    async def _check_rate_limit(self, user_id: str) -> bool:
+        """Per-user chat limit on the shared GCRA limiter"""
+        result = await self.rate_limiter.hit(f"chat_user:{user_id}", CHAT_USER_RATE_LIMIT)
+        return result.allowed
     
     async def _save_to_history(self, user_id: str, query: str, response: str, agent_type: str, conversation_id: str = None):
-        """Save conversation to persistent history with optimized batch processing"""
+        """Save conversation to persistent history, via the write-behind queue when enabled"""
         try:
             if self.chat_service:
-                # Create conversation if it doesn't exist
-                if not conversation_id:
-                    conversation_id = self.chat_service.create_conversation(
-                        user_id=user_id,
-                        agent_mode=agent_type
-                    )
-                
-                # Use batch message saving for better performance
                 processing_start = time.time()
-                await self._batch_save_messages(conversation_id, [
+                messages = [
                     {
                         "message_type": "user",
                         "content": query,
@@ -964,26 +1057,28 @@ class ArthaAIChatSystem:
                         "tokens_used": int(len(response.split()) * 1.3),  # Rough token estimation
                         "processing_time": time.time() - processing_start
                     }
-                ])
+                ]
+                
+                if self.chat_writer:
+                    return await self.chat_writer.submit(user_id, messages, conversation_id, agent_type)
+                
+                # Create conversation if it doesn't exist
+                if not conversation_id:
+                    conversation_id = await self.chat_service.create_conversation_async(
+                        user_id=user_id,
+                        agent_mode=agent_type
+                    )
                 
+                await self._batch_save_messages(conversation_id, messages)
                 return conversation_id
         except Exception as e:
             logger.error(f"❌ Failed to save conversation history: {e}")
             return None
     
     async def _batch_save_messages(self, conversation_id: str, messages: List[Dict[str, Any]]):
-        """Save multiple messages in a single transaction for better performance"""
+        """Save multiple messages in a single transaction without blocking the event loop"""
         try:
-            for message_data in messages:
-                self.chat_service.add_message(
-                    conversation_id=conversation_id,
-                    message_type=message_data["message_type"],
-                    content=message_data["content"],
-                    agent_mode=message_data.get("agent_mode"),
-                    tokens_used=int(message_data.get("tokens_used", 0)),
-                    processing_time=message_data.get("processing_time", 0.0),
-                    metadata=message_data.get("metadata")
-                )
+            await self.chat_service.add_messages_async(conversation_id, messages)
         except Exception as e:
             logger.error(f"❌ Failed to batch save messages: {e}")
             raise
@@ -1173,6 +1268,20 @@ async def lifespan(app: FastAPI):
     if INVESTMENT_AGENT_AVAILABLE:
         logger.info("✅ Investment Agent ready")
     
+    # Open the shared HTTP pool on the serving loop so the first Fi MCP call
+    # doesn't pay for connector setup
+    await get_http_pool().get_session()
+    
+    if chat_system.chat_writer:
+        chat_system.chat_writer.start()
+    
+    # Pre-warm the PostgreSQL pool shared by the user, auth and portfolio services
+    if SERVICES_AVAILABLE:
+        try:
+            await asyncio.to_thread(get_pg_pool().warm)
+        except Exception as e:
+            logger.warning(f"⚠️ PostgreSQL pool warm-up failed, connections will open on demand: {e}")
+    
     app_state["startup_complete"] = True
     logger.info("✅ Server startup complete")
     
@@ -1180,6 +1289,10 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("🛑 Shutting down Artha AI Backend Server...")
+    await chat_system.cleanup()
+    if SERVICES_AVAILABLE:
+        await get_pdf_ingestion_manager().shutdown()
+        get_pdf_extraction_pool().shutdown()
 
 
 # Create FastAPI app
@@ -1199,6 +1312,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts and latency histograms for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Add explicit CORS headers (improved version)
 @app.middleware("http")
 async def add_cors_headers(request: Request, call_next):
@@ -1272,6 +1388,17 @@ if ERROR_HANDLING_AVAILABLE:
 async def root():
     return {"message": "Artha AI Backend (Merged) is running", "version": "2.0"}
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """Prometheus text exposition of the process metrics registry"""
+    if METRICS_AUTH_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        if not secrets.compare_digest(authorization, f"Bearer {METRICS_AUTH_TOKEN}"):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    # Collectors read pool and cache stats, which may touch SQLite; keep that off the loop
+    body = await asyncio.to_thread(metrics.render)
+    return PlainTextResponse(body, media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/health")
 async def health_check():
     return {
@@ -1818,7 +1945,6 @@ async def stream_query(request: QueryRequest):
             # Initial status
             init_msg = json.dumps({"type": "log", "content": "🤖 Artha AI is thinking..."})
             yield f"data: {init_msg}\n\n"
-            await asyncio.sleep(0.1)
             
             # Extract user_data properly - this is critical for personalization
             user_data = None
@@ -1849,8 +1975,6 @@ async def stream_query(request: QueryRequest):
                 status_msg = json.dumps({"type": "log", "content": "⚡ Fast response mode"})
                 yield f"data: {status_msg}\n\n"
             
-            await asyncio.sleep(0.1)
-            
             # Load financial data with proper error handling
             financial_data = None
             try:
@@ -1867,8 +1991,9 @@ async def stream_query(request: QueryRequest):
             process_msg = json.dumps({"type": "log", "content": "✨ Generating response..."})
             yield f"data: {process_msg}\n\n"
             
-            # Call chat system with all required parameters
-            result = await chat_system.process_query(
+            # Forward model chunks as they arrive
+            has_content = False
+            async for event in chat_system.stream_query(
                 query=request.query,
                 user_id=request.user_id,
                 conversation_id=request.conversation_id,
@@ -1877,27 +2002,12 @@ async def stream_query(request: QueryRequest):
                 demo_mode=request.demo_mode,
                 pdf_context=pdf_context,
                 user_data=user_data  # Critical: pass user_data for personalization
-            )
+            ):
+                if event["type"] == "content":
+                    has_content = has_content or bool(event["content"])
+                yield f"data: {json.dumps(event)}\n\n"
             
-            # Stream response content
-            if result and "response" in result:
-                response_text = result["response"]
-                
-                # Stream in smaller chunks for better UX
-                words = response_text.split()
-                for i, word in enumerate(words):
-                    chunk_msg = json.dumps({"type": "content", "content": word + " "})
-                    yield f"data: {chunk_msg}\n\n"
-                    
-                    # Add small delay every few words
-                    if i % 3 == 0:
-                        await asyncio.sleep(0.02)
-                
-                # Add sources if available
-                if "sources" in result and result["sources"]:
-                    sources_msg = json.dumps({"type": "log", "content": f"📚 {len(result['sources'])} sources used"})
-                    yield f"data: {sources_msg}\n\n"
-            else:
+            if not has_content:
                 # Fallback response
                 fallback_msg = json.dumps({"type": "content", "content": "I apologize, but I couldn't generate a proper response. Please try again."})
                 yield f"data: {fallback_msg}\n\n"
@@ -1922,7 +2032,7 @@ async def stream_query(request: QueryRequest):
             yield f"data: [DONE]\n\n"
     
     return StreamingResponse(
-        generate_response(), 
+        instrument_stream("stream_query", generate_response()),
         media_type="text/plain",
         headers={
             "Cache-Control": "no-cache",
@@ -1948,15 +2058,13 @@ async def stream_chat(request: ChatRequest):
             
             # Initial connection confirmation
             yield f"data: {json.dumps({'type': 'log', 'content': '🔗 Connection established - streaming enabled'})}\n\n"
-            await asyncio.sleep(0.1)
             
             # Load conversation history if provided
             if request.conversation_id:
-                existing_history = load_conversation_history(request.conversation_id)
+                existing_history = await load_conversation_history(request.conversation_id)
                 if existing_history:
                     request.conversation_history.extend(existing_history)
                     yield f"data: {json.dumps({'type': 'log', 'content': f'📚 Loaded {len(existing_history)} previous messages'})}\n\n"
-                    await asyncio.sleep(0.1)
             
             # Track demo mode sessions
             if request.conversation_id:
@@ -1968,23 +2076,21 @@ async def stream_chat(request: ChatRequest):
                 pdf_context_text = format_pdf_context_for_ai(request.pdf_context)
                 if pdf_context_text:
                     yield f"data: {json.dumps({'type': 'log', 'content': '📄 PDF context detected and loaded'})}\n\n"
-                    await asyncio.sleep(0.1)
             
             # Prepare enhanced query
-            enhanced_query = request.query
+            enhanced_query = request.message
             if pdf_context_text:
                 enhanced_query = f"""
                 UPLOADED DOCUMENT CONTEXT:
                 {pdf_context_text}
                 
-                USER QUERY: {request.query}
+                USER QUERY: {request.message}
                 
                 Please analyze the user's query in the context of the uploaded financial document data above.
                 """
             
             # Processing indicator
             yield f"data: {json.dumps({'type': 'log', 'content': '🤖 Processing your query with AI...'})}\n\n"
-            await asyncio.sleep(0.2)
 
 
             
@@ -1994,8 +2100,11 @@ async def stream_chat(request: ChatRequest):
             logger.info(f"🔍 User ID: {request.user_id}")
             logger.info(f"🔍 Demo mode: {request.demo_mode}")
             
-            # Process query with the chatbot using correct parameters and user data
-            response = await chatbot.process_query(
+            # Stream the response straight from the model
+            yield f"data: {json.dumps({'type': 'log', 'content': '✨ Generating response...'})}\n\n"
+            
+            chunks = []
+            async for event in chat_system.stream_query(
                 query=enhanced_query,
                 user_id=request.user_id,
                 conversation_id=request.conversation_id,
@@ -2004,42 +2113,19 @@ async def stream_chat(request: ChatRequest):
                 demo_mode=request.demo_mode,
                 pdf_context=pdf_context_text,
                 user_data=user_data
-            )
-            
-            # Start streaming the response
-            yield f"data: {json.dumps({'type': 'log', 'content': '✨ Generating response...'})}\n\n"
-            await asyncio.sleep(0.1)
-            
-            # Stream response content word by word
-            response_content = response.get('response', 'I apologize, but I encountered an issue processing your request.')
-            words = response_content.split()
-            
-            for i, word in enumerate(words):
-                yield f"data: {json.dumps({'type': 'content', 'content': word + ' '})}\n\n"
-                await asyncio.sleep(0.03)  # Adjust speed as needed
-            
-            # Add sources if available
-            sources = response.get('sources', [])
-            if sources:
-                yield f"data: {json.dumps({'type': 'log', 'content': f'📊 Response based on {len(sources)} sources'})}\n\n"
-                await asyncio.sleep(0.1)
-                
-                sources_text = f"\n\n📚 **Sources:**\n"
-                for i, source in enumerate(sources[:3], 1):
-                    source_title = source.get('title', 'Source')
-                    sources_text += f"{i}. {source_title}\n"
-                
-                # Stream sources
-                for word in sources_text.split():
-                    yield f"data: {json.dumps({'type': 'content', 'content': word + ' '})}\n\n"
-                    await asyncio.sleep(0.02)
+            ):
+                if event["type"] == "content":
+                    chunks.append(event["content"])
+                yield f"data: {json.dumps(event)}\n\n"
+            
+            response_content = "".join(chunks).strip()
+            if not response_content:
+                response_content = 'I apologize, but I encountered an issue processing your request.'
+                yield f"data: {json.dumps({'type': 'content', 'content': response_content})}\n\n"
              
             # Save conversation history
             if request.conversation_id:
-                save_conversation_history(request.conversation_id, [
-                    {"role": "user", "content": request.query},
-                    {"role": "assistant", "content": response_content}
-                ])
+                await save_conversation_history(request.conversation_id, request.message, response_content, request.user_id)
                 yield f"data: {json.dumps({'type': 'log', 'content': '💾 Conversation saved'})}\n\n"
             
             # End of stream
@@ -2059,7 +2145,7 @@ async def stream_chat(request: ChatRequest):
             logger.error(f"❌ Critical error in chat streaming: {e}")
             # Try to provide a fallback response
             try:
-                fallback_response = chatbot._generate_fallback_response(request.query, pdf_context=pdf_context_text)
+                fallback_response = chat_system._generate_fallback_response(request.message, pdf_context=pdf_context_text)
                 yield f"data: {json.dumps({'type': 'content', 'content': fallback_response})}\n\n"
                 yield f"data: {json.dumps({'type': 'sources', 'sources': []})}\n\n"
             except:
@@ -2068,7 +2154,7 @@ async def stream_chat(request: ChatRequest):
             yield f"data: [DONE]\n\n"
     
     return StreamingResponse(
-        generate_stream(),
+        instrument_stream("stream_chat", generate_stream()),
         media_type="text/plain",
         headers={
             "Cache-Control": "no-cache",
@@ -2838,7 +2924,19 @@ async def get_status():
             "pdf_context_injection": True,
             "pdf_enhanced_chat": True
         },
-        "active_demo_sessions": len(_demo_mode_sessions)
+        "active_demo_sessions": len(_demo_mode_sessions),
+        "fi_data_fetch": get_financial_data_fetch_stats() if FI_MONEY_AVAILABLE else None,
+        "http_pool": get_http_pool_stats(),
+        "gemini_models": chat_system.model_registry.get_stats(),
+        "response_cache": response_cache.get_stats(),
+        "chat_write_behind": chat_system.chat_writer.get_stats() if chat_system.chat_writer else None,
+        "rate_limiter": chat_system.rate_limiter.get_stats(),
+        "pg_pool": get_pg_pool().get_stats() if SERVICES_AVAILABLE else None,
+        "password_hasher": get_password_hasher().get_stats() if SERVICES_AVAILABLE else None,
+        "pdf_extraction": get_pdf_extraction_pool().get_stats() if SERVICES_AVAILABLE else None,
+        "pdf_parse_cache": get_pdf_parse_cache().get_stats() if SERVICES_AVAILABLE and get_pdf_parse_cache() else None,
+        "pdf_ingestion": get_pdf_ingestion_manager().get_stats() if SERVICES_AVAILABLE else None,
+        "token_verification": get_auth_service().get_token_verification_stats() if SERVICES_AVAILABLE else None
     }
 
 
@@ -0,0 +1,117 @@
+"""
+Login Throughput Benchmark
+==========================
+
+Compares login throughput when every call opens its own psycopg2 connection
+(the old _get_db_connection behaviour) against borrowing from the shared
+PostgreSQL pool. Needs a reachable PostgreSQL with the users table.
+
+By default only the login lookup query is timed, so the connection cost
+isn't hidden behind bcrypt. Pass --email/--password for an existing account
+to time AuthService.login_user end to end instead.
+
+Usage:
+    python benchmarks/bench_auth_login.py [--requests 500] [--concurrency 16]
+    python benchmarks/bench_auth_login.py --email user@example.com --password '...'
+"""
+
+import argparse
+import hashlib
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from database.config import get_database_url
+from database.pg_pool import PostgresConnectionPool
+
+LOGIN_LOOKUP = """
+    SELECT id, email, password_hash, salt, login_attempts, locked_until,
+           is_active, is_verified, full_name_encrypted, full_name_nonce, full_name_auth_tag,
+           last_login
+    FROM users WHERE email_hash = %s
+"""
+
+
+@contextmanager
+def per_call_connection(dsn):
+    """What the services did before: a brand-new connection per call"""
+    conn = psycopg2.connect(dsn, cursor_factory=RealDictCursor)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def lookup(get_connection, email_hash):
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(LOGIN_LOOKUP, (email_hash,))
+            cursor.fetchone()
+
+
+def run(label, call, requests, concurrency):
+    def timed(_):
+        start = time.perf_counter()
+        call()
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = sorted(executor.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    print(f"  {label:<10} {requests / elapsed:8.1f} logins/s   "
+          f"p50 {statistics.median(samples):7.2f} ms   p99 {samples[int(len(samples) * 0.99) - 1]:7.2f} ms")
+    return requests / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--email", help="Existing account for an end-to-end login_user run")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+
+    dsn = get_database_url()
+    pool = PostgresConnectionPool(dsn=dsn, max_connections=max(args.concurrency, 2))
+    pool.warm()
+
+    print(f"🔐 Login throughput: {args.requests} requests, concurrency {args.concurrency}")
+
+    if args.email:
+        from services.auth_service import AuthService
+        service = AuthService()
+
+        def login():
+            service.login_user(args.email, args.password)
+
+        with patch.object(AuthService, "_get_db_connection", lambda self: per_call_connection(dsn)):
+            before = run("per-call", login, args.requests, args.concurrency)
+        with patch.object(AuthService, "_get_db_connection", lambda self: pool.connection()):
+            after = run("pooled", login, args.requests, args.concurrency)
+    else:
+        email_hash = hashlib.sha256(b"bench@example.com").hexdigest()
+        before = run("per-call", lambda: lookup(lambda: per_call_connection(dsn), email_hash),
+                     args.requests, args.concurrency)
+        after = run("pooled", lambda: lookup(pool.connection, email_hash),
+                    args.requests, args.concurrency)
+
+    stats = pool.get_stats()
+    print(f"🚀 Speedup: {after / before:.1f}x "
+          f"({stats['connections_opened']} pooled connections served {stats['checkouts']} checkouts)")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Financial Data Cache Benchmark
+==============================
+
+Compares get_cached_financial_data served from the in-process L1 cache
+against the SecureCache path (row lookup + AES-GCM decrypt + JSON parse).
+An in-memory SQLite database stands in for PostgreSQL, so absolute numbers
+understate the network round-trip the L1 tier saves in production.
+
+Usage:
+    python benchmarks/bench_cache_service.py [--reads 2000]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.config import Base
+from services.cache_service import CacheService
+
+
+def sample_financial_data():
+    return {
+        "net_worth": {"totalNetWorthValue": {"units": "2450000"}},
+        "transactions": [{"amount": i * 10, "narration": f"UPI/{i}"} for i in range(300)],
+        "mutual_funds": [{"scheme": f"Fund {i}", "nav": 101.5 + i} for i in range(40)],
+    }
+
+
+def time_reads(cache, email, reads, clear_l1):
+    samples = []
+    for _ in range(reads):
+        if clear_l1:
+            cache.l1_cache.clear()
+        start = time.perf_counter()
+        cache.get_cached_financial_data(email)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the two-tier financial data cache")
+    parser.add_argument("--reads", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def get_session():
+        session = factory()
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    print("🚀 Financial Data Cache Benchmark")
+    print("=" * 60)
+
+    with patch('services.cache_service.get_session', get_session):
+        cache = CacheService()
+        email = "benchmark@example.com"
+        cache.cache_financial_data(email, sample_financial_data())
+
+        db_p50, db_p99 = time_reads(cache, email, args.reads, clear_l1=True)
+        print(f"❌ SecureCache (decrypt every read): p50={db_p50:.3f}ms  p99={db_p99:.3f}ms")
+
+        l1_p50, l1_p99 = time_reads(cache, email, args.reads, clear_l1=False)
+        print(f"✅ L1 hit:                           p50={l1_p50:.3f}ms  p99={l1_p99:.3f}ms")
+
+        print(f"\n📈 p50 speedup: {db_p50 / l1_p50:.0f}x")
+        print(f"📊 L1 stats: {cache.l1_cache.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
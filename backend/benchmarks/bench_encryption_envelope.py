@@ -0,0 +1,81 @@
+"""
+Encryption Envelope Benchmark
+=============================
+
+Compares the legacy storage format (three base64 strings from
+encrypt_for_database) against the binary envelope, uncompressed and
+compressed, for Fi MCP-shaped payloads of increasing size. Reports bytes
+stored per row and decode time (base64 decode + decrypt + JSON parse for
+the legacy format, decrypt + decompress + JSON parse for the envelope).
+
+Usage:
+    python benchmarks/bench_encryption_envelope.py [--sizes 10,100,1000,5000] [--reads 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('ARTHA_ENCRYPTION_KEY', 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA')
+
+from utils.encryption import ZSTD_AVAILABLE, EncryptionManager
+
+
+def fi_payload(transactions):
+    return {
+        "net_worth": {"totalNetWorthValue": {"currencyCode": "INR", "units": "2450000"}},
+        "transactions": [
+            {"amount": {"units": str(i * 10)}, "narration": f"UPI/DR/{400000 + i}/GROCERY/okaxis",
+             "date": f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "type": "DEBIT" if i % 3 else "CREDIT"}
+            for i in range(transactions)
+        ],
+        "mutual_funds": [{"scheme": f"Example Flexi Cap Fund {i}", "nav": 101.5 + i} for i in range(40)],
+    }
+
+
+def time_decode(decode, reads):
+    samples = []
+    for _ in range(reads):
+        start = time.perf_counter()
+        decode()
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000,5000", help="Transactions per payload")
+    parser.add_argument("--reads", type=int, default=200)
+    args = parser.parse_args()
+
+    manager = EncryptionManager()
+    codecs = ["none", "zlib"] + (["zstd"] if ZSTD_AVAILABLE else [])
+
+    print(f"🔐 Envelope vs base64 storage ({args.reads} decodes per cell, median µs)")
+    print(f"  {'payload':>10}  {'legacy':>18}  " + "  ".join(f"{'envelope/' + codec:>18}" for codec in codecs))
+
+    for transactions in (int(size) for size in args.sizes.split(",")):
+        data = fi_payload(transactions)
+
+        legacy = manager.encrypt_for_database(data)
+        legacy_bytes = sum(len(part) for part in legacy)
+        legacy_us = time_decode(lambda: manager.decrypt_from_database(*legacy), args.reads)
+        cells = [f"{legacy_bytes:>9,}B {legacy_us:>6.0f}µs"]
+
+        for codec in codecs:
+            envelope = manager.encrypt_envelope(data, compression=codec)
+            assert manager.decrypt_envelope(envelope) == data
+            envelope_us = time_decode(lambda: manager.decrypt_envelope(envelope), args.reads)
+            cells.append(f"{len(envelope):>9,}B {envelope_us:>6.0f}µs")
+
+        print(f"  {transactions:>6} txns  " + "  ".join(f"{cell:>18}" for cell in cells))
+
+    print("✅ Envelope sizes exclude column overhead; legacy sizes are the three base64 text columns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Injection Scanner Micro-benchmark
+=================================
+
+Scans realistic chat request payloads (a message plus a short conversation
+history, nested JSON) with each validator's rule set, comparing the
+per-pattern regex loops the validators used to run against the shared
+literal-prefiltered InjectionScanner. Both must agree on every payload.
+
+The InputSanitizer rule set needs bleach (imported by validation_utils) and
+is skipped when it isn't installed.
+
+Usage:
+    python benchmarks/bench_injection_scanner.py [--payloads 500] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from middleware.input_validator import InputValidationMiddleware
+from middleware.security_middleware import SecurityConfig
+from utils.injection_scanner import InjectionScanner, SQL_INJECTION, XSS
+
+MESSAGES = [
+    "How is my portfolio doing this month compared to the Nifty 50?",
+    "Should I increase my SIP in the flexi cap fund from 10,000 to 15,000?",
+    "I have a credit card balance of 1.2 lakh at 36% interest, what should I pay first?",
+    "Can you explain the difference between ELSS and PPF for tax saving under 80C?",
+    "My salary got credited today, help me split it into expenses, savings and investments.",
+    "What is my net worth and how has it changed over the last 6 months?",
+    "Is it a good time to buy gold ETFs or should I wait for a correction?",
+    "Please review my EPF balance and tell me if I am on track for retirement at 55.",
+    "Summarise my spending on food delivery and shopping last month.",
+    "I want to buy a car worth 12 lakh in two years, how much should I save monthly?",
+]
+
+ATTACKS = [
+    "1' OR 1=1; DROP TABLE users",
+    "<script>alert(document.cookie)</script>",
+    "../../etc/passwd",
+]
+
+
+def build_payloads(count, attack_rate=0.02, seed=7):
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(count):
+        history = [
+            {"role": rng.choice(["user", "assistant"]), "content": " ".join(rng.sample(MESSAGES, 2))}
+            for _ in range(rng.randint(2, 6))
+        ]
+        message = rng.choice(ATTACKS) if rng.random() < attack_rate else rng.choice(MESSAGES)
+        payloads.append({
+            "message": message,
+            "user_id": f"user_{rng.randint(1, 10000)}",
+            "session_id": f"{rng.getrandbits(64):016x}",
+            "context": {"history": history, "locale": "en-IN"},
+        })
+    return payloads
+
+
+def loop_scan(compiled, value):
+    """The old per-pattern loops, recursing through nested values"""
+    if isinstance(value, str):
+        return any(pattern.search(value) for pattern in compiled)
+    if isinstance(value, dict):
+        return any(loop_scan(compiled, v) for v in value.values())
+    if isinstance(value, list):
+        return any(loop_scan(compiled, item) for item in value)
+    return False
+
+
+def rule_sets():
+    sets = [
+        ("SecurityMiddleware", SecurityConfig().injection_rules),
+        ("InputValidationMiddleware", InputValidationMiddleware(app=None).scanner.rules),
+    ]
+    try:
+        from utils.validation_utils import InputSanitizer
+        sets.append(("InputSanitizer", [(SQL_INJECTION, p) for p in InputSanitizer.SQL_INJECTION_PATTERNS]
+                     + [(XSS, p) for p in InputSanitizer.XSS_PATTERNS]))
+    except ImportError as e:
+        print(f"⚠️  Skipping InputSanitizer rules ({e})")
+    return sets
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payloads", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payloads = build_payloads(args.payloads)
+    print(f"🔎 {len(payloads)} chat payloads, best of {args.repeat}")
+
+    for name, rules in rule_sets():
+        compiled = [re.compile(pattern, re.IGNORECASE) for _, pattern in rules]
+        scanner = InjectionScanner(rules)
+
+        old_results = [loop_scan(compiled, p) for p in payloads]
+        new_results = [scanner.scan_value(p) is not None for p in payloads]
+        assert old_results == new_results, f"{name}: scanner and pattern loop disagree"
+
+        old = best_of(args.repeat, lambda: [loop_scan(compiled, p) for p in payloads])
+        new = best_of(args.repeat, lambda: [scanner.scan_value(p) for p in payloads])
+        per_payload = lambda seconds: seconds / len(payloads) * 1e6
+        print(f"  {name:<26} {len(rules):2d} rules   loops {per_payload(old):7.1f} µs   "
+              f"scanner {per_payload(new):7.1f} µs   {old / new:5.1f}x   flagged {sum(new_results)}")
+
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
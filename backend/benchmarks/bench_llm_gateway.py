@@ -0,0 +1,93 @@
+"""
+Gemini Gateway Benchmark
+========================
+
+Compares N grounded queries issued the old way (blocking generate_content
+inside an async def) against the shared GeminiGateway. A fake client with a
+fixed round-trip latency stands in for the API so no key or quota is needed.
+
+Usage:
+    python benchmarks/bench_llm_gateway.py [--queries 8] [--latency 0.5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.llm_gateway import GeminiGateway
+from core.google_grounding.grounding_client import GoogleGroundingClient
+
+
+class SimulatedModels:
+    """Blocking and async model surfaces with the same simulated latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, model, contents, config=None):
+        time.sleep(self.latency)
+        return SimpleNamespace(text=f"result for {contents[:20]}", candidates=[])
+
+
+class SimulatedAsyncModels(SimulatedModels):
+    async def generate_content(self, model, contents, config=None):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text=f"result for {contents[:20]}", candidates=[])
+
+
+async def run_blocking(queries, latency):
+    """Baseline: the synchronous SDK call made directly on the event loop"""
+    models = SimulatedModels(latency)
+
+    async def ground(query):
+        return models.generate_content(model="gemini-2.5-flash", contents=query)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[ground(q) for q in queries])
+    return time.perf_counter() - start
+
+
+async def run_gateway(queries, client):
+    grounding = GoogleGroundingClient(api_key="benchmark")
+    grounding.gateway = GeminiGateway(api_key="benchmark", client=client, default_limit=len(queries))
+
+    start = time.perf_counter()
+    await grounding.ground_multiple_queries(queries)
+    elapsed = time.perf_counter() - start
+    grounding.gateway.shutdown()
+    return elapsed, grounding.gateway.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Gemini gateway")
+    parser.add_argument("--queries", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated model round-trip in seconds")
+    args = parser.parse_args()
+
+    queries = [f"Indian market query {i}" for i in range(args.queries)]
+
+    print("🚀 Gemini Gateway Benchmark")
+    print("=" * 60)
+    print(f"{args.queries} grounded queries, {args.latency:.2f}s simulated latency each\n")
+
+    blocking = asyncio.run(run_blocking(queries, args.latency))
+    print(f"❌ Blocking generate_content:     {blocking:.2f}s")
+
+    async_client = SimpleNamespace(aio=SimpleNamespace(models=SimulatedAsyncModels(args.latency)))
+    via_async, stats = asyncio.run(run_gateway(queries, async_client))
+    print(f"✅ Gateway (SDK async API):       {via_async:.2f}s  peak in-flight={max(s['peak_in_flight'] for s in stats.values())}")
+
+    pool_client = SimpleNamespace(models=SimulatedModels(args.latency))
+    via_pool, stats = asyncio.run(run_gateway(queries, pool_client))
+    print(f"✅ Gateway (thread-pool offload): {via_pool:.2f}s  peak in-flight={max(s['peak_in_flight'] for s in stats.values())}")
+
+    print(f"\n📈 Speedup: {blocking / via_async:.1f}x (async API), {blocking / via_pool:.1f}x (thread pool)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Login Concurrency Benchmark
+===========================
+
+Drives 50 concurrent clients at a login endpoint and compares bcrypt run
+inline in the async handler (the old behaviour) against the bounded password
+hashing pool. A prober hits a cheap health endpoint throughout the run, so
+its p99 shows how long the event loop is stalled behind bcrypt.
+
+Database work is stubbed out so only the KDF and the event loop are measured;
+run bench_auth_login.py for the connection side. Requests rejected with 503
+by the pool's admission cap are counted separately.
+
+Usage:
+    python benchmarks/bench_password_hashing.py [--clients 50] [--logins 400] [--rounds 12]
+    python benchmarks/bench_password_hashing.py --max-pending 16   # see admission control shed load
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('ARTHA_ENCRYPTION_KEY', 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA')
+
+import bcrypt
+import httpx
+from fastapi import FastAPI, HTTPException
+
+from services.auth_service import AuthService
+from services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+PASSWORD = "Secret#Passw0rd"
+SALT = "a" * 32
+
+
+def build_app(auth_service, pooled):
+    app = FastAPI()
+
+    @app.post("/login")
+    async def login():
+        try:
+            if pooled:
+                result = await auth_service.login_user_async("bench@example.com", PASSWORD)
+            else:
+                result = auth_service.login_user("bench@example.com", PASSWORD)
+        except PasswordHasherBusy:
+            raise HTTPException(status_code=503, headers={"Retry-After": "1"})
+        return result
+
+    @app.get("/health")
+    async def health():
+        return {"ok": True}
+
+    return app
+
+
+async def run(label, app, clients, logins):
+    login_ms, health_ms, shed = [], [], 0
+    per_client = max(1, logins // clients)
+    done = asyncio.Event()
+
+    async def client(http):
+        nonlocal shed
+        for _ in range(per_client):
+            start = time.perf_counter()
+            response = await http.post("/login")
+            if response.status_code == 503:
+                shed += 1
+            else:
+                login_ms.append((time.perf_counter() - start) * 1000)
+
+    async def prober(http):
+        while not done.is_set():
+            start = time.perf_counter()
+            await http.get("/health")
+            health_ms.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        probe = asyncio.create_task(prober(http))
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe
+
+    def p99(samples):
+        return sorted(samples)[max(0, int(len(samples) * 0.99) - 1)] if samples else 0.0
+
+    print(f"  {label:<8} {len(login_ms) / elapsed:7.1f} logins/s   login p50 {statistics.median(login_ms or [0]):7.1f} ms"
+          f"   p99 {p99(login_ms):7.1f} ms   health p99 {p99(health_ms):7.1f} ms   503s {shed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--max-pending", type=int, help="Admission cap (default: one slot per client)")
+    args = parser.parse_args()
+
+    auth_service = AuthService()
+    auth_service.password_hasher = PasswordHasher(rounds=args.rounds, max_workers=args.workers,
+                                                  max_pending=args.max_pending or args.clients)
+    user = {
+        'id': 'bench', 'salt': SALT, 'login_attempts': 0,
+        'password_hash': bcrypt.hashpw((PASSWORD + SALT).encode(), bcrypt.gensalt(args.rounds)).decode()
+    }
+
+    print(f"🔐 {args.clients} clients, {args.logins} logins, bcrypt cost {args.rounds}, {args.workers} hash workers")
+    with patch.object(AuthService, "_load_login_user", return_value=user), \
+            patch.object(AuthService, "_complete_login", return_value={"success": True}):
+        asyncio.run(run("inline", build_app(auth_service, pooled=False), args.clients, args.logins))
+        asyncio.run(run("pooled", build_app(auth_service, pooled=True), args.clients, args.logins))
+
+    print(f"✅ Pool stats: {auth_service.password_hasher.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+PDF Extraction Benchmark
+========================
+
+Extracts a batch of generated bank statements (20 by default) two ways:
+
+  inline   the old PDFProcessorService path: whole-document pdfplumber
+           extraction run directly in the coroutine, one file after another
+  pool     PDFExtractionPool, all files submitted together and their pages
+           fanned out across worker processes
+
+Reports wall time, statements per second and the longest event-loop stall a
+concurrent ticker saw while the batch ran. On a single-core machine the pool
+can't beat inline on throughput; its win there is the stall column.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py [--files 20] [--pages 6] [--workers N]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdfplumber
+from reportlab.pdfgen import canvas
+
+from services.pdf_extraction_pool import PDF_EXTRACTION_WORKERS, PDFExtractionPool
+
+
+def build_statement(pages, seed):
+    rng = random.Random(seed)
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    balance = 50_000.0
+    for page_number in range(1, pages + 1):
+        pdf.drawString(72, 780, f"HDFC Bank Savings Account 1234567890 - page {page_number}")
+        for row in range(40):
+            amount = round(rng.uniform(100, 20_000), 2)
+            balance += amount if rng.random() < 0.3 else -amount
+            pdf.drawString(72, 750 - row * 17,
+                           f"{rng.randint(1, 28):02d}/04/2024  UPI/{rng.randint(10**8, 10**9)}  {amount:>10.2f}  {balance:>12.2f}")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def legacy_extract(content):
+    """The old pdfplumber loop from PDFProcessorService._extract_pdf_data"""
+    text = ""
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        for page_num, page in enumerate(pdf.pages):
+            page_text = page.extract_text()
+            if page_text:
+                text += f"\n--- Page {page_num + 1} ---\n{page_text}\n"
+            for table_num, table in enumerate(page.extract_tables()):
+                text += f"\n--- Table {table_num + 1} on Page {page_num + 1} ---\n"
+                for row in table:
+                    if row:
+                        text += " | ".join([cell or "" for cell in row]) + "\n"
+    return text
+
+
+async def measure(batch):
+    """Run batch() while a 10ms ticker records the longest event-loop stall"""
+    stall, done = 0.0, False
+
+    async def ticker():
+        nonlocal stall
+        while not done:
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            stall = max(stall, time.perf_counter() - before - 0.01)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await batch()
+    elapsed = time.perf_counter() - start
+    done = True
+    await tick
+    return elapsed, stall
+
+
+def report(label, files, elapsed, stall):
+    print(f"  {label:<8} {elapsed:7.2f} s   {files / elapsed:6.1f} statements/s   max loop stall {stall * 1000:8.1f} ms")
+
+
+async def run(files, pages, workers):
+    statements = [build_statement(pages, seed) for seed in range(files)]
+    print(f"📄 {files} statements x {pages} pages, {workers} workers on {os.cpu_count()} CPUs")
+
+    async def inline():
+        for content in statements:
+            legacy_extract(content)
+
+    report("inline", files, *await measure(inline))
+
+    pool = PDFExtractionPool(max_workers=workers, max_jobs=files, max_queued=0)
+    try:
+        await pool.extract_text(statements[0], "warmup.pdf")
+
+        async def pooled():
+            await asyncio.gather(*(pool.extract_text(content, f"s{n}.pdf") for n, content in enumerate(statements)))
+
+        report("pool", files, *await measure(pooled))
+    finally:
+        pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=PDF_EXTRACTION_WORKERS)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.files, args.pages, args.workers))
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
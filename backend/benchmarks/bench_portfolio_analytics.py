@@ -0,0 +1,133 @@
+"""
+Portfolio Analytics Benchmark
+=============================
+
+Ten years of daily snapshots for one user, comparing the pure-Python
+analytics PortfolioService used to rebuild on every request with the
+vectorized PortfolioAnalyticsEngine:
+
+  full history   analytics over all snapshots (legacy loops vs NumPy)
+  90-day read    one /analytics read (legacy recompute vs engine lookup)
+  daily replay   store each day's snapshot and read analytics after it,
+                 for the whole ten years
+
+Database access is left out; the legacy path's snapshot rows are built
+in memory up front.
+
+Usage:
+    python benchmarks/bench_portfolio_analytics.py [--years 10] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.portfolio_analytics import COLUMNS, PortfolioAnalyticsEngine, rows_to_array, window_analytics
+
+
+def build_rows(days, seed=11):
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=days - 1)
+    net_worth, rows = 500_000.0, []
+    for offset in range(days):
+        net_worth *= 1 + rng.gauss(0.0004, 0.01)
+        rows.append((start + timedelta(days=offset), net_worth, net_worth + 80_000, 80_000,
+                     net_worth * 0.55, net_worth * 0.15, net_worth * 0.3))
+    return rows
+
+
+def legacy_analytics(snapshots):
+    """The per-request loops from PortfolioService._calculate_comprehensive_analytics"""
+    net_worths = [s['net_worth'] for s in snapshots if s['net_worth']]
+    analytics = {}
+    if len(net_worths) > 2:
+        daily_returns = [(net_worths[i] - net_worths[i - 1]) / net_worths[i - 1] * 100
+                         for i in range(1, len(net_worths)) if net_worths[i - 1] != 0]
+        peak, max_drawdown = net_worths[0], 0
+        for value in net_worths[1:]:
+            if value > peak:
+                peak = value
+            else:
+                max_drawdown = max(max_drawdown, (peak - value) / peak * 100)
+        analytics['risk'] = {
+            "volatility": statistics.stdev(daily_returns),
+            "max_drawdown": max_drawdown,
+            "positive_days": len([r for r in daily_returns if r > 0]),
+            "negative_days": len([r for r in daily_returns if r < 0]),
+        }
+    if len(net_worths) >= 7:
+        def trend(values):
+            n = len(values)
+            x_mean, y_mean = (n - 1) / 2, sum(values) / n
+            return (sum((i - x_mean) * (values[i] - y_mean) for i in range(n))
+                    / sum((i - x_mean) ** 2 for i in range(n)))
+        analytics['trends'] = {"recent_trend": trend(net_worths[-7:]), "overall_trend": trend(net_worths)}
+    return analytics
+
+
+def as_snapshots(rows):
+    return [dict(zip(('snapshot_date',) + COLUMNS, row)) for row in rows]
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    days = args.years * 365
+    rows = build_rows(days)
+    snapshots = as_snapshots(rows)
+    print(f"📈 {days} daily snapshots, best of {args.repeat}")
+
+    series = rows_to_array(rows)
+    legacy = best_of(args.repeat, lambda: legacy_analytics(snapshots))
+    vectorized = best_of(args.repeat, lambda: window_analytics(series))
+    print(f"  full history   legacy {legacy * 1e3:8.2f} ms   numpy {vectorized * 1e3:8.2f} ms   {legacy / vectorized:6.1f}x")
+
+    window = snapshots[-90:]
+    engine = PortfolioAnalyticsEngine(window_days=90)
+    load = best_of(1, lambda: engine.get_analytics("bench", lambda: rows))
+    legacy = best_of(args.repeat, lambda: legacy_analytics(window))
+    cached = best_of(args.repeat, lambda: engine.get_analytics("bench", lambda: rows))
+    print(f"  90-day read    legacy {legacy * 1e6:8.1f} µs   engine {cached * 1e6:8.1f} µs   "
+          f"{legacy / cached:6.0f}x   (first load {load * 1e3:.2f} ms)")
+
+    # Replay: history starts empty; each day's snapshot is stored, then read 5 times
+    def replay_legacy():
+        for index in range(days):
+            for _ in range(5):
+                legacy_analytics(snapshots[max(0, index - 89):index + 1])
+
+    def replay_engine():
+        replay = PortfolioAnalyticsEngine(window_days=90, retain_days=730)
+        replay.get_analytics("bench", lambda: [])
+        for row in rows:
+            replay.record_snapshot("bench", row[0], row[1:])
+            for _ in range(5):
+                replay.get_analytics("bench", lambda: [], as_of=row[0])
+
+    legacy = best_of(1, replay_legacy)
+    incremental = best_of(1, replay_engine)
+    print(f"  daily replay   legacy {legacy:8.2f} s    engine {incremental:8.2f} s    "
+          f"{legacy / incremental:6.1f}x   ({days} snapshots, 5 reads each)")
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Response Cache Benchmark
+========================
+
+Replays a chat log through ResponseCache and reports hit ratio, memory
+footprint and lookup cost, with and without normalized query keys. Lookups are
+keyed the way BaseFinancialAgent.generate_ai_response keys them: the user's
+question as the query, and the user's financial data as the verbatim context.
+Each miss is treated as an LLM call so the saved model time can be estimated.
+
+The log is JSONL with one {"user": ..., "query": ..., "context": ...} object
+per line ("context" is the user's data and defaults to the user id). Without
+--log a synthetic log is generated: a pool of common questions asked by many
+users, each with fixed portfolio data, with small variations in case, spacing,
+punctuation and amounts.
+
+Usage:
+    python benchmarks/bench_response_cache.py [--log chats.jsonl] [--messages 20000] [--users 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import config
+from utils.response_cache import ResponseCache, response_cache_namespace
+
+QUESTION_TEMPLATES = [
+    "Should I invest {amount} in ELSS this year?",
+    "How much emergency fund do I need with {amount} monthly expenses?",
+    "Is it better to prepay my home loan of {amount} or invest in SIPs?",
+    "What is the tax benefit on {amount} under section 80C?",
+    "Can I afford a car worth {amount}?",
+    "how is my credit score",
+    "What are the best debt funds right now?",
+    "Should I move {amount} from FD to liquid funds?",
+]
+
+
+def vary(text, rng):
+    """Case, whitespace and punctuation noise a real user would add"""
+    if rng.random() < 0.3:
+        text = text.lower()
+    if rng.random() < 0.2:
+        text = text.replace(" ", "  ", 1)
+    if rng.random() < 0.3:
+        text = text.rstrip("?") + rng.choice(["", "??", " ?"])
+    return text
+
+
+def synthetic_log(messages, users, seed=7):
+    rng = random.Random(seed)
+    amounts = [50000, 100000, 150000, 500000, 1000000]
+    log = []
+    for _ in range(messages):
+        amount = rng.choice(amounts) + rng.choice([0, 0, 0, 250, 1200])
+        template = rng.choice(QUESTION_TEMPLATES)
+        user = rng.randrange(users)
+        log.append({
+            "user": f"user-{user}",
+            "query": vary(template.format(amount=f"₹{amount:,}"), rng),
+            "context": json.dumps({"net_worth": 250000 + user * 1375, "equity": 40000 + user * 210})
+        })
+    return log
+
+
+def load_log(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def agent_cache_context(data):
+    """Context as built by generate_ai_response for the analyst with a user_query"""
+    return f"analyst\x00\x00\x00{data}"
+
+
+def replay(log, normalize, max_entries):
+    cache = ResponseCache(max_entries=max_entries, normalize_queries=normalize)
+    lookup_time = 0.0
+    for message in log:
+        context = agent_cache_context(message.get("context", message.get("user")))
+        with response_cache_namespace(message.get("user")):
+            start = time.perf_counter()
+            cached = cache.get(message["query"], context)
+            lookup_time += time.perf_counter() - start
+            if cached is None:
+                cache.set(message["query"], "A" * 3000, context)  # ~3 KB model answer
+    stats = cache.get_stats()
+    stats["avg_lookup_us"] = lookup_time / len(log) * 1e6
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a chat log through the response cache")
+    parser.add_argument("--log", help="JSONL chat log with user and query fields")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--max-entries", type=int, default=5000)
+    parser.add_argument("--llm-latency", type=float, default=4.0, help="Seconds per model call, for the savings estimate")
+    args = parser.parse_args()
+
+    config.ENABLE_RESPONSE_CACHING = True
+    log = load_log(args.log) if args.log else synthetic_log(args.messages, args.users)
+
+    print("🚀 Response Cache Benchmark")
+    print("=" * 60)
+    print(f"{len(log)} messages, {len({m.get('user') for m in log})} users, max {args.max_entries} entries\n")
+
+    for label, normalize in (("Exact keys", False), ("Normalized keys", True)):
+        stats = replay(log, normalize, args.max_entries)
+        saved = stats["hits"] * args.llm_latency
+        print(f"{'✅' if normalize else '📊'} {label}:")
+        print(f"   Hit ratio:   {stats['hit_rate']:.1%}  ({stats['hits']} hits / {stats['misses']} misses)")
+        print(f"   Entries:     {stats['size']}  evictions={stats['evictions']}")
+        print(f"   Memory:      {stats['size_bytes'] / 1024 / 1024:.1f} MB")
+        print(f"   Lookup:      {stats['avg_lookup_us']:.1f} µs")
+        print(f"   LLM time saved: ~{saved / 3600:.1f} h at {args.llm_latency:.1f}s per call\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Security Middleware Upload Benchmark
+====================================
+
+Uploads a multipart PDF (20 MB by default) through SecurityMiddleware and
+compares the old BaseHTTPMiddleware path, which buffered the whole body with
+request.body(), replayed it and regex-scanned it, against the streaming ASGI
+middleware that scans chunk by chunk and skips file parts.
+
+Each mode runs in its own subprocess so peak RSS (ru_maxrss) is not shared.
+The payload is built before the baseline is taken, and the endpoint reads the
+upload in 64 KB chunks, so the RSS growth reported is the middleware and
+multipart parsing overhead rather than the application's own copy. Latency
+includes starlette spooling each chunk to its temporary file; the legacy path
+hands the parser one replayed message, so it pays that per-chunk cost once.
+
+Usage:
+    python benchmarks/bench_security_middleware.py [--size-mb 20] [--uploads 5]
+    python benchmarks/bench_security_middleware.py --mode streaming   # one mode only
+"""
+
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI, File, Request, UploadFile
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from middleware.security_middleware import SecurityConfig, SecurityMiddleware
+
+BOUNDARY = "bench-boundary"
+CHUNK = 64 * 1024
+
+
+class LegacyBufferingMiddleware(BaseHTTPMiddleware):
+    """The previous dispatch: buffer, replay and scan the entire body"""
+
+    def __init__(self, app, config: SecurityConfig):
+        super().__init__(app)
+        self.inner = SecurityMiddleware(app, config)
+
+    async def dispatch(self, request: Request, call_next):
+        if self.inner._is_clearly_malicious_user_agent(request.headers.get('user-agent', '')):
+            return JSONResponse({"detail": "Access denied"}, status_code=403)
+        is_limited, _ = await self.inner.rate_limiter.is_rate_limited(request)
+        if is_limited:
+            return JSONResponse({"detail": "Rate limit exceeded"}, status_code=429)
+
+        body = await request.body()
+
+        async def receive():
+            return {"type": "http.request", "body": body}
+        request._receive = receive
+
+        is_valid, _ = self.inner.input_validator.validate_request(request, body)
+        if not is_valid:
+            return JSONResponse({"detail": "Invalid input detected"}, status_code=400)
+
+        response = await call_next(request)
+        for header, value in self.inner.config.security_headers.items():
+            response.headers[header] = value
+        return response
+
+
+def build_app(mode, size_bytes):
+    config = SecurityConfig()
+    config.rate_limits = {category: {'requests': 100000, 'window': 60} for category in config.rate_limits}
+    config.max_upload_size = size_bytes * 2
+
+    app = FastAPI()
+
+    @app.post("/api/pdf/upload")
+    async def upload(file: UploadFile = File(...)):
+        total = 0
+        while chunk := await file.read(CHUNK):
+            total += len(chunk)
+        return {"bytes": total}
+
+    if mode == "legacy":
+        app.add_middleware(LegacyBufferingMiddleware, config=config)
+    else:
+        app.add_middleware(SecurityMiddleware, config=config)
+    return app
+
+
+def build_payload(size_bytes):
+    # Text-looking PDF content so the old path decodes and pattern-checks real bytes
+    filler = b"BT /F1 12 Tf (Closing balance 1,24,500.00) Tj ET\n"
+    content = (filler * (size_bytes // len(filler) + 1))[:size_bytes]
+    head = (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="statement.pdf"\r\n'
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode()
+    return head + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def max_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run_uploads(app, payload, uploads):
+    async def body():
+        for start in range(0, len(payload), CHUNK):
+            yield payload[start:start + CHUNK]
+
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for _ in range(uploads):
+            start = time.perf_counter()
+            response = await client.post("/api/pdf/upload", content=body(),
+                                         headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.text
+    return latencies
+
+
+def run_mode(mode, size_mb, uploads):
+    size_bytes = int(size_mb * 1024 * 1024)
+    payload = build_payload(size_bytes)
+    app = build_app(mode, size_bytes)
+    baseline = max_rss_mb()
+
+    latencies = asyncio.run(run_uploads(app, payload, uploads))
+
+    print(f"  {mode:<10} p50 {statistics.median(latencies):8.1f} ms   max {max(latencies):8.1f} ms"
+          f"   peak RSS +{max_rss_mb() - baseline:7.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=20)
+    parser.add_argument("--uploads", type=int, default=5)
+    parser.add_argument("--mode", choices=["legacy", "streaming"], help="Run a single mode in this process")
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.size_mb, args.uploads)
+        return
+
+    print(f"🛡️  {args.uploads} x {args.size_mb:g} MB multipart uploads through SecurityMiddleware")
+    for mode in ("legacy", "streaming"):
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode,
+                        "--size-mb", str(args.size_mb), "--uploads", str(args.uploads)], check=True)
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Session Store Benchmark
+=======================
+
+Reads N keys from one session the way the frontend used to (one /get per key,
+each doing GET data + GET metadata + SETEX metadata on a key-per-value
+layout) and with the hash-per-session store's get_many (one HMGET plus one
+HSET of last_accessed). Runs against REDIS_URL when it answers, otherwise
+against fakeredis, so absolute numbers only mean something on a real server;
+the round-trip counts hold either way.
+
+Also times the in-memory fallback with many live sessions.
+
+Usage:
+    python benchmarks/bench_session_store.py [--keys 8] [--rounds 500]
+    REDIS_URL=redis://localhost:6379/0 python benchmarks/bench_session_store.py
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.session_store import InMemorySessionBackend, RedisSessionBackend
+
+SESSION = "sess_benchmark01"
+
+
+async def connect():
+    import redis.asyncio as redis_asyncio
+    client = redis_asyncio.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
+    try:
+        await client.ping()
+        return client, "redis"
+    except Exception:
+        import fakeredis
+        return fakeredis.FakeAsyncRedis(decode_responses=True), "fakeredis"
+
+
+async def legacy_get(client, key):
+    """One old /get: data GET, then metadata GET + SETEX"""
+    value = await client.get(f"bench_legacy:{SESSION}:{key}")
+    if value is not None:
+        metadata_key = f"bench_legacy:{SESSION}:_metadata"
+        metadata = json.loads(await client.get(metadata_key))
+        metadata["last_accessed"] = time.time()
+        await client.set(metadata_key, json.dumps(metadata), ex=86400)
+    return value
+
+
+def report(label, latencies):
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(f"    {label:<22} p50 {statistics.median(latencies):9.1f} µs   p99 {p99:9.1f} µs")
+
+
+async def timed(rounds, fn):
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await fn()
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+async def bench_redis(keys, rounds):
+    client, kind = await connect()
+    names = [f"key{index}" for index in range(keys)]
+    print(f"  {kind}: {keys} keys per read, {rounds} rounds")
+
+    await client.set(f"bench_legacy:{SESSION}:_metadata", json.dumps({"last_accessed": 0}), ex=86400)
+    for name in names:
+        await client.set(f"bench_legacy:{SESSION}:{name}", "x" * 200, ex=86400)
+    backend = RedisSessionBackend(client, prefix="bench_session:", ttl_seconds=86400)
+    for name in names:
+        await backend.set(SESSION, name, "x" * 200, "127.0.0.1")
+
+    async def legacy():
+        for name in names:
+            await legacy_get(client, name)
+
+    report(f"per-key ({3 * keys} cmds)", await timed(rounds, legacy))
+    report("get_many (2 cmds)", await timed(rounds, lambda: backend.get_many(SESSION, names)))
+
+    await client.delete(f"bench_session:{SESSION}", f"bench_legacy:{SESSION}:_metadata",
+                        *[f"bench_legacy:{SESSION}:{name}" for name in names])
+
+
+async def bench_memory(sessions, rounds):
+    backend = InMemorySessionBackend(max_sessions=sessions, ttl_seconds=86400)
+    start = time.perf_counter()
+    for index in range(sessions):
+        await backend.set(f"sess_{index:010d}", "userData", "x" * 200, "127.0.0.1")
+    print(f"  memory: {sessions} sessions populated in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    counter = iter(range(10 ** 9))
+    report("set (at capacity)", await timed(rounds, lambda: backend.set(
+        f"sess_new{next(counter):08d}", "userData", "x", "127.0.0.1")))
+    report("get_many", await timed(rounds, lambda: backend.get_many("sess_0000000001", ["userData"])))
+    print(f"    {backend.get_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--sessions", type=int, default=100000)
+    args = parser.parse_args()
+
+    print("🔑 Session store benchmark")
+    try:
+        asyncio.run(bench_redis(args.keys, args.rounds))
+    except ImportError as e:
+        print(f"⚠️  Skipping Redis comparison ({e})")
+    asyncio.run(bench_memory(args.sessions, args.rounds))
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Statement Parser Benchmark
+==========================
+
+Parses a generated bank statement (2,500 rows by default) with the per-line
+multi-regex code PDFProcessorService used before and with StatementParser:
+
+  lines      page text only, so both parse line by line
+  tables     page text plus the pdfplumber table block; StatementParser
+             reads the table by column and skips the page's line scan
+  accounts   a consolidated statement with many account numbers
+
+The legacy parser stopped at 50 transactions; the cap is removed here so
+both sides do the full work.
+
+Usage:
+    python benchmarks/bench_statement_parser.py [--rows 2500] [--accounts 200] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.statement_parser import StatementParser
+
+NARRATIONS = ["UPI/SWIGGY/FOOD", "NEFT SALARY ACME LTD", "SIP HDFC MUTUAL FUND", "HP PETROL PUMP",
+              "APOLLO PHARMACY", "HOME LOAN EMI", "BESCOM ELECTRICITY", "ATM WITHDRAWAL", "AMAZON PAY"]
+
+
+def build_statement(rows, seed=3):
+    rng = random.Random(seed)
+    text_lines, table_lines = [], ["Date | Narration | Chq./Ref.No. | Withdrawal Amt. | Deposit Amt. | Closing Balance"]
+    balance = 200_000.0
+    for n in range(rows):
+        narration = f"{rng.choice(NARRATIONS)} {rng.randint(10**6, 10**7)}"
+        amount = round(rng.uniform(100, 50_000), 2)
+        credit = rng.random() < 0.3
+        balance += amount if credit else -amount
+        date = f"{n % 28 + 1:02d}/04/2024"
+        text_lines.append(f"{date} {narration} {amount:,.2f} {balance:,.2f}")
+        withdrawal, deposit = ("", f"{amount:,.2f}") if credit else (f"{amount:,.2f}", "")
+        table_lines.append(f"{date} | {narration} | REF{n} | {withdrawal} | {deposit} | {balance:,.2f}")
+    header = "HDFC Bank Account Statement\nAccount No: 123456789012\nClosing Balance: Rs. 1,45,000.00\n"
+    text = f"\n--- Page 1 ---\n{header}" + "\n".join(text_lines) + "\n"
+    return text, text + "\n--- Table 1 on Page 1 ---\n" + "\n".join(table_lines) + "\n"
+
+
+def build_accounts(count):
+    return "\n".join(f"Account No: {10**11 + n}\nAvailable Balance: Rs. {n * 1000:,.2f}\n{'x' * 300}"
+                     for n in range(count)) + "\nState Bank of India"
+
+
+def legacy_categorize(description):
+    description_lower = description.lower()
+    if any(keyword in description_lower for keyword in ['salary', 'pay', 'wage']):
+        return 'income'
+    elif any(keyword in description_lower for keyword in ['grocery', 'food', 'restaurant']):
+        return 'food'
+    elif any(keyword in description_lower for keyword in ['fuel', 'petrol', 'diesel', 'gas']):
+        return 'fuel'
+    elif any(keyword in description_lower for keyword in ['medical', 'doctor', 'hospital', 'pharmacy']):
+        return 'healthcare'
+    elif any(keyword in description_lower for keyword in ['sip', 'mutual fund', 'investment']):
+        return 'investment'
+    elif any(keyword in description_lower for keyword in ['emi', 'loan', 'repay']):
+        return 'loan'
+    elif any(keyword in description_lower for keyword in ['electricity', 'water', 'gas', 'internet']):
+        return 'utilities'
+    return 'others'
+
+
+def legacy_transactions(text):
+    """PDFProcessorService._extract_transactions before the parser engine, without the [:50] cap"""
+    transaction_patterns = [
+        r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\s+(.+?)\s+(?:Dr\.?\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)\s*(?:Cr\.?)?',
+        r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\s+(.+?)\s+(?:Rs\.?\s*|₹\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)',
+    ]
+    transactions = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line or len(line) < 20:
+            continue
+        for pattern in transaction_patterns:
+            match = re.search(pattern, line, re.IGNORECASE)
+            if match:
+                description = match.group(2).strip()
+                amount = float(match.group(3).replace(',', ''))
+                transaction_type = 'debit'
+                if any(keyword in line.lower() for keyword in ['credit', 'cr', 'deposit']):
+                    transaction_type = 'credit'
+                elif any(keyword in line.lower() for keyword in ['sip', 'investment', 'mutual fund']):
+                    transaction_type = 'investment'
+                transactions.append((match.group(1), description[:100], amount, transaction_type,
+                                     legacy_categorize(description)))
+    return transactions
+
+
+def legacy_accounts(text):
+    """PDFProcessorService._extract_accounts before the parser engine"""
+    account_patterns = [r'account\s*(?:no|number)[:\s]*(\d{10,18})', r'a/c\s*(?:no)?[:\s]*(\d{10,18})',
+                        r'account[:\s]+(\d{10,18})']
+    balance_patterns = [r'balance[:\s]*(?:rs\.?\s*|₹\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)',
+                        r'available\s*balance[:\s]*(?:rs\.?\s*|₹\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)',
+                        r'closing\s*balance[:\s]*(?:rs\.?\s*|₹\s*)?(\d+(?:,\d{3})*(?:\.\d{2})?)']
+    bank_patterns = [r'(state bank of india|sbi)', r'(hdfc bank|hdfc)', r'(icici bank|icici)',
+                     r'(axis bank|axis)', r'(kotak mahindra|kotak)', r'(punjab national bank|pnb)']
+    accounts, found = [], set()
+    for pattern in account_patterns:
+        for match in re.finditer(pattern, text, re.IGNORECASE):
+            number = match.group(1)
+            if number in found:
+                continue
+            found.add(number)
+            balance = 0.0
+            for balance_pattern in balance_patterns:
+                balance_match = re.search(balance_pattern, text[max(0, match.start() - 200):match.end() + 200], re.IGNORECASE)
+                if balance_match:
+                    balance = float(balance_match.group(1).replace(',', ''))
+                    break
+            bank_name = 'unknown'
+            for bank_pattern in bank_patterns:
+                bank_match = re.search(bank_pattern, text, re.IGNORECASE)
+                if bank_match:
+                    bank_name = bank_match.group(1)
+                    break
+            accounts.append((number, balance, bank_name))
+    return accounts
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2500)
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = StatementParser()
+    text_only, with_tables = build_statement(args.rows)
+    consolidated = build_accounts(args.accounts)
+    print(f"🧾 {args.rows} rows, {args.accounts} accounts, best of {args.repeat}")
+
+    for label, text in (("lines", text_only), ("tables", with_tables)):
+        legacy, old = best_of(args.repeat, lambda: legacy_transactions(text))
+        compiled, new = best_of(args.repeat, lambda: engine.extract_transactions(text))
+        print(f"  {label:<9} legacy {legacy * 1e3:8.1f} ms ({len(old):5d} txns)   "
+              f"parser {compiled * 1e3:8.1f} ms ({len(new):5d} txns)   {legacy / compiled:5.1f}x")
+
+    legacy, old = best_of(args.repeat, lambda: legacy_accounts(consolidated))
+    compiled, new = best_of(args.repeat, lambda: engine.extract_accounts(consolidated))
+    print(f"  {'accounts':<9} legacy {legacy * 1e3:8.1f} ms ({len(old):5d} accts)  "
+          f"parser {compiled * 1e3:8.1f} ms ({len(new):5d} accts)  {legacy / compiled:5.1f}x")
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
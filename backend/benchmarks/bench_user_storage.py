@@ -0,0 +1,114 @@
+"""
+User Profile Storage Benchmark
+==============================
+
+Populates 100k user profiles in the JSON-file backend (one file per user, the
+old layout) and in the SQLite/WAL backend, then measures through
+UserDataStorage:
+
+  load cold   first read of a profile (backend read + validation)
+  load warm   repeat read served by the in-memory cache
+  by email    lookup by email (index on SQLite, derived user ID for JSON)
+  update      atomic partial update of one field
+  list        list_all_users over the whole store
+
+Everything runs in a temporary directory that is removed afterwards.
+
+Usage:
+    python benchmarks/bench_user_storage.py [--users 100000] [--samples 2000]
+    python benchmarks/bench_user_storage.py --backends sqlite
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.user_models import UserDataStorage, UserProfile, create_user_id_from_email
+from models.user_storage import JSONFileBackend, SQLiteBackend, hash_email
+
+
+def profile_row(index):
+    email = f"user{index}@example.com"
+    user_id = create_user_id_from_email(email)
+    data = UserProfile(
+        user_id=user_id,
+        personalInfo={"fullName": f"User {index}", "email": email, "phoneNumber": "9876543210",
+                      "dateOfBirth": "1990-01-01", "occupation": "Engineer"},
+        professionalInfo={"occupation": "Engineer", "annualIncome": "10-20L"},
+        investmentPreferences={"riskTolerance": "moderate", "investmentGoals": ["retirement", "house"]}
+    ).dict()
+    return user_id, hash_email(email), data
+
+
+def timed(samples, fn):
+    latencies = []
+    for item in samples:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    return latencies
+
+
+def report(label, latencies):
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(f"    {label:<10} p50 {statistics.median(latencies):9.1f} µs   p99 {p99:9.1f} µs")
+
+
+def run(backend_name, rows, samples, workdir):
+    directory = os.path.join(workdir, backend_name)
+    if backend_name == "json":
+        backend = JSONFileBackend(directory)
+    else:
+        backend = SQLiteBackend(os.path.join(directory, "user_profiles.db"))
+    storage = UserDataStorage(directory, backend=backend)
+
+    start = time.perf_counter()
+    backend.put_many(rows)
+    print(f"  {backend_name}: populated {len(rows)} users in {time.perf_counter() - start:.1f}s")
+
+    rng = random.Random(42)
+    picked = rng.sample(rows, samples)
+    user_ids = [row[0] for row in picked]
+    emails = [row[2]["personalInfo"]["email"] for row in picked]
+
+    report("load cold", timed(user_ids, storage.load_user_data))
+    report("load warm", timed(user_ids, storage.load_user_data))
+    report("by email", timed(emails, storage.load_user_data_by_email))
+    report("update", timed(user_ids[:samples // 4], lambda user_id: storage.update_user_data(
+        user_id, {"investmentPreferences": {"riskTolerance": "aggressive", "investmentGoals": ["wealth"]}})))
+
+    start = time.perf_counter()
+    count = len(storage.list_all_users())
+    print(f"    {'list':<10} {count} users in {(time.perf_counter() - start) * 1000:.1f} ms")
+    backend.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--backends", nargs="+", default=["json", "sqlite"], choices=["json", "sqlite"])
+    args = parser.parse_args()
+
+    print(f"👥 Building {args.users} profiles...")
+    rows = [profile_row(index) for index in range(args.users)]
+
+    workdir = tempfile.mkdtemp(prefix="bench_user_storage_")
+    try:
+        for backend_name in args.backends:
+            run(backend_name, rows, min(args.samples, args.users), workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
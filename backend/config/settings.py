@@ -25,6 +25,9 @@ class Config:
     STREAMING_CHUNK_SIZE = int(os.getenv("STREAMING_CHUNK_SIZE", "2048"))  # Larger chunks for quality content
     ENABLE_RESPONSE_CACHING = os.getenv("ENABLE_RESPONSE_CACHING", "false").lower() == "true"  # Disabled for fresh quality analysis
     CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "300"))        # Reduced cache time for fresher quality
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))  # LRU bound on cached responses
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # Memory bound (approximate)
+    RESPONSE_CACHE_NORMALIZE_QUERIES = os.getenv("RESPONSE_CACHE_NORMALIZE_QUERIES", "false").lower() == "true"  # Casefold/whitespace/number-bucket the question (never the context)
     PARALLEL_AGENT_PROCESSING = os.getenv("PARALLEL_AGENT_PROCESSING", "false").lower() == "true"  # Sequential for complete analysis
     PARALLEL_SEARCH_PROCESSING = os.getenv("PARALLEL_SEARCH_PROCESSING", "true").lower() == "true"  # Parallel searches for efficiency
     GEMINI_GENERATION_CONFIG = {
@@ -35,7 +38,12 @@ class Config:
     }
     RESPONSE_LENGTH_LIMIT = 25000  # Significantly increased for comprehensive quality responses
     SEARCH_TIMEOUT_SECONDS = int(os.getenv("SEARCH_TIMEOUT_SECONDS", "45"))  # Increased timeout for quality grounding
-    
+
+    # Gemini gateway concurrency
+    GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))  # Default in-flight calls per model
+    GEMINI_MODEL_CONCURRENCY = os.getenv("GEMINI_MODEL_CONCURRENCY", "")  # Per-model overrides, e.g. "gemini-2.5-pro=2,gemini-2.5-flash=10"
+    GEMINI_THREAD_POOL_SIZE = int(os.getenv("GEMINI_THREAD_POOL_SIZE", "16"))  # Offload pool for clients without an async API
+
     # Logging Configuration
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -6,6 +6,7 @@ No sample data or fallbacks - production-ready implementation
 
 import asyncio
 import json
+import os
 import time
 import uuid
 from typing import Dict, Any, Optional, List
@@ -14,8 +15,41 @@ import logging
 import aiohttp
 from contextlib import asynccontextmanager
 
+from core.fi_mcp.single_flight import SingleFlightCache
+from core.http_pool import get_http_pool
+from core.metrics import metrics
+
 logger = logging.getLogger(__name__)
 
+# Concurrent fetch_all_financial_data calls for the same Fi session share one
+# upstream fetch, and the result is reused for a few seconds afterwards
+FI_DATA_SNAPSHOT_TTL = float(os.getenv("FI_DATA_SNAPSHOT_TTL", "30"))
+_financial_data_flight = SingleFlightCache(ttl_seconds=FI_DATA_SNAPSHOT_TTL)
+
+# Send the financial data tool calls as a single JSON-RPC batch request
+FI_MCP_BATCH_CALLS = os.getenv("FI_MCP_BATCH_CALLS", "true").lower() == "true"
+FINANCIAL_DATA_TOOLS = [
+    'fetch_net_worth',
+    'fetch_credit_report',
+    'fetch_epf_details',
+    'fetch_mf_transactions',
+    'fetch_bank_transactions'
+]
+_mcp_batch_stats = {'batches': 0, 'batched_calls': 0, 'fallback_calls': 0, 'batch_failures': 0}
+# Batched requests are recorded under tool="batch"
+MCP_CALL_SECONDS = metrics.histogram(
+    "artha_mcp_call_duration_seconds", "Fi MCP request latency by tool and outcome", ("tool", "outcome")
+)
+
+
+class MCPBatchError(Exception):
+    """A JSON-RPC batch request failed as a whole"""
+    
+    def __init__(self, message: str, unsupported: bool = False):
+        super().__init__(message)
+        # True when the server rejected the batch format itself, not a transient failure
+        self.unsupported = unsupported
+
 @dataclass
 class FiAuthSession:
     """Fi Money authentication session"""
@@ -89,30 +123,19 @@ class FiMoneyMCPClient:
     def __init__(self, mcp_url: str = "https://mcp.fi.money:8080/mcp/stream"):
         self.mcp_url = mcp_url
         self.session: Optional[FiAuthSession] = None
-        self.http_session: Optional[aiohttp.ClientSession] = None
+        # Process-wide keep-alive pool, owned by the application lifespan
+        self.http_pool = get_http_pool()
+        # Cleared once the server rejects a JSON-RPC batch
+        self.batch_supported = True
         
     @asynccontextmanager
     async def get_http_session(self):
-        """Get or create HTTP session"""
-        if self.http_session is None:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.http_session = aiohttp.ClientSession(
-                timeout=timeout,
-                headers={
-                    'Content-Type': 'application/json',
-                    'User-Agent': 'Artha-AI/1.0'
-                }
-            )
-        try:
-            yield self.http_session
-        finally:
-            pass  # Keep session alive for reuse
+        """Get the shared pooled HTTP session"""
+        yield await self.http_pool.get_session()
     
     async def close(self):
-        """Close HTTP session"""
-        if self.http_session:
-            await self.http_session.close()
-            self.http_session = None
+        """Release client state; pooled connections stay open for other callers"""
+        self.session = None
     
     async def clear_cached_session(self) -> Dict[str, Any]:
         """
@@ -160,6 +183,7 @@ class FiMoneyMCPClient:
                         logger.warning(f"⚠️ [CLEAR:{clear_id}] Logout request failed: {logout_error}")
             
             # Clear local session
+            self._invalidate_financial_data()
             self.session = None
             logger.info(f"✅ [CLEAR:{clear_id}] Local session cleared")
             
@@ -171,6 +195,7 @@ class FiMoneyMCPClient:
         except Exception as e:
             logger.error(f"❌ [CLEAR:{clear_id}] Session clear error: {e}")
             # Still clear local session even if remote clear fails
+            self._invalidate_financial_data()
             self.session = None
             return {
                 "success": True,
@@ -641,65 +666,78 @@ class FiMoneyMCPClient:
         if not self.session.authenticated:
             raise Exception("Not authenticated. Please complete authentication first.")
     
-    async def _make_mcp_call(self, tool_name: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Make authenticated MCP API call"""
-        self._ensure_authenticated()
-        
-        if params is None:
-            params = {}
-        
-        payload = {
+    def _mcp_headers(self) -> Dict[str, str]:
+        """Headers for an authenticated MCP request"""
+        return {
+            "Mcp-Session-Id": self.session.session_id,
+            "Authorization": f"Bearer {self.session.passcode}",
+            "Content-Type": "application/json"
+        }
+    
+    @staticmethod
+    def _tool_call_payload(tool_name: str, params: Dict[str, Any], request_id: int) -> Dict[str, Any]:
+        return {
             "jsonrpc": "2.0",
-            "id": int(time.time() * 1000),  # Use timestamp as ID
+            "id": request_id,
             "method": "tools/call",
             "params": {
                 "name": tool_name,
-                "arguments": params
+                "arguments": params or {}
             }
         }
+    
+    @staticmethod
+    def _parse_tool_result(tool_name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract tool data from a JSON-RPC response object, raising on JSON-RPC errors"""
+        if 'error' in result:
+            error_msg = result['error'].get('message', 'Unknown error')
+            logger.error(f"MCP API error for {tool_name}: {error_msg}")
+            raise Exception(f"MCP API error: {error_msg}")
         
-        headers = {
-            "Mcp-Session-Id": self.session.session_id,
-            "Authorization": f"Bearer {self.session.passcode}",
-            "Content-Type": "application/json"
-        }
+        # Extract actual data from MCP response
+        tool_result = result.get('result', {})
+        if 'content' in tool_result and tool_result['content']:
+            # Parse JSON content if it's a string
+            content = tool_result['content'][0]
+            if isinstance(content, dict) and 'text' in content:
+                try:
+                    return json.loads(content['text'])
+                except json.JSONDecodeError:
+                    return content
+            return content
+        return tool_result
+    
+    def _check_auth_status(self, status: int):
+        if status == 401:
+            # Session expired or invalid
+            self.session.authenticated = False
+            raise Exception("Session expired or invalid. Please authenticate again.")
         
+        elif status == 403:
+            raise Exception("Access denied. Check your Fi Money account permissions.")
+    
+    async def _make_mcp_call(self, tool_name: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Make authenticated MCP API call"""
+        self._ensure_authenticated()
+        
+        payload = self._tool_call_payload(tool_name, params, int(time.time() * 1000))  # Use timestamp as ID
+        
+        start = time.perf_counter()
+        outcome = "error"
         try:
             async with self.get_http_session() as http_session:
                 async with http_session.post(
                     self.mcp_url,
                     json=payload,
-                    headers=headers
+                    headers=self._mcp_headers()
                 ) as response:
                     
-                    if response.status == 401:
-                        # Session expired or invalid
-                        self.session.authenticated = False
-                        raise Exception("Session expired or invalid. Please authenticate again.")
-                    
-                    elif response.status == 403:
-                        raise Exception("Access denied. Check your Fi Money account permissions.")
+                    self._check_auth_status(response.status)
                     
-                    elif response.status == 200:
-                        result = await response.json()
-                        
-                        if 'error' in result:
-                            error_msg = result['error'].get('message', 'Unknown error')
-                            logger.error(f"MCP API error for {tool_name}: {error_msg}")
-                            raise Exception(f"MCP API error: {error_msg}")
-                        
-                        # Extract actual data from MCP response
-                        tool_result = result.get('result', {})
-                        if 'content' in tool_result and tool_result['content']:
-                            # Parse JSON content if it's a string
-                            content = tool_result['content'][0]
-                            if isinstance(content, dict) and 'text' in content:
-                                try:
-                                    return json.loads(content['text'])
-                                except json.JSONDecodeError:
-                                    return content
-                            return content
-                        return tool_result
+                    if response.status == 200:
+                        result = self._parse_tool_result(tool_name, await response.json())
+                        outcome = "ok"
+                        return result
                     
                     else:
                         error_text = await response.text()
@@ -707,8 +745,99 @@ class FiMoneyMCPClient:
                         raise Exception(f"MCP call failed: {response.status}")
                         
         except asyncio.TimeoutError:
+            outcome = "timeout"
             logger.error(f"Timeout calling {tool_name}")
             raise Exception(f"Timeout calling {tool_name}")
+        finally:
+            MCP_CALL_SECONDS.labels(tool_name, outcome).observe(time.perf_counter() - start)
+    
+    async def _make_mcp_batch_call(self, tool_names: List[str]) -> Dict[str, Any]:
+        """
+        Send several tools/call requests as one JSON-RPC 2.0 batch
+        Returns {tool_name: data or Exception}; raises if the batch as a whole failed
+        """
+        self._ensure_authenticated()
+        
+        base_id = int(time.time() * 1000)
+        ids = {base_id + i: tool_name for i, tool_name in enumerate(tool_names)}
+        payload = [self._tool_call_payload(tool_name, {}, request_id) for request_id, tool_name in ids.items()]
+        
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            async with self.get_http_session() as http_session:
+                async with http_session.post(
+                    self.mcp_url,
+                    json=payload,
+                    headers=self._mcp_headers()
+                ) as response:
+                    
+                    self._check_auth_status(response.status)
+                    
+                    if response.status != 200:
+                        error_text = await response.text()
+                        raise MCPBatchError(f"MCP batch failed: {response.status} - {error_text[:200]}",
+                                            unsupported=400 <= response.status < 500)
+                    
+                    body = await response.json(content_type=None)
+                    outcome = "ok"
+        
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise MCPBatchError("Timeout calling MCP batch")
+        finally:
+            MCP_CALL_SECONDS.labels("batch", outcome).observe(time.perf_counter() - start)
+        
+        if not isinstance(body, list):
+            # A single response object means the server doesn't speak batches
+            raise MCPBatchError("MCP server returned a non-batch response", unsupported=True)
+        
+        # Responses may come back in any order; demultiplex by id
+        results: Dict[str, Any] = {}
+        for item in body:
+            tool_name = ids.get(item.get('id')) if isinstance(item, dict) else None
+            if tool_name is None:
+                continue
+            try:
+                results[tool_name] = self._parse_tool_result(tool_name, item)
+            except Exception as e:
+                results[tool_name] = e
+        
+        for tool_name in tool_names:
+            results.setdefault(tool_name, MCPBatchError(f"No response for {tool_name} in MCP batch"))
+        return results
+    
+    async def _call_tools(self, tool_names: List[str]) -> Dict[str, Any]:
+        """
+        Call several argument-less tools, batched into one request when possible
+        Tools that fail inside the batch (or the whole batch, if it fails) are
+        retried as individual calls. Returns {tool_name: data or Exception}.
+        """
+        results: Dict[str, Any] = {}
+        pending = list(tool_names)
+        
+        if FI_MCP_BATCH_CALLS and self.batch_supported and len(tool_names) > 1:
+            try:
+                results = await self._make_mcp_batch_call(tool_names)
+                _mcp_batch_stats['batches'] += 1
+                pending = [name for name in tool_names if isinstance(results[name], Exception)]
+                _mcp_batch_stats['batched_calls'] += len(tool_names) - len(pending)
+            except Exception as e:
+                _mcp_batch_stats['batch_failures'] += 1
+                if isinstance(e, MCPBatchError) and e.unsupported:
+                    logger.warning(f"⚠️ MCP server rejected batched calls, using individual calls: {e}")
+                    self.batch_supported = False
+                else:
+                    logger.warning(f"⚠️ MCP batch failed, retrying calls individually: {e}")
+        
+        if pending:
+            if len(pending) < len(tool_names):
+                logger.info(f"🔄 Retrying {len(pending)} failed batched MCP calls individually: {pending}")
+                _mcp_batch_stats['fallback_calls'] += len(pending)
+            individual = await asyncio.gather(*[self._make_mcp_call(name) for name in pending], return_exceptions=True)
+            results.update(zip(pending, individual))
+        
+        return results
     
     async def fetch_net_worth(self) -> Dict[str, Any]:
         """Fetch real-time net worth data from Fi Money"""
@@ -735,7 +864,24 @@ class FiMoneyMCPClient:
         logger.info("🏧 Fetching real-time bank transactions from Fi Money...")
         return await self._make_mcp_call('fetch_bank_transactions')
     
-    async def fetch_all_financial_data(self) -> FinancialData:
+    def _invalidate_financial_data(self):
+        """Drop the shared financial data snapshot for the current session"""
+        if self.session:
+            _financial_data_flight.invalidate(self.session.session_id)
+    
+    async def fetch_all_financial_data(self, force_refresh: bool = False) -> FinancialData:
+        """
+        Fetch all real-time financial data from Fi Money MCP server
+        Concurrent callers for the same session are coalesced into one upstream fetch
+        """
+        self._ensure_authenticated()
+        
+        if force_refresh:
+            self._invalidate_financial_data()
+        
+        return await _financial_data_flight.get(self.session.session_id, self._fetch_all_financial_data)
+    
+    async def _fetch_all_financial_data(self) -> FinancialData:
         """
         Fetch all real-time financial data from Fi Money MCP server
         No fallbacks or sample data - production only
@@ -743,16 +889,9 @@ class FiMoneyMCPClient:
         logger.info("🚀 Fetching comprehensive real-time financial data from Fi Money...")
         
         try:
-            # Fetch all data concurrently for performance
-            tasks = [
-                self.fetch_net_worth(),
-                self.fetch_credit_report(),
-                self.fetch_epf_details(),
-                self.fetch_mf_transactions(),
-                self.fetch_bank_transactions()
-            ]
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # One batched JSON-RPC request, with individual calls as the fallback
+            by_tool = await self._call_tools(FINANCIAL_DATA_TOOLS)
+            results = [by_tool[tool_name] for tool_name in FINANCIAL_DATA_TOOLS]
             
             # Process results
             net_worth = results[0] if not isinstance(results[0], Exception) else {}
@@ -915,10 +1054,15 @@ async def test_fi_connectivity() -> Dict[str, Any]:
     client = await get_fi_client()
     return await client.test_connectivity()
 
+def get_financial_data_fetch_stats() -> Dict[str, Any]:
+    """Get single-flight hit/miss/coalesced counters and MCP batching counters for financial data fetches"""
+    return {**_financial_data_flight.get_stats(), 'batch': dict(_mcp_batch_stats)}
+
 async def logout_user():
     """Logout user and clear session"""
     global _fi_client
     if _fi_client:
+        _fi_client._invalidate_financial_data()
         await _fi_client.close()
         _fi_client = None
     logger.info("🔓 User logged out from Fi Money MCP")
@@ -927,5 +1071,6 @@ async def clear_fi_session():
     """Clear Fi Money session to force fresh authentication"""
     global _fi_client
     if _fi_client:
+        _fi_client._invalidate_financial_data()
         _fi_client.session = None
         logger.info("🧹 Fi Money session cleared - fresh authentication required")
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""
+Single-flight request coalescing for Fi MCP data fetches
+Concurrent callers for the same key share one in-flight upstream fetch, and the
+result is kept as a short-lived snapshot so back-to-back chat turns and
+dashboard loads don't each fire the full set of MCP tool calls.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightCache:
+    """Coalesces concurrent fetches per key behind a short-TTL snapshot"""
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._snapshots: Dict[str, Tuple[float, Any]] = {}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def _get_snapshot(self, key: str) -> Optional[Any]:
+        entry = self._snapshots.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._snapshots[key]
+            return None
+        return value
+
+    def _store_snapshot(self, key: str, value: Any):
+        if self.ttl_seconds <= 0:
+            return
+        if len(self._snapshots) >= self.max_entries:
+            self._purge_expired()
+            if len(self._snapshots) >= self.max_entries:
+                # Still full - drop the entry closest to expiry
+                oldest = min(self._snapshots, key=lambda k: self._snapshots[k][0])
+                del self._snapshots[oldest]
+        self._snapshots[key] = (time.monotonic() + self.ttl_seconds, value)
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._snapshots.items() if now >= expires_at]:
+            del self._snapshots[key]
+
+    def _on_done(self, key: str, task: asyncio.Task):
+        # A fetch that was invalidated mid-flight must not repopulate the snapshot
+        current = self._in_flight.get(key) is task
+        if current:
+            del self._in_flight[key]
+        if task.cancelled():
+            return
+        error = task.exception()  # Also marks the exception as retrieved
+        if error is not None:
+            self.errors += 1
+        elif current:
+            self._store_snapshot(key, task.result())
+
+    async def get(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the snapshot for key, joining or starting an upstream fetch as needed"""
+        value = self._get_snapshot(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.debug(f"Coalescing fetch for {key}")
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(fetch())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+
+        # Shield so one caller disconnecting doesn't cancel the fetch for everyone else
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: str = None):
+        """Drop the snapshot (and detach any in-flight fetch) for key, or for every key when None"""
+        if key is None:
+            self._snapshots.clear()
+            self._in_flight.clear()
+        else:
+            self._snapshots.pop(key, None)
+            self._in_flight.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss/coalesced counters and upstream savings"""
+        requests = self.hits + self.misses + self.coalesced
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+            'in_flight': len(self._in_flight),
+            'snapshots': len(self._snapshots),
+            'ttl_seconds': self.ttl_seconds,
+            'upstream_fetches_saved': self.hits + self.coalesced,
+            'saved_ratio': round((self.hits + self.coalesced) / requests, 4) if requests else 0.0
+        }
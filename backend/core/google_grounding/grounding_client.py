@@ -7,7 +7,6 @@ import asyncio
 import json
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field
-from google import genai
 from google.genai import types
 import logging
 import sys
@@ -15,6 +14,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from config.settings import config
+from core.llm_gateway import get_gemini_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +62,8 @@ class GoogleGroundingClient:
     def __init__(self, api_key: str = None, model: str = None):
         self.api_key = api_key or config.GOOGLE_API_KEY
         self.model = model or config.GEMINI_MODEL
-        self.client = genai.Client(api_key=self.api_key)
+        self.gateway = get_gemini_gateway(self.api_key)
+        self.client = self.gateway.client
         
         # Configure grounding tool
         self.grounding_tool = types.Tool(
@@ -81,7 +82,7 @@ class GoogleGroundingClient:
             logger.info(f"Executing grounded query: {query}")
             
             # Make grounded request
-            response = self.client.models.generate_content(
+            response = await self.gateway.generate_content(
                 model=self.model,
                 contents=full_prompt,
                 config=self.config
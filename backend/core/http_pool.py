@@ -0,0 +1,196 @@
+"""
+Shared aiohttp connection pool
+One tuned ClientSession per process (and event loop) so outbound calls such as
+Fi MCP tool calls reuse warm keep-alive connections instead of paying a TCP +
+TLS handshake per request. Opened lazily, closed from the FastAPI lifespan.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "30"))
+HTTP_POOL_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_POOL_KEEPALIVE_TIMEOUT", "30"))
+HTTP_POOL_DNS_CACHE_TTL = int(os.getenv("HTTP_POOL_DNS_CACHE_TTL", "300"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "30"))
+
+
+@dataclass
+class PoolStats:
+    """Request and connection counters for a pool"""
+    requests: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    queued: int = 0
+    total_queue_wait: float = 0.0
+    dns_cache_hits: int = 0
+    dns_cache_misses: int = 0
+
+
+class HTTPConnectionPool:
+    """Lazily created, keep-alive aiohttp session with reuse and saturation metrics"""
+
+    def __init__(self, name: str = "default", limit: int = None, limit_per_host: int = None,
+                 keepalive_timeout: float = None, dns_cache_ttl: int = None,
+                 timeout: float = None, headers: Dict[str, str] = None):
+        self.name = name
+        self.limit = limit or HTTP_POOL_LIMIT
+        self.limit_per_host = limit_per_host or HTTP_POOL_LIMIT_PER_HOST
+        self.keepalive_timeout = keepalive_timeout or HTTP_POOL_KEEPALIVE_TIMEOUT
+        self.dns_cache_ttl = dns_cache_ttl or HTTP_POOL_DNS_CACHE_TTL
+        self.timeout = timeout or HTTP_POOL_TIMEOUT
+        self.headers = headers or {'User-Agent': 'Artha-AI/1.0'}
+        self.stats = PoolStats()
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        stats = self.stats
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            stats.requests += 1
+            stats.in_flight += 1
+            stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+
+        async def on_request_end(session, ctx, params):
+            stats.in_flight -= 1
+
+        async def on_request_exception(session, ctx, params):
+            stats.in_flight -= 1
+            stats.errors += 1
+
+        async def on_connection_queued_start(session, ctx, params):
+            stats.queued += 1
+            ctx.queued_at = time.perf_counter()
+
+        async def on_connection_queued_end(session, ctx, params):
+            stats.total_queue_wait += time.perf_counter() - ctx.queued_at
+
+        async def on_connection_create_end(session, ctx, params):
+            stats.connections_created += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            stats.connections_reused += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            stats.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            stats.dns_cache_misses += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        trace.on_request_exception.append(on_request_exception)
+        trace.on_connection_queued_start.append(on_connection_queued_start)
+        trace.on_connection_queued_end.append(on_connection_queued_end)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+            keepalive_timeout=self.keepalive_timeout,
+            enable_cleanup_closed=True
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers=self.headers,
+            trace_configs=[self._trace_config()]
+        )
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, opening it on first use"""
+        loop = asyncio.get_running_loop()
+        if self._session is not None and not self._session.closed and self._loop is loop:
+            return self._session
+
+        if self._loop is not loop:
+            # Sessions are bound to their loop; a session from a finished loop can't be reused
+            if self._session is not None and not self._session.closed:
+                logger.warning(f"⚠️ HTTP pool '{self.name}' re-opened on a new event loop")
+            self._session = None
+            self._lock = asyncio.Lock()
+            self._loop = loop
+
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                self._session = self._create_session()
+                logger.info(f"✅ HTTP pool '{self.name}' opened (limit={self.limit}, per_host={self.limit_per_host})")
+        return self._session
+
+    async def close(self):
+        """Close the session and its pooled connections"""
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
+            logger.info(f"✅ HTTP pool '{self.name}' closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection reuse and saturation metrics"""
+        stats = self.stats
+        connections = stats.connections_created + stats.connections_reused
+        return {
+            'open': self._session is not None and not self._session.closed,
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host,
+            'requests': stats.requests,
+            'errors': stats.errors,
+            'in_flight': stats.in_flight,
+            'peak_in_flight': stats.peak_in_flight,
+            'saturation': round(stats.in_flight / self.limit, 4),
+            'peak_saturation': round(stats.peak_in_flight / self.limit, 4),
+            'connections_created': stats.connections_created,
+            'connections_reused': stats.connections_reused,
+            'reuse_ratio': round(stats.connections_reused / connections, 4) if connections else 0.0,
+            'queued_for_connection': stats.queued,
+            'avg_queue_wait_ms': round(stats.total_queue_wait / stats.queued * 1000, 2) if stats.queued else 0.0,
+            'dns_cache_hits': stats.dns_cache_hits,
+            'dns_cache_misses': stats.dns_cache_misses
+        }
+
+
+_pools: Dict[str, HTTPConnectionPool] = {}
+
+
+def get_http_pool(name: str = "default") -> HTTPConnectionPool:
+    """Return the process-wide pool with the given name"""
+    pool = _pools.get(name)
+    if pool is None:
+        pool = HTTPConnectionPool(name=name)
+        _pools[name] = pool
+    return pool
+
+
+async def close_http_pools():
+    """Close every pool; called on application shutdown"""
+    for pool in _pools.values():
+        try:
+            await pool.close()
+        except Exception as e:
+            logger.error(f"❌ Error closing HTTP pool '{pool.name}': {e}")
+
+
+def get_http_pool_stats() -> Dict[str, Any]:
+    """Stats for every pool, keyed by name"""
+    return {name: pool.get_stats() for name, pool in _pools.items()}
@@ -0,0 +1,157 @@
+"""
+Shared async Gemini gateway
+Every agent and the grounding client route model calls through here so that
+no synchronous SDK call ever runs on the event loop, and so that concurrency
+against each model is capped in one place.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from google import genai
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelCallStats:
+    """Running call statistics for a single model"""
+    calls: int = 0
+    errors: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    total_latency: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight,
+            'avg_latency_ms': round(self.total_latency / self.calls * 1000, 2) if self.calls else 0.0
+        }
+
+
+@dataclass
+class _ModelSlot:
+    """Concurrency limit and stats for a single model"""
+    limit: int
+    stats: ModelCallStats = field(default_factory=ModelCallStats)
+    # Semaphores are bound to the loop that first waits on them, and some
+    # callers (stock_api_server) spin up a fresh loop per request
+    _semaphores: "weakref.WeakKeyDictionary" = field(default_factory=weakref.WeakKeyDictionary)
+
+    def semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.limit)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+
+def _parse_model_limits(raw: str) -> Dict[str, int]:
+    """Parse 'model=limit,model=limit' into a dict, ignoring malformed entries"""
+    limits = {}
+    for item in (raw or "").split(","):
+        if "=" not in item:
+            continue
+        name, _, value = item.partition("=")
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            logger.warning(f"Ignoring invalid Gemini concurrency limit: {item}")
+    return limits
+
+
+class GeminiGateway:
+    """Non-blocking front door for Gemini generate_content calls"""
+
+    def __init__(self, api_key: str = None, client: Any = None,
+                 default_limit: int = None, model_limits: Dict[str, int] = None,
+                 max_workers: int = None):
+        self.api_key = api_key or config.GOOGLE_API_KEY
+        self.client = client or genai.Client(api_key=self.api_key)
+        self.default_limit = default_limit or config.GEMINI_MAX_CONCURRENCY
+        self.model_limits = model_limits if model_limits is not None else _parse_model_limits(config.GEMINI_MODEL_CONCURRENCY)
+        self._slots: Dict[str, _ModelSlot] = {}
+
+        # Only used when the client has no native async surface
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._max_workers = max_workers or config.GEMINI_THREAD_POOL_SIZE
+
+    def _slot(self, model: str) -> _ModelSlot:
+        slot = self._slots.get(model)
+        if slot is None:
+            limit = self.model_limits.get(model, self.default_limit)
+            slot = _ModelSlot(limit=limit)
+            self._slots[model] = slot
+        return slot
+
+    async def _call(self, model: str, contents: Any, config: Any) -> Any:
+        aio = getattr(self.client, 'aio', None)
+        if aio is not None:
+            return await aio.models.generate_content(model=model, contents=contents, config=config)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="gemini")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            lambda: self.client.models.generate_content(model=model, contents=contents, config=config)
+        )
+
+    async def generate_content(self, model: str, contents: Any, config: Any = None) -> Any:
+        """Run generate_content without blocking the loop, within the model's concurrency limit"""
+        slot = self._slot(model)
+        async with slot.semaphore():
+            stats = slot.stats
+            stats.in_flight += 1
+            stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+            start_time = time.perf_counter()
+            try:
+                return await self._call(model, contents, config)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.calls += 1
+                stats.in_flight -= 1
+                stats.total_latency += time.perf_counter() - start_time
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-model call statistics"""
+        return {
+            model: {'limit': slot.limit, **slot.stats.to_dict()}
+            for model, slot in self._slots.items()
+        }
+
+    def shutdown(self):
+        """Release the fallback thread pool, if one was started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+_gateways: Dict[str, GeminiGateway] = {}
+
+
+def get_gemini_gateway(api_key: str = None) -> GeminiGateway:
+    """Return the process-wide gateway for an API key"""
+    key = api_key or config.GOOGLE_API_KEY
+    gateway = _gateways.get(key)
+    if gateway is None:
+        gateway = GeminiGateway(api_key=key)
+        _gateways[key] = gateway
+    return gateway
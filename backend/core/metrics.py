@@ -0,0 +1,499 @@
+"""
+Process-wide metrics registry with Prometheus text exposition
+Counters, gauges and fixed-bucket histograms, optionally labelled. Writers
+never take a lock: every series keeps one accumulator per thread, each thread
+only updates its own, and a scrape sums them. Values that services already
+track (pool occupancy, cache hit counters) are read at scrape time through
+registered collectors instead of being mirrored on the hot path.
+"""
+
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+import weakref
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Label combinations beyond this collapse into one overflow series per metric
+METRICS_MAX_SERIES_PER_METRIC = int(os.getenv("METRICS_MAX_SERIES_PER_METRIC", "500"))
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+OVERFLOW_LABEL_VALUE = "__overflow__"
+
+
+def exponential_buckets(start: float, factor: float, count: int) -> Tuple[float, ...]:
+    """count upper bounds growing geometrically from start (constant relative error, as in HDR histograms)"""
+    return tuple(start * factor ** i for i in range(count))
+
+
+# Seconds; request latencies from a millisecond cache hit up to a slow LLM call
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _ThreadCells:
+    """One accumulator list per writing thread; readers sum the lists"""
+
+    __slots__ = ('width', '_local', '_cells', '_lock')
+
+    def __init__(self, width: int):
+        self.width = width
+        self._local = threading.local()
+        self._cells: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def cell(self) -> List[float]:
+        try:
+            return self._local.cell
+        except AttributeError:
+            # First write from this thread
+            cell = [0.0] * self.width
+            with self._lock:
+                self._cells.append(cell)
+            self._local.cell = cell
+            return cell
+
+    def totals(self) -> List[float]:
+        with self._lock:
+            cells = list(self._cells)
+        totals = [0.0] * self.width
+        for cell in cells:
+            for i, value in enumerate(cell):
+                totals[i] += value
+        return totals
+
+
+class _CounterChild:
+    __slots__ = ('_cells',)
+
+    def __init__(self):
+        self._cells = _ThreadCells(1)
+
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._cells.cell()[0] += amount
+
+    def get(self) -> float:
+        return self._cells.totals()[0]
+
+
+class _GaugeChild:
+    __slots__ = ('_cells', '_base')
+
+    def __init__(self):
+        self._cells = _ThreadCells(1)
+        self._base = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self._cells.cell()[0] += amount
+
+    def dec(self, amount: float = 1.0):
+        self._cells.cell()[0] -= amount
+
+    def set(self, value: float):
+        # Meant for single-writer gauges; inc()/dec() are safe from any thread
+        self._base = value - self._cells.totals()[0]
+
+    def get(self) -> float:
+        return self._base + self._cells.totals()[0]
+
+
+class _HistogramChild:
+    __slots__ = ('_bounds', '_cells')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        # One slot per bucket (the last is +Inf) followed by the running sum
+        self._cells = _ThreadCells(len(bounds) + 2)
+
+    def observe(self, value: float):
+        cell = self._cells.cell()
+        cell[bisect.bisect_left(self._bounds, value)] += 1
+        cell[-1] += value
+
+    def time(self) -> "_Timer":
+        """Context manager observing the elapsed seconds of its block"""
+        return _Timer(self)
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """(per-bucket counts, count, sum)"""
+        totals = self._cells.totals()
+        counts = totals[:-1]
+        return counts, sum(counts), totals[-1]
+
+    def percentile(self, q: float) -> float:
+        return bucket_percentile(self._bounds, self.snapshot()[0], q)
+
+
+def bucket_percentile(bounds: Sequence[float], counts: Sequence[float], q: float) -> float:
+    """q-th percentile of bucketed counts, interpolated linearly inside its bucket"""
+    count = sum(counts)
+    if not count:
+        return 0.0
+    rank = q * count
+    seen = 0.0
+    for i, bucket_count in enumerate(counts):
+        if bucket_count and seen + bucket_count >= rank:
+            if i == len(bounds):
+                # Past the last bound; the best estimate is that bound
+                return bounds[-1] if bounds else 0.0
+            lower = bounds[i - 1] if i else 0.0
+            return lower + (bounds[i] - lower) * (rank - seen) / bucket_count
+        seen += bucket_count
+    return bounds[-1] if bounds else 0.0
+
+
+def latency_summary(bounds: Sequence[float], counts: Sequence[float], total: float) -> Dict[str, Any]:
+    """A seconds histogram as the millisecond summary reported by the stats endpoints"""
+    count = sum(counts)
+    cumulative = 0.0
+    buckets = {}
+    for bound, bucket_count in zip(tuple(bounds) + (math.inf,), counts):
+        cumulative += bucket_count
+        buckets["+Inf" if math.isinf(bound) else f"{bound * 1000:g}"] = int(cumulative)
+    return {
+        'count': int(count),
+        'sum_ms': round(total * 1000, 2),
+        'avg_ms': round(total * 1000 / count, 2) if count else 0.0,
+        'p50_ms': round(bucket_percentile(bounds, counts, 0.50) * 1000, 2),
+        'p95_ms': round(bucket_percentile(bounds, counts, 0.95) * 1000, 2),
+        'p99_ms': round(bucket_percentile(bounds, counts, 0.99) * 1000, 2),
+        'buckets': buckets
+    }
+
+
+class _Timer:
+    __slots__ = ('_histogram', '_start')
+
+    def __init__(self, histogram: _HistogramChild):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._histogram.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _Metric:
+    """A metric family: one child series per label combination"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 max_series: int = METRICS_MAX_SERIES_PER_METRIC):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        """Child series for these label values (positional, or by label name)"""
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is not None:
+            return child
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        with self._lock:
+            child = self._children.get(values)
+            if child is None:
+                if len(self._children) >= self.max_series:
+                    # Unbounded label values (user ids, raw paths) must not grow memory
+                    values = (OVERFLOW_LABEL_VALUE,) * len(self.labelnames)
+                    child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def children(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return list(self._children.items())
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def get(self) -> float:
+        return self._default.get()
+
+
+class Gauge(_Metric):
+    """Value that goes up and down"""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+    def get(self) -> float:
+        return self._default.get()
+
+
+class Histogram(_Metric):
+    """Fixed-bucket distribution (le upper bounds, plus +Inf)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, **kwargs):
+        self.buckets = tuple(sorted(bound for bound in buckets if not math.isinf(bound)))
+        super().__init__(name, documentation, labelnames, **kwargs)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def time(self) -> _Timer:
+        return self._default.time()
+
+    def percentile(self, q: float) -> float:
+        return self._default.percentile(q)
+
+    def totals(self, **match) -> Tuple[List[float], float, float]:
+        """(per-bucket counts, count, sum) merged across label combinations, optionally only those matching"""
+        counts = [0.0] * (len(self.buckets) + 1)
+        count = total = 0.0
+        for values, child in self.children():
+            labels = dict(zip(self.labelnames, values))
+            if any(labels.get(name) != str(value) for name, value in match.items()):
+                continue
+            child_counts, child_count, child_sum = child.snapshot()
+            counts = [a + b for a, b in zip(counts, child_counts)]
+            count += child_count
+            total += child_sum
+        return counts, count, total
+
+
+# A collector returns metric families as (name, kind, documentation, [(labels, value), ...])
+CollectedFamily = Tuple[str, str, str, Iterable[Tuple[Dict[str, str], float]]]
+
+
+class MetricsRegistry:
+    """Named metrics plus scrape-time collectors, rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[CollectedFamily]]] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered as {metric.kind} {metric.labelnames}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def collected_value(self, name: str) -> Optional[float]:
+        """Sum of a collector-provided family's samples, or None if no collector reports it"""
+        with self._lock:
+            collectors = list(self._collectors.values())
+        for collect in collectors:
+            try:
+                for family_name, _, _, samples in collect():
+                    if family_name == name:
+                        return sum(value for _, value in samples)
+            except Exception:
+                continue
+        return None
+
+    def register_collector(self, key: str, collect: Callable[[], Iterable[CollectedFamily]]):
+        """Add (or replace) a scrape-time collector; failures are logged and skipped"""
+        with self._lock:
+            self._collectors[key] = collect
+
+    def collect(self) -> Iterable[CollectedFamily]:
+        """Every family as (name, kind, documentation, samples); histogram samples carry suffixes"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.items())
+        for metric in metrics:
+            yield metric.name, metric.kind, metric.documentation, list(_samples(metric))
+        for key, collect in collectors:
+            try:
+                families = list(collect())
+            except Exception as e:
+                logger.warning(f"⚠️ Metrics collector {key} failed: {e}")
+                continue
+            yield from families
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        lines = []
+        for name, kind, documentation, samples in self.collect():
+            lines.append(f"# HELP {name} {_escape_help(documentation)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                sample_name = labels.pop("__name__", name)
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _samples(metric: _Metric) -> Iterable[Tuple[Dict[str, str], float]]:
+    for values, child in metric.children():
+        labels = dict(zip(metric.labelnames, values))
+        if isinstance(metric, Histogram):
+            counts, count, total = child.snapshot()
+            cumulative = 0.0
+            for bound, bucket_count in zip(metric.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                yield {"__name__": f"{metric.name}_bucket", **labels, "le": _format_value(bound)}, cumulative
+            yield {"__name__": f"{metric.name}_sum", **labels}, total
+            yield {"__name__": f"{metric.name}_count", **labels}, count
+        else:
+            yield labels, child.get()
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return f"{value:.1f}" if isinstance(value, float) else str(value)
+    return repr(float(value))
+
+
+metrics = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry"""
+    return metrics
+
+
+# Caches report their own hit/miss counters; they are read at scrape time
+_cache_sources: "weakref.WeakKeyDictionary[Any, Tuple[str, str]]" = weakref.WeakKeyDictionary()
+_cache_sources_lock = threading.Lock()
+
+
+def register_cache(cache: Any, name: str, tier: str):
+    """
+    Export a cache's get_stats() hits/misses/evictions (and size, when reported)
+    under artha_cache_*{cache=name, tier=tier}. Held weakly.
+    """
+    with _cache_sources_lock:
+        _cache_sources[cache] = (name, tier)
+
+
+def cache_totals() -> Dict[Tuple[str, str], Dict[str, float]]:
+    """Summed stats per (cache, tier) across registered caches"""
+    with _cache_sources_lock:
+        sources = list(_cache_sources.items())
+    totals: Dict[Tuple[str, str], Dict[str, float]] = {}
+    for cache, key in sources:
+        try:
+            stats = cache.get_stats()
+        except Exception as e:
+            logger.warning(f"⚠️ Cache stats for {key[0]} unavailable: {e}")
+            continue
+        entry = totals.setdefault(key, {'hits': 0, 'misses': 0, 'evictions': 0, 'entries': 0})
+        for field in ('hits', 'misses', 'evictions'):
+            entry[field] += stats.get(field, 0)
+        entry['entries'] += stats.get('size', stats.get('entries', 0))
+    return totals
+
+
+def _collect_caches() -> Iterable[CollectedFamily]:
+    totals = cache_totals()
+    lookups = []
+    for (name, tier), stats in totals.items():
+        lookups.append(({"cache": name, "tier": tier, "result": "hit"}, stats['hits']))
+        lookups.append(({"cache": name, "tier": tier, "result": "miss"}, stats['misses']))
+    yield "artha_cache_lookups_total", "counter", "Cache lookups by cache, tier and result", lookups
+    yield ("artha_cache_evictions_total", "counter", "Entries evicted to stay within cache bounds",
+           [({"cache": name, "tier": tier}, stats['evictions']) for (name, tier), stats in totals.items()])
+    yield ("artha_cache_entries", "gauge", "Entries currently held",
+           [({"cache": name, "tier": tier}, stats['entries']) for (name, tier), stats in totals.items()])
+
+
+metrics.register_collector("caches", _collect_caches)
+
+
+SSE_STREAMS_ACTIVE = metrics.gauge("artha_sse_streams_active", "Server-sent event streams currently open", ("stream",))
+SSE_EVENTS = metrics.counter("artha_sse_events_total", "Server-sent event chunks written", ("stream",))
+SSE_STREAM_SECONDS = metrics.histogram(
+    "artha_sse_stream_duration_seconds", "Lifetime of server-sent event streams", ("stream",),
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0)
+)
+
+
+async def instrument_stream(stream: str, chunks: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """Wrap an SSE generator to count open streams, chunks written and stream lifetime"""
+    active = SSE_STREAMS_ACTIVE.labels(stream)
+    events = SSE_EVENTS.labels(stream)
+    started = time.perf_counter()
+    active.inc()
+    try:
+        async for chunk in chunks:
+            events.inc()
+            yield chunk
+    finally:
+        active.dec()
+        SSE_STREAM_SECONDS.labels(stream).observe(time.perf_counter() - started)
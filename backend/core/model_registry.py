@@ -0,0 +1,115 @@
+"""
+GenerativeModel registry and per-model latency histograms
+Models are built once per (model name, configuration) and reused across
+requests and retry attempts, and every call is recorded into the shared
+metrics registry (core/metrics.py) instead of one log line per request, so
+the same histograms back /api/status and /metrics.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from core.metrics import Histogram, MetricsRegistry, exponential_buckets, latency_summary, metrics
+
+logger = logging.getLogger(__name__)
+
+# Seconds, doubling from 100ms to 51.2s; anything slower lands in the +Inf bucket
+GEMINI_LATENCY_BUCKETS = exponential_buckets(0.1, 2, 10)
+GEMINI_TOKENS_PER_SECOND_BUCKETS = exponential_buckets(5, 2, 8)
+
+
+def _model_histograms(registry: MetricsRegistry) -> Tuple[Histogram, Histogram, Histogram]:
+    return (
+        registry.histogram("artha_gemini_request_duration_seconds", "Gemini call latency by model and outcome",
+                           ("model", "status"), buckets=GEMINI_LATENCY_BUCKETS),
+        registry.histogram("artha_gemini_time_to_first_token_seconds", "Time to the first streamed Gemini token",
+                           ("model",), buckets=GEMINI_LATENCY_BUCKETS),
+        registry.histogram("artha_gemini_tokens_per_second", "Streamed Gemini output rate",
+                           ("model",), buckets=GEMINI_TOKENS_PER_SECOND_BUCKETS)
+    )
+
+
+GEMINI_REQUEST_SECONDS, GEMINI_TTFT_SECONDS, GEMINI_TOKENS_PER_SECOND = _model_histograms(metrics)
+
+
+def _config_hash(options: Dict[str, Any]) -> str:
+    """Stable hash of model options (enum keys such as HarmCategory are stringified)"""
+    def normalise(value):
+        if isinstance(value, dict):
+            return {str(k): normalise(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [normalise(v) for v in value]
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            return value
+        return str(value)
+
+    encoded = json.dumps(normalise(options), sort_keys=True)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+class GenerativeModelRegistry:
+    """Builds each (model name, configuration) once and hands out the shared instance"""
+
+    def __init__(self, factory: Callable[..., Any], metrics_registry: MetricsRegistry = None):
+        self.factory = factory
+        self._models: Dict[Tuple[str, str], Any] = {}
+        self._latency, self._ttft, self._tokens_per_sec = _model_histograms(metrics_registry or metrics)
+        self.builds = 0
+        self.reuses = 0
+
+    def get(self, model_name: str, **options) -> Any:
+        """Return the model for this name and options, building it on first use"""
+        key = (model_name, _config_hash(options))
+        model = self._models.get(key)
+        if model is None:
+            model = self.factory(model_name=model_name, **options)
+            self._models[key] = model
+            self.builds += 1
+            logger.info(f"✅ Built Gemini model {model_name} (config {key[1]})")
+        else:
+            self.reuses += 1
+        return model
+
+    def warm(self, model_names: Iterable[str], **options):
+        """Build the configured models up front, e.g. at startup"""
+        for model_name in model_names:
+            self.get(model_name, **options)
+
+    def record(self, model_name: str, status: str, latency: float,
+               ttft: float = None, tokens_per_sec: float = None):
+        """Record one call's outcome into the model's histograms"""
+        self._latency.labels(model_name, status).observe(latency)
+        if ttft is not None:
+            self._ttft.labels(model_name).observe(ttft)
+        if tokens_per_sec is not None:
+            self._tokens_per_sec.labels(model_name).observe(tokens_per_sec)
+
+    def _model_stats(self, model_name: str) -> Dict[str, Any]:
+        statuses = {
+            status: int(child.snapshot()[1])
+            for (name, status), child in self._latency.children() if name == model_name
+        }
+        counts, _, total = self._latency.totals(model=model_name)
+        stats = {
+            'statuses': statuses,
+            'latency': latency_summary(self._latency.buckets, counts, total)
+        }
+        # Looked up rather than labels(), which would create empty series for unstreamed models
+        ttft_counts, ttft_count, ttft_total = self._ttft.totals(model=model_name)
+        if ttft_count:
+            stats['ttft'] = latency_summary(self._ttft.buckets, ttft_counts, ttft_total)
+        _, streamed_calls, rate_total = self._tokens_per_sec.totals(model=model_name)
+        if streamed_calls:
+            stats['avg_tokens_per_sec'] = round(rate_total / streamed_calls, 2)
+        return stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Registry reuse counters and per-model latency histograms"""
+        model_names = sorted({model_name for (model_name, _), _ in self._latency.children()})
+        return {
+            'models_built': self.builds,
+            'model_reuses': self.reuses,
+            'models': {model_name: self._model_stats(model_name) for model_name in model_names}
+        }
@@ -0,0 +1,227 @@
+"""
+GCRA rate limiting engine
+One limiter shared by the HTTP middleware and the chat system. Each key costs
+a single float (its theoretical arrival time) regardless of the limit, keys
+are spread over striped locks, and idle keys are evicted. The Redis backend
+runs the same algorithm in a Lua script so limits hold across uvicorn workers.
+"""
+
+import logging
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_STRIPES = int(os.getenv("RATE_LIMIT_STRIPES", "64"))
+RATE_LIMIT_SWEEP_EVERY = int(os.getenv("RATE_LIMIT_SWEEP_EVERY", "1024"))
+RATE_LIMIT_REDIS_PREFIX = os.getenv("RATE_LIMIT_REDIS_PREFIX", "ratelimit:")
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """requests per period seconds, allowing bursts of up to burst requests"""
+    requests: int
+    period: float
+    burst: Optional[int] = None
+
+    @property
+    def emission_interval(self) -> float:
+        return self.period / self.requests
+
+    @property
+    def capacity(self) -> int:
+        return self.burst or self.requests
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of one hit; retry_after is 0 when allowed"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+
+def gcra(tat: float, now: float, emission_interval: float, capacity: int,
+         cost: int = 1) -> Tuple[bool, float, int, float, float]:
+    """
+    Generic cell rate algorithm for one key
+
+    Returns (allowed, new_tat, remaining, retry_after, reset_after). new_tat is
+    what should be stored for the key; it equals tat when the hit is denied.
+    """
+    tat = max(tat, now)
+    new_tat = tat + emission_interval * cost
+    allow_at = new_tat - emission_interval * capacity
+    if now < allow_at:
+        return False, tat, 0, allow_at - now, tat - now
+    remaining = int((now - allow_at) / emission_interval)
+    return True, new_tat, remaining, 0.0, new_tat - now
+
+
+class InMemoryRateLimitBackend:
+    """Per-process backend: one float per key behind striped locks"""
+
+    def __init__(self, stripes: int = None, sweep_every: int = None):
+        stripes = stripes or RATE_LIMIT_STRIPES
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._tats = [dict() for _ in range(stripes)]
+        self.sweep_every = sweep_every or RATE_LIMIT_SWEEP_EVERY
+        self._hits_since_sweep = 0
+        self._next_sweep_stripe = 0
+        self.evicted = 0
+
+    def _stripe(self, key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % len(self._locks)
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitResult:
+        now = time.monotonic()
+        index = self._stripe(key)
+        with self._locks[index]:
+            tats = self._tats[index]
+            allowed, new_tat, remaining, retry_after, reset_after = gcra(
+                tats.get(key, now), now, limit.emission_interval, limit.capacity, cost
+            )
+            if allowed:
+                tats[key] = new_tat
+
+        self._hits_since_sweep += 1
+        if self._hits_since_sweep >= self.sweep_every:
+            self._hits_since_sweep = 0
+            self._sweep_next_stripe()
+
+        return RateLimitResult(allowed, limit.capacity, remaining, retry_after, reset_after)
+
+    def _sweep_next_stripe(self):
+        # A key whose TAT has passed has a full bucket, so dropping it changes nothing
+        index = self._next_sweep_stripe
+        self._next_sweep_stripe = (index + 1) % len(self._locks)
+        now = time.monotonic()
+        with self._locks[index]:
+            tats = self._tats[index]
+            idle = [key for key, tat in tats.items() if tat <= now]
+            for key in idle:
+                del tats[key]
+        self.evicted += len(idle)
+
+    def sweep(self) -> int:
+        """Evict idle keys from every stripe; returns how many were removed"""
+        before = self.evicted
+        for _ in range(len(self._locks)):
+            self._sweep_next_stripe()
+        return self.evicted - before
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'backend': 'memory',
+            'keys': sum(len(tats) for tats in self._tats),
+            'stripes': len(self._locks),
+            'evicted': self.evicted
+        }
+
+
+# KEYS[1] = key, ARGV = emission interval (ms), capacity, cost.
+# Uses the server clock so every worker agrees on "now", and expires the key
+# once its bucket is full again so idle keys evict themselves.
+GCRA_LUA = """
+local now_parts = redis.call('TIME')
+local now = now_parts[1] * 1000 + now_parts[2] / 1000
+local interval = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval * cost
+local allow_at = new_tat - interval * capacity
+if now < allow_at then
+  return {0, 0, tostring(allow_at - now), tostring(tat - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now - allow_at) / interval), '0', tostring(new_tat - now)}
+"""
+
+
+class RedisRateLimitBackend:
+    """Shared backend for multi-worker deployments (any redis.asyncio-compatible client)"""
+
+    def __init__(self, client, prefix: str = None):
+        self.client = client
+        self.prefix = prefix or RATE_LIMIT_REDIS_PREFIX
+        self._script = client.register_script(GCRA_LUA)
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitResult:
+        allowed, remaining, retry_after_ms, reset_after_ms = await self._script(
+            keys=[self.prefix + key],
+            args=[limit.emission_interval * 1000, limit.capacity, cost]
+        )
+        return RateLimitResult(
+            allowed=bool(int(allowed)),
+            limit=limit.capacity,
+            remaining=int(remaining),
+            retry_after=float(retry_after_ms) / 1000,
+            reset_after=float(reset_after_ms) / 1000
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': 'redis', 'prefix': self.prefix}
+
+
+class RateLimiter:
+    """Rate limiting front end over a pluggable backend"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or InMemoryRateLimitBackend()
+        self.allowed = 0
+        self.denied = 0
+        self.errors = 0
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitResult:
+        """Consume cost from key's allowance under limit; fails open if the backend errors"""
+        try:
+            result = await self.backend.hit(key, limit, cost)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"❌ Rate limit backend error, allowing request: {e}")
+            return RateLimitResult(True, limit.capacity, limit.capacity, 0.0, 0.0)
+        if result.allowed:
+            self.allowed += 1
+        else:
+            self.denied += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.backend.get_stats(),
+            'allowed': self.allowed,
+            'denied': self.denied,
+            'errors': self.errors
+        }
+
+
+def _create_backend():
+    if RATE_LIMIT_BACKEND == "redis":
+        try:
+            import redis.asyncio as redis_asyncio
+            client = redis_asyncio.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+            logger.info("✅ Rate limiter using Redis backend")
+            return RedisRateLimitBackend(client)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis rate limit backend unavailable, using in-memory: {e}")
+    return InMemoryRateLimitBackend()
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter(_create_backend())
+    return _rate_limiter
@@ -0,0 +1,254 @@
+"""
+Server-side session store
+Backs /api/session. Each session is one Redis hash (one field per key plus a
+few reserved metadata fields) with a single EXPIRE, so a session costs one
+key and reading any number of its keys is one script call. Without Redis the store
+falls back to a bounded in-memory LRU whose expiries sit in a heap, so expired
+sessions are swept as a side effect of normal traffic.
+"""
+
+import heapq
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "redis")
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "86400"))
+SESSION_MEMORY_MAX_SESSIONS = int(os.getenv("SESSION_MEMORY_MAX_SESSIONS", "10000"))
+SESSION_REDIS_PREFIX = os.getenv("SESSION_REDIS_PREFIX", "artha_session:")
+
+# Reserved hash fields; user keys may not start with "_"
+CREATED_AT_FIELD = "_created_at"
+LAST_ACCESSED_FIELD = "_last_accessed"
+CLIENT_IP_FIELD = "_client_ip"
+
+
+# KEYS[1] = session hash, ARGV = access time, then the fields to read.
+# Reads and touches _last_accessed in one round trip; only an existing hash is
+# touched, so a session that just expired is never recreated without its TTL.
+# unpack moved to table.unpack after Lua 5.1 (Redis embeds 5.1, lupa ships 5.4).
+GET_MANY_LUA = f"""
+local unpack = table.unpack or unpack
+local values = redis.call('HMGET', KEYS[1], unpack(ARGV, 2))
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HSET', KEYS[1], '{LAST_ACCESSED_FIELD}', ARGV[1])
+end
+return values
+"""
+
+
+def is_reserved_key(key: str) -> bool:
+    return key.startswith("_")
+
+
+class InMemorySessionBackend:
+    """Per-process fallback: LRU over sessions with expiries kept in a min-heap"""
+
+    name = "memory"
+
+    def __init__(self, max_sessions: int = None, ttl_seconds: int = None, clock=time.monotonic):
+        self.max_sessions = max_sessions or SESSION_MEMORY_MAX_SESSIONS
+        self.ttl_seconds = ttl_seconds or SESSION_TTL_SECONDS
+        self.clock = clock
+        # session_id -> (fields, expires_at), least recently used first
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        # (expires_at, session_id); entries go stale when a session is refreshed
+        self._expiry_heap: List[tuple] = []
+        self.expired = 0
+        self.evicted = 0
+
+    def _sweep(self, now: float):
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, session_id = heapq.heappop(heap)
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry[1] == expires_at:
+                del self._sessions[session_id]
+                self.expired += 1
+        # Every set pushes a new entry; rebuild once stale ones dominate
+        if len(heap) > 2 * len(self._sessions) + 64:
+            self._expiry_heap = [(expires_at, session_id)
+                                 for session_id, (_, expires_at) in self._sessions.items()]
+            heapq.heapify(self._expiry_heap)
+
+    def _live(self, session_id: str) -> Optional[Dict[str, str]]:
+        self._sweep(self.clock())
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        self._sessions.move_to_end(session_id)
+        return entry[0]
+
+    async def set(self, session_id: str, key: str, value: str, client_ip: str):
+        now = self.clock()
+        self._sweep(now)
+        entry = self._sessions.get(session_id)
+        fields = entry[0] if entry else {CREATED_AT_FIELD: datetime.utcnow().isoformat()}
+        fields[key] = value
+        fields[CLIENT_IP_FIELD] = client_ip
+        fields[LAST_ACCESSED_FIELD] = datetime.utcnow().isoformat()
+
+        expires_at = now + self.ttl_seconds
+        self._sessions[session_id] = (fields, expires_at)
+        self._sessions.move_to_end(session_id)
+        heapq.heappush(self._expiry_heap, (expires_at, session_id))
+
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    async def get_many(self, session_id: str, keys: List[str]) -> Dict[str, Optional[str]]:
+        fields = self._live(session_id)
+        if fields is None:
+            return {key: None for key in keys}
+        values = {key: fields.get(key) for key in keys}
+        if any(value is not None for value in values.values()):
+            fields[LAST_ACCESSED_FIELD] = datetime.utcnow().isoformat()
+        return values
+
+    async def remove(self, session_id: str, key: str):
+        fields = self._live(session_id)
+        if fields is not None:
+            fields.pop(key, None)
+
+    async def clear(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    async def ping(self) -> bool:
+        return True
+
+    def sweep(self) -> int:
+        """Drop every expired session now; returns how many were removed"""
+        before = self.expired
+        self._sweep(self.clock())
+        return self.expired - before
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'backend': self.name,
+            'sessions': len(self._sessions),
+            'max_sessions': self.max_sessions,
+            'expired': self.expired,
+            'evicted': self.evicted
+        }
+
+
+class RedisSessionBackend:
+    """Hash-per-session backend (any redis.asyncio-compatible client with decode_responses=True)"""
+
+    name = "redis"
+
+    def __init__(self, client, prefix: str = None, ttl_seconds: int = None):
+        self.client = client
+        self.prefix = prefix or SESSION_REDIS_PREFIX
+        self.ttl_seconds = ttl_seconds or SESSION_TTL_SECONDS
+        self._get_many_script = None
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    async def set(self, session_id: str, key: str, value: str, client_ip: str):
+        now = datetime.utcnow().isoformat()
+        redis_key = self._key(session_id)
+        # One round trip; MULTI so a reader never sees the hash without its EXPIRE
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(redis_key, mapping={key: value, CLIENT_IP_FIELD: client_ip, LAST_ACCESSED_FIELD: now})
+            pipe.hsetnx(redis_key, CREATED_AT_FIELD, now)
+            pipe.expire(redis_key, self.ttl_seconds)
+            await pipe.execute()
+
+    async def get_many(self, session_id: str, keys: List[str]) -> Dict[str, Optional[str]]:
+        if not keys:
+            return {}
+        if self._get_many_script is None:
+            self._get_many_script = self.client.register_script(GET_MANY_LUA)
+        values = await self._get_many_script(
+            keys=[self._key(session_id)],
+            args=[datetime.utcnow().isoformat(), *keys]
+        )
+        return dict(zip(keys, values))
+
+    async def remove(self, session_id: str, key: str):
+        await self.client.hdel(self._key(session_id), key)
+
+    async def clear(self, session_id: str):
+        await self.client.delete(self._key(session_id))
+
+    async def ping(self) -> bool:
+        return bool(await self.client.ping())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': self.name, 'prefix': self.prefix, 'ttl_seconds': self.ttl_seconds}
+
+
+class SessionStore:
+    """Session front end; checks Redis once and falls back to memory if it's unreachable"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or InMemorySessionBackend()
+        self._checked = backend is None
+
+    async def ready(self):
+        if self._checked:
+            return self
+        self._checked = True
+        try:
+            await self.backend.ping()
+            logger.info(f"✅ Session store using {self.backend.name} backend")
+        except Exception as e:
+            logger.warning(f"⚠️ Session backend {self.backend.name} not available, using in-memory storage: {e}")
+            self.backend = InMemorySessionBackend()
+        return self
+
+    async def set(self, session_id: str, key: str, value: str, client_ip: str):
+        await self.backend.set(session_id, key, value, client_ip)
+
+    async def get(self, session_id: str, key: str) -> Optional[str]:
+        return (await self.backend.get_many(session_id, [key]))[key]
+
+    async def get_many(self, session_id: str, keys: List[str]) -> Dict[str, Optional[str]]:
+        return await self.backend.get_many(session_id, keys)
+
+    async def remove(self, session_id: str, key: str):
+        await self.backend.remove(session_id, key)
+
+    async def clear(self, session_id: str):
+        await self.backend.clear(session_id)
+
+    async def ping(self) -> bool:
+        return await self.backend.ping()
+
+    @property
+    def storage_type(self) -> str:
+        return "Redis" if self.backend.name == "redis" else "Memory"
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.backend.get_stats()
+
+
+def _create_backend():
+    if SESSION_STORE_BACKEND == "redis":
+        try:
+            import redis.asyncio as redis_asyncio
+            return RedisSessionBackend(redis_asyncio.from_url(
+                os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True
+            ))
+        except Exception as e:
+            logger.warning(f"⚠️ Redis session backend unavailable, using in-memory storage: {e}")
+    return None
+
+
+_session_store: Optional[SessionStore] = None
+
+
+async def get_session_store() -> SessionStore:
+    """Return the process-wide session store (also usable as a FastAPI dependency)"""
+    global _session_store
+    if _session_store is None:
+        _session_store = SessionStore(_create_backend())
+    return await _session_store.ready()
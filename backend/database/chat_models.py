@@ -5,7 +5,7 @@ Chat Conversation Models for Artha AI
 Database models for storing user chat conversations, messages, and chat analytics.
 """
 
-from sqlalchemy import Column, String, DateTime, Text, Boolean, Integer, Float, ForeignKey, Index, JSON
+from sqlalchemy import Column, String, DateTime, Text, Boolean, Integer, Float, ForeignKey, Index, JSON, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime, timedelta
 from database.config import Base
@@ -41,8 +41,9 @@ class ChatConversation(Base):
     message_count = Column(Integer, default=0, nullable=False)
     total_tokens_used = Column(Integer, default=0, nullable=False)
     
-    # Financial context (encrypted)
-    financial_context = Column(JSON, nullable=True)  # Encrypted financial data snapshot
+    # Financial context (encrypted binary envelope; the JSON column is the legacy format, read-only)
+    financial_context_blob = Column(LargeBinary, nullable=True)
+    financial_context = Column(JSON, nullable=True)
     
     # Conversation summary (AI-generated)
     summary = Column(Text, nullable=True)
@@ -104,8 +105,9 @@ class ChatMessage(Base):
     # Message metadata
     message_metadata = Column(JSON, nullable=True)  # Additional message data (sources, confidence, etc.)
     
-    # Financial context at time of message
-    financial_snapshot = Column(JSON, nullable=True)  # Encrypted financial data at message time
+    # Financial context at time of message (encrypted binary envelope; JSON column is legacy, read-only)
+    financial_snapshot_blob = Column(LargeBinary, nullable=True)
+    financial_snapshot = Column(JSON, nullable=True)
     
     # Message status
     is_edited = Column(Boolean, default=False, nullable=False)
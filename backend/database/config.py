@@ -9,13 +9,13 @@ Supports PostgreSQL with encrypted data storage and automatic cleanup.
 import os
 import logging
 from datetime import datetime, timedelta
-from sqlalchemy import create_engine, Column, String, DateTime, Text, Boolean, Index, text
+from sqlalchemy import create_engine, inspect, Column, String, DateTime, Text, Boolean, Index, LargeBinary, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
 from sqlalchemy.exc import SQLAlchemyError
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -43,12 +43,13 @@ class SecureCache(Base):
     # Primary key: user email (hashed for privacy)
     user_email_hash = Column(String(64), primary_key=True, index=True)
     
-    # Encrypted financial data (JSONB equivalent as Text)
-    encrypted_data = Column(Text, nullable=False)
+    # Encrypted financial data as a binary envelope (header | nonce | tag | ciphertext)
+    encrypted_blob = Column(LargeBinary, nullable=True)
     
-    # Encryption metadata
-    encryption_nonce = Column(String(32), nullable=False)
-    encryption_tag = Column(String(32), nullable=False)
+    # Legacy base64 format, still read for rows written before encrypted_blob
+    encrypted_data = Column(Text, nullable=True)
+    encryption_nonce = Column(String(32), nullable=True)
+    encryption_tag = Column(String(32), nullable=True)
     
     # Timestamps
     cached_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -177,12 +178,58 @@ def test_connection() -> bool:
     """
     return connection_manager.test_connection()
 
+# Envelope columns added after these tables first shipped; create_all() leaves existing tables alone
+ENVELOPE_COLUMNS = {
+    'secure_cache': ['encrypted_blob'],
+    'chat_conversations': ['financial_context_blob'],
+    'chat_messages': ['financial_snapshot_blob'],
+}
+LEGACY_ENCRYPTION_COLUMNS = {
+    'secure_cache': ['encrypted_data', 'encryption_nonce', 'encryption_tag'],
+}
+
+def upgrade_envelope_columns(bind=None) -> List[str]:
+    """
+    Add the binary envelope columns to existing tables and relax NOT NULL on
+    the legacy base64 columns they replace. Safe to run repeatedly.
+    
+    Returns:
+        "table.column" for every column added
+    """
+    bind = bind or engine
+    inspector = inspect(bind)
+    tables = set(inspector.get_table_names())
+    binary_type = LargeBinary().compile(dialect=bind.dialect)
+    added = []
+    
+    with bind.begin() as conn:
+        for table, columns in ENVELOPE_COLUMNS.items():
+            if table not in tables:
+                continue
+            existing = {column['name'] for column in inspector.get_columns(table)}
+            for column in columns:
+                if column not in existing:
+                    conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {binary_type}"))
+                    added.append(f"{table}.{column}")
+        
+        # SQLite can't drop NOT NULL in place; its tables are always created from the current models
+        if bind.dialect.name == 'postgresql':
+            for table, columns in LEGACY_ENCRYPTION_COLUMNS.items():
+                if table in tables:
+                    for column in columns:
+                        conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL"))
+    
+    if added:
+        logger.info(f"✅ Added envelope columns: {', '.join(added)}")
+    return added
+
 def create_tables():
     """
     Create all database tables
     """
     try:
         Base.metadata.create_all(bind=engine)
+        upgrade_envelope_columns(engine)
         logger.info("✅ Database tables created successfully")
         logger.info(f"   📊 Tables: {', '.join(Base.metadata.tables.keys())}")
         return True
@@ -251,9 +251,9 @@ def create_user_tables():
                 savings_accounts DECIMAL(15,2),
                 epf_value DECIMAL(15,2),
                 other_investments DECIMAL(15,2),
-                portfolio_data_encrypted BYTEA NOT NULL,
-                portfolio_data_nonce BYTEA NOT NULL,
-                portfolio_data_auth_tag BYTEA NOT NULL,
+                portfolio_data_encrypted BYTEA NOT NULL,  -- binary envelope (nonce and tag inside)
+                portfolio_data_nonce BYTEA,  -- legacy base64 format only
+                portfolio_data_auth_tag BYTEA,
                 data_source VARCHAR(50) DEFAULT 'fi_mcp',
                 created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
@@ -261,6 +261,13 @@ def create_user_tables():
             );
         """)
         
+        # Envelope rows carry the nonce and tag inside portfolio_data_encrypted
+        cursor.execute("""
+            ALTER TABLE portfolio_snapshots
+                ALTER COLUMN portfolio_data_nonce DROP NOT NULL,
+                ALTER COLUMN portfolio_data_auth_tag DROP NOT NULL;
+        """)
+        
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_portfolio_snapshots_user_id 
             ON portfolio_snapshots(user_id);
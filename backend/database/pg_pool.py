@@ -0,0 +1,233 @@
+"""
+Shared PostgreSQL connection pool for the raw-psycopg2 services
+UserService, AuthService and PortfolioService borrow connections from one
+process-wide ThreadedConnectionPool instead of opening a new connection (TCP +
+auth handshake) on every call. Connections carry a server-side statement
+timeout, are pre-warmed at startup, and are recycled after DB_POOL_RECYCLE.
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+import psycopg2
+from psycopg2 import pool as psycopg2_pool
+from psycopg2.extras import RealDictCursor
+
+from core.metrics import metrics
+from database.config import get_database_url
+
+logger = logging.getLogger(__name__)
+
+PG_POOL_MIN_CONNECTIONS = int(os.getenv("PG_POOL_MIN_CONNECTIONS", "2"))
+PG_POOL_MAX_CONNECTIONS = int(os.getenv("PG_POOL_MAX_CONNECTIONS", "20"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "3600"))
+DB_CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+
+
+DB_POOL_WAIT_SECONDS = metrics.histogram(
+    "artha_db_pool_wait_seconds", "Time spent waiting to check out a PostgreSQL connection",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+
+
+class PoolTimeoutError(Exception):
+    """No connection became free within the pool timeout"""
+    pass
+
+
+class _TrackedConnectionPool(psycopg2_pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool that records when each connection was opened"""
+
+    def __init__(self, minconn, maxconn, *args, on_connect=None, **kwargs):
+        self.opened_at: Dict[int, float] = {}
+        self._on_connect = on_connect
+        super().__init__(minconn, maxconn, *args, **kwargs)
+
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        self.opened_at[id(conn)] = time.monotonic()
+        if self._on_connect:
+            self._on_connect()
+        return conn
+
+
+class PostgresConnectionPool:
+    """Process-wide psycopg2 pool with bounded waiting and checkout metrics"""
+
+    def __init__(self, dsn: str = None, min_connections: int = None, max_connections: int = None,
+                 statement_timeout_ms: int = None, pool_timeout: float = None, recycle_seconds: float = None):
+        self.dsn = dsn or get_database_url()
+        self.min_connections = PG_POOL_MIN_CONNECTIONS if min_connections is None else min_connections
+        self.max_connections = max_connections or PG_POOL_MAX_CONNECTIONS
+        self.statement_timeout_ms = DB_STATEMENT_TIMEOUT_MS if statement_timeout_ms is None else statement_timeout_ms
+        self.pool_timeout = pool_timeout or DB_POOL_TIMEOUT
+        self.recycle_seconds = recycle_seconds or DB_POOL_RECYCLE
+
+        self._pool: Optional[_TrackedConnectionPool] = None
+        self._init_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        # ThreadedConnectionPool raises instead of waiting when exhausted
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+
+        # Counters
+        self.checkouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.connections_opened = 0
+        self.connections_discarded = 0
+
+    def _count_connect(self):
+        with self._stats_lock:
+            self.connections_opened += 1
+
+    def _get_pool(self) -> _TrackedConnectionPool:
+        if self._pool is None:
+            with self._init_lock:
+                if self._pool is None:
+                    options = f"-c statement_timeout={self.statement_timeout_ms}" if self.statement_timeout_ms else None
+                    # Opens min_connections immediately, which is what pre-warms the pool
+                    self._pool = _TrackedConnectionPool(
+                        self.min_connections,
+                        self.max_connections,
+                        self.dsn,
+                        on_connect=self._count_connect,
+                        cursor_factory=RealDictCursor,
+                        connect_timeout=DB_CONNECT_TIMEOUT,
+                        options=options
+                    )
+                    logger.info(f"✅ PostgreSQL pool opened (min={self.min_connections}, max={self.max_connections}, "
+                                f"statement_timeout={self.statement_timeout_ms}ms)")
+        return self._pool
+
+    def warm(self):
+        """Open the pool and its minimum connections ahead of the first request"""
+        self._get_pool()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a connection; commits on success and rolls back on error like
+        psycopg2's own connection context manager, then returns it to the pool
+        """
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            with self._stats_lock:
+                self.timeouts += 1
+            raise PoolTimeoutError(f"No database connection available within {self.pool_timeout}s")
+
+        try:
+            pool = self._get_pool()
+            conn = pool.getconn()
+        except Exception as e:
+            self._slots.release()
+            logger.error(f"Database connection failed: {e}")
+            raise
+
+        waited = time.perf_counter() - start
+        DB_POOL_WAIT_SECONDS.observe(waited)
+        with self._stats_lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+        discard = False
+        try:
+            yield conn
+            if not conn.closed:
+                conn.commit()
+        except Exception as e:
+            discard = conn.closed or isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+            raise
+        finally:
+            opened_at = pool.opened_at.get(id(conn), 0.0)
+            discard = discard or bool(conn.closed) or time.monotonic() - opened_at > self.recycle_seconds
+            if discard:
+                pool.opened_at.pop(id(conn), None)
+            pool.putconn(conn, close=discard)
+            with self._stats_lock:
+                self.in_use -= 1
+                if discard:
+                    self.connections_discarded += 1
+            self._slots.release()
+
+    def close(self):
+        """Close every pooled connection"""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.closeall()
+            logger.info("✅ PostgreSQL pool closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Checkout, wait and connection churn metrics"""
+        return {
+            'open': self._pool is not None,
+            'min_connections': self.min_connections,
+            'max_connections': self.max_connections,
+            'statement_timeout_ms': self.statement_timeout_ms,
+            'checkouts': self.checkouts,
+            'in_use': self.in_use,
+            'peak_in_use': self.peak_in_use,
+            'saturation': round(self.in_use / self.max_connections, 4),
+            'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            'max_wait_ms': round(self.max_wait * 1000, 3),
+            'timeouts': self.timeouts,
+            'connections_opened': self.connections_opened,
+            'connections_discarded': self.connections_discarded,
+            'reuse_ratio': round(1 - self.connections_opened / self.checkouts, 4) if self.checkouts else 0.0
+        }
+
+
+_pg_pool: Optional[PostgresConnectionPool] = None
+_pg_pool_lock = threading.Lock()
+
+
+def get_pg_pool() -> PostgresConnectionPool:
+    """Return the process-wide pool"""
+    global _pg_pool
+    if _pg_pool is None:
+        with _pg_pool_lock:
+            if _pg_pool is None:
+                _pg_pool = PostgresConnectionPool()
+    return _pg_pool
+
+
+def close_pg_pool():
+    """Close the process-wide pool; called on application shutdown"""
+    if _pg_pool is not None:
+        _pg_pool.close()
+
+
+def get_pg_pool_stats() -> Dict[str, Any]:
+    return get_pg_pool().get_stats()
+
+
+def _collect_pg_pool():
+    # Only report once something has created the pool; scraping must not open it
+    if _pg_pool is None:
+        return
+    stats = _pg_pool.get_stats()
+    yield "artha_db_pool_connections_in_use", "gauge", "PostgreSQL connections checked out", [({}, stats['in_use'])]
+    yield "artha_db_pool_connections_max", "gauge", "PostgreSQL pool size limit", [({}, stats['max_connections'])]
+    yield "artha_db_pool_checkouts_total", "counter", "PostgreSQL connection checkouts", [({}, stats['checkouts'])]
+    yield "artha_db_pool_timeouts_total", "counter", "Checkouts that gave up waiting", [({}, stats['timeouts'])]
+    yield ("artha_db_pool_connections_opened_total", "counter", "PostgreSQL connections opened",
+           [({}, stats['connections_opened'])])
+
+
+metrics.register_collector("pg_pool", _collect_pg_pool)
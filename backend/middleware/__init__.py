@@ -1,14 +1,16 @@
 """
 Middleware package for Artha AI Backend
-Contains security, rate limiting, and input validation middleware
+Contains security, rate limiting, input validation and request metrics middleware
 """
 
 from .security_middleware import SecurityMiddleware
 from .rate_limiter import RateLimitMiddleware
 from .input_validator import InputValidationMiddleware
+from .metrics_middleware import MetricsMiddleware
 
 __all__ = [
     'SecurityMiddleware',
     'RateLimitMiddleware', 
-    'InputValidationMiddleware'
+    'InputValidationMiddleware',
+    'MetricsMiddleware'
 ]
\ No newline at end of file
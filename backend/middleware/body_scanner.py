@@ -0,0 +1,182 @@
+"""
+Incremental Request Body Scanning
+=================================
+
+Runs request bodies through the malicious-content patterns chunk by chunk as
+they arrive, so SecurityMiddleware never buffers a whole body. The tail of
+what has already been scanned (a bounded lookahead window) is scanned again
+with each new chunk, so a pattern split across a chunk boundary still
+matches; matches longer than the window are not guaranteed to be caught.
+
+multipart/form-data is parsed on the fly: part headers and text fields are
+scanned, file parts (a filename or a non-text content type) are skipped
+without being held in memory.
+"""
+
+import codecs
+import re
+from typing import Callable, Optional
+
+DEFAULT_LOOKAHEAD = 4096
+MAX_PART_HEADER_BYTES = 16 * 1024
+
+# Bodies of these types are counted against size limits but never pattern-scanned
+BINARY_CONTENT_TYPES = (
+    'application/pdf',
+    'application/octet-stream',
+    'application/zip',
+    'image/',
+    'audio/',
+    'video/',
+)
+
+TEXT_PART_CONTENT_TYPES = (
+    'text/',
+    'application/json',
+    'application/x-www-form-urlencoded',
+)
+
+MALICIOUS_BODY = "Malicious content detected in request body"
+
+_BOUNDARY_RE = re.compile(r'boundary="?([^";]+)"?', re.IGNORECASE)
+
+
+def is_binary_content_type(content_type: str) -> bool:
+    """Whether a body or part of this type is opaque binary data"""
+    return content_type.strip().lower().startswith(BINARY_CONTENT_TYPES)
+
+
+def _is_file_part(headers: str) -> bool:
+    lowered = headers.lower()
+    if 'filename=' in lowered or 'filename*=' in lowered:
+        return True
+    for line in lowered.split('\r\n'):
+        if line.startswith('content-type:'):
+            return not line.split(':', 1)[1].strip().startswith(TEXT_PART_CONTENT_TYPES)
+    return False
+
+
+class TextBodyScanner:
+    """Scans a UTF-8 stream, re-scanning a bounded lookahead window across chunks"""
+
+    def __init__(self, matcher: Callable[[str], bool], lookahead: int = DEFAULT_LOOKAHEAD):
+        self.matcher = matcher
+        self.lookahead = lookahead
+        self.scanned_bytes = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        self._tail = ''
+
+    def feed(self, chunk: bytes, final: bool = False) -> Optional[str]:
+        """Scan the next chunk; returns a rejection reason or None"""
+        self.scanned_bytes += len(chunk)
+        text = self._decoder.decode(chunk, final)
+        if not text:
+            return None
+        window = self._tail + text
+        self._tail = window[-self.lookahead:] if self.lookahead else ''
+        if self.matcher(window):
+            return MALICIOUS_BODY
+        return None
+
+    def close(self) -> Optional[str]:
+        return self.feed(b'', final=True)
+
+
+class MultipartBodyScanner:
+    """Streams multipart/form-data, scanning part headers and text fields and skipping file parts"""
+
+    def __init__(self, boundary: bytes, matcher: Callable[[str], bool], lookahead: int = DEFAULT_LOOKAHEAD,
+                 max_header_bytes: int = MAX_PART_HEADER_BYTES):
+        self.delimiter = b'\r\n--' + boundary
+        self.matcher = matcher
+        self.lookahead = lookahead
+        self.max_header_bytes = max_header_bytes
+        self.scanned_bytes = 0
+        self.skipped_bytes = 0
+        # Leading CRLF lets the opening boundary match the same delimiter as the rest
+        self._buffer = b'\r\n'
+        self._state = 'preamble'
+        self._field: Optional[TextBodyScanner] = None
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        """Scan the next chunk; returns a rejection reason or None"""
+        self._buffer += chunk
+        while True:
+            if self._state == 'epilogue':
+                self._buffer = b''
+                return None
+
+            if self._state == 'boundary':
+                # Either "--" (closing delimiter) or optional padding then CRLF
+                if len(self._buffer) < 2:
+                    return None
+                if self._buffer.startswith(b'--'):
+                    self._state = 'epilogue'
+                    continue
+                end = self._buffer.find(b'\r\n')
+                if end == -1:
+                    if len(self._buffer) > self.max_header_bytes:
+                        return "Malformed multipart boundary"
+                    return None
+                self._buffer = self._buffer[end + 2:]
+                self._state = 'headers'
+                continue
+
+            if self._state == 'headers':
+                if self._buffer.startswith(b'\r\n'):
+                    end, headers = 0, ''
+                else:
+                    end = self._buffer.find(b'\r\n\r\n')
+                    if end == -1:
+                        if len(self._buffer) > self.max_header_bytes:
+                            return "Multipart part headers too large"
+                        return None
+                    headers = self._buffer[:end].decode('utf-8', errors='ignore')
+                    end += 2
+                self._buffer = self._buffer[end + 2:]
+                self.scanned_bytes += len(headers)
+                if headers and self.matcher(headers):
+                    return "Malicious content detected in multipart part headers"
+                if _is_file_part(headers):
+                    self._state, self._field = 'file', None
+                else:
+                    self._state, self._field = 'field', TextBodyScanner(self.matcher, self.lookahead)
+                continue
+
+            # preamble, field or file: hand over everything up to the next delimiter
+            index = self._buffer.find(self.delimiter)
+            if index == -1:
+                # Keep just enough to recognise a delimiter split across chunks
+                keep = len(self.delimiter) - 1
+                data, self._buffer = self._buffer[:-keep], self._buffer[-keep:]
+                return self._consume(data, final=False)
+            data, self._buffer = self._buffer[:index], self._buffer[index + len(self.delimiter):]
+            reason = self._consume(data, final=True)
+            if reason:
+                return reason
+            self._state = 'boundary'
+
+    def _consume(self, data: bytes, final: bool) -> Optional[str]:
+        if self._state == 'field':
+            reason = self._field.feed(data, final)
+            self.scanned_bytes += len(data)
+            return reason
+        if self._state == 'file':
+            self.skipped_bytes += len(data)
+        return None
+
+    def close(self) -> Optional[str]:
+        if self._state == 'field':
+            return self._consume(self._buffer, final=True)
+        return None
+
+
+def create_body_scanner(content_type: str, matcher: Callable[[str], bool], lookahead: int = DEFAULT_LOOKAHEAD):
+    """Scanner for a body of the given content type, or None when it should not be scanned"""
+    if is_binary_content_type(content_type):
+        return None
+    if content_type.strip().lower().startswith('multipart/form-data'):
+        match = _BOUNDARY_RE.search(content_type)
+        if match:
+            return MultipartBodyScanner(match.group(1).strip().encode('latin-1'), matcher, lookahead)
+    return TextBodyScanner(matcher, lookahead)
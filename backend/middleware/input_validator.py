@@ -10,11 +10,19 @@ import html
 import json
 from typing import Any, Dict, List, Union
 from fastapi import Request, HTTPException, status
-from fastapi.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
 import logging
 
+from utils.injection_scanner import PATH_TRAVERSAL, SQL_INJECTION, XSS, get_injection_scanner
+
 logger = logging.getLogger(__name__)
 
+CATEGORY_LABELS = {
+    SQL_INJECTION: "SQL injection",
+    XSS: "XSS",
+    PATH_TRAVERSAL: "Path traversal",
+}
+
 class InputValidationMiddleware(BaseHTTPMiddleware):
     """Middleware for input validation and sanitization"""
     
@@ -58,10 +66,12 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
             r"..%5c",
         ]
         
-        # Compile patterns for better performance
-        self.compiled_sql_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.sql_patterns]
-        self.compiled_xss_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.xss_patterns]
-        self.compiled_path_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.path_traversal_patterns]
+        # One prefiltered scanner over all three pattern groups
+        self.scanner = get_injection_scanner(
+            [(SQL_INJECTION, pattern) for pattern in self.sql_patterns]
+            + [(XSS, pattern) for pattern in self.xss_patterns]
+            + [(PATH_TRAVERSAL, pattern) for pattern in self.path_traversal_patterns]
+        )
         
         # Endpoints that require strict validation
         self.strict_endpoints = [
@@ -93,36 +103,6 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
                 return True
         return False
     
-    def _detect_sql_injection(self, text: str) -> bool:
-        """Detect potential SQL injection attempts"""
-        if not isinstance(text, str):
-            return False
-        
-        for pattern in self.compiled_sql_patterns:
-            if pattern.search(text):
-                return True
-        return False
-    
-    def _detect_xss(self, text: str) -> bool:
-        """Detect potential XSS attempts"""
-        if not isinstance(text, str):
-            return False
-        
-        for pattern in self.compiled_xss_patterns:
-            if pattern.search(text):
-                return True
-        return False
-    
-    def _detect_path_traversal(self, text: str) -> bool:
-        """Detect potential path traversal attempts"""
-        if not isinstance(text, str):
-            return False
-        
-        for pattern in self.compiled_path_patterns:
-            if pattern.search(text):
-                return True
-        return False
-    
     def _sanitize_string(self, text: str) -> str:
         """Sanitize string input"""
         if not isinstance(text, str):
@@ -141,40 +121,28 @@ class InputValidationMiddleware(BaseHTTPMiddleware):
         return text
     
     def _validate_value(self, value: Any, strict: bool = False) -> Any:
-        """Validate and sanitize a single value"""
+        """Validate a value (walking nested dicts and lists once) and sanitize it"""
+        category = self.scanner.scan_value(value)
+        if category:
+            logger.warning(f"{CATEGORY_LABELS[category]} attempt detected: {str(value)[:100]}")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid input detected"
+            )
+        
+        # Sanitize if not strict mode
+        if strict:
+            return value
+        return self._sanitize_value(value)
+    
+    def _sanitize_value(self, value: Any) -> Any:
+        """Sanitize every string in a value"""
         if isinstance(value, str):
-            # Check for malicious patterns
-            if self._detect_sql_injection(value):
-                logger.warning(f"SQL injection attempt detected: {value[:100]}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid input detected"
-                )
-            
-            if self._detect_xss(value):
-                logger.warning(f"XSS attempt detected: {value[:100]}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid input detected"
-                )
-            
-            if self._detect_path_traversal(value):
-                logger.warning(f"Path traversal attempt detected: {value[:100]}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid input detected"
-                )
-            
-            # Sanitize if not strict mode
-            if not strict:
-                value = self._sanitize_string(value)
-        
+            return self._sanitize_string(value)
         elif isinstance(value, dict):
-            return {k: self._validate_value(v, strict) for k, v in value.items()}
-        
+            return {k: self._sanitize_value(v) for k, v in value.items()}
         elif isinstance(value, list):
-            return [self._validate_value(item, strict) for item in value]
-        
+            return [self._sanitize_value(item) for item in value]
         return value
     
     def _validate_query_params(self, request: Request, strict: bool = False):
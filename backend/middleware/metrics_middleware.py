@@ -0,0 +1,62 @@
+"""
+Request metrics middleware for Artha AI Backend
+Records request counts, in-flight requests and latency histograms labelled by
+method, route template and status. Timing runs until the last body chunk is
+sent, so streamed responses are measured end to end.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.metrics import metrics
+
+HTTP_REQUESTS = metrics.counter(
+    "artha_http_requests_total", "HTTP requests by method, route and status", ("method", "endpoint", "status")
+)
+HTTP_REQUEST_SECONDS = metrics.histogram(
+    "artha_http_request_duration_seconds", "HTTP request latency by method and route", ("method", "endpoint")
+)
+HTTP_REQUESTS_IN_FLIGHT = metrics.gauge("artha_http_requests_in_flight", "HTTP requests being served")
+
+# Requests that matched no route share one label instead of one series per raw path
+UNMATCHED_ENDPOINT = "unmatched"
+
+
+def route_template(scope: Scope) -> str:
+    """The matched route's path template (/api/pdf/jobs/{job_id}), never the raw path"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ENDPOINT
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware feeding the metrics registry"""
+
+    def __init__(self, app: ASGIApp, exclude_paths=("/metrics",)):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # The router writes the matched route into scope while handling the request
+            endpoint = route_template(scope)
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, endpoint, str(status_code)).inc()
+            HTTP_REQUEST_SECONDS.labels(method, endpoint).observe(time.perf_counter() - start)
@@ -5,73 +5,49 @@ Rate Limiting Middleware for Artha AI Backend
 Comprehensive rate limiting with different tiers for various endpoints.
 """
 
+import os
+import math
 import time
-import asyncio
-from typing import Dict, Optional, Tuple
-from fastapi import Request, HTTPException, status
-from fastapi.middleware.base import BaseHTTPMiddleware
-from collections import defaultdict, deque
 import logging
-import os
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from core.rate_limit import RateLimit, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
-class RateLimiter:
-    """Thread-safe rate limiter using sliding window algorithm"""
+# Different rate limits for different endpoint types
+ENDPOINT_RATE_LIMITS = {
+    # Authentication endpoints - stricter limits
+    'auth': RateLimit(requests=10, period=60),  # 10 requests per minute
     
-    def __init__(self, max_requests: int, window_seconds: int):
-        self.max_requests = max_requests
-        self.window_seconds = window_seconds
-        self.requests: Dict[str, deque] = defaultdict(deque)
-        self._lock = asyncio.Lock()
+    # General API endpoints
+    'api': RateLimit(requests=100, period=60),  # 100 requests per minute
     
-    async def is_allowed(self, identifier: str) -> Tuple[bool, Optional[float]]:
-        """Check if request is allowed, return (allowed, retry_after_seconds)"""
-        async with self._lock:
-            current_time = time.time()
-            window_start = current_time - self.window_seconds
-            
-            # Clean old requests
-            user_requests = self.requests[identifier]
-            while user_requests and user_requests[0] < window_start:
-                user_requests.popleft()
-            
-            # Check if under limit
-            if len(user_requests) < self.max_requests:
-                user_requests.append(current_time)
-                return True, None
-            
-            # Calculate retry after time
-            oldest_request = user_requests[0]
-            retry_after = oldest_request + self.window_seconds - current_time
-            return False, max(0, retry_after)
+    # Chat/AI endpoints - moderate limits
+    'chat': RateLimit(requests=30, period=60),  # 30 requests per minute
+    
+    # File upload endpoints - very strict
+    'upload': RateLimit(requests=5, period=60),  # 5 uploads per minute
+    
+    # Health/status endpoints - lenient
+    'health': RateLimit(requests=200, period=60),  # 200 requests per minute
+}
+
+# Global rate limit for overall protection
+GLOBAL_RATE_LIMIT = RateLimit(requests=500, period=60)  # 500 total requests per minute
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """Rate limiting middleware with different limits for different endpoint types"""
     
-    def __init__(self, app):
+    def __init__(self, app, limiter=None):
         super().__init__(app)
         
-        # Different rate limits for different endpoint types
-        self.limiters = {
-            # Authentication endpoints - stricter limits
-            'auth': RateLimiter(max_requests=10, window_seconds=60),  # 10 requests per minute
-            
-            # General API endpoints
-            'api': RateLimiter(max_requests=100, window_seconds=60),  # 100 requests per minute
-            
-            # Chat/AI endpoints - moderate limits
-            'chat': RateLimiter(max_requests=30, window_seconds=60),  # 30 requests per minute
-            
-            # File upload endpoints - very strict
-            'upload': RateLimiter(max_requests=5, window_seconds=60),  # 5 uploads per minute
-            
-            # Health/status endpoints - lenient
-            'health': RateLimiter(max_requests=200, window_seconds=60),  # 200 requests per minute
-        }
-        
-        # Global rate limiter for overall protection
-        self.global_limiter = RateLimiter(max_requests=500, window_seconds=60)  # 500 total requests per minute
+        # Shared GCRA limiter (in-memory or Redis, see core.rate_limit)
+        self.limiter = limiter or get_rate_limiter()
+        self.limits = ENDPOINT_RATE_LIMITS
+        self.global_limit = GLOBAL_RATE_LIMIT
         
         # Whitelist for development
         self.whitelist_ips = set(os.getenv("RATE_LIMIT_WHITELIST", "127.0.0.1,::1").split(","))
@@ -107,7 +83,7 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             return "auth"
         elif path.startswith("/api/chat/") or path.startswith("/api/query") or path.startswith("/api/stream"):
             return "chat"
-        elif path.startswith("/api/upload/") or "upload" in path:
+        elif path.startswith("/api/upload/") or path.startswith("/api/pdf/ingest") or "upload" in path:
             return "upload"
         elif path in ["/health", "/status", "/api/status"]:
             return "health"
@@ -128,44 +104,41 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         
         try:
             # Check global rate limit first
-            global_allowed, global_retry_after = await self.global_limiter.is_allowed(client_id)
-            if not global_allowed:
+            global_result = await self.limiter.hit(f"global:{client_id}", self.global_limit)
+            if not global_result.allowed:
                 logger.warning(f"Global rate limit exceeded for {client_id}")
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Too many requests globally",
-                    headers={"Retry-After": str(int(global_retry_after or 60))}
-                )
+                return self._too_many_requests("Too many requests globally", global_result)
             
             # Check category-specific rate limit
-            limiter = self.limiters.get(category, self.limiters['api'])
-            allowed, retry_after = await limiter.is_allowed(f"{client_id}:{category}")
+            limit = self.limits.get(category, self.limits['api'])
+            result = await self.limiter.hit(f"{category}:{client_id}", limit)
             
-            if not allowed:
+            if not result.allowed:
                 logger.warning(f"Rate limit exceeded for {client_id} on {category} endpoints")
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Too many requests for {category} endpoints",
-                    headers={"Retry-After": str(int(retry_after or 60))}
-                )
-            
-            # Process request
-            response = await call_next(request)
-            
-            # Add rate limit headers
-            remaining = limiter.max_requests - len(limiter.requests[f"{client_id}:{category}"])
-            response.headers["X-RateLimit-Limit"] = str(limiter.max_requests)
-            response.headers["X-RateLimit-Remaining"] = str(max(0, remaining))
-            response.headers["X-RateLimit-Reset"] = str(int(time.time() + limiter.window_seconds))
-            
-            return response
-            
-        except HTTPException:
-            raise
+                return self._too_many_requests(f"Too many requests for {category} endpoints", result)
+        
         except Exception as e:
             logger.error(f"Rate limiting error: {e}")
             # If rate limiting fails, allow the request to proceed
             return await call_next(request)
+        
+        # Process request
+        response = await call_next(request)
+        
+        # Add rate limit headers
+        response.headers["X-RateLimit-Limit"] = str(result.limit)
+        response.headers["X-RateLimit-Remaining"] = str(result.remaining)
+        response.headers["X-RateLimit-Reset"] = str(math.ceil(time.time() + result.reset_after))
+        
+        return response
+    
+    def _too_many_requests(self, detail: str, result) -> JSONResponse:
+        """429 response (HTTPException raised in middleware would bypass the exception handlers)"""
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": detail},
+            headers={"Retry-After": str(math.ceil(result.retry_after))}
+        )
 
 # Factory function for easy integration
 def create_rate_limit_middleware():
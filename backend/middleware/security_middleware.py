@@ -3,6 +3,9 @@ Comprehensive Security Middleware for Artha AI
 ==============================================
 
 This middleware implements multiple security layers to protect against common vulnerabilities.
+It is a pure ASGI middleware: request bodies are validated chunk by chunk as the
+application reads them (see middleware/body_scanner.py) instead of being
+buffered and replayed, and oversized bodies are refused as early as possible.
 """
 
 import os
@@ -11,15 +14,29 @@ import time
 import hashlib
 import logging
 from typing import Dict, List, Optional, Set
-from collections import defaultdict, deque
 from datetime import datetime, timedelta
 from fastapi import Request, Response, HTTPException, status
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import jwt
 
+from core.rate_limit import RateLimit, get_rate_limiter
+from middleware.body_scanner import DEFAULT_LOOKAHEAD, create_body_scanner
+from utils.injection_scanner import (
+    COMMAND_INJECTION, LDAP_INJECTION, NOSQL_INJECTION, PATH_TRAVERSAL, SQL_INJECTION, XSS,
+    get_injection_scanner
+)
+
 logger = logging.getLogger(__name__)
 
+SECURITY_MAX_BODY_BYTES = int(os.getenv("SECURITY_MAX_BODY_BYTES", str(10 * 1024 * 1024)))
+SECURITY_MAX_UPLOAD_BYTES = int(os.getenv("SECURITY_MAX_UPLOAD_BYTES", str(64 * 1024 * 1024)))
+SECURITY_BODY_SCAN_LOOKAHEAD = int(os.getenv("SECURITY_BODY_SCAN_LOOKAHEAD", str(DEFAULT_LOOKAHEAD)))
+
+BODY_METHODS = {'POST', 'PUT', 'PATCH'}
+
 class SecurityConfig:
     """Security configuration settings"""
     
@@ -46,35 +63,36 @@ class SecurityConfig:
         }
         
         # Input validation patterns
-        self.malicious_patterns = [
+        self.injection_rules = [
             # SQL Injection patterns
-            r"(?i)(union\s+select|select\s+.*\s+from|insert\s+into|update\s+.*\s+set|delete\s+from)",
-            r"(?i)(drop\s+table|alter\s+table|create\s+table|truncate\s+table)",
-            r"(?i)(\'\s*or\s+\'\d+\'\s*=\s*\'\d+|\'\s*or\s+\d+\s*=\s*\d+)",
-            r"(?i)(exec\s*\(|execute\s*\(|sp_executesql)",
+            (SQL_INJECTION, r"(?i)(union\s+select|select\s+.*\s+from|insert\s+into|update\s+.*\s+set|delete\s+from)"),
+            (SQL_INJECTION, r"(?i)(drop\s+table|alter\s+table|create\s+table|truncate\s+table)"),
+            (SQL_INJECTION, r"(?i)(\'\s*or\s+\'\d+\'\s*=\s*\'\d+|\'\s*or\s+\d+\s*=\s*\d+)"),
+            (SQL_INJECTION, r"(?i)(exec\s*\(|execute\s*\(|sp_executesql)"),
             
             # XSS patterns
-            r"(?i)(<script[^>]*>|</script>|javascript:|vbscript:|onload=|onerror=)",
-            r"(?i)(alert\s*\(|confirm\s*\(|prompt\s*\(|eval\s*\()",
-            r"(?i)(<iframe|<object|<embed|<applet)",
+            (XSS, r"(?i)(<script[^>]*>|</script>|javascript:|vbscript:|onload=|onerror=)"),
+            (XSS, r"(?i)(alert\s*\(|confirm\s*\(|prompt\s*\(|eval\s*\()"),
+            (XSS, r"(?i)(<iframe|<object|<embed|<applet)"),
             
             # Command injection patterns
-            r"(?i)(;\s*rm\s+|;\s*cat\s+|;\s*ls\s+|;\s*pwd|;\s*whoami)",
-            r"(?i)(\|\s*nc\s+|\|\s*netcat\s+|\|\s*wget\s+|\|\s*curl\s+)",
-            r"(?i)(&&\s*rm\s+|&&\s*cat\s+|&&\s*ls\s+)",
+            (COMMAND_INJECTION, r"(?i)(;\s*rm\s+|;\s*cat\s+|;\s*ls\s+|;\s*pwd|;\s*whoami)"),
+            (COMMAND_INJECTION, r"(?i)(\|\s*nc\s+|\|\s*netcat\s+|\|\s*wget\s+|\|\s*curl\s+)"),
+            (COMMAND_INJECTION, r"(?i)(&&\s*rm\s+|&&\s*cat\s+|&&\s*ls\s+)"),
             
             # Path traversal patterns
-            r"(?i)(\.\.\/|\.\.\\|%2e%2e%2f|%2e%2e%5c)",
-            r"(?i)(\/etc\/passwd|\/etc\/shadow|\/proc\/|\/sys\/)",
+            (PATH_TRAVERSAL, r"(?i)(\.\.\/|\.\.\\|%2e%2e%2f|%2e%2e%5c)"),
+            (PATH_TRAVERSAL, r"(?i)(\/etc\/passwd|\/etc\/shadow|\/proc\/|\/sys\/)"),
             
             # LDAP injection patterns
-            r"(?i)(\*\)\(|\)\(.*\*|\(\||\)\&)",
+            (LDAP_INJECTION, r"(?i)(\*\)\(|\)\(.*\*|\(\||\)\&)"),
             
             # NoSQL injection patterns
-            r"(?i)(\$where|\$ne|\$gt|\$lt|\$regex|\$or|\$and)",
+            (NOSQL_INJECTION, r"(?i)(\$where|\$ne|\$gt|\$lt|\$regex|\$or|\$and)"),
         ]
         
-        self.compiled_patterns = [re.compile(pattern) for pattern in self.malicious_patterns]
+        self.malicious_patterns = [pattern for _, pattern in self.injection_rules]
+        self.injection_scanner = get_injection_scanner(self.injection_rules)
         
         # Blocked user agents (bots, scanners)
         self.blocked_user_agents = [
@@ -84,13 +102,24 @@ class SecurityConfig:
         ]
         
         self.compiled_user_agents = [re.compile(pattern) for pattern in self.blocked_user_agents]
+        
+        # Request body limits (multipart uploads get the larger one) and scan window
+        self.max_body_size = SECURITY_MAX_BODY_BYTES
+        self.max_upload_size = SECURITY_MAX_UPLOAD_BYTES
+        self.body_scan_lookahead = SECURITY_BODY_SCAN_LOOKAHEAD
 
 class RateLimiter:
-    """Advanced rate limiter with multiple strategies"""
+    """Per-IP limits on the shared GCRA limiter, with temporary blocks for abusive IPs"""
     
-    def __init__(self, config: SecurityConfig):
+    def __init__(self, config: SecurityConfig, limiter=None):
         self.config = config
-        self.requests: Dict[str, Dict[str, deque]] = defaultdict(lambda: defaultdict(deque))
+        self.limiter = limiter or get_rate_limiter()
+        self.limits = {
+            category: RateLimit(requests=limit['requests'], period=limit['window'])
+            for category, limit in config.rate_limits.items()
+        }
+        # More than 50 rejected requests in 5 minutes gets the IP blocked
+        self.abuse_limit = RateLimit(requests=50, period=300)
         self.blocked_ips: Dict[str, datetime] = {}
         self.suspicious_ips: Set[str] = set()
     
@@ -129,17 +158,16 @@ class RateLimiter:
         
         if any(auth_path in path for auth_path in ['/auth/', '/login', '/register', '/token']):
             return 'auth'
-        elif any(upload_path in path for upload_path in ['/upload', '/file']):
+        elif any(upload_path in path for upload_path in ['/upload', '/file', '/pdf/ingest']):
             return 'upload'
         elif any(chat_path in path for chat_path in ['/chat', '/stream', '/ai']):
             return 'chat'
         else:
             return 'api'
     
-    def is_rate_limited(self, request: Request) -> tuple[bool, Optional[str]]:
+    async def is_rate_limited(self, request: Request) -> tuple[bool, Optional[str]]:
         """Check if request should be rate limited"""
         client_ip = self._get_client_ip(request)
-        current_time = time.time()
         
         # Check if IP is temporarily blocked
         if client_ip in self.blocked_ips:
@@ -148,48 +176,29 @@ class RateLimiter:
             else:
                 del self.blocked_ips[client_ip]
         
-        # Get rate limit category
-        category = self._get_rate_limit_key(request)
-        limit_config = self.config.rate_limits[category]
-        
-        # Clean old requests
-        cutoff_time = current_time - limit_config['window']
-        request_times = self.requests[client_ip][category]
-        
-        while request_times and request_times[0] < cutoff_time:
-            request_times.popleft()
-        
         # Check category-specific limit
-        if len(request_times) >= limit_config['requests']:
-            self._mark_suspicious(client_ip)
-            return True, f"Rate limit exceeded for {category}: {limit_config['requests']} requests per {limit_config['window']} seconds"
+        category = self._get_rate_limit_key(request)
+        limit = self.limits[category]
+        result = await self.limiter.hit(f"{category}:ip:{client_ip}", limit)
+        if not result.allowed:
+            await self._mark_suspicious(client_ip)
+            return True, f"Rate limit exceeded for {category}: {limit.requests} requests per {limit.period:g} seconds"
         
         # Check global limit
-        global_config = self.config.rate_limits['global']
-        global_cutoff = current_time - global_config['window']
-        total_requests = 0
+        global_limit = self.limits['global']
+        result = await self.limiter.hit(f"global:ip:{client_ip}", global_limit)
+        if not result.allowed:
+            await self._mark_suspicious(client_ip)
+            return True, f"Global rate limit exceeded: {global_limit.requests} requests per {global_limit.period:g} seconds"
         
-        for cat_requests in self.requests[client_ip].values():
-            total_requests += sum(1 for req_time in cat_requests if req_time > global_cutoff)
-        
-        if total_requests >= global_config['requests']:
-            self._mark_suspicious(client_ip)
-            return True, f"Global rate limit exceeded: {global_config['requests']} requests per {global_config['window']} seconds"
-        
-        # Record this request
-        request_times.append(current_time)
         return False, None
     
-    def _mark_suspicious(self, ip: str):
-        """Mark IP as suspicious and potentially block it"""
+    async def _mark_suspicious(self, ip: str):
+        """Mark IP as suspicious and block it after repeated violations"""
         self.suspicious_ips.add(ip)
         
-        # Block IP for repeated violations
-        violation_count = sum(1 for cat_requests in self.requests[ip].values() 
-                            for req_time in cat_requests 
-                            if time.time() - req_time < 300)  # Last 5 minutes
-        
-        if violation_count > 50:  # More than 50 requests in 5 minutes
+        result = await self.limiter.hit(f"abuse:ip:{ip}", self.abuse_limit)
+        if not result.allowed:
             self.blocked_ips[ip] = datetime.now() + timedelta(minutes=30)
             logger.warning(f"Blocked IP {ip} for 30 minutes due to excessive requests")
 
@@ -227,11 +236,11 @@ class InputValidator:
         if not content or len(content) > 10000:  # Skip very large content
             return False
         
-        for pattern in self.config.compiled_patterns:
-            if pattern.search(content):
-                return True
-        
-        return False
+        return self.matches_malicious_content(content)
+    
+    def matches_malicious_content(self, content: str) -> bool:
+        """Pattern check without the size cap, for callers that bound their own input"""
+        return self.config.injection_scanner.scan(content) is not None
     
     def sanitize_input(self, data: str) -> str:
         """Sanitize input data"""
@@ -254,11 +263,15 @@ class InputValidator:
         
         return data
 
-class SecurityMiddleware(BaseHTTPMiddleware):
+class RequestBodyRejected(HTTPException):
+    """Raised from the receive channel when a streamed request body fails validation"""
+    pass
+
+class SecurityMiddleware:
     """Comprehensive security middleware"""
     
-    def __init__(self, app, config: Optional[SecurityConfig] = None):
-        super().__init__(app)
+    def __init__(self, app: ASGIApp, config: Optional[SecurityConfig] = None):
+        self.app = app
         self.config = config or SecurityConfig()
         self.rate_limiter = RateLimiter(self.config)
         self.input_validator = InputValidator(self.config)
@@ -267,78 +280,135 @@ class SecurityMiddleware(BaseHTTPMiddleware):
         self.jwt_secret = os.getenv('JWT_SECRET_KEY', 'artha_ai_jwt_secret_2024_secure')
         self.security_bearer = HTTPBearer(auto_error=False)
     
-    async def dispatch(self, request: Request, call_next):
-        """Main security middleware dispatch with CORS compatibility"""
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Main security middleware entry point with CORS compatibility"""
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        
         start_time = time.time()
+        request = Request(scope)
+        
+        # SKIP ALL SECURITY CHECKS FOR OPTIONS REQUESTS (CORS preflight)
+        if request.method == "OPTIONS":
+            await self.app(scope, receive, self._wrap_send(send, start_time, security_headers=False))
+            return
         
         try:
-            # SKIP ALL SECURITY CHECKS FOR OPTIONS REQUESTS (CORS preflight)
-            if request.method == "OPTIONS":
-                response = await call_next(request)
-                # Add timing header for monitoring
-                process_time = time.time() - start_time
-                response.headers["X-Process-Time"] = str(process_time)
-                return response
-            
-            # 1. Check user agent (skip for browser requests)
-            user_agent = request.headers.get('user-agent', '')
-            # Only block clearly malicious user agents, not browsers
-            if self._is_clearly_malicious_user_agent(user_agent):
-                logger.warning(f"Blocked request from suspicious user agent: {user_agent}")
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Access denied"
-                )
-            
-            # 2. Rate limiting (more lenient for browser requests)
-            is_limited, limit_message = self.rate_limiter.is_rate_limited(request)
-            if is_limited:
-                logger.warning(f"Rate limit exceeded: {limit_message}")
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail="Rate limit exceeded"
-                )
-            
-            # 3. Input validation
-            body = None
-            if request.method in ['POST', 'PUT', 'PATCH']:
-                body = await request.body()
-                # Reset body for downstream processing
-                async def receive():
-                    return {"type": "http.request", "body": body}
-                request._receive = receive
-            
-            is_valid, validation_message = self.input_validator.validate_request(request, body)
-            if not is_valid:
-                logger.warning(f"Input validation failed: {validation_message}")
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid input detected"
-                )
-            
-            # 4. Process request
-            response = await call_next(request)
-            
-            # 5. Add security headers (but don't override CORS headers)
-            for header, value in self.config.security_headers.items():
-                # Don't override CORS headers that might already be set
-                if not header.startswith('Access-Control-'):
-                    response.headers[header] = value
-            
-            # 6. Add timing header for monitoring
-            process_time = time.time() - start_time
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            return response
-            
-        except HTTPException:
-            raise
+            rejection = await self._check_request(request)
         except Exception as e:
             logger.error(f"Security middleware error: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Internal server error"
-            )
+            rejection = (status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal server error")
+        
+        send = self._wrap_send(send, start_time)
+        if rejection:
+            status_code, detail = rejection
+            await JSONResponse({"detail": detail}, status_code=status_code)(scope, receive, send)
+            return
+        
+        # 4. Process request, validating the body as the application reads it
+        if request.method in BODY_METHODS:
+            receive = self._scanning_receive(request, receive)
+        
+        response_started = False
+        
+        async def track_send(message: Message):
+            nonlocal response_started
+            if message['type'] == 'http.response.start':
+                response_started = True
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, track_send)
+        except RequestBodyRejected as e:
+            # Normally turned into a response by the app's exception handling;
+            # this covers apps that let it escape
+            if response_started:
+                raise
+            await JSONResponse({"detail": e.detail}, status_code=e.status_code)(scope, receive, send)
+    
+    async def _check_request(self, request: Request) -> Optional[tuple[int, str]]:
+        """Checks that need only the request line and headers; returns (status, detail) to reject"""
+        # 1. Check user agent (skip for browser requests)
+        user_agent = request.headers.get('user-agent', '')
+        # Only block clearly malicious user agents, not browsers
+        if self._is_clearly_malicious_user_agent(user_agent):
+            logger.warning(f"Blocked request from suspicious user agent: {user_agent}")
+            return status.HTTP_403_FORBIDDEN, "Access denied"
+        
+        # 2. Rate limiting (more lenient for browser requests)
+        is_limited, limit_message = await self.rate_limiter.is_rate_limited(request)
+        if is_limited:
+            logger.warning(f"Rate limit exceeded: {limit_message}")
+            return status.HTTP_429_TOO_MANY_REQUESTS, "Rate limit exceeded"
+        
+        # 3. Input validation: declared size, query parameters and headers up front
+        content_length = request.headers.get('content-length')
+        if content_length and content_length.isdigit():
+            if int(content_length) > self._body_limit(request.headers.get('content-type', '')):
+                logger.warning(f"Request body too large: {content_length} bytes for {request.url.path}")
+                return 413, "Request too large"
+        
+        is_valid, validation_message = self.input_validator.validate_request(request)
+        if not is_valid:
+            logger.warning(f"Input validation failed: {validation_message}")
+            return status.HTTP_400_BAD_REQUEST, "Invalid input detected"
+        
+        return None
+    
+    def _body_limit(self, content_type: str) -> int:
+        if content_type.lower().startswith('multipart/'):
+            return self.config.max_upload_size
+        return self.config.max_body_size
+    
+    def _scanning_receive(self, request: Request, receive: Receive) -> Receive:
+        """Wrap receive so each body chunk is size-checked and scanned as it is read"""
+        content_type = request.headers.get('content-type', '')
+        limit = self._body_limit(content_type)
+        scanner = create_body_scanner(
+            content_type, self.input_validator.matches_malicious_content, self.config.body_scan_lookahead
+        )
+        received = 0
+        
+        async def scanning_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message['type'] != 'http.request':
+                return message
+            
+            chunk = message.get('body', b'')
+            received += len(chunk)
+            if received > limit:
+                # Chunked bodies have no Content-Length, so this is the first chance to refuse
+                logger.warning(f"Request body too large: over {limit} bytes for {request.url.path}")
+                raise RequestBodyRejected(status_code=413, detail="Request too large")
+            
+            if scanner is not None:
+                reason = scanner.feed(chunk)
+                if reason is None and not message.get('more_body', False):
+                    reason = scanner.close()
+                if reason:
+                    logger.warning(f"Input validation failed: {reason}")
+                    raise RequestBodyRejected(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid input detected")
+            return message
+        
+        return scanning_receive
+    
+    def _wrap_send(self, send: Send, start_time: float, security_headers: bool = True) -> Send:
+        """Add security and timing headers to the response start message"""
+        async def send_with_headers(message: Message):
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(scope=message)
+                if security_headers:
+                    # 5. Add security headers (but don't override CORS headers)
+                    for header, value in self.config.security_headers.items():
+                        if not header.startswith('Access-Control-'):
+                            headers[header] = value
+                # 6. Add timing header for monitoring
+                headers["X-Process-Time"] = str(time.time() - start_time)
+            await send(message)
+        
+        return send_with_headers
     
     def _is_blocked_user_agent(self, user_agent: str) -> bool:
         """Check if user agent is blocked"""
@@ -0,0 +1,102 @@
+"""
+User Profile JSON Migration Script
+==================================
+
+Moves the file-per-user profiles in user_data/*.json into the configured
+user storage backend (USER_STORE_BACKEND, sqlite by default). Every file is
+validated as a UserProfile first; invalid files are reported and left alone.
+Rows are upserted in batches, so the script can be re-run safely.
+
+Usage:
+    python migrate_user_data.py [--source user_data] [--backend sqlite] [--batch-size 1000]
+    python migrate_user_data.py --dry-run            # validate only
+    python migrate_user_data.py --archive            # move migrated files to user_data/migrated/
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+from models.user_models import USER_STORE_BACKEND, USER_STORE_SQLITE_PATH, UserProfile
+from models.user_storage import create_storage_backend, hash_email
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def iter_profiles(source: Path):
+    """Yield (path, row) for each valid profile file and (path, None) for invalid ones"""
+    for path in sorted(source.glob("*.json")):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            profile = UserProfile(**data)
+            yield path, (profile.user_id, hash_email(profile.personalInfo.email), data)
+        except Exception as e:
+            logger.warning(f"⚠️ Skipping {path.name}: {e}")
+            yield path, None
+
+
+def migrate(source: str, backend_name: str, sqlite_path: str = None, batch_size: int = 1000,
+            dry_run: bool = False, archive: bool = False) -> dict:
+    source_dir = Path(source)
+    backend = None if dry_run else create_storage_backend(backend_name, source, sqlite_path)
+    if backend is not None and backend.name == "json":
+        raise ValueError("Target backend is the JSON file store itself; choose sqlite or postgres")
+
+    counts = {'migrated': 0, 'invalid': 0}
+    batch, batch_paths = [], []
+
+    def flush():
+        if batch and backend is not None:
+            backend.put_many(batch)
+            if archive:
+                archive_dir = source_dir / "migrated"
+                archive_dir.mkdir(exist_ok=True)
+                for path in batch_paths:
+                    path.rename(archive_dir / path.name)
+        counts['migrated'] += len(batch)
+        batch.clear()
+        batch_paths.clear()
+
+    for path, row in iter_profiles(source_dir):
+        if row is None:
+            counts['invalid'] += 1
+            continue
+        batch.append(row)
+        batch_paths.append(path)
+        if len(batch) >= batch_size:
+            flush()
+            logger.info(f"📦 {counts['migrated']} profiles migrated")
+    flush()
+
+    if backend is not None:
+        backend.close()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="user_data", help="Directory holding <user_id>.json files")
+    parser.add_argument("--backend", default=USER_STORE_BACKEND, choices=["sqlite", "postgres"])
+    parser.add_argument("--sqlite-path", default=USER_STORE_SQLITE_PATH)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="Validate files without writing anything")
+    parser.add_argument("--archive", action="store_true", help="Move migrated files into <source>/migrated/")
+    args = parser.parse_args()
+
+    logger.info(f"🚀 Migrating user profiles from {args.source}/ to {args.backend}...")
+    counts = migrate(args.source, args.backend, args.sqlite_path, args.batch_size, args.dry_run, args.archive)
+
+    verb = "validated" if args.dry_run else "migrated"
+    logger.info(f"✅ {counts['migrated']} profiles {verb}, {counts['invalid']} invalid files skipped")
+    if counts['invalid']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,20 @@ from pydantic import BaseModel, EmailStr
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import json
+import logging
 import os
 from pathlib import Path
 
+from models.user_storage import UserStorageBackend, create_storage_backend, hash_email
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+USER_STORE_BACKEND = os.getenv("USER_STORE_BACKEND", "sqlite")
+USER_STORE_SQLITE_PATH = os.getenv("USER_STORE_SQLITE_PATH")  # default: user_data/user_profiles.db
+USER_STORE_CACHE_MAX_ENTRIES = int(os.getenv("USER_STORE_CACHE_MAX_ENTRIES", "10000"))
+USER_STORE_CACHE_TTL_SECONDS = float(os.getenv("USER_STORE_CACHE_TTL_SECONDS", "60"))
+
 class PersonalInfo(BaseModel):
     fullName: str
     email: EmailStr
@@ -37,61 +48,108 @@ class UserProfile(BaseModel):
     updated_at: datetime = datetime.now()
 
 class UserDataStorage:
-    """Simple file-based storage for user data"""
+    """
+    User profile storage on a pluggable backend (models/user_storage.py) with a
+    read-through in-memory cache. Profiles still only present as legacy
+    user_data/<user_id>.json files are listed alongside the backend's and
+    imported on first read; run migrate_user_data.py to move them all at once.
+    """
     
-    def __init__(self, storage_dir: str = "user_data"):
+    def __init__(self, storage_dir: str = "user_data", backend: Optional[UserStorageBackend] = None):
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(exist_ok=True)
+        self.backend = backend or create_storage_backend(USER_STORE_BACKEND, storage_dir, USER_STORE_SQLITE_PATH)
+        self._cache = TTLCache(
+            max_entries=USER_STORE_CACHE_MAX_ENTRIES,
+            ttl_seconds=USER_STORE_CACHE_TTL_SECONDS,
+            name="user_store"
+        )
     
     def _get_user_file_path(self, user_id: str) -> Path:
-        """Get the file path for a user's data"""
+        """Get the file path for a user's legacy JSON data"""
         return self.storage_dir / f"{user_id}.json"
     
+    def _import_legacy_file(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Move a not-yet-migrated JSON profile into the backend"""
+        if self.backend.name == "json":
+            return None
+        user_file = self._get_user_file_path(user_id)
+        if not user_file.exists():
+            return None
+        with open(user_file, 'r') as f:
+            data = json.load(f)
+        profile = UserProfile(**data)
+        self.backend.put(user_id, hash_email(profile.personalInfo.email), data)
+        return data
+    
     def save_user_data(self, user_profile: UserProfile) -> bool:
-        """Save user profile data to file"""
+        """Save user profile data"""
         try:
-            user_file = self._get_user_file_path(user_profile.user_id)
             user_profile.updated_at = datetime.now()
-            
-            with open(user_file, 'w') as f:
-                json.dump(user_profile.dict(), f, indent=2, default=str)
-            
+            self.backend.put(
+                user_profile.user_id,
+                hash_email(user_profile.personalInfo.email),
+                user_profile.dict()
+            )
+            self._cache.delete(user_profile.user_id)
             return True
         except Exception as e:
             print(f"Error saving user data: {e}")
             return False
     
     def load_user_data(self, user_id: str) -> Optional[UserProfile]:
-        """Load user profile data from file"""
+        """Load user profile data"""
         try:
-            user_file = self._get_user_file_path(user_id)
+            cached = self._cache.get(user_id)
+            if cached is not None:
+                return cached.model_copy(deep=True)
             
-            if not user_file.exists():
-                return None
+            data = self.backend.get(user_id)
+            if data is None:
+                data = self._import_legacy_file(user_id)
+                if data is None:
+                    return None
             
-            with open(user_file, 'r') as f:
-                data = json.load(f)
-            
-            return UserProfile(**data)
+            user_profile = UserProfile(**data)
+            self._cache.set(user_id, user_profile)
+            return user_profile.model_copy(deep=True)
         except Exception as e:
             print(f"Error loading user data: {e}")
             return None
     
-    def update_user_data(self, user_id: str, updates: Dict[str, Any]) -> bool:
-        """Update specific fields in user profile"""
+    def load_user_data_by_email(self, email: str) -> Optional[UserProfile]:
+        """Load a profile through the email-hash index, falling back to the email-derived user ID"""
         try:
-            user_profile = self.load_user_data(user_id)
-            if not user_profile:
-                return False
-            
-            # Update the profile with new data
-            profile_dict = user_profile.dict()
+            user_id = self.backend.find_user_id(hash_email(email))
+        except Exception as e:
+            logger.error(f"Error looking up user by email: {e}")
+            user_id = None
+        if user_id:
+            return self.load_user_data(user_id)
+        # IDs are derived from the signup email, so a profile whose email has since
+        # changed must not be found under the old one
+        user_profile = self.load_user_data(create_user_id_from_email(email))
+        if user_profile and hash_email(user_profile.personalInfo.email) == hash_email(email):
+            return user_profile
+        return None
+    
+    def update_user_data(self, user_id: str, updates: Dict[str, Any]) -> bool:
+        """Update specific fields in user profile (atomic read-modify-write in the backend)"""
+        def apply(current: Dict[str, Any]) -> Dict[str, Any]:
+            profile_dict = dict(current)
             for key, value in updates.items():
                 if key in profile_dict:
                     profile_dict[key] = value
-            
-            updated_profile = UserProfile(**profile_dict)
-            return self.save_user_data(updated_profile)
+            profile_dict['updated_at'] = datetime.now()
+            # Validate before anything is written
+            return UserProfile(**profile_dict).dict()
+        
+        try:
+            updated = self.backend.update(user_id, apply)
+            if updated is None and self._import_legacy_file(user_id) is not None:
+                updated = self.backend.update(user_id, apply)
+            self._cache.delete(user_id)
+            return updated is not None
         except Exception as e:
             print(f"Error updating user data: {e}")
             return False
@@ -99,22 +157,36 @@ class UserDataStorage:
     def delete_user_data(self, user_id: str) -> bool:
         """Delete user profile data"""
         try:
-            user_file = self._get_user_file_path(user_id)
-            if user_file.exists():
-                user_file.unlink()
-                return True
-            return False
+            deleted = self.backend.delete(user_id)
+            if self.backend.name != "json":
+                # Don't let a leftover legacy file resurrect the profile
+                user_file = self._get_user_file_path(user_id)
+                if user_file.exists():
+                    user_file.unlink()
+                    deleted = True
+            self._cache.delete(user_id)
+            return deleted
         except Exception as e:
             print(f"Error deleting user data: {e}")
             return False
     
     def list_all_users(self) -> List[str]:
-        """List all user IDs"""
+        """List all user IDs, including legacy JSON profiles not imported yet"""
         try:
-            return [f.stem for f in self.storage_dir.glob("*.json")]
+            user_ids = self.backend.list_user_ids()
+            if self.backend.name == "json":
+                return user_ids
+            legacy_ids = {f.stem for f in self.storage_dir.glob("*.json")}
+            return sorted(legacy_ids.union(user_ids))
         except Exception as e:
             print(f"Error listing users: {e}")
             return []
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'backend': self.backend.name,
+            'cache': self._cache.get_stats()
+        }
 
 # Global storage instance
 user_storage = UserDataStorage()
@@ -161,5 +233,7 @@ def get_user_profile(user_id: str) -> Optional[Dict[str, Any]]:
 
 def get_user_profile_by_email(email: str) -> Optional[Dict[str, Any]]:
     """Get user profile by email"""
-    user_id = create_user_id_from_email(email)
-    return get_user_profile(user_id)
\ No newline at end of file
+    user_profile = user_storage.load_user_data_by_email(email)
+    if user_profile:
+        return user_profile.dict()
+    return None
\ No newline at end of file
@@ -0,0 +1,343 @@
+"""
+Storage backends for user profiles
+UserDataStorage (models/user_models.py) keeps profiles as JSON documents
+keyed by user_id in one of these backends, chosen with USER_STORE_BACKEND:
+
+  json      one pretty-printed file per user under user_data/ (the original
+            layout), now written atomically and locked for updates
+  sqlite    a single WAL-mode SQLite file with an email-hash index (default)
+  postgres  a user_profile_store table on the shared psycopg2 pool
+
+Every backend applies update() as one atomic read-modify-write, so
+concurrent partial updates can't lose each other's fields.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.sqlite_store import SQLiteConnections
+
+logger = logging.getLogger(__name__)
+
+USER_STORE_TABLE = "user_profile_store"
+
+# (user_id, email_hash, data)
+ProfileRow = Tuple[str, str, Dict[str, Any]]
+
+
+def hash_email(email: str) -> str:
+    """Index key for profile lookups by email (case and whitespace insensitive)"""
+    return hashlib.sha256(email.strip().lower().encode('utf-8')).hexdigest()
+
+
+def email_hash_of(data: Dict[str, Any]) -> str:
+    """Index key for a stored profile document, from personalInfo.email"""
+    return hash_email((data.get('personalInfo') or {}).get('email') or '')
+
+
+def _dump(data: Dict[str, Any]) -> str:
+    return json.dumps(data, default=str, separators=(',', ':'))
+
+
+class UserStorageBackend(ABC):
+    """Interface shared by the profile storage backends"""
+
+    name = "base"
+
+    @abstractmethod
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    def find_user_id(self, email_hash: str) -> Optional[str]:
+        """User ID indexed under email_hash; backends without an index return None"""
+        return None
+
+    @abstractmethod
+    def put(self, user_id: str, email_hash: str, data: Dict[str, Any]):
+        pass
+
+    def put_many(self, rows: Iterable[ProfileRow]) -> int:
+        count = 0
+        for user_id, email_hash, data in rows:
+            self.put(user_id, email_hash, data)
+            count += 1
+        return count
+
+    @abstractmethod
+    def update(self, user_id: str, apply: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Atomically replace a profile with apply(current) and re-index its email;
+        returns the new data, or None when the user doesn't exist. If apply
+        raises nothing is written.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, user_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def list_user_ids(self) -> List[str]:
+        pass
+
+    def close(self):
+        pass
+
+
+class JSONFileBackend(UserStorageBackend):
+    """One JSON file per user; writes go through a temp file and os.replace"""
+
+    name = "json"
+
+    def __init__(self, storage_dir: str = "user_data"):
+        self.storage_dir = Path(storage_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _path(self, user_id: str) -> Path:
+        return self.storage_dir / f"{user_id}.json"
+
+    def _lock(self, user_id: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(user_id, threading.Lock())
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(user_id), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write(self, user_id: str, data: Dict[str, Any]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.storage_dir, prefix=f".{user_id}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, indent=2, default=str)
+            os.replace(tmp_path, self._path(user_id))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def put(self, user_id: str, email_hash: str, data: Dict[str, Any]):
+        with self._lock(user_id):
+            self._write(user_id, data)
+
+    def update(self, user_id: str, apply: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        with self._lock(user_id):
+            current = self.get(user_id)
+            if current is None:
+                return None
+            updated = apply(current)
+            self._write(user_id, updated)
+            return updated
+
+    def delete(self, user_id: str) -> bool:
+        with self._lock(user_id):
+            try:
+                self._path(user_id).unlink()
+                return True
+            except FileNotFoundError:
+                return False
+
+    def list_user_ids(self) -> List[str]:
+        return sorted(f.stem for f in self.storage_dir.glob("*.json"))
+
+
+class SQLiteBackend(UserStorageBackend):
+    """Embedded SQLite store in WAL mode with a per-thread connection"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = SQLiteConnections(path)
+        with self._db.transaction() as conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {USER_STORE_TABLE} (
+                    user_id TEXT PRIMARY KEY,
+                    email_hash TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{USER_STORE_TABLE}_email_hash ON {USER_STORE_TABLE} (email_hash)"
+            )
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        row = self._db.connection().execute(f"SELECT data FROM {USER_STORE_TABLE} WHERE user_id = ?", (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_user_id(self, email_hash: str) -> Optional[str]:
+        row = self._db.connection().execute(
+            f"SELECT user_id FROM {USER_STORE_TABLE} WHERE email_hash = ? ORDER BY updated_at DESC LIMIT 1",
+            (email_hash,)
+        ).fetchone()
+        return row[0] if row else None
+
+    _UPSERT = f"""
+        INSERT INTO {USER_STORE_TABLE} (user_id, email_hash, data, updated_at) VALUES (?, ?, ?, ?)
+        ON CONFLICT(user_id) DO UPDATE SET
+            email_hash = excluded.email_hash, data = excluded.data, updated_at = excluded.updated_at
+    """
+
+    def put(self, user_id: str, email_hash: str, data: Dict[str, Any]):
+        self._db.connection().execute(self._UPSERT, (user_id, email_hash, _dump(data), datetime.now().isoformat()))
+
+    def put_many(self, rows: Iterable[ProfileRow]) -> int:
+        now = datetime.now().isoformat()
+        params = [(user_id, email_hash, _dump(data), now) for user_id, email_hash, data in rows]
+        with self._db.transaction() as conn:
+            conn.executemany(self._UPSERT, params)
+        return len(params)
+
+    def update(self, user_id: str, apply: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        with self._db.transaction() as conn:
+            row = conn.execute(f"SELECT data FROM {USER_STORE_TABLE} WHERE user_id = ?", (user_id,)).fetchone()
+            if row is None:
+                return None
+            updated = apply(json.loads(row[0]))
+            conn.execute(
+                f"UPDATE {USER_STORE_TABLE} SET data = ?, email_hash = ?, updated_at = ? WHERE user_id = ?",
+                (_dump(updated), email_hash_of(updated), datetime.now().isoformat(), user_id)
+            )
+            return updated
+
+    def delete(self, user_id: str) -> bool:
+        cursor = self._db.connection().execute(f"DELETE FROM {USER_STORE_TABLE} WHERE user_id = ?", (user_id,))
+        return cursor.rowcount > 0
+
+    def list_user_ids(self) -> List[str]:
+        return [row[0] for row in self._db.connection().execute(f"SELECT user_id FROM {USER_STORE_TABLE} ORDER BY user_id")]
+
+    def close(self):
+        self._db.close()
+
+
+class PostgresBackend(UserStorageBackend):
+    """user_profile_store table (JSONB documents) on the shared psycopg2 pool"""
+
+    name = "postgres"
+
+    def __init__(self, pool=None):
+        if pool is None:
+            from database.pg_pool import get_pg_pool
+            pool = get_pg_pool()
+        self.pool = pool
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    @contextmanager
+    def _cursor(self):
+        if not self._schema_ready:
+            self._create_table()
+        with self.pool.connection() as conn:
+            with conn.cursor() as cursor:
+                yield cursor
+
+    def _create_table(self):
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            with self.pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"""
+                        CREATE TABLE IF NOT EXISTS {USER_STORE_TABLE} (
+                            user_id VARCHAR(64) PRIMARY KEY,
+                            email_hash CHAR(64) NOT NULL,
+                            data JSONB NOT NULL,
+                            updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                        )
+                    """)
+                    cursor.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{USER_STORE_TABLE}_email_hash ON {USER_STORE_TABLE} (email_hash)"
+                    )
+            self._schema_ready = True
+
+    @staticmethod
+    def _data(row) -> Optional[Dict[str, Any]]:
+        if not row:
+            return None
+        data = row['data'] if isinstance(row, dict) else row[0]
+        return json.loads(data) if isinstance(data, str) else data
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT data FROM {USER_STORE_TABLE} WHERE user_id = %s", (user_id,))
+            return self._data(cursor.fetchone())
+
+    def find_user_id(self, email_hash: str) -> Optional[str]:
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"SELECT user_id FROM {USER_STORE_TABLE} WHERE email_hash = %s ORDER BY updated_at DESC LIMIT 1",
+                (email_hash,)
+            )
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return row['user_id'] if isinstance(row, dict) else row[0]
+
+    _UPSERT = f"""
+        INSERT INTO {USER_STORE_TABLE} (user_id, email_hash, data, updated_at)
+        VALUES (%s, %s, %s::jsonb, CURRENT_TIMESTAMP)
+        ON CONFLICT (user_id) DO UPDATE SET
+            email_hash = EXCLUDED.email_hash, data = EXCLUDED.data, updated_at = EXCLUDED.updated_at
+    """
+
+    def put(self, user_id: str, email_hash: str, data: Dict[str, Any]):
+        with self._cursor() as cursor:
+            cursor.execute(self._UPSERT, (user_id, email_hash, _dump(data)))
+
+    def put_many(self, rows: Iterable[ProfileRow]) -> int:
+        params = [(user_id, email_hash, _dump(data)) for user_id, email_hash, data in rows]
+        with self._cursor() as cursor:
+            cursor.executemany(self._UPSERT, params)
+        return len(params)
+
+    def update(self, user_id: str, apply: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        # The row lock is held until the pool commits the connection
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT data FROM {USER_STORE_TABLE} WHERE user_id = %s FOR UPDATE", (user_id,))
+            current = self._data(cursor.fetchone())
+            if current is None:
+                return None
+            updated = apply(current)
+            cursor.execute(
+                f"UPDATE {USER_STORE_TABLE} SET data = %s::jsonb, email_hash = %s, updated_at = CURRENT_TIMESTAMP "
+                f"WHERE user_id = %s",
+                (_dump(updated), email_hash_of(updated), user_id)
+            )
+            return updated
+
+    def delete(self, user_id: str) -> bool:
+        with self._cursor() as cursor:
+            cursor.execute(f"DELETE FROM {USER_STORE_TABLE} WHERE user_id = %s", (user_id,))
+            return cursor.rowcount > 0
+
+    def list_user_ids(self) -> List[str]:
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT user_id FROM {USER_STORE_TABLE} ORDER BY user_id")
+            return [row['user_id'] if isinstance(row, dict) else row[0] for row in cursor.fetchall()]
+
+
+def create_storage_backend(name: str, storage_dir: str = "user_data", sqlite_path: str = None) -> UserStorageBackend:
+    """Backend for USER_STORE_BACKEND (json, sqlite or postgres)"""
+    name = (name or "sqlite").lower()
+    if name == "json":
+        return JSONFileBackend(storage_dir)
+    if name == "sqlite":
+        return SQLiteBackend(sqlite_path or os.path.join(storage_dir, "user_profiles.db"))
+    if name in ("postgres", "postgresql"):
+        return PostgresBackend()
+    raise ValueError(f"Unknown user storage backend: {name}")
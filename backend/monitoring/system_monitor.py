@@ -16,11 +16,15 @@ import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, asdict
-from collections import defaultdict, deque
+from collections import deque
 import json
 import logging
 from pathlib import Path
 
+from core.metrics import bucket_percentile, cache_totals, metrics
+from core.model_registry import GEMINI_REQUEST_SECONDS
+from middleware.metrics_middleware import HTTP_REQUEST_SECONDS, HTTP_REQUESTS, HTTP_REQUESTS_IN_FLIGHT
+
 # Import our logging configuration
 try:
     from backend.config.logging_config import get_logger
@@ -80,10 +84,9 @@ class MetricsCollector:
         self.is_collecting = False
         self.collection_thread = None
         
-        # Performance counters
-        self.request_times = deque(maxlen=1000)
-        self.error_counts = defaultdict(int)
-        self.endpoint_stats = defaultdict(lambda: {'count': 0, 'total_time': 0, 'errors': 0})
+        # Request latency buckets at the previous collection, so percentiles cover one interval
+        self._last_latency_counts = [0.0] * (len(HTTP_REQUEST_SECONDS.buckets) + 1)
+        self._last_latency_sum = 0.0
         
         # Network baseline
         self.network_baseline = self._get_network_stats()
@@ -168,33 +171,40 @@ class MetricsCollector:
         )
     
     def _collect_application_metrics(self) -> ApplicationMetrics:
-        """Collect application-specific metrics"""
-        # Calculate response time percentiles
-        response_times = list(self.request_times)
-        if response_times:
-            response_times.sort()
-            avg_time = sum(response_times) / len(response_times)
-            p95_time = response_times[int(len(response_times) * 0.95)] if response_times else 0
-            p99_time = response_times[int(len(response_times) * 0.99)] if response_times else 0
-        else:
-            avg_time = p95_time = p99_time = 0
+        """Collect application-specific metrics from the metrics registry"""
+        # Response time percentiles over the requests since the previous collection
+        counts, _, latency_sum = HTTP_REQUEST_SECONDS.totals()
+        interval_counts = [now - before for now, before in zip(counts, self._last_latency_counts)]
+        interval_requests = sum(interval_counts)
+        avg_time = (latency_sum - self._last_latency_sum) / interval_requests if interval_requests else 0
+        p95_time = bucket_percentile(HTTP_REQUEST_SECONDS.buckets, interval_counts, 0.95)
+        p99_time = bucket_percentile(HTTP_REQUEST_SECONDS.buckets, interval_counts, 0.99)
+        self._last_latency_counts, self._last_latency_sum = counts, latency_sum
         
         # Get total request and error counts
-        total_requests = sum(stats['count'] for stats in self.endpoint_stats.values())
-        total_errors = sum(self.error_counts.values())
+        total_requests = total_errors = 0
+        for (_, _, status), child in HTTP_REQUESTS.children():
+            count = child.get()
+            total_requests += count
+            if status.isdigit() and int(status) >= 400:
+                total_errors += count
+        
+        caches = cache_totals().values()
+        cache_hits = sum(stats['hits'] for stats in caches)
+        cache_lookups = cache_hits + sum(stats['misses'] for stats in caches)
         
         return ApplicationMetrics(
             timestamp=datetime.utcnow(),
-            active_connections=0,  # Will be updated by connection manager
-            request_count=total_requests,
-            error_count=total_errors,
+            active_connections=int(HTTP_REQUESTS_IN_FLIGHT.get()),
+            request_count=int(total_requests),
+            error_count=int(total_errors),
             response_time_avg=avg_time,
             response_time_p95=p95_time,
             response_time_p99=p99_time,
-            database_connections=0,  # Will be updated by database manager
-            cache_hit_rate=0.0,  # Will be updated by cache manager
-            ai_requests_count=0,  # Will be updated by AI service
-            websocket_connections=0  # Will be updated by WebSocket manager
+            database_connections=int(metrics.collected_value("artha_db_pool_connections_in_use") or 0),
+            cache_hit_rate=cache_hits / cache_lookups if cache_lookups else 0.0,
+            ai_requests_count=int(GEMINI_REQUEST_SECONDS.totals()[1]),
+            websocket_connections=0  # No WebSocket endpoints yet
         )
     
     def _get_network_stats(self) -> Dict[str, int]:
@@ -211,16 +221,9 @@ class MetricsCollector:
             return {'bytes_sent': 0, 'bytes_recv': 0, 'packets_sent': 0, 'packets_recv': 0}
     
     def record_request(self, endpoint: str, method: str, duration: float, status_code: int):
-        """Record API request metrics"""
-        self.request_times.append(duration)
-        
-        endpoint_key = f"{method} {endpoint}"
-        self.endpoint_stats[endpoint_key]['count'] += 1
-        self.endpoint_stats[endpoint_key]['total_time'] += duration
-        
-        if status_code >= 400:
-            self.endpoint_stats[endpoint_key]['errors'] += 1
-            self.error_counts[str(status_code)] += 1
+        """Record API request metrics (MetricsMiddleware does this for every HTTP request)"""
+        HTTP_REQUESTS.labels(method, endpoint, str(status_code)).inc()
+        HTTP_REQUEST_SECONDS.labels(method, endpoint).observe(duration)
     
     def update_connection_count(self, count: int):
         """Update active connection count"""
@@ -7,16 +7,15 @@ Comprehensive user authentication with JWT, encryption, and security features.
 
 import os
 import sys
+import asyncio
 import hashlib
 import secrets
 import uuid
 import logging
+import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, Tuple
 import jwt
-import bcrypt
-import psycopg2
-from psycopg2.extras import RealDictCursor
 import re
 from email_validator import validate_email, EmailNotValidError
 
@@ -24,10 +23,37 @@ from email_validator import validate_email, EmailNotValidError
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.config import get_database_url
+from core.metrics import exponential_buckets, latency_summary, metrics
+from database.pg_pool import get_pg_pool
+from services.password_hasher import PasswordHasherBusy, get_password_hasher
+from services.token_revocation import RevocationIndex, hash_token
 from utils.encryption import EncryptionHelper
+from utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+ACCESS_TOKEN_EXPIRE_SECONDS = 24 * 60 * 60
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv('TOKEN_CACHE_MAX_ENTRIES', '10000'))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv('TOKEN_CACHE_TTL_SECONDS', '300'))
+TOKEN_REVOCATION_SYNC_SECONDS = float(os.getenv('TOKEN_REVOCATION_SYNC_SECONDS', '5'))
+# Seconds, doubling from 50µs (cache hit) to ~200ms (database round trip)
+TOKEN_VERIFY_BUCKETS = exponential_buckets(0.00005, 2, 13)
+
+# Shared by every AuthService in the process. A verified token is served from
+# here until its exp (or the TTL, which bounds how long a deactivated user keeps
+# access); logged-out tokens are rejected via the revocation index.
+_verified_tokens = TTLCache(max_entries=TOKEN_CACHE_MAX_ENTRIES, ttl_seconds=TOKEN_CACHE_TTL_SECONDS,
+                            name="verified_tokens")
+_revoked_tokens = RevocationIndex(max_token_age=ACCESS_TOKEN_EXPIRE_SECONDS,
+                                  sync_interval=TOKEN_REVOCATION_SYNC_SECONDS)
+TOKEN_VERIFY_SECONDS = metrics.histogram(
+    "artha_token_verify_duration_seconds", "JWT verification latency by result", ("result",),
+    buckets=TOKEN_VERIFY_BUCKETS
+)
+TOKEN_VERIFY_DB_LOOKUPS = metrics.counter(
+    "artha_token_verify_db_lookups_total", "Token verifications that read the user row"
+)
+
 class AuthenticationError(Exception):
     """Custom authentication error"""
     pass
@@ -45,11 +71,12 @@ class AuthService:
         self.database_url = get_database_url()
         self.jwt_secret = os.getenv('JWT_SECRET_KEY', 'artha_ai_jwt_secret_2024_secure')
         self.jwt_algorithm = 'HS256'
-        self.access_token_expire = 24 * 60 * 60  # 24 hours
+        self.access_token_expire = ACCESS_TOKEN_EXPIRE_SECONDS  # 24 hours
         self.refresh_token_expire = 7 * 24 * 60 * 60  # 7 days
         self.max_login_attempts = 5
         self.lockout_duration = 30 * 60  # 30 minutes
         self.encryption = EncryptionHelper()
+        self.password_hasher = get_password_hasher()
         
         # Password requirements - Enhanced security
         self.min_password_length = 12
@@ -57,33 +84,8 @@ class AuthService:
         self.password_pattern = re.compile(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{12,128}$')
     
     def _get_db_connection(self):
-        """Get database connection with proper error handling"""
-        try:
-            # Parse database URL
-            import re
-            match = re.match(r'postgresql://([^:]+):?([^@]*)@([^:]+):(\d+)/(.+)', self.database_url)
-            if not match:
-                match = re.match(r'postgresql://([^@]+)@([^:]+):(\d+)/(.+)', self.database_url)
-                if match:
-                    user, host, port, database = match.groups()
-                    password = ''
-                else:
-                    raise ValueError(f"Invalid database URL format: {self.database_url}")
-            else:
-                user, password, host, port, database = match.groups()
-            
-            conn = psycopg2.connect(
-                host=host,
-                port=int(port),
-                database=database,
-                user=user,
-                password=password,
-                cursor_factory=RealDictCursor
-            )
-            return conn
-        except Exception as e:
-            logger.error(f"Database connection failed: {e}")
-            raise AuthenticationError("Database connection failed")
+        """Borrow a connection from the shared PostgreSQL pool (returned when the block exits)"""
+        return get_pg_pool().connection()
     
     def _hash_email(self, email: str) -> str:
         """Create consistent hash of email for indexing"""
@@ -130,15 +132,24 @@ class AuthService:
         """Generate cryptographic salt"""
         return secrets.token_hex(16)
     
+    def _salted_password(self, password: str, salt: str) -> bytes:
+        return (password + salt).encode('utf-8')
+    
     def _hash_password(self, password: str, salt: str) -> str:
-        """Hash password with salt using bcrypt"""
-        salted_password = (password + salt).encode('utf-8')
-        return bcrypt.hashpw(salted_password, bcrypt.gensalt()).decode('utf-8')
+        """Hash password with salt using bcrypt (on the calling thread)"""
+        return self.password_hasher.hash_sync(self._salted_password(password, salt))
     
     def _verify_password(self, password: str, salt: str, hashed: str) -> bool:
-        """Verify password against hash"""
-        salted_password = (password + salt).encode('utf-8')
-        return bcrypt.checkpw(salted_password, hashed.encode('utf-8'))
+        """Verify password against hash (on the calling thread)"""
+        return self.password_hasher.verify_sync(self._salted_password(password, salt), hashed)
+    
+    async def _hash_password_async(self, password: str, salt: str) -> str:
+        """Hash password on the bounded password hashing pool"""
+        return await self.password_hasher.hash(self._salted_password(password, salt))
+    
+    async def _verify_password_async(self, password: str, salt: str, hashed: str) -> bool:
+        """Verify password on the bounded password hashing pool"""
+        return await self.password_hasher.verify(self._salted_password(password, salt), hashed)
     
     def _generate_tokens(self, user_id: str, email: str) -> Tuple[str, str]:
         """Generate JWT access and refresh tokens"""
@@ -184,108 +195,33 @@ class AuthService:
         Register a new user with comprehensive validation and security
         """
         try:
-            # Validate inputs
-            if not self._validate_email(email):
-                raise ValidationError("Invalid email format")
-            
-            password_valid, password_error = self._validate_password(password)
-            if not password_valid:
-                raise ValidationError(password_error)
-            
-            if not full_name or len(full_name.strip()) < 2:
-                raise ValidationError("Full name must be at least 2 characters")
-            
-            email = email.lower().strip()
-            email_hash = self._hash_email(email)
-            user_id = str(uuid.uuid4())
-            salt = self._generate_salt()
+            email, salt = self._validate_registration(email, password, full_name)
             password_hash = self._hash_password(password, salt)
+            return self._create_user(email, salt, password_hash, full_name, phone, date_of_birth)
             
-            # Encrypt sensitive data using GCM mode
-            full_name_enc = self.encryption.encrypt_data_gcm(full_name.strip())
-            phone_enc = self.encryption.encrypt_data_gcm(phone) if phone else None
-            dob_enc = self.encryption.encrypt_data_gcm(date_of_birth) if date_of_birth else None
-            
-            with self._get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    # Check if user already exists
-                    cursor.execute(
-                        "SELECT id FROM users WHERE email_hash = %s",
-                        (email_hash,)
-                    )
-                    if cursor.fetchone():
-                        raise ValidationError("User with this email already exists")
-                    
-                    # Insert new user
-                    cursor.execute("""
-                        INSERT INTO users (
-                            id, email, email_hash, password_hash, salt,
-                            full_name_encrypted, full_name_nonce, full_name_auth_tag,
-                            phone_encrypted, phone_nonce, phone_auth_tag,
-                            date_of_birth_encrypted, date_of_birth_nonce, date_of_birth_auth_tag,
-                            verification_token, is_verified, is_active
-                        ) VALUES (
-                            %s, %s, %s, %s, %s,
-                            %s, %s, %s,
-                            %s, %s, %s,
-                            %s, %s, %s,
-                            %s, %s, %s
-                        )
-                    """, (
-                        user_id, email, email_hash, password_hash, salt,
-                        full_name_enc['encrypted_data'], full_name_enc['nonce'], full_name_enc['auth_tag'],
-                        phone_enc['encrypted_data'] if phone_enc else None,
-                        phone_enc['nonce'] if phone_enc else None,
-                        phone_enc['auth_tag'] if phone_enc else None,
-                        dob_enc['encrypted_data'] if dob_enc else None,
-                        dob_enc['nonce'] if dob_enc else None,
-                        dob_enc['auth_tag'] if dob_enc else None,
-                        secrets.token_urlsafe(32), True, True  # Auto-verify for now, can add email verification later
-                    ))
-                    
-                    # Create default investment preferences
-                    prefs_id = str(uuid.uuid4())
-                    cursor.execute("""
-                        INSERT INTO investment_preferences (
-                            id, user_id, risk_tolerance, investment_horizon,
-                            investment_goals, emergency_fund_months, investment_experience
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-                    """, (
-                        prefs_id, user_id, 'moderate', 'long_term',
-                        '["wealth_building"]', 6, 'beginner'
-                    ))
-                    
-                    # Create default user profile
-                    profile_id = str(uuid.uuid4())
-                    cursor.execute("""
-                        INSERT INTO user_profiles (id, user_id) VALUES (%s, %s)
-                    """, (profile_id, user_id))
-                    
-                    conn.commit()
-            
-            logger.info(f"✅ User registered successfully: {email}")
-            
-            # Generate tokens for immediate login
-            access_token, refresh_token = self._generate_tokens(user_id, email)
-            
-            return {
-                "success": True,
-                "message": "User registered successfully",
-                "user": {
-                    "id": user_id,
-                    "email": email,
-                    "full_name": full_name,
-                    "is_verified": True,
-                    "last_login": None
-                },
-                "tokens": {
-                    "access_token": access_token,
-                    "refresh_token": refresh_token,
-                    "token_type": "bearer",
-                    "expires_in": self.access_token_expire
-                }
-            }
+        except ValidationError as e:
+            logger.warning(f"Registration validation failed: {e}")
+            return {"success": False, "message": str(e)}
+        except Exception as e:
+            logger.error(f"Registration failed: {e}")
+            return {"success": False, "message": "Registration failed. Please try again."}
+    
+    async def register_user_async(self, email: str, password: str, full_name: str,
+                                  phone: Optional[str] = None, date_of_birth: Optional[str] = None) -> Dict[str, Any]:
+        """
+        register_user for async handlers: bcrypt runs on the password hashing pool
+        and the database work on a worker thread. Raises PasswordHasherBusy when
+        the pool is saturated.
+        """
+        try:
+            email, salt = self._validate_registration(email, password, full_name)
+            password_hash = await self._hash_password_async(password, salt)
+            return await asyncio.to_thread(
+                self._create_user, email, salt, password_hash, full_name, phone, date_of_birth
+            )
             
+        except PasswordHasherBusy:
+            raise
         except ValidationError as e:
             logger.warning(f"Registration validation failed: {e}")
             return {"success": False, "message": str(e)}
@@ -293,6 +229,111 @@ class AuthService:
             logger.error(f"Registration failed: {e}")
             return {"success": False, "message": "Registration failed. Please try again."}
     
+    def _validate_registration(self, email: str, password: str, full_name: str) -> Tuple[str, str]:
+        """Validate registration inputs; returns the normalized email and a new salt"""
+        if not self._validate_email(email):
+            raise ValidationError("Invalid email format")
+        
+        password_valid, password_error = self._validate_password(password)
+        if not password_valid:
+            raise ValidationError(password_error)
+        
+        if not full_name or len(full_name.strip()) < 2:
+            raise ValidationError("Full name must be at least 2 characters")
+        
+        return email.lower().strip(), self._generate_salt()
+    
+    def _create_user(self, email: str, salt: str, password_hash: str, full_name: str,
+                     phone: Optional[str], date_of_birth: Optional[str]) -> Dict[str, Any]:
+        """Insert the user with default preferences and profile, and issue tokens"""
+        email_hash = self._hash_email(email)
+        user_id = str(uuid.uuid4())
+        
+        # Encrypt sensitive data using GCM mode
+        full_name_enc = self.encryption.encrypt_data_gcm(full_name.strip())
+        phone_enc = self.encryption.encrypt_data_gcm(phone) if phone else None
+        dob_enc = self.encryption.encrypt_data_gcm(date_of_birth) if date_of_birth else None
+        
+        with self._get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                # Check if user already exists
+                cursor.execute(
+                    "SELECT id FROM users WHERE email_hash = %s",
+                    (email_hash,)
+                )
+                if cursor.fetchone():
+                    raise ValidationError("User with this email already exists")
+                
+                # Insert new user
+                cursor.execute("""
+                    INSERT INTO users (
+                        id, email, email_hash, password_hash, salt,
+                        full_name_encrypted, full_name_nonce, full_name_auth_tag,
+                        phone_encrypted, phone_nonce, phone_auth_tag,
+                        date_of_birth_encrypted, date_of_birth_nonce, date_of_birth_auth_tag,
+                        verification_token, is_verified, is_active
+                    ) VALUES (
+                        %s, %s, %s, %s, %s,
+                        %s, %s, %s,
+                        %s, %s, %s,
+                        %s, %s, %s,
+                        %s, %s, %s
+                    )
+                """, (
+                    user_id, email, email_hash, password_hash, salt,
+                    full_name_enc['encrypted_data'], full_name_enc['nonce'], full_name_enc['auth_tag'],
+                    phone_enc['encrypted_data'] if phone_enc else None,
+                    phone_enc['nonce'] if phone_enc else None,
+                    phone_enc['auth_tag'] if phone_enc else None,
+                    dob_enc['encrypted_data'] if dob_enc else None,
+                    dob_enc['nonce'] if dob_enc else None,
+                    dob_enc['auth_tag'] if dob_enc else None,
+                    secrets.token_urlsafe(32), True, True  # Auto-verify for now, can add email verification later
+                ))
+                
+                # Create default investment preferences
+                prefs_id = str(uuid.uuid4())
+                cursor.execute("""
+                    INSERT INTO investment_preferences (
+                        id, user_id, risk_tolerance, investment_horizon,
+                        investment_goals, emergency_fund_months, investment_experience
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """, (
+                    prefs_id, user_id, 'moderate', 'long_term',
+                    '["wealth_building"]', 6, 'beginner'
+                ))
+                
+                # Create default user profile
+                profile_id = str(uuid.uuid4())
+                cursor.execute("""
+                    INSERT INTO user_profiles (id, user_id) VALUES (%s, %s)
+                """, (profile_id, user_id))
+                
+                conn.commit()
+        
+        logger.info(f"✅ User registered successfully: {email}")
+        
+        # Generate tokens for immediate login
+        access_token, refresh_token = self._generate_tokens(user_id, email)
+        
+        return {
+            "success": True,
+            "message": "User registered successfully",
+            "user": {
+                "id": user_id,
+                "email": email,
+                "full_name": full_name,
+                "is_verified": True,
+                "last_login": None
+            },
+            "tokens": {
+                "access_token": access_token,
+                "refresh_token": refresh_token,
+                "token_type": "bearer",
+                "expires_in": self.access_token_expire
+            }
+        }
+    
     def login_user(self, email: str, password: str, ip_address: Optional[str] = None,
                   user_agent: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -300,106 +341,47 @@ class AuthService:
         """
         try:
             email = email.lower().strip()
-            email_hash = self._hash_email(email)
+            user_dict = self._load_login_user(email)
             
-            with self._get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    # Get user data
-                    cursor.execute("""
-                        SELECT id, email, password_hash, salt, login_attempts, locked_until,
-                               is_active, is_verified, full_name_encrypted, full_name_nonce, full_name_auth_tag,
-                               last_login
-                        FROM users WHERE email_hash = %s
-                    """, (email_hash,))
-                    
-                    user = cursor.fetchone()
-                    if not user:
-                        raise ValidationError("Invalid email or password")
-                    
-                    user_dict = dict(user)
-                    
-                    # Check if account is active
-                    if not user_dict['is_active']:
-                        raise ValidationError("Account is deactivated")
-                    
-                    # Check if account is locked
-                    if self._is_account_locked(user_dict):
-                        raise ValidationError("Account is temporarily locked. Please try again later.")
-                    
-                    # Verify password
-                    if not self._verify_password(password, user_dict['salt'], user_dict['password_hash']):
-                        # Increment login attempts
-                        login_attempts = user_dict['login_attempts'] + 1
-                        locked_until = None
-                        
-                        if login_attempts >= self.max_login_attempts:
-                            locked_until = datetime.utcnow() + timedelta(seconds=self.lockout_duration)
-                        
-                        cursor.execute("""
-                            UPDATE users SET login_attempts = %s, locked_until = %s
-                            WHERE id = %s
-                        """, (login_attempts, locked_until, user_dict['id']))
-                        conn.commit()
-                        
-                        if locked_until:
-                            raise ValidationError("Too many failed attempts. Account locked for 30 minutes.")
-                        else:
-                            raise ValidationError("Invalid email or password")
-                    
-                    # Successful login - reset attempts and update last login
-                    cursor.execute("""
-                        UPDATE users SET login_attempts = 0, locked_until = NULL, last_login = %s
-                        WHERE id = %s
-                    """, (datetime.utcnow(), user_dict['id']))
-                    
-                    # Generate session tokens
-                    access_token, refresh_token = self._generate_tokens(user_dict['id'], email)
-                    
-                    # Create session record
-                    session_id = str(uuid.uuid4())
-                    expires_at = datetime.utcnow() + timedelta(seconds=self.access_token_expire)
-                    refresh_expires_at = datetime.utcnow() + timedelta(seconds=self.refresh_token_expire)
-                    
-                    cursor.execute("""
-                        INSERT INTO user_sessions (
-                            id, user_id, session_token, refresh_token,
-                            expires_at, refresh_expires_at, ip_address, user_agent
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (
-                        session_id, user_dict['id'], access_token, refresh_token,
-                        expires_at, refresh_expires_at, ip_address, user_agent
-                    ))
-                    
-                    conn.commit()
-                    
-                    # Decrypt full name for response
-                    full_name = self.encryption.decrypt_data_gcm({
-                        'encrypted_data': user_dict['full_name_encrypted'],
-                        'nonce': user_dict['full_name_nonce'],
-                        'auth_tag': user_dict['full_name_auth_tag']
-                    }) if user_dict['full_name_encrypted'] else "User"
-                    
-                    logger.info(f"✅ User logged in successfully: {email}")
-                    
-                    return {
-                        "success": True,
-                        "message": "Login successful",
-                        "user": {
-                            "id": user_dict['id'],
-                            "email": email,
-                            "full_name": full_name,
-                            "is_verified": user_dict['is_verified'],
-                            "last_login": user_dict['last_login'].isoformat() if user_dict['last_login'] else None
-                        },
-                        "tokens": {
-                            "access_token": access_token,
-                            "refresh_token": refresh_token,
-                            "token_type": "bearer",
-                            "expires_in": self.access_token_expire
-                        },
-                        "session_id": session_id
-                    }
-                    
+            password_valid = self._verify_password(password, user_dict['salt'], user_dict['password_hash'])
+            new_hash = None
+            if password_valid and self.password_hasher.needs_rehash(user_dict['password_hash']):
+                new_hash = self._hash_password(password, user_dict['salt'])
+            
+            return self._complete_login(user_dict, email, password_valid, new_hash, ip_address, user_agent)
+            
+        except ValidationError as e:
+            logger.warning(f"Login validation failed: {e}")
+            return {"success": False, "message": str(e)}
+        except Exception as e:
+            logger.error(f"Login failed: {e}")
+            return {"success": False, "message": "Login failed. Please try again."}
+    
+    async def login_user_async(self, email: str, password: str, ip_address: Optional[str] = None,
+                               user_agent: Optional[str] = None) -> Dict[str, Any]:
+        """
+        login_user for async handlers: bcrypt runs on the password hashing pool
+        and the database work on worker threads. Raises PasswordHasherBusy when
+        the pool is saturated.
+        """
+        try:
+            email = email.lower().strip()
+            user_dict = await asyncio.to_thread(self._load_login_user, email)
+            
+            password_valid = await self._verify_password_async(password, user_dict['salt'], user_dict['password_hash'])
+            new_hash = None
+            if password_valid and self.password_hasher.needs_rehash(user_dict['password_hash']):
+                try:
+                    new_hash = await self._hash_password_async(password, user_dict['salt'])
+                except PasswordHasherBusy:
+                    pass  # Upgrade on a later login rather than fail this one
+            
+            return await asyncio.to_thread(
+                self._complete_login, user_dict, email, password_valid, new_hash, ip_address, user_agent
+            )
+            
+        except PasswordHasherBusy:
+            raise
         except ValidationError as e:
             logger.warning(f"Login validation failed: {e}")
             return {"success": False, "message": str(e)}
@@ -407,11 +389,146 @@ class AuthService:
             logger.error(f"Login failed: {e}")
             return {"success": False, "message": "Login failed. Please try again."}
     
+    def _load_login_user(self, email: str) -> Dict[str, Any]:
+        """Fetch the account for a login and reject inactive or locked accounts"""
+        email_hash = self._hash_email(email)
+        
+        with self._get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                # Get user data
+                cursor.execute("""
+                    SELECT id, email, password_hash, salt, login_attempts, locked_until,
+                           is_active, is_verified, full_name_encrypted, full_name_nonce, full_name_auth_tag,
+                           last_login
+                    FROM users WHERE email_hash = %s
+                """, (email_hash,))
+                
+                user = cursor.fetchone()
+                if not user:
+                    raise ValidationError("Invalid email or password")
+                
+                user_dict = dict(user)
+                
+                # Check if account is active
+                if not user_dict['is_active']:
+                    raise ValidationError("Account is deactivated")
+                
+                # Check if account is locked
+                if self._is_account_locked(user_dict):
+                    raise ValidationError("Account is temporarily locked. Please try again later.")
+                
+                return user_dict
+    
+    def _complete_login(self, user_dict: Dict[str, Any], email: str, password_valid: bool,
+                        new_hash: Optional[str], ip_address: Optional[str],
+                        user_agent: Optional[str]) -> Dict[str, Any]:
+        """Record the attempt; on success upgrade the hash if needed and open a session"""
+        with self._get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                if not password_valid:
+                    # Increment login attempts
+                    login_attempts = user_dict['login_attempts'] + 1
+                    locked_until = None
+                    
+                    if login_attempts >= self.max_login_attempts:
+                        locked_until = datetime.utcnow() + timedelta(seconds=self.lockout_duration)
+                    
+                    cursor.execute("""
+                        UPDATE users SET login_attempts = %s, locked_until = %s
+                        WHERE id = %s
+                    """, (login_attempts, locked_until, user_dict['id']))
+                    conn.commit()
+                    
+                    if locked_until:
+                        raise ValidationError("Too many failed attempts. Account locked for 30 minutes.")
+                    else:
+                        raise ValidationError("Invalid email or password")
+                
+                # Successful login - reset attempts and update last login
+                cursor.execute("""
+                    UPDATE users SET login_attempts = 0, locked_until = NULL, last_login = %s
+                    WHERE id = %s
+                """, (datetime.utcnow(), user_dict['id']))
+                
+                # Upgrade hashes made with an older, cheaper cost factor
+                if new_hash:
+                    cursor.execute("""
+                        UPDATE users SET password_hash = %s WHERE id = %s
+                    """, (new_hash, user_dict['id']))
+                    logger.info(f"🔐 Password hash upgraded to {self.password_hasher.rounds} rounds: {email}")
+                
+                # Generate session tokens
+                access_token, refresh_token = self._generate_tokens(user_dict['id'], email)
+                
+                # Create session record
+                session_id = str(uuid.uuid4())
+                expires_at = datetime.utcnow() + timedelta(seconds=self.access_token_expire)
+                refresh_expires_at = datetime.utcnow() + timedelta(seconds=self.refresh_token_expire)
+                
+                cursor.execute("""
+                    INSERT INTO user_sessions (
+                        id, user_id, session_token, refresh_token,
+                        expires_at, refresh_expires_at, ip_address, user_agent
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                """, (
+                    session_id, user_dict['id'], access_token, refresh_token,
+                    expires_at, refresh_expires_at, ip_address, user_agent
+                ))
+                
+                conn.commit()
+                
+                # Decrypt full name for response
+                full_name = self.encryption.decrypt_data_gcm({
+                    'encrypted_data': user_dict['full_name_encrypted'],
+                    'nonce': user_dict['full_name_nonce'],
+                    'auth_tag': user_dict['full_name_auth_tag']
+                }) if user_dict['full_name_encrypted'] else "User"
+                
+                logger.info(f"✅ User logged in successfully: {email}")
+                
+                return {
+                    "success": True,
+                    "message": "Login successful",
+                    "user": {
+                        "id": user_dict['id'],
+                        "email": email,
+                        "full_name": full_name,
+                        "is_verified": user_dict['is_verified'],
+                        "last_login": user_dict['last_login'].isoformat() if user_dict['last_login'] else None
+                    },
+                    "tokens": {
+                        "access_token": access_token,
+                        "refresh_token": refresh_token,
+                        "token_type": "bearer",
+                        "expires_in": self.access_token_expire
+                    },
+                    "session_id": session_id
+                }
+    
     def verify_token(self, token: str) -> Dict[str, Any]:
         """
         Verify JWT token and return user information
+        
+        Served from the verified-token cache when possible, so most requests
+        authenticate without decoding the JWT or touching the database.
         """
+        start = time.perf_counter()
+        result = self._verify_token(token)
+        TOKEN_VERIFY_SECONDS.labels('verified' if result['valid'] else 'rejected').observe(time.perf_counter() - start)
+        return result
+    
+    def _verify_token(self, token: str) -> Dict[str, Any]:
         try:
+            token_hash = hash_token(token)
+            _revoked_tokens.maybe_sync(self._load_revoked_sessions)
+            if _revoked_tokens.is_revoked(token_hash):
+                _verified_tokens.delete(token_hash)
+                return {"valid": False, "message": "Token revoked"}
+            
+            cached_user = _verified_tokens.get(token_hash)
+            if cached_user is not None:
+                return {"valid": True, "user": dict(cached_user)}
+            
             # Decode token
             payload = jwt.decode(token, self.jwt_secret, algorithms=[self.jwt_algorithm])
             
@@ -425,6 +542,7 @@ class AuthService:
                 raise jwt.InvalidTokenError("Invalid token payload")
             
             # Verify user still exists and is active
+            TOKEN_VERIFY_DB_LOOKUPS.inc()
             with self._get_db_connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute("""
@@ -438,23 +556,24 @@ class AuthService:
                         raise jwt.InvalidTokenError("User not found or inactive")
                     
                     user_dict = dict(user)
-                    
-                    # Decrypt full name
-                    full_name = self.encryption.decrypt_data_gcm({
-                        'encrypted_data': user_dict['full_name_encrypted'],
-                        'nonce': user_dict['full_name_nonce'],
-                        'auth_tag': user_dict['full_name_auth_tag']
-                    }) if user_dict['full_name_encrypted'] else "User"
-                    
-                    return {
-                        "valid": True,
-                        "user": {
-                            "id": user_dict['id'],
-                            "email": user_dict['email'],
-                            "full_name": full_name,
-                            "is_verified": user_dict['is_verified']
-                        }
-                    }
+            
+            # Decrypt full name
+            full_name = self.encryption.decrypt_data_gcm({
+                'encrypted_data': user_dict['full_name_encrypted'],
+                'nonce': user_dict['full_name_nonce'],
+                'auth_tag': user_dict['full_name_auth_tag']
+            }) if user_dict['full_name_encrypted'] else "User"
+            
+            verified_user = {
+                "id": user_dict['id'],
+                "email": user_dict['email'],
+                "full_name": full_name,
+                "is_verified": user_dict['is_verified']
+            }
+            # Never cache past the token's own expiry
+            _verified_tokens.set(token_hash, verified_user, payload.get('exp', 0) - time.time())
+            
+            return {"valid": True, "user": dict(verified_user)}
                     
         except jwt.ExpiredSignatureError:
             return {"valid": False, "message": "Token expired"}
@@ -464,6 +583,28 @@ class AuthService:
             logger.error(f"Token verification failed: {e}")
             return {"valid": False, "message": "Token verification failed"}
     
+    def _load_revoked_sessions(self, since: datetime):
+        """Sessions deactivated since the given time whose access token may still be unexpired"""
+        with self._get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT session_token, last_used FROM user_sessions
+                    WHERE is_active = FALSE AND last_used > %s AND expires_at > %s
+                """, (since, datetime.utcnow()))
+                return cursor.fetchall()
+    
+    def get_token_verification_stats(self) -> Dict[str, Any]:
+        """Verified-token cache, revocation index and per-request verify latency"""
+        counts, _, total = TOKEN_VERIFY_SECONDS.totals()
+        return {
+            'verified': int(TOKEN_VERIFY_SECONDS.totals(result='verified')[1]),
+            'rejected': int(TOKEN_VERIFY_SECONDS.totals(result='rejected')[1]),
+            'db_lookups': int(TOKEN_VERIFY_DB_LOOKUPS.get()),
+            'cache': _verified_tokens.get_stats(),
+            'revocations': _revoked_tokens.get_stats(),
+            'latency': latency_summary(TOKEN_VERIFY_SECONDS.buckets, counts, total)
+        }
+    
     def refresh_token(self, refresh_token: str) -> Dict[str, Any]:
         """
         Generate new access token using refresh token
@@ -528,16 +669,21 @@ class AuthService:
             
             with self._get_db_connection() as conn:
                 with conn.cursor() as cursor:
-                    # Deactivate all sessions for this token
+                    # Deactivate all sessions for this token; last_used lets other workers' revocation sync find it
                     cursor.execute("""
                         UPDATE user_sessions 
-                        SET is_active = FALSE 
+                        SET is_active = FALSE, last_used = %s
                         WHERE session_token = %s
-                    """, (access_token,))
+                    """, (datetime.utcnow(), access_token))
                     
                     conn.commit()
-                    
-                    return {"success": True, "message": "Logged out successfully"}
+            
+            # Reject it in this worker straight away
+            token_hash = hash_token(access_token)
+            _revoked_tokens.add(token_hash)
+            _verified_tokens.delete(token_hash)
+            
+            return {"success": True, "message": "Logged out successfully"}
                     
         except Exception as e:
             logger.error(f"Logout failed: {e}")
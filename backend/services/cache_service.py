@@ -1,18 +1,23 @@
 """
 Secure Cache Service for Artha AI Financial Data
-Handles 24-hour data caching with AES-256-GCM encryption and PostgreSQL
+Handles 24-hour data caching with AES-256-GCM encryption and PostgreSQL,
+fronted by an in-process L1 cache of already-decrypted data
 """
 
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
+from sqlalchemy.dialects import postgresql, sqlite
 import logging
 import json
+import os
 import uuid
 
 from database.config import get_session, SecureCache, CacheAuditLog
 from utils.encryption import encryption
+from utils.ttl_cache import TTLCache
+from core.metrics import register_cache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +30,19 @@ class CacheService:
         self.cache_duration_hours = 24
         self.max_access_count = 1000  # Prevent abuse
         self.encryption_manager = encryption
+        
+        # L1: decrypted financial data per user hash. Entries never outlive the
+        # SecureCache row, and the TTL bounds staleness across worker processes.
+        self.l1_cache = TTLCache(
+            max_entries=int(os.getenv('CACHE_L1_MAX_ENTRIES', '512')),
+            ttl_seconds=float(os.getenv('CACHE_L1_TTL_SECONDS', '300')),
+            name='financial_data_l1'
+        )
+        
+        # L2 (PostgreSQL) lookups that got past L1
+        self.hits = 0
+        self.misses = 0
+        register_cache(self, 'financial_data', tier='postgres')
     
     def _create_user_hash(self, email: str) -> str:
         """Create consistent user hash from email using the encryption manager"""
@@ -77,35 +95,37 @@ class CacheService:
                 "user_email": email  # For verification
             }
             
-            # Encrypt the data using GCM
-            encrypted_data, nonce, auth_tag = self.encryption_manager.encrypt_for_database(cache_data)
+            # Encrypt (and compress, when large) into a single binary envelope
+            envelope = self.encryption_manager.encrypt_envelope(cache_data)
             
             # Calculate expiry time
-            expiry_time = datetime.utcnow() + timedelta(hours=self.cache_duration_hours)
+            now = datetime.utcnow()
+            expiry_time = now + timedelta(hours=self.cache_duration_hours)
+            data_size = len(json.dumps(financial_data, default=str))
+            
+            values = {
+                'user_email_hash': user_hash,
+                'encrypted_blob': envelope,
+                'encrypted_data': None,
+                'encryption_nonce': None,
+                'encryption_tag': None,
+                'cached_at': now,
+                'expires_at': expiry_time,
+                'last_accessed': now,
+                'data_size_bytes': str(data_size),
+                'cache_version': '3.0'
+            }
             
             with get_session() as session:
-                # Remove existing cache for this user
-                session.query(SecureCache).filter(
-                    SecureCache.user_email_hash == user_hash
-                ).delete()
-                
-                # Create new cache entry
-                cache_entry = SecureCache(
-                    user_email_hash=user_hash,
-                    encrypted_data=encrypted_data,
-                    encryption_nonce=nonce,
-                    encryption_tag=auth_tag,
-                    cached_at=datetime.utcnow(),
-                    expires_at=expiry_time,
-                    data_size_bytes=str(len(json.dumps(financial_data)))
-                )
-                
-                session.add(cache_entry)
+                self._upsert_cache_entry(session, values)
                 session.commit()
                 
                 # Log successful operation
                 self._log_operation(session, user_hash, "STORE", True, 
-                                  f"Data size: {len(json.dumps(financial_data))} bytes")
+                                  f"Data size: {data_size} bytes")
+                
+                # Write through so the next read skips the DB and the decrypt
+                self.l1_cache.set(user_hash, financial_data, self._seconds_until(expiry_time))
                 
                 logger.info(f"✅ Financial data cached for user (expires: {expiry_time})")
                 return True
@@ -116,6 +136,24 @@ class CacheService:
                               "STORE", False, str(e))
             return False
     
+    def _upsert_cache_entry(self, session: Session, values: Dict[str, Any]):
+        """Insert or replace the user's cache row in a single statement"""
+        dialect = session.get_bind().dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+            stmt = insert(SecureCache).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[SecureCache.user_email_hash],
+                set_={key: value for key, value in values.items() if key != 'user_email_hash'}
+            )
+            session.execute(stmt)
+        else:
+            session.merge(SecureCache(**values))
+    
+    @staticmethod
+    def _seconds_until(expires_at: datetime) -> float:
+        return (expires_at - datetime.utcnow()).total_seconds()
+    
     def get_cached_financial_data(self, email: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve cached financial data if available and not expired
@@ -129,6 +167,12 @@ class CacheService:
         try:
             user_hash = self._create_user_hash(email)
             
+            # L1 hit: no DB round-trip, no decrypt. Callers must treat the
+            # returned dict as read-only since it is shared between readers.
+            cached = self.l1_cache.get(user_hash)
+            if cached is not None:
+                return cached
+            
             with get_session() as session:
                 # Find active, non-expired cache
                 cache_entry = session.query(SecureCache).filter(
@@ -139,13 +183,15 @@ class CacheService:
                 ).first()
                 
                 if not cache_entry:
+                    self.misses += 1
                     self._log_operation(session, user_hash, "RETRIEVE", False, 
                                       "No valid cache found")
                     return None
+                self.hits += 1
                 
-                # Decrypt data using GCM
-                decrypted_data = self.encryption_manager.decrypt_from_database(
-                    cache_entry.encrypted_data,
+                # Envelope rows, with a fallback for rows still in the base64 format
+                decrypted_data = self.encryption_manager.decrypt_stored(
+                    cache_entry.encrypted_blob or cache_entry.encrypted_data,
                     cache_entry.encryption_nonce,
                     cache_entry.encryption_tag
                 )
@@ -157,8 +203,12 @@ class CacheService:
                 # Log successful access
                 self._log_operation(session, user_hash, "RETRIEVE", True)
                 
+                financial_data = decrypted_data.get("financial_data")
+                if financial_data is not None:
+                    self.l1_cache.set(user_hash, financial_data, self._seconds_until(cache_entry.expires_at))
+                
                 logger.info(f"✅ Retrieved cached data for user")
-                return decrypted_data.get("financial_data")
+                return financial_data
             
         except Exception as e:
             logger.error(f"Failed to retrieve cached data: {e}")
@@ -228,6 +278,9 @@ class CacheService:
         try:
             user_hash = self._create_user_hash(email)
             
+            # Drop L1 first so no reader is served data we are about to delete
+            self.l1_cache.delete(user_hash)
+            
             with get_session() as session:
                 # Delete all cache entries for this user
                 deleted_count = session.query(SecureCache).filter(
@@ -236,6 +289,9 @@ class CacheService:
                 
                 session.commit()
                 
+                # Again after commit, in case a concurrent miss re-filled L1 from the old row
+                self.l1_cache.delete(user_hash)
+                
                 # Log the operation
                 self._log_operation(session, user_hash, "INVALIDATE", True, 
                                   f"Deleted {deleted_count} cache entries")
@@ -261,6 +317,9 @@ class CacheService:
             Dict with cleanup statistics
         """
         try:
+            # L1 entries are capped at their row's expiry, so purging by TTL keeps both tiers in step
+            self.l1_cache.purge_expired()
+            
             with get_session() as session:
                 now = datetime.utcnow()
                 
@@ -313,6 +372,10 @@ class CacheService:
             self._log_operation(None, 'system', 'CLEANUP', False, str(e))
             return {"error": str(e)}
     
+    def get_stats(self) -> Dict[str, Any]:
+        """L2 lookup counters (no database query, safe to call on every scrape)"""
+        return {'hits': self.hits, 'misses': self.misses}
+    
     def get_system_cache_stats(self) -> Dict[str, Any]:
         """
         Get system-wide cache statistics
@@ -356,7 +419,8 @@ class CacheService:
                     'recent_activity_24h': recent_activity,
                     'last_cleanup': last_cleanup.isoformat() if last_cleanup else None,
                     'cache_enabled': True,
-                    'encryption_enabled': True
+                    'encryption_enabled': True,
+                    'l1': self.l1_cache.get_stats()
                 }
                 
         except Exception as e:
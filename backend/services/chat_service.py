@@ -9,10 +9,11 @@ Provides secure storage and retrieval of user chat history.
 import os
 import json
 import hashlib
+import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, desc, func, and_, or_
+from sqlalchemy import create_engine, desc, func, and_, or_, insert
 import logging
 from functools import lru_cache
 import asyncio
@@ -20,7 +21,7 @@ from concurrent.futures import ThreadPoolExecutor
 
 # Import our models
 from database.chat_models import ChatConversation, ChatMessage, ChatAnalytics, ChatFeedback
-from database.config import get_database_url
+from database.config import get_database_url, upgrade_envelope_columns
 from utils.encryption import encryption
 
 logger = logging.getLogger(__name__)
@@ -52,6 +53,7 @@ class ChatService:
         try:
             from database.chat_models import Base
             Base.metadata.create_all(bind=self.engine)
+            upgrade_envelope_columns(self.engine)
             logger.info("✅ Chat tables created/verified")
         except Exception as e:
             logger.error(f"❌ Failed to create chat tables: {e}")
@@ -61,27 +63,27 @@ class ChatService:
         """Hash user ID for privacy"""
         return hashlib.sha256(user_id.encode()).hexdigest()
     
-    def _encrypt_financial_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Encrypt financial data for storage"""
+    def _encrypt_financial_data(self, data: Dict[str, Any]) -> Optional[bytes]:
+        """Encrypt financial data into a binary envelope for storage"""
         if not data:
             return None
         
         try:
-            json_data = json.dumps(data)
-            encrypted_data = encryption.encrypt_for_database(json_data)
-            return encrypted_data
+            return encryption.encrypt_envelope(data)
         except Exception as e:
             logger.error(f"❌ Failed to encrypt financial data: {e}")
             return None
     
-    def _decrypt_financial_data(self, encrypted_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Decrypt financial data from storage"""
-        if not encrypted_data:
+    def _decrypt_financial_data(self, envelope: Optional[bytes], legacy: Any = None) -> Dict[str, Any]:
+        """Decrypt financial data from its envelope, or from the legacy JSON column"""
+        if not envelope and not legacy:
             return None
         
         try:
-            decrypted_json = encryption.decrypt_from_database(encrypted_data)
-            return json.loads(decrypted_json)
+            # Legacy rows hold [ciphertext, nonce, auth_tag] of a JSON string
+            encrypted_data, nonce, auth_tag = (envelope, None, None) if envelope else legacy
+            data = encryption.decrypt_stored(encrypted_data, nonce, auth_tag)
+            return json.loads(data) if isinstance(data, str) else data
         except Exception as e:
             logger.error(f"❌ Failed to decrypt financial data: {e}")
             return None
@@ -107,7 +109,7 @@ class ChatService:
                 conversation = ChatConversation(
                     user_id=hashed_user_id,
                     agent_mode=agent_mode,
-                    financial_context=encrypted_context
+                    financial_context_blob=encrypted_context
                 )
                 
                 session.add(conversation)
@@ -141,51 +143,156 @@ class ChatService:
         Returns:
             Message ID
         """
-        try:
-            encrypted_snapshot = self._encrypt_financial_data(financial_snapshot)
+        return self.add_messages(conversation_id, [{
+            "message_type": message_type,
+            "content": content,
+            "agent_mode": agent_mode,
+            "tokens_used": tokens_used,
+            "processing_time": processing_time,
+            "metadata": metadata,
+            "financial_snapshot": financial_snapshot
+        }])[0]
+    
+    def add_messages(self, conversation_id: str, messages: List[Dict[str, Any]]) -> List[str]:
+        """
+        Add several messages to a conversation in one transaction
+        
+        The messages go in as a single multi-row INSERT and the conversation
+        counters are updated once, so a chat turn costs one commit instead of
+        one per message.
+        
+        Args:
+            conversation_id: Conversation ID
+            messages: Dicts with message_type, content and optionally agent_mode,
+                tokens_used, processing_time, metadata and financial_snapshot
             
+        Returns:
+            Message IDs in the order given
+        """
+        try:
             with self.SessionLocal() as session:
-                # Get conversation to update it
                 conversation = session.query(ChatConversation).filter_by(id=conversation_id).first()
                 if not conversation:
                     raise ValueError(f"Conversation {conversation_id} not found")
                 
-                # Create message
-                message = ChatMessage(
-                    conversation_id=conversation_id,
-                    message_type=message_type,
-                    content=content,
-                    agent_mode=agent_mode,
-                    tokens_used=tokens_used,
-                    processing_time=processing_time,
-                    metadata=metadata,
-                    financial_snapshot=encrypted_snapshot
-                )
+                rows = self._build_message_rows(conversation_id, messages)
+                self._insert_message_rows(session, rows)
+                self._apply_messages_to_conversation(conversation, rows)
+                session.commit()
                 
-                session.add(message)
+                # Invalidate cache for this conversation and user
+                self._invalidate_conversation_cache(conversation_id)
+                self.invalidate_user_cache(conversation.user_id)
                 
-                # Update conversation
-                conversation.update_last_message()
-                conversation.total_tokens_used += tokens_used
+                logger.info(f"✅ Added {len(rows)} messages to conversation {conversation_id}")
+                return [row["id"] for row in rows]
                 
-                # Auto-generate title from first user message
-                if not conversation.title and message_type == 'user' and conversation.message_count == 1:
-                    conversation.title = conversation.generate_title(content)
+        except Exception as e:
+            logger.error(f"❌ Failed to add messages: {e}")
+            raise
+    
+    def save_exchanges(self, exchanges: List[Dict[str, Any]]) -> int:
+        """
+        Persist a batch of chat exchanges in one transaction
+        
+        Each exchange has user_id, conversation_id, agent_mode, messages and a
+        create flag; conversations flagged for creation are inserted with the
+        given ID first. Used by the write-behind queue to flush many turns at once.
+        
+        Args:
+            exchanges: Exchanges to persist, in arrival order
+            
+        Returns:
+            Number of messages written
+        """
+        if not exchanges:
+            return 0
+        
+        try:
+            with self.SessionLocal() as session:
+                conversation_ids = {exchange["conversation_id"] for exchange in exchanges}
+                conversations = {
+                    conversation.id: conversation
+                    for conversation in session.query(ChatConversation).filter(
+                        ChatConversation.id.in_(conversation_ids)
+                    )
+                }
+                
+                rows = []
+                for exchange in exchanges:
+                    conversation_id = exchange["conversation_id"]
+                    conversation = conversations.get(conversation_id)
+                    if conversation is None:
+                        if not exchange.get("create"):
+                            raise ValueError(f"Conversation {conversation_id} not found")
+                        conversation = ChatConversation(
+                            id=conversation_id,
+                            user_id=self._hash_user_id(exchange["user_id"]),
+                            agent_mode=exchange.get("agent_mode") or 'quick',
+                            financial_context_blob=self._encrypt_financial_data(exchange.get("financial_context")),
+                            message_count=0,
+                            total_tokens_used=0
+                        )
+                        session.add(conversation)
+                        conversations[conversation_id] = conversation
+                    
+                    exchange_rows = self._build_message_rows(conversation_id, exchange["messages"])
+                    self._apply_messages_to_conversation(conversation, exchange_rows)
+                    rows.extend(exchange_rows)
                 
+                # Conversations must exist before their messages reference them
+                session.flush()
+                self._insert_message_rows(session, rows)
                 session.commit()
-                session.refresh(message)
                 
-                # Invalidate cache for this conversation and user
-                self._invalidate_conversation_cache(conversation_id)
-                self.invalidate_user_cache(conversation.user_id)
+                for conversation_id, conversation in conversations.items():
+                    self._invalidate_conversation_cache(conversation_id)
+                    self.invalidate_user_cache(conversation.user_id)
                 
-                logger.info(f"✅ Added {message_type} message to conversation {conversation_id}")
-                return message.id
+                logger.info(f"✅ Saved {len(exchanges)} exchanges ({len(rows)} messages) in one transaction")
+                return len(rows)
                 
         except Exception as e:
-            logger.error(f"❌ Failed to add message: {e}")
+            logger.error(f"❌ Failed to save exchanges: {e}")
             raise
     
+    def _build_message_rows(self, conversation_id: str, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Column values for a multi-row ChatMessage insert"""
+        now = datetime.utcnow()
+        rows = []
+        for index, message in enumerate(messages):
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "conversation_id": conversation_id,
+                "message_type": message["message_type"],
+                "content": message["content"],
+                # Offset by position so messages written together keep their order
+                "created_at": now + timedelta(microseconds=index),
+                "agent_mode": message.get("agent_mode"),
+                "tokens_used": int(message.get("tokens_used") or 0),
+                "processing_time": float(message.get("processing_time") or 0.0),
+                "message_metadata": message.get("metadata"),
+                "financial_snapshot_blob": self._encrypt_financial_data(message.get("financial_snapshot")),
+                "is_edited": False,
+                "is_deleted": False
+            })
+        return rows
+    
+    def _insert_message_rows(self, session, rows: List[Dict[str, Any]]):
+        """Insert all rows with one executemany (multi-row VALUES where the driver supports it)"""
+        if rows:
+            session.execute(insert(ChatMessage), rows)
+    
+    def _apply_messages_to_conversation(self, conversation: ChatConversation, rows: List[Dict[str, Any]]):
+        """Update counters, timestamps and the auto-title for newly added messages"""
+        for row in rows:
+            conversation.update_last_message()
+            conversation.total_tokens_used += row["tokens_used"]
+            
+            # Auto-generate title from first user message
+            if not conversation.title and row["message_type"] == 'user' and conversation.message_count == 1:
+                conversation.title = conversation.generate_title(row["content"])
+    
     def _invalidate_conversation_cache(self, conversation_id: str):
         """Invalidate cache for a specific conversation"""
         cache_key = f"conv_{conversation_id}"
@@ -304,12 +411,14 @@ class ChatService:
                         "agent_mode": msg.agent_mode,
                         "tokens_used": msg.tokens_used,
                         "processing_time": msg.processing_time,
-                        "metadata": msg.metadata,
+                        "metadata": msg.message_metadata,
                         "is_edited": msg.is_edited
                     })
                 
                 # Decrypt financial context
-                financial_context = self._decrypt_financial_data(conversation.financial_context)
+                financial_context = self._decrypt_financial_data(
+                    conversation.financial_context_blob, conversation.financial_context
+                )
                 
                 result = {
                     "conversation": conv_data,
@@ -477,6 +586,37 @@ class ChatService:
         
         return result
     
+    async def create_conversation_async(self, user_id: str, agent_mode: str = 'quick',
+                                        financial_context: Dict[str, Any] = None) -> str:
+        """Async version of create_conversation"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            self.create_conversation,
+            user_id,
+            agent_mode,
+            financial_context
+        )
+    
+    async def add_messages_async(self, conversation_id: str, messages: List[Dict[str, Any]]) -> List[str]:
+        """Async version of add_messages"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            self.add_messages,
+            conversation_id,
+            messages
+        )
+    
+    async def save_exchanges_async(self, exchanges: List[Dict[str, Any]]) -> int:
+        """Async version of save_exchanges"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            self.save_exchanges,
+            exchanges
+        )
+    
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics for monitoring"""
         return {
@@ -0,0 +1,156 @@
+"""
+Write-behind queue for chat persistence
+=======================================
+
+Chat turns are handed to a background worker instead of being written on the
+response path. The worker drains whatever has queued up and writes it with
+ChatService.save_exchanges, so a burst of turns costs one transaction rather
+than one commit per message.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHAT_WRITE_QUEUE_SIZE = int(os.getenv("CHAT_WRITE_QUEUE_SIZE", "1000"))
+CHAT_WRITE_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "100"))
+
+
+class ChatWriteBehindQueue:
+    """Buffers chat exchanges and persists them in batches off the request path"""
+
+    def __init__(self, chat_service, max_size: int = None, max_batch: int = None):
+        self.chat_service = chat_service
+        self.max_size = max_size or CHAT_WRITE_QUEUE_SIZE
+        self.max_batch = max_batch or CHAT_WRITE_BATCH_SIZE
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Counters
+        self.submitted = 0
+        self.written_exchanges = 0
+        self.written_messages = 0
+        self.batches = 0
+        self.failed = 0
+        self.backpressured = 0
+        self.total_write_time = 0.0
+
+    def start(self):
+        """Start the worker on the running loop (no-op if already running there)"""
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+        if self._queue is not None and self._loop is not loop and self._queue.qsize():
+            logger.warning(f"⚠️ Chat write queue restarted on a new event loop, "
+                           f"{self._queue.qsize()} exchanges dropped")
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._worker = loop.create_task(self._run())
+        logger.info(f"✅ Chat write-behind queue started (size={self.max_size}, batch={self.max_batch})")
+
+    async def submit(self, user_id: str, messages: List[Dict[str, Any]], conversation_id: str = None,
+                     agent_mode: str = 'quick') -> str:
+        """
+        Queue an exchange for persistence and return its conversation ID
+
+        A new conversation gets its ID here so callers can use it straight away.
+        When the queue is full the exchange is written inline instead, which
+        applies backpressure rather than dropping history.
+        """
+        self.start()
+        exchange = {
+            "user_id": user_id,
+            "conversation_id": conversation_id or str(uuid.uuid4()),
+            "create": conversation_id is None,
+            "agent_mode": agent_mode,
+            "messages": messages
+        }
+        self.submitted += 1
+        try:
+            self._queue.put_nowait(exchange)
+        except asyncio.QueueFull:
+            self.backpressured += 1
+            logger.warning("⚠️ Chat write queue full, writing exchange inline")
+            await self._write([exchange])
+        return exchange["conversation_id"]
+
+    async def _run(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        start = time.perf_counter()
+        try:
+            messages = await self.chat_service.save_exchanges_async(batch)
+            self._record(len(batch), messages, start)
+        except Exception as e:
+            if len(batch) == 1:
+                self.failed += 1
+                logger.error(f"❌ Failed to persist chat exchange: {e}")
+                return
+            # Retry one by one so a single bad exchange doesn't lose the whole batch
+            logger.warning(f"⚠️ Batch of {len(batch)} chat exchanges failed, retrying individually: {e}")
+            for exchange in batch:
+                await self._write([exchange])
+
+    def _record(self, exchanges: int, messages: int, start: float):
+        self.batches += 1
+        self.written_exchanges += exchanges
+        self.written_messages += messages
+        self.total_write_time += time.perf_counter() - start
+
+    async def flush(self):
+        """Wait until everything queued so far has been written"""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def stop(self, timeout: float = 10.0):
+        """Flush pending exchanges (up to timeout) and stop the worker"""
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self.flush(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"❌ Chat write queue stopped with {self._queue.qsize()} exchanges unwritten")
+        worker, self._worker = self._worker, None
+        worker.cancel()
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
+        logger.info("✅ Chat write-behind queue stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, batching and failure counters"""
+        return {
+            'running': self._worker is not None and not self._worker.done(),
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'max_size': self.max_size,
+            'max_batch': self.max_batch,
+            'submitted': self.submitted,
+            'written_exchanges': self.written_exchanges,
+            'written_messages': self.written_messages,
+            'batches': self.batches,
+            'avg_batch_size': round(self.written_exchanges / self.batches, 2) if self.batches else 0.0,
+            'avg_write_ms': round(self.total_write_time / self.batches * 1000, 2) if self.batches else 0.0,
+            'failed': self.failed,
+            'backpressured': self.backpressured
+        }
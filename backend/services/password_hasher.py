@@ -0,0 +1,158 @@
+"""
+Password Hashing Pool for Artha AI
+==================================
+
+Runs bcrypt hashing and verification on a dedicated, bounded thread pool so
+async handlers await password KDF work instead of blocking the event loop.
+bcrypt releases the GIL while it works, so threads run it in parallel across
+cores without the pickling cost of a process pool.
+
+Admission is capped: once PASSWORD_HASH_MAX_PENDING operations are running or
+queued, new ones fail fast with PasswordHasherBusy (mapped to 503) rather than
+queueing behind a login burst. Hashes below the configured cost factor are
+reported by needs_rehash() so they can be upgraded on the next login.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", "0"))  # >0 calibrates rounds at startup
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 8)))
+
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+
+
+class PasswordHasherBusy(Exception):
+    """Too many password hashing operations are already running or queued"""
+    pass
+
+
+def calibrate_rounds(target_ms: float, minimum: int = MIN_BCRYPT_ROUNDS, maximum: int = MAX_BCRYPT_ROUNDS) -> int:
+    """Highest bcrypt cost whose hash time on this machine stays within target_ms"""
+    start = time.perf_counter()
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(minimum))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    # Each extra round doubles the work
+    rounds = minimum
+    while rounds < maximum and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms *= 2
+    return rounds
+
+
+class PasswordHasher:
+    """Bounded thread pool for bcrypt hash/verify with fast rejection when saturated"""
+
+    def __init__(self, rounds: int = None, max_workers: int = None, max_pending: int = None):
+        self.rounds = rounds or BCRYPT_ROUNDS
+        self.max_workers = max_workers or PASSWORD_HASH_WORKERS
+        self.max_pending = max_pending or PASSWORD_HASH_MAX_PENDING
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+
+        # Counters
+        self.pending = 0
+        self.peak_pending = 0
+        self.hashes = 0
+        self.verifications = 0
+        self.rejected = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def hash_sync(self, password: bytes) -> str:
+        """Hash on the calling thread"""
+        return bcrypt.hashpw(password, bcrypt.gensalt(self.rounds)).decode('utf-8')
+
+    def verify_sync(self, password: bytes, hashed: str) -> bool:
+        """Verify on the calling thread"""
+        return bcrypt.checkpw(password, hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Whether a stored hash was made with a lower cost factor than configured"""
+        try:
+            # $2b$12$<salt+hash>
+            return int(hashed.split('$')[2]) < self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    async def hash(self, password: bytes) -> str:
+        """Hash on the pool; raises PasswordHasherBusy when saturated"""
+        result = await self._submit(self.hash_sync, password)
+        with self._lock:
+            self.hashes += 1
+        return result
+
+    async def verify(self, password: bytes, hashed: str) -> bool:
+        """Verify on the pool; raises PasswordHasherBusy when saturated"""
+        result = await self._submit(self.verify_sync, password, hashed)
+        with self._lock:
+            self.verifications += 1
+        return result
+
+    async def _submit(self, fn: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordHasherBusy(f"{self.pending} password operations already in flight")
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.pending -= 1
+                self.total_time += elapsed
+                self.max_time = max(self.max_time, elapsed)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool saturation, rejection and latency metrics"""
+        completed = self.hashes + self.verifications
+        return {
+            'rounds': self.rounds,
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'peak_pending': self.peak_pending,
+            'hashes': self.hashes,
+            'verifications': self.verifications,
+            'rejected': self.rejected,
+            'avg_ms': round(self.total_time / completed * 1000, 2) if completed else 0.0,
+            'max_ms': round(self.max_time * 1000, 2)
+        }
+
+
+_password_hasher: Optional[PasswordHasher] = None
+_password_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the process-wide password hasher"""
+    global _password_hasher
+    if _password_hasher is None:
+        with _password_hasher_lock:
+            if _password_hasher is None:
+                rounds = BCRYPT_ROUNDS
+                if BCRYPT_TARGET_MS > 0:
+                    rounds = calibrate_rounds(BCRYPT_TARGET_MS)
+                    logger.info(f"✅ bcrypt cost calibrated to {rounds} rounds for ~{BCRYPT_TARGET_MS:.0f}ms")
+                _password_hasher = PasswordHasher(rounds=rounds)
+    return _password_hasher
@@ -0,0 +1,361 @@
+"""
+PDF Extraction Pool for Artha AI
+================================
+
+Runs PDF text extraction in a pool of worker processes so uploads never block
+the event loop. A document's pages are fanned out across the workers in small
+chunks and each page is extracted independently: pdfplumber text and tables
+first, then PyPDF2, then OCR. OCR rasterizes only the page it needs
+(pypdfium2, or pdf2image as a fallback) instead of converting the whole
+document up front.
+
+Workers read the upload from a temporary file rather than receiving the bytes
+with every task. At most PDF_EXTRACTION_MAX_JOBS documents are extracted at
+once; up to PDF_EXTRACTION_MAX_QUEUED more wait for a slot, and beyond that
+new jobs fail fast with PDFExtractionBusy (mapped to 503).
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS") or os.cpu_count() or 2)
+PDF_EXTRACTION_MAX_JOBS = int(os.getenv("PDF_EXTRACTION_MAX_JOBS", "4"))
+PDF_EXTRACTION_MAX_QUEUED = int(os.getenv("PDF_EXTRACTION_MAX_QUEUED", "32"))
+PDF_EXTRACTION_PAGES_PER_TASK = int(os.getenv("PDF_EXTRACTION_PAGES_PER_TASK", "2"))
+PDF_OCR_DPI = int(os.getenv("PDF_OCR_DPI", "300"))
+
+# PDF libraries with graceful fallback (imported in every worker process too)
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+try:
+    import pdfplumber
+    PDFPLUMBER_AVAILABLE = True
+except ImportError:
+    PDFPLUMBER_AVAILABLE = False
+
+try:
+    import pytesseract
+    OCR_AVAILABLE = True
+except ImportError:
+    OCR_AVAILABLE = False
+
+try:
+    import pypdfium2
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+MISSING_LIBRARIES_MESSAGE = (
+    "PDF processing libraries not fully available. Please install: pip install pdfplumber PyPDF2 pytesseract Pillow"
+)
+
+
+class PDFExtractionBusy(Exception):
+    """Too many PDF extraction jobs are already running or queued"""
+    pass
+
+
+@dataclass
+class PageResult:
+    """Extracted text for one page; method is pdfplumber, pypdf2, ocr or None when nothing was found"""
+    page_number: int
+    text: str
+    method: Optional[str]
+    elapsed_ms: float
+    error: Optional[str] = None
+    page_count: int = 0
+
+
+# Worker-side functions: module level so the process pool can pickle them
+
+def count_pages(path: str) -> int:
+    if PDFIUM_AVAILABLE:
+        document = pypdfium2.PdfDocument(path)
+        try:
+            return len(document)
+        finally:
+            document.close()
+    if PDFPLUMBER_AVAILABLE:
+        with pdfplumber.open(path) as pdf:
+            return len(pdf.pages)
+    return len(PyPDF2.PdfReader(path).pages)
+
+
+def _plumber_page_text(page, page_number: int) -> str:
+    text = ""
+    page_text = page.extract_text()
+    if page_text:
+        text += f"\n--- Page {page_number} ---\n{page_text}\n"
+    for table_num, table in enumerate(page.extract_tables()):
+        text += f"\n--- Table {table_num + 1} on Page {page_number} ---\n"
+        for row in table:
+            if row:
+                text += " | ".join([cell or "" for cell in row]) + "\n"
+    return text
+
+
+def _rasterize_page(path: str, index: int):
+    """Render a single page for OCR"""
+    if PDFIUM_AVAILABLE:
+        document = pypdfium2.PdfDocument(path)
+        try:
+            return document[index].render(scale=PDF_OCR_DPI / 72).to_pil()
+        finally:
+            document.close()
+    from pdf2image import convert_from_path
+    return convert_from_path(path, dpi=PDF_OCR_DPI, first_page=index + 1, last_page=index + 1)[0]
+
+
+def extract_page_range(path: str, start: int, stop: int, ocr: bool = True) -> List[PageResult]:
+    """Extract pages [start, stop) of the PDF at path, falling back per page"""
+    results = []
+    plumber = pdfplumber.open(path) if PDFPLUMBER_AVAILABLE else None
+    reader = None
+    try:
+        for index in range(start, stop):
+            page_number = index + 1
+            began = time.perf_counter()
+            text, method, error = "", None, None
+
+            if plumber is not None:
+                try:
+                    text = _plumber_page_text(plumber.pages[index], page_number)
+                    method = "pdfplumber"
+                except Exception as e:
+                    error = f"pdfplumber: {e}"
+
+            if not text.strip() and PYPDF2_AVAILABLE:
+                try:
+                    reader = reader or PyPDF2.PdfReader(path)
+                    page_text = reader.pages[index].extract_text()
+                    text = f"\n--- Page {page_number} ---\n{page_text}\n" if page_text else ""
+                    method = "pypdf2"
+                except Exception as e:
+                    error = f"pypdf2: {e}"
+
+            if not text.strip() and ocr and OCR_AVAILABLE:
+                try:
+                    page_text = pytesseract.image_to_string(_rasterize_page(path, index), lang='eng')
+                    text = f"\n--- Page {page_number} (OCR) ---\n{page_text}\n" if page_text.strip() else ""
+                    method = "ocr"
+                except Exception as e:
+                    error = f"ocr: {e}"
+
+            results.append(PageResult(
+                page_number=page_number,
+                text=text if text.strip() else "",
+                method=method if text.strip() else None,
+                elapsed_ms=(time.perf_counter() - began) * 1000,
+                error=None if text.strip() else error
+            ))
+    finally:
+        if plumber is not None:
+            plumber.close()
+    return results
+
+
+def join_pages(pages: List[PageResult], filename: str) -> Optional[str]:
+    """Document text from page results in any order, or None when every page was empty"""
+    pages = sorted(pages, key=lambda page: page.page_number)
+    text = "".join(page.text for page in pages)
+    if not text.strip():
+        logger.warning(f"⚠️ No text extracted from {filename}")
+        return None
+    methods = {page.method for page in pages if page.method}
+    logger.info(f"✅ Extracted {len(text)} characters from {len(pages)} pages of {filename} ({', '.join(sorted(methods))})")
+    return text
+
+
+class PDFExtractionPool:
+    """Process pool that extracts PDF pages in parallel with bounded concurrent jobs"""
+
+    def __init__(self, max_workers: int = None, max_jobs: int = None, max_queued: int = None,
+                 pages_per_task: int = None):
+        self.max_workers = max_workers or PDF_EXTRACTION_WORKERS
+        self.max_jobs = max_jobs or PDF_EXTRACTION_MAX_JOBS
+        self.max_queued = PDF_EXTRACTION_MAX_QUEUED if max_queued is None else max_queued
+        self.pages_per_task = pages_per_task or PDF_EXTRACTION_PAGES_PER_TASK
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._running = 0
+        self._waiters: deque = deque()
+
+        # Counters
+        self.jobs = 0
+        self.pages = 0
+        self.ocr_pages = 0
+        self.failed_jobs = 0
+        self.rejected = 0
+        self.peak_queued = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                if "forkserver" in methods:
+                    # Workers fork from a clean server process instead of the threaded app
+                    context = multiprocessing.get_context("forkserver")
+                    context.set_forkserver_preload([__name__])
+                else:
+                    context = multiprocessing.get_context("spawn")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=context
+                )
+                logger.info(f"✅ PDF extraction pool started with {self.max_workers} workers")
+            return self._executor
+
+    async def _acquire(self):
+        with self._lock:
+            if self._running < self.max_jobs:
+                self._running += 1
+                return
+            if len(self._waiters) >= self.max_queued:
+                self.rejected += 1
+                raise PDFExtractionBusy(f"{self._running} PDF extractions running, {len(self._waiters)} queued")
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self.peak_queued = max(self.peak_queued, len(self._waiters))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            if not waiter.cancelled():
+                # The slot was handed over just as we were cancelled; _wake releases it otherwise
+                self._release()
+            raise
+
+    def _release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    # Hand the slot straight to the next job; _running stays the same
+                    waiter.get_loop().call_soon_threadsafe(self._wake, waiter)
+                    return
+            self._running -= 1
+
+    def _wake(self, waiter):
+        if waiter.cancelled():
+            self._release()
+        else:
+            waiter.set_result(None)
+
+    async def iter_pages(self, file_content: bytes, filename: str = "document.pdf",
+                         ocr: bool = True) -> AsyncIterator[PageResult]:
+        """
+        Yield each page's PageResult as soon as its worker finishes (not in page order).
+        Raises PDFExtractionBusy when the pool is saturated.
+        """
+        fd, path = tempfile.mkstemp(suffix=".pdf", prefix="artha_pdf_")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(file_content)
+            async for page in self.iter_pages_from_path(path, filename, ocr):
+                yield page
+        finally:
+            os.unlink(path)
+
+    async def iter_pages_from_path(self, path: str, filename: str = "document.pdf",
+                                   ocr: bool = True) -> AsyncIterator[PageResult]:
+        """iter_pages for a PDF already on disk; the caller owns (and deletes) the file"""
+        await self._acquire()
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        futures = []
+        failed = True
+        try:
+            page_count = await loop.run_in_executor(executor, count_pages, path)
+            logger.info(f"📊 {filename}: fanning {page_count} pages out to {self.max_workers} workers")
+
+            futures = [
+                asyncio.wrap_future(executor.submit(
+                    extract_page_range, path, start, min(start + self.pages_per_task, page_count), ocr
+                ))
+                for start in range(0, page_count, self.pages_per_task)
+            ]
+            for next_done in asyncio.as_completed(futures):
+                for page in await next_done:
+                    page.page_count = page_count
+                    with self._lock:
+                        self.pages += 1
+                        if page.method == "ocr":
+                            self.ocr_pages += 1
+                    yield page
+            failed = False
+        finally:
+            for future in futures:
+                future.cancel()
+            # Cancelled chunks never start; running ones only need the file until they finish
+            await asyncio.gather(*futures, return_exceptions=True)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.jobs += 1
+                self.failed_jobs += int(failed)
+                self.total_time += elapsed
+                self.max_time = max(self.max_time, elapsed)
+            self._release()
+
+    async def extract_text(self, file_content: bytes, filename: str = "document.pdf") -> Optional[str]:
+        """Whole-document text in page order, or None when nothing could be extracted"""
+        if not (PDFPLUMBER_AVAILABLE or PYPDF2_AVAILABLE):
+            return MISSING_LIBRARIES_MESSAGE
+        return join_pages([page async for page in self.iter_pages(file_content, filename)], filename)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool saturation and job latency metrics"""
+        return {
+            'max_workers': self.max_workers,
+            'max_jobs': self.max_jobs,
+            'max_queued': self.max_queued,
+            'running': self._running,
+            'queued': len(self._waiters),
+            'peak_queued': self.peak_queued,
+            'jobs': self.jobs,
+            'failed_jobs': self.failed_jobs,
+            'rejected': self.rejected,
+            'pages': self.pages,
+            'ocr_pages': self.ocr_pages,
+            'avg_ms': round(self.total_time / self.jobs * 1000, 2) if self.jobs else 0.0,
+            'max_ms': round(self.max_time * 1000, 2)
+        }
+
+
+_pdf_extraction_pool: Optional[PDFExtractionPool] = None
+_pdf_extraction_pool_lock = threading.Lock()
+
+
+def get_pdf_extraction_pool() -> PDFExtractionPool:
+    """Return the process-wide PDF extraction pool"""
+    global _pdf_extraction_pool
+    if _pdf_extraction_pool is None:
+        with _pdf_extraction_pool_lock:
+            if _pdf_extraction_pool is None:
+                _pdf_extraction_pool = PDFExtractionPool()
+    return _pdf_extraction_pool
@@ -0,0 +1,319 @@
+"""
+Streaming PDF Ingestion
+=======================
+
+Uploads are spooled from the request stream to a temp file in fixed-size
+chunks and cut off as soon as they pass the size limit, so memory per upload
+stays bounded no matter what the client sends. Each spooled file is then
+processed as a background job: pages are extracted in the extraction pool
+from the file on disk, and every finished page (with the transactions found
+on it) is published as an event that clients follow over SSE.
+
+Jobs keep a bounded ring of recent events, replayed to subscribers that
+connect late. A subscriber that falls behind the ring, or reconnects with an
+old Last-Event-ID, gets a status snapshot instead of the missed events.
+Finished jobs are kept for PDF_INGEST_JOB_TTL_SECONDS so the result can be
+fetched after the stream ends.
+"""
+
+import asyncio
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from services.pdf_extraction_pool import (
+    PDF_EXTRACTION_MAX_JOBS, PDF_EXTRACTION_MAX_QUEUED, PDFExtractionBusy
+)
+
+logger = logging.getLogger(__name__)
+
+PDF_INGEST_CHUNK_BYTES = int(os.getenv("PDF_INGEST_CHUNK_BYTES", str(64 * 1024)))
+PDF_INGEST_MAX_ACTIVE_JOBS = int(
+    os.getenv("PDF_INGEST_MAX_ACTIVE_JOBS") or PDF_EXTRACTION_MAX_JOBS + PDF_EXTRACTION_MAX_QUEUED
+)
+PDF_INGEST_MAX_RETAINED_JOBS = int(os.getenv("PDF_INGEST_MAX_RETAINED_JOBS", "1000"))
+PDF_INGEST_JOB_TTL_SECONDS = float(os.getenv("PDF_INGEST_JOB_TTL_SECONDS", "900"))
+PDF_INGEST_EVENT_BUFFER = int(os.getenv("PDF_INGEST_EVENT_BUFFER", "256"))
+PDF_INGEST_KEEPALIVE_SECONDS = float(os.getenv("PDF_INGEST_KEEPALIVE_SECONDS", "15"))
+
+# The PDF header must appear within the first 1024 bytes
+PDF_MAGIC = b"%PDF-"
+PDF_MAGIC_WINDOW = 1024
+
+TERMINAL_STATUSES = ("complete", "failed")
+
+
+class UploadTooLarge(Exception):
+    """Raised while spooling once an upload passes the size limit"""
+
+
+class InvalidUpload(Exception):
+    """Raised when the uploaded bytes are not a PDF"""
+
+
+class PDFIngestionBusy(Exception):
+    """Raised when too many ingestion jobs are already active"""
+
+
+async def spool_upload(chunks: AsyncIterator[bytes], max_bytes: int,
+                       chunk_size: int = PDF_INGEST_CHUNK_BYTES) -> Tuple[str, int]:
+    """
+    Write an upload stream to a temp file and return (path, size). Raises UploadTooLarge
+    as soon as max_bytes is passed and InvalidUpload when the stream isn't a PDF.
+    The caller owns (and deletes) the returned file.
+    """
+    fd, path = tempfile.mkstemp(suffix=".pdf", prefix="artha_upload_")
+    size = 0
+    head = b""
+    # Request chunks are gathered into chunk_size writes, each run off the event loop
+    pending = bytearray()
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {max_bytes} bytes")
+                if len(head) < PDF_MAGIC_WINDOW:
+                    head += chunk[:PDF_MAGIC_WINDOW - len(head)]
+                    if len(head) >= PDF_MAGIC_WINDOW and PDF_MAGIC not in head:
+                        raise InvalidUpload("Upload is not a PDF")
+                pending += chunk
+                if len(pending) >= chunk_size:
+                    await asyncio.to_thread(f.write, pending)
+                    pending.clear()
+            if pending:
+                await asyncio.to_thread(f.write, pending)
+        if PDF_MAGIC not in head:
+            raise InvalidUpload("Upload is empty" if size == 0 else "Upload is not a PDF")
+        return path, size
+    except BaseException:
+        os.unlink(path)
+        raise
+
+
+class IngestionJob:
+    """State and event history of one background PDF ingestion"""
+
+    def __init__(self, job_id: str, filename: str, size: int, event_buffer: int = PDF_INGEST_EVENT_BUFFER):
+        self.job_id = job_id
+        self.filename = filename
+        self.size = size
+        self.status = "queued"
+        self.pages_total = 0
+        self.pages_done = 0
+        self.transactions_found = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.seq = 0
+        self.events: deque = deque(maxlen=event_buffer)
+        # Replaced on every publish; subscribers wait on the one they saw last
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        """Apply a progress event to the job and wake subscribers"""
+        if self.finished:
+            return
+        if event_type == "page":
+            self.pages_done += 1
+            self.pages_total = data.get("pages_total", self.pages_total)
+            self.transactions_found += len(data.get("transactions", ()))
+            data = {**data, "pages_done": self.pages_done}
+        elif event_type in ("extracting", "parsing"):
+            self.status = event_type
+        elif event_type == "complete":
+            self.status = "complete"
+            self.result = data.get("result")
+        elif event_type == "failed":
+            self.status = "failed"
+            self.error = data.get("error")
+        if self.finished:
+            self.finished_at = time.time()
+
+        self.seq += 1
+        self.events.append((self.seq, {"type": event_type, "job_id": self.job_id, **data}))
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current status, including the result once complete"""
+        return {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "size": self.size,
+            "status": self.status,
+            "pages_total": self.pages_total,
+            "pages_done": self.pages_done,
+            "transactions_found": self.transactions_found,
+            "error": self.error,
+            "result": self.result,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+    async def subscribe(self, last_seq: Optional[int] = None,
+                        keepalive: float = PDF_INGEST_KEEPALIVE_SECONDS) -> AsyncIterator[Tuple[Optional[int], Optional[Dict[str, Any]]]]:
+        """
+        Yield (seq, event) until the job finishes, from the start or after last_seq when
+        those events are still buffered, otherwise from a snapshot. Yields (None, None)
+        after keepalive idle seconds.
+        """
+        if last_seq is None and (not self.events or self.events[0][0] == 1):
+            # The whole history is still buffered, so replay it
+            last_seq = 0
+        while True:
+            changed = self._changed
+            oldest = self.events[0][0] if self.events else self.seq + 1
+            if last_seq is None or last_seq > self.seq or oldest > last_seq + 1:
+                # The events this subscriber needs have left the ring
+                last_seq = self.seq
+                yield last_seq, {"type": "snapshot", **self.snapshot()}
+            for seq, event in list(self.events):
+                if seq > last_seq:
+                    last_seq = seq
+                    yield seq, event
+            if self.finished and last_seq >= self.seq:
+                return
+            if self._changed is not changed:
+                continue
+            try:
+                await asyncio.wait_for(changed.wait(), keepalive)
+            except asyncio.TimeoutError:
+                yield None, None
+
+
+class PDFIngestionManager:
+    """Runs spooled uploads as background jobs and keeps finished jobs for a while"""
+
+    def __init__(self, processor=None, max_active_jobs: int = PDF_INGEST_MAX_ACTIVE_JOBS,
+                 max_retained_jobs: int = PDF_INGEST_MAX_RETAINED_JOBS,
+                 job_ttl_seconds: float = PDF_INGEST_JOB_TTL_SECONDS,
+                 event_buffer: int = PDF_INGEST_EVENT_BUFFER):
+        self._processor = processor
+        self.max_active_jobs = max_active_jobs
+        self.max_retained_jobs = max_retained_jobs
+        self.job_ttl_seconds = job_ttl_seconds
+        self.event_buffer = event_buffer
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._tasks: set = set()
+
+        # Counters
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @property
+    def processor(self):
+        if self._processor is None:
+            from services.pdf_processor_service import get_pdf_processor_service
+            self._processor = get_pdf_processor_service()
+        return self._processor
+
+    @property
+    def active_jobs(self) -> int:
+        return len(self._tasks)
+
+    def has_capacity(self) -> bool:
+        return self.active_jobs < self.max_active_jobs
+
+    def submit(self, path: str, filename: str, size: int) -> IngestionJob:
+        """
+        Start processing a spooled upload in the background. The job takes ownership
+        of path. Raises PDFIngestionBusy (leaving path to the caller) when full.
+        """
+        self._purge()
+        if not self.has_capacity():
+            self.rejected += 1
+            raise PDFIngestionBusy(f"{self.active_jobs} PDF ingestion jobs active")
+        job = IngestionJob(secrets.token_urlsafe(16), filename, size, self.event_buffer)
+        self._jobs[job.job_id] = job
+        self.submitted += 1
+        task = asyncio.create_task(self._run(job, path))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info(f"📥 Ingestion job {job.job_id} queued for {filename} ({size} bytes)")
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        self._purge()
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: IngestionJob, path: str):
+        try:
+            result = await self.processor.process_pdf_file(path, job.filename, progress=job.publish)
+            if result.get("success"):
+                job.publish("complete", {"result": result})
+            else:
+                job.publish("failed", {"error": result.get("message", "PDF processing failed")})
+        except PDFExtractionBusy:
+            job.publish("failed", {"error": "PDF processing is at capacity, please retry shortly"})
+        except asyncio.CancelledError:
+            job.publish("failed", {"error": "PDF processing was cancelled"})
+            raise
+        except Exception as e:
+            logger.error(f"❌ Ingestion job {job.job_id} failed: {e}")
+            job.publish("failed", {"error": f"PDF processing failed: {str(e)}"})
+        finally:
+            if job.status == "complete":
+                self.completed += 1
+            else:
+                self.failed += 1
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _purge(self):
+        # Insertion order is submission order, so expired jobs sit at the front
+        now = time.time()
+        for job_id in list(self._jobs):
+            job = self._jobs[job_id]
+            expired = job.finished and now - job.finished_at >= self.job_ttl_seconds
+            if not expired and len(self._jobs) <= self.max_retained_jobs:
+                break
+            if job.finished:
+                del self._jobs[job_id]
+
+    async def shutdown(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'active_jobs': self.active_jobs,
+            'max_active_jobs': self.max_active_jobs,
+            'retained_jobs': len(self._jobs),
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected
+        }
+
+
+_pdf_ingestion_manager: Optional[PDFIngestionManager] = None
+_pdf_ingestion_manager_lock = threading.Lock()
+
+
+def get_pdf_ingestion_manager() -> PDFIngestionManager:
+    """Get the process-wide ingestion manager"""
+    global _pdf_ingestion_manager
+    if _pdf_ingestion_manager is None:
+        with _pdf_ingestion_manager_lock:
+            if _pdf_ingestion_manager is None:
+                _pdf_ingestion_manager = PDFIngestionManager()
+    return _pdf_ingestion_manager
@@ -0,0 +1,205 @@
+"""
+Content-addressed cache for parsed PDF statements
+=================================================
+
+Users re-upload the same statement many times. Parsed results are keyed by an
+HMAC-SHA256 of the uploaded bytes (keyed with the encryption key, so the
+stored digests can't be matched against a copy of a known statement) and kept
+in an embedded SQLite file as AES-256-GCM envelopes from EncryptionManager.
+
+The cache is bounded by total envelope bytes and entry count, evicting least
+recently used rows first, and entries expire after PDF_CACHE_TTL_DAYS. Rows
+written by a different parser version are treated as misses, so parser
+changes never serve stale parses.
+"""
+
+import hashlib
+import hmac
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from core.metrics import register_cache
+from utils.sqlite_store import SQLiteConnections
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_ENABLED = os.getenv("PDF_CACHE_ENABLED", "true").lower() == "true"
+PDF_CACHE_PATH = os.getenv("PDF_CACHE_PATH", "user_data/pdf_parse_cache.db")
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+PDF_CACHE_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MAX_ENTRIES", "5000"))
+PDF_CACHE_TTL_DAYS = float(os.getenv("PDF_CACHE_TTL_DAYS", "30"))
+
+PDF_CACHE_TABLE = "pdf_parse_cache"
+
+
+class PDFParseCache:
+    """Encrypted, size-bounded LRU of parsed statements keyed by content digest"""
+
+    def __init__(self, path: str = PDF_CACHE_PATH, max_bytes: int = PDF_CACHE_MAX_BYTES,
+                 max_entries: int = PDF_CACHE_MAX_ENTRIES, ttl_days: float = PDF_CACHE_TTL_DAYS,
+                 encryption_manager=None, clock=time.time):
+        if encryption_manager is None:
+            from utils.encryption import encryption as encryption_manager
+        self.encryption_manager = encryption_manager
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_days * 86400
+        self.clock = clock
+        self._digest_key = hashlib.sha256(b"artha-pdf-cache:" + encryption_manager.key).digest()
+        self._db = SQLiteConnections(path)
+        with self._db.transaction() as conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {PDF_CACHE_TABLE} (
+                    digest TEXT PRIMARY KEY,
+                    parser_version TEXT NOT NULL,
+                    envelope BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{PDF_CACHE_TABLE}_last_used ON {PDF_CACHE_TABLE} (last_used)"
+            )
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.errors = 0
+        register_cache(self, "pdf_parse", tier="sqlite")
+
+    def digest(self, file_content: bytes) -> str:
+        """Content address of an upload (HMAC-SHA256 of the bytes)"""
+        return hmac.new(self._digest_key, file_content, hashlib.sha256).hexdigest()
+
+    def digest_file(self, path: str, chunk_size: int = 1024 * 1024) -> str:
+        """digest() of a spooled upload, read in chunks"""
+        digest = hmac.new(self._digest_key, digestmod=hashlib.sha256)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get(self, digest: str, parser_version: str) -> Optional[Dict[str, Any]]:
+        """Return the cached parse for digest, or None on a miss"""
+        try:
+            conn = self._db.connection()
+            row = conn.execute(
+                f"SELECT parser_version, envelope, created_at FROM {PDF_CACHE_TABLE} WHERE digest = ?", (digest,)
+            ).fetchone()
+            if row is None or row[0] != parser_version:
+                self.misses += 1
+                return None
+            now = self.clock()
+            if now - row[2] >= self.ttl_seconds:
+                conn.execute(f"DELETE FROM {PDF_CACHE_TABLE} WHERE digest = ?", (digest,))
+                self.misses += 1
+                return None
+
+            payload = self.encryption_manager.decrypt_envelope(row[1])
+            # The digest is sealed inside the envelope so rows can't be swapped between keys
+            if payload.get("digest") != digest:
+                raise ValueError("cached envelope belongs to a different digest")
+            conn.execute(f"UPDATE {PDF_CACHE_TABLE} SET last_used = ? WHERE digest = ?", (now, digest))
+            self.hits += 1
+            return payload["data"]
+        except Exception as e:
+            self.errors += 1
+            self.misses += 1
+            logger.warning(f"⚠️ PDF parse cache read failed: {e}")
+            return None
+
+    def put(self, digest: str, parser_version: str, data: Dict[str, Any]) -> bool:
+        """Store a parse, evicting expired and least recently used rows to stay within bounds"""
+        try:
+            envelope = self.encryption_manager.encrypt_envelope({"digest": digest, "data": data})
+            if len(envelope) > self.max_bytes:
+                return False
+            now = self.clock()
+            with self._db.transaction() as conn:
+                conn.execute(f"""
+                    INSERT INTO {PDF_CACHE_TABLE} (digest, parser_version, envelope, size, created_at, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(digest) DO UPDATE SET
+                        parser_version = excluded.parser_version, envelope = excluded.envelope,
+                        size = excluded.size, created_at = excluded.created_at, last_used = excluded.last_used
+                """, (digest, parser_version, envelope, len(envelope), now, now))
+                self._evict(conn, now)
+            self.stores += 1
+            return True
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️ PDF parse cache write failed: {e}")
+            return False
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        # Caller holds the write transaction. Totals are read from the table rather
+        # than tracked in memory so several worker processes can share the file.
+        expired = conn.execute(
+            f"DELETE FROM {PDF_CACHE_TABLE} WHERE created_at <= ?", (now - self.ttl_seconds,)
+        ).rowcount
+        self.evictions += expired
+        entries, size = conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {PDF_CACHE_TABLE}").fetchone()
+        if entries <= self.max_entries and size <= self.max_bytes:
+            return
+        victims = []
+        for digest, row_size in conn.execute(f"SELECT digest, size FROM {PDF_CACHE_TABLE} ORDER BY last_used"):
+            if entries <= self.max_entries and size <= self.max_bytes:
+                break
+            victims.append((digest,))
+            entries -= 1
+            size -= row_size
+        conn.executemany(f"DELETE FROM {PDF_CACHE_TABLE} WHERE digest = ?", victims)
+        self.evictions += len(victims)
+
+    def clear(self):
+        self._db.connection().execute(f"DELETE FROM {PDF_CACHE_TABLE}")
+
+    def close(self):
+        self._db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit ratio, occupancy and eviction counters"""
+        entries, size = self._db.connection().execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {PDF_CACHE_TABLE}"
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'size_bytes': size,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'errors': self.errors
+        }
+
+
+_pdf_parse_cache: Optional[PDFParseCache] = None
+_pdf_parse_cache_failed = False
+_pdf_parse_cache_lock = threading.Lock()
+
+
+def get_pdf_parse_cache() -> Optional[PDFParseCache]:
+    """Return the process-wide parse cache, or None when disabled or unavailable"""
+    global _pdf_parse_cache, _pdf_parse_cache_failed
+    if _pdf_parse_cache is None and PDF_CACHE_ENABLED and not _pdf_parse_cache_failed:
+        with _pdf_parse_cache_lock:
+            if _pdf_parse_cache is None and not _pdf_parse_cache_failed:
+                try:
+                    _pdf_parse_cache = PDFParseCache()
+                    logger.info(f"✅ PDF parse cache ready at {PDF_CACHE_PATH}")
+                except Exception as e:
+                    _pdf_parse_cache_failed = True
+                    logger.warning(f"⚠️ PDF parse cache unavailable, statements will be parsed on every upload: {e}")
+    return _pdf_parse_cache
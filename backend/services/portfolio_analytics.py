@@ -0,0 +1,471 @@
+"""
+Vectorized Portfolio Analytics
+==============================
+
+Per-user snapshot series held as NumPy arrays (one row per snapshot date) by
+PortfolioAnalyticsEngine. The first read loads a user's history once; after
+that store_portfolio_snapshot feeds each new snapshot in, lifetime statistics
+are folded in O(1), and windowed metrics are computed once per change, so the
+analytics, insights and performance endpoints read cached results.
+
+Caches are per process: another worker picks up a new snapshot when its
+entry expires (PORTFOLIO_ANALYTICS_CACHE_TTL_SECONDS).
+"""
+
+import math
+import os
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.ttl_cache import TTLCache
+
+PORTFOLIO_ANALYTICS_WINDOW_DAYS = int(os.getenv("PORTFOLIO_ANALYTICS_WINDOW_DAYS", "90"))
+PORTFOLIO_ANALYTICS_RETAIN_DAYS = int(os.getenv("PORTFOLIO_ANALYTICS_RETAIN_DAYS", "730"))
+PORTFOLIO_ANALYTICS_ROLLING_WINDOW = int(os.getenv("PORTFOLIO_ANALYTICS_ROLLING_WINDOW", "30"))
+PORTFOLIO_ANALYTICS_CACHE_MAX_USERS = int(os.getenv("PORTFOLIO_ANALYTICS_CACHE_MAX_USERS", "1000"))
+PORTFOLIO_ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("PORTFOLIO_ANALYTICS_CACHE_TTL_SECONDS", "300"))
+
+# Annual %, the FD rate the benchmarks compare against
+RISK_FREE_RATE = float(os.getenv("PORTFOLIO_RISK_FREE_RATE", "6.5"))
+# Snapshots are taken per calendar day
+PERIODS_PER_YEAR = 365
+
+# Value columns of a series row; column 0 is the snapshot date as an ordinal
+COLUMNS = ('net_worth', 'total_assets', 'total_liabilities',
+           'mutual_funds_value', 'savings_accounts', 'epf_value')
+NET_WORTH, TOTAL_ASSETS, MUTUAL_FUNDS, SAVINGS, EPF = 1, 2, 4, 5, 6
+
+# Deviations below this are float noise from a flat series
+_EPSILON = 1e-12
+
+
+def to_row(snapshot_date: date, values: Iterable[Any]) -> List[float]:
+    """Series row for one snapshot; missing values count as 0 like the old list filters"""
+    return [float(snapshot_date.toordinal())] + [float(v) if v else 0.0 for v in values]
+
+
+def rows_to_array(rows: Iterable[Tuple]) -> np.ndarray:
+    """(snapshot_date, *COLUMNS) tuples, oldest first, as a series array"""
+    table = [to_row(row[0], row[1:]) for row in rows]
+    return np.array(table, dtype=np.float64).reshape(-1, len(COLUMNS) + 1)
+
+
+def percent_returns(values: np.ndarray) -> np.ndarray:
+    return np.diff(values) / values[:-1] * 100
+
+
+def max_drawdown(values: np.ndarray) -> float:
+    """Largest fall from a running peak, in percent"""
+    if values.size < 2:
+        return 0.0
+    peaks = np.maximum.accumulate(values)
+    return max(0.0, float(((peaks - values) / peaks * 100).max()))
+
+
+def trend_slope(values: np.ndarray) -> float:
+    """Least-squares slope against the snapshot index"""
+    n = values.size
+    if n < 2:
+        return 0.0
+    x = np.arange(n) - (n - 1) / 2
+    return float(x @ (values - values.mean()) / (x @ x))
+
+
+def rolling_volatility(returns: np.ndarray, window: int) -> np.ndarray:
+    """Sample standard deviation of each run of window consecutive returns"""
+    if window < 2 or returns.size < window:
+        return np.empty(0)
+    return sliding_window_view(returns, window).std(axis=1, ddof=1)
+
+
+def _excess(returns: np.ndarray, risk_free: float) -> np.ndarray:
+    return returns - risk_free / PERIODS_PER_YEAR
+
+
+def sharpe_ratio(returns: np.ndarray, risk_free: float = RISK_FREE_RATE) -> float:
+    """Annualized Sharpe ratio of percent returns"""
+    if returns.size < 2:
+        return 0.0
+    excess = _excess(returns, risk_free)
+    std = excess.std(ddof=1)
+    return float(excess.mean() / std * math.sqrt(PERIODS_PER_YEAR)) if std > _EPSILON else 0.0
+
+
+def sortino_ratio(returns: np.ndarray, risk_free: float = RISK_FREE_RATE) -> float:
+    """Annualized Sortino ratio: excess return over downside deviation"""
+    if returns.size < 2:
+        return 0.0
+    excess = _excess(returns, risk_free)
+    downside = math.sqrt(float(np.mean(np.minimum(excess, 0.0) ** 2)))
+    return float(excess.mean() / downside * math.sqrt(PERIODS_PER_YEAR)) if downside > _EPSILON else 0.0
+
+
+def cagr(start_value: float, end_value: float, days: float) -> float:
+    """Compound annual growth rate in percent"""
+    if days <= 0 or start_value <= 0 or end_value <= 0:
+        return 0.0
+    return ((end_value / start_value) ** (PERIODS_PER_YEAR / days) - 1) * 100
+
+
+def diversification_score(asset_values: List[float]) -> float:
+    """0-100 score from the Herfindahl-Hirschman index of the allocation (higher is better)"""
+    total = sum(asset_values)
+    if total == 0:
+        return 0
+    held = [value for value in asset_values if value > 0]
+    hhi = sum((value / total) ** 2 for value in held)
+    max_hhi = 1.0
+    min_hhi = 1 / len(held)
+    if max_hhi == min_hhi:
+        return 100
+    score = (1 - (hhi - min_hhi) / (max_hhi - min_hhi)) * 100
+    return max(0, min(100, score))
+
+
+def fd_comparison(portfolio_return: float, fd_annual_rate: float = RISK_FREE_RATE) -> Dict[str, Any]:
+    """Compare a period return with fixed deposit returns"""
+    annualized_return = portfolio_return * 4  # Assuming quarterly measurement
+    return {
+        "portfolio_return": portfolio_return,
+        "annualized_portfolio_return": annualized_return,
+        "fd_return": fd_annual_rate,
+        "excess_return": annualized_return - fd_annual_rate,
+        "outperforming": annualized_return > fd_annual_rate
+    }
+
+
+def _last_nonzero(column: np.ndarray) -> Optional[float]:
+    index = np.flatnonzero(column)
+    return float(column[index[-1]]) if index.size else None
+
+
+def window_analytics(series: np.ndarray, rolling_window: int = None) -> Dict[str, Any]:
+    """Growth, risk, allocation, trend and benchmark metrics over a series window"""
+    rolling_window = rolling_window or PORTFOLIO_ANALYTICS_ROLLING_WINDOW
+    if series.size == 0:
+        return {}
+
+    net_worth = series[:, NET_WORTH]
+    net_worths = net_worth[net_worth != 0]
+    analytics = {}
+
+    if net_worths.size > 1:
+        current_nw, previous_nw = float(net_worths[-1]), float(net_worths[0])
+        analytics['growth'] = {
+            "current_net_worth": current_nw,
+            "starting_net_worth": previous_nw,
+            "absolute_growth": current_nw - previous_nw,
+            "percentage_growth": ((current_nw - previous_nw) / previous_nw * 100) if previous_nw != 0 else 0,
+            "avg_daily_growth": (current_nw - previous_nw) / net_worths.size
+        }
+
+        if net_worths.size > 2:
+            returns = percent_returns(net_worths)
+            positive_days = int((returns > 0).sum())
+            volatility = float(returns.std(ddof=1))
+            rolling = rolling_volatility(returns, rolling_window)
+            analytics['risk'] = {
+                "volatility": volatility,
+                "max_drawdown": max_drawdown(net_worths),
+                "best_day_return": float(returns.max()),
+                "worst_day_return": float(returns.min()),
+                "positive_days": positive_days,
+                "negative_days": int((returns < 0).sum()),
+                "win_rate": positive_days / returns.size * 100,
+                "sharpe_ratio": sharpe_ratio(returns),
+                "sortino_ratio": sortino_ratio(returns),
+                "rolling_volatility": float(rolling[-1]) if rolling.size else volatility,
+                "peak_rolling_volatility": float(rolling.max()) if rolling.size else volatility,
+                "rolling_window": rolling_window
+            }
+
+    latest = [_last_nonzero(series[:, column]) for column in (TOTAL_ASSETS, MUTUAL_FUNDS, SAVINGS, EPF)]
+    if all(value is not None for value in latest):
+        latest_assets, latest_mf, latest_liquid, latest_epf = latest
+        analytics['allocation'] = {
+            "mutual_funds_percentage": (latest_mf / latest_assets * 100) if latest_assets > 0 else 0,
+            "liquid_funds_percentage": (latest_liquid / latest_assets * 100) if latest_assets > 0 else 0,
+            "epf_percentage": (latest_epf / latest_assets * 100) if latest_assets > 0 else 0,
+            "diversification_score": diversification_score([latest_mf, latest_liquid, latest_epf])
+        }
+
+    if net_worths.size >= 7:
+        recent_trend = trend_slope(net_worths[-7:])
+        overall_trend = trend_slope(net_worths)
+        analytics['trends'] = {
+            "recent_trend": recent_trend,
+            "overall_trend": overall_trend,
+            "momentum": "positive" if recent_trend > overall_trend else "negative" if recent_trend < overall_trend else "neutral"
+        }
+
+    analytics['benchmarks'] = {
+        "nifty_50_comparison": "Not available",  # Would need market data integration
+        "fd_comparison": fd_comparison(analytics.get('growth', {}).get('percentage_growth', 0)),
+        "inflation_adjusted": "Not available"     # Would need inflation data
+    }
+
+    return analytics
+
+
+def net_worth_summary(net_worths: np.ndarray, data_points: int, period_days: int) -> Dict[str, Any]:
+    """Summary statistics for net worth values over a period, oldest first"""
+    values = net_worths[net_worths != 0]
+    if values.size == 0:
+        return {}
+    current_value, oldest_value = float(values[-1]), float(values[0])
+    return {
+        "current_net_worth": current_value,
+        "period_start_net_worth": oldest_value,
+        "absolute_change": current_value - oldest_value,
+        "percentage_change": ((current_value - oldest_value) / oldest_value * 100) if oldest_value != 0 else 0,
+        "highest_net_worth": float(values.max()),
+        "lowest_net_worth": float(values.min()),
+        "average_net_worth": float(values.mean()),
+        "volatility": float(values.std(ddof=1)) if values.size > 1 else 0,
+        "data_points": data_points,
+        "period_days": period_days
+    }
+
+
+class LifetimeStats:
+    """
+    Return statistics over a user's whole history, folded one snapshot at a time
+
+    The latest snapshot stays provisional because today's snapshot is rewritten
+    each time it's stored again; it is folded in once a later date arrives.
+    """
+
+    def __init__(self, risk_free: float = RISK_FREE_RATE):
+        self.risk_free_daily = risk_free / PERIODS_PER_YEAR
+        self.first_date = self.first_value = None
+        self.settled_value = None
+        self.last_date = self.last_value = None
+        # Welford accumulators over settled returns
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.downside_sq = 0.0
+        self.peak = None
+        self.max_drawdown = 0.0
+
+    @classmethod
+    def from_series(cls, dates: np.ndarray, values: np.ndarray, risk_free: float = RISK_FREE_RATE) -> "LifetimeStats":
+        """Initialise from a whole history at once (vectorized)"""
+        stats = cls(risk_free)
+        mask = values != 0
+        dates, values = dates[mask], values[mask]
+        if values.size == 0:
+            return stats
+        stats.first_date, stats.first_value = int(dates[0]), float(values[0])
+        stats.last_date, stats.last_value = int(dates[-1]), float(values[-1])
+        settled = values[:-1]
+        if settled.size:
+            stats.settled_value = float(settled[-1])
+            stats.peak = float(settled.max())
+            stats.max_drawdown = max_drawdown(settled)
+            returns = percent_returns(settled)
+            if returns.size:
+                stats.count = int(returns.size)
+                stats.mean = float(returns.mean())
+                stats.m2 = float(((returns - stats.mean) ** 2).sum())
+                stats.downside_sq = float((np.minimum(returns - stats.risk_free_daily, 0.0) ** 2).sum())
+        return stats
+
+    def _fold(self, accumulators, value: float, previous: Optional[float]):
+        count, mean, m2, downside_sq, peak, drawdown = accumulators
+        if previous is not None:
+            r = (value - previous) / previous * 100
+            count += 1
+            delta = r - mean
+            mean += delta / count
+            m2 += delta * (r - mean)
+            downside_sq += min(r - self.risk_free_daily, 0.0) ** 2
+        if peak is None or value > peak:
+            peak = value
+        else:
+            drawdown = max(drawdown, (peak - value) / peak * 100)
+        return count, mean, m2, downside_sq, peak, drawdown
+
+    def _accumulators(self):
+        return self.count, self.mean, self.m2, self.downside_sq, self.peak, self.max_drawdown
+
+    def observe(self, ordinal: int, value: float) -> bool:
+        """Add or replace the latest snapshot; returns False for dates older than the latest"""
+        if not value:
+            return True
+        if self.last_date is None:
+            self.first_date, self.first_value = ordinal, value
+        elif ordinal < self.last_date:
+            return False
+        elif ordinal > self.last_date:
+            (self.count, self.mean, self.m2, self.downside_sq,
+             self.peak, self.max_drawdown) = self._fold(self._accumulators(), self.last_value, self.settled_value)
+            self.settled_value = self.last_value
+        if ordinal == self.first_date:
+            self.first_value = value
+        self.last_date, self.last_value = ordinal, value
+        return True
+
+    def summary(self) -> Dict[str, Any]:
+        if self.last_date is None:
+            return {}
+        count, mean, m2, downside_sq, _, drawdown = self._fold(
+            self._accumulators(), self.last_value, self.settled_value
+        )
+        volatility = math.sqrt(m2 / (count - 1)) if count > 1 else 0.0
+        excess = mean - self.risk_free_daily
+        downside = math.sqrt(downside_sq / count) if count else 0.0
+        days = self.last_date - self.first_date
+        return {
+            "first_snapshot_date": date.fromordinal(self.first_date).isoformat(),
+            "years": round(days / PERIODS_PER_YEAR, 2),
+            "cagr": cagr(self.first_value, self.last_value, days),
+            "volatility": volatility,
+            "max_drawdown": drawdown,
+            "sharpe_ratio": excess / volatility * math.sqrt(PERIODS_PER_YEAR) if count > 1 and volatility > _EPSILON else 0.0,
+            "sortino_ratio": excess / downside * math.sqrt(PERIODS_PER_YEAR) if count > 1 and downside > _EPSILON else 0.0,
+            "data_points": count + 1
+        }
+
+
+class SnapshotSeries:
+    """Series rows, oldest first, in a growable array holding the last retain_days"""
+
+    def __init__(self, rows: np.ndarray, retain_days: int):
+        self.retain_days = retain_days
+        self._data = np.empty((max(16, 2 * len(rows)), len(COLUMNS) + 1))
+        self._data[:len(rows)] = rows
+        # Live rows are _data[start:end]; rows before start fell out of retention
+        self.start = 0
+        self.end = len(rows)
+        self._advance_start()
+
+    def _advance_start(self):
+        if self.end:
+            cutoff = self._data[self.end - 1, 0] - self.retain_days
+            self.start += int(np.searchsorted(self._data[self.start:self.end, 0], cutoff, side='left'))
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self._data[self.start:self.end]
+
+    def append(self, row: List[float]) -> bool:
+        """Append or replace the latest row; returns False for dates older than the latest"""
+        if self.end > self.start and row[0] <= self._data[self.end - 1, 0]:
+            if row[0] < self._data[self.end - 1, 0]:
+                return False
+            self._data[self.end - 1] = row
+            return True
+        if self.end == len(self._data):
+            # Compact to the front, growing only if the live rows fill half the buffer
+            live = self.rows
+            capacity = max(len(self._data), 2 * (len(live) + 1))
+            data = np.empty((capacity, len(COLUMNS) + 1))
+            data[:len(live)] = live
+            self._data, self.start, self.end = data, 0, len(live)
+        self._data[self.end] = row
+        self.end += 1
+        self._advance_start()
+        return True
+
+    def since(self, ordinal: float) -> np.ndarray:
+        rows = self.rows
+        return rows[np.searchsorted(rows[:, 0], ordinal, side='left'):]
+
+
+class UserAnalytics:
+    """One user's series, lifetime statistics and memoized results"""
+
+    def __init__(self, rows: np.ndarray, retain_days: int):
+        self.series = SnapshotSeries(rows, retain_days)
+        self.lifetime = LifetimeStats.from_series(rows[:, 0], rows[:, NET_WORTH])
+        self.lock = threading.Lock()
+        self._memo: Dict[Tuple, Any] = {}
+
+    def record(self, row: List[float]) -> bool:
+        with self.lock:
+            self._memo.clear()
+            return self.series.append(row) and self.lifetime.observe(int(row[0]), row[NET_WORTH])
+
+    def memo(self, key: Tuple, compute: Callable[[], Any]) -> Any:
+        with self.lock:
+            if key not in self._memo:
+                self._memo[key] = compute()
+            return self._memo[key]
+
+
+class PortfolioAnalyticsEngine:
+    """Per-user analytics kept current by snapshot writes; results are shared, treat them as read-only"""
+
+    def __init__(self, window_days: int = None, retain_days: int = None,
+                 max_users: int = None, ttl_seconds: float = None):
+        self.window_days = window_days or PORTFOLIO_ANALYTICS_WINDOW_DAYS
+        self.retain_days = max(retain_days or PORTFOLIO_ANALYTICS_RETAIN_DAYS, self.window_days)
+        self._users = TTLCache(
+            max_entries=max_users or PORTFOLIO_ANALYTICS_CACHE_MAX_USERS,
+            ttl_seconds=ttl_seconds or PORTFOLIO_ANALYTICS_CACHE_TTL_SECONDS,
+            name="portfolio_analytics"
+        )
+        self.loads = 0
+
+    def _user(self, user_id: str, loader: Callable[[], Iterable[Tuple]]) -> UserAnalytics:
+        user = self._users.get(user_id)
+        if user is None:
+            user = UserAnalytics(rows_to_array(loader()), self.retain_days)
+            self._users.set(user_id, user)
+            self.loads += 1
+        return user
+
+    def record_snapshot(self, user_id: str, snapshot_date: date, values: Iterable[Any]):
+        """Fold a stored snapshot (values in COLUMNS order) into a cached user; uncached users load on read"""
+        user = self._users.get(user_id)
+        if user is not None and not user.record(to_row(snapshot_date, values)):
+            self._users.delete(user_id)
+
+    def invalidate(self, user_id: str):
+        self._users.delete(user_id)
+
+    def get_analytics(self, user_id: str, loader: Callable[[], Iterable[Tuple]],
+                      as_of: Optional[date] = None) -> Tuple[Dict[str, Any], int]:
+        """(analytics over the window_days before as_of (today) plus lifetime stats, snapshots in the window)"""
+        user = self._user(user_id, loader)
+        today = (as_of or date.today()).toordinal()
+
+        def compute():
+            window = user.series.since(today - self.window_days)
+            analytics = window_analytics(window)
+            if analytics:
+                analytics['lifetime'] = user.lifetime.summary()
+            return analytics, len(window)
+
+        return user.memo(('analytics', today), compute)
+
+    def get_summary(self, user_id: str, days: int, loader: Callable[[], Iterable[Tuple]],
+                    as_of: Optional[date] = None) -> Dict[str, Any]:
+        """Net worth summary over the days (at most retain_days) before as_of (today)"""
+        user = self._user(user_id, loader)
+        today = (as_of or date.today()).toordinal()
+
+        def compute():
+            window = user.series.since(today - days)
+            return net_worth_summary(window[:, NET_WORTH], len(window), days)
+
+        return user.memo(('summary', today, days), compute)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._users.get_stats(), 'loads': self.loads, 'retain_days': self.retain_days}
+
+
+_analytics_engine: Optional[PortfolioAnalyticsEngine] = None
+
+
+def get_portfolio_analytics_engine() -> PortfolioAnalyticsEngine:
+    """Return the process-wide analytics engine"""
+    global _analytics_engine
+    if _analytics_engine is None:
+        _analytics_engine = PortfolioAnalyticsEngine()
+    return _analytics_engine
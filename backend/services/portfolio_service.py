@@ -11,18 +11,17 @@ import uuid
 import logging
 from datetime import datetime, date, timedelta
 from typing import Dict, Any, Optional, List, Tuple
-import psycopg2
-from psycopg2.extras import RealDictCursor
 from decimal import Decimal
 import json
-import statistics
-from collections import defaultdict
+import numpy as np
 
 # Add backend to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.config import get_database_url
+from database.pg_pool import get_pg_pool
 from utils.encryption import EncryptionHelper
+from services.portfolio_analytics import COLUMNS, get_portfolio_analytics_engine, net_worth_summary
 
 logger = logging.getLogger(__name__)
 
@@ -34,35 +33,11 @@ class PortfolioService:
     def __init__(self):
         self.database_url = get_database_url()
         self.encryption = EncryptionHelper()
+        self.analytics = get_portfolio_analytics_engine()
     
     def _get_db_connection(self):
-        """Get database connection with proper error handling"""
-        try:
-            # Parse database URL
-            import re
-            match = re.match(r'postgresql://([^:]+):?([^@]*)@([^:]+):(\d+)/(.+)', self.database_url)
-            if not match:
-                match = re.match(r'postgresql://([^@]+)@([^:]+):(\d+)/(.+)', self.database_url)
-                if match:
-                    user, host, port, database = match.groups()
-                    password = ''
-                else:
-                    raise ValueError(f"Invalid database URL format: {self.database_url}")
-            else:
-                user, password, host, port, database = match.groups()
-            
-            conn = psycopg2.connect(
-                host=host,
-                port=int(port),
-                database=database,
-                user=user,
-                password=password,
-                cursor_factory=RealDictCursor
-            )
-            return conn
-        except Exception as e:
-            logger.error(f"Database connection failed: {e}")
-            raise Exception("Database connection failed")
+        """Borrow a connection from the shared PostgreSQL pool (returned when the block exits)"""
+        return get_pg_pool().connection()
     
     def store_portfolio_snapshot(self, user_id: str, portfolio_data: Dict[str, Any], 
                                 data_source: str = 'fi_mcp') -> Dict[str, Any]:
@@ -91,8 +66,8 @@ class PortfolioService:
                     liquid_funds = summary.get('liquid_funds', 0)
                     epf = summary.get('epf', 0)
                     
-                    # Encrypt complete portfolio data
-                    portfolio_enc = self.encryption.encrypt_data(json.dumps(portfolio_data))
+                    # Encrypt complete portfolio data into one binary envelope (compressed when large)
+                    portfolio_blob = self.encryption.encrypt_envelope(portfolio_data)
                     
                     if existing:
                         # Update existing snapshot
@@ -106,7 +81,7 @@ class PortfolioService:
                         """, (
                             Decimal(str(net_worth)), Decimal(str(total_assets)), Decimal(str(total_liabilities)),
                             Decimal(str(mutual_funds)), Decimal(str(liquid_funds)), Decimal(str(epf)),
-                            portfolio_enc['encrypted_data'], portfolio_enc['nonce'], portfolio_enc['auth_tag'],
+                            portfolio_blob, None, None,
                             data_source, user_id, today
                         ))
                         action = "updated"
@@ -124,13 +99,17 @@ class PortfolioService:
                             snapshot_id, user_id, today,
                             Decimal(str(net_worth)), Decimal(str(total_assets)), Decimal(str(total_liabilities)),
                             Decimal(str(mutual_funds)), Decimal(str(liquid_funds)), Decimal(str(epf)),
-                            portfolio_enc['encrypted_data'], portfolio_enc['nonce'], portfolio_enc['auth_tag'],
+                            portfolio_blob, None, None,
                             data_source
                         ))
                         action = "created"
                     
                     conn.commit()
                     
+                    self.analytics.record_snapshot(
+                        user_id, today, (net_worth, total_assets, total_liabilities, mutual_funds, liquid_funds, epf)
+                    )
+                    
                     logger.info(f"✅ Portfolio snapshot {action} for user: {user_id} on {today}")
                     return {"success": True, "message": f"Portfolio snapshot {action} successfully"}
                     
@@ -177,26 +156,9 @@ class PortfolioService:
                         
                         history.append(snapshot_dict)
                     
-                    # Calculate summary statistics
-                    net_worths = [s['net_worth'] for s in history if s['net_worth']]
-                    
-                    summary_stats = {}
-                    if net_worths:
-                        current_value = net_worths[0]  # Latest value (DESC order)
-                        oldest_value = net_worths[-1]  # Oldest value
-                        
-                        summary_stats = {
-                            "current_net_worth": current_value,
-                            "period_start_net_worth": oldest_value,
-                            "absolute_change": current_value - oldest_value,
-                            "percentage_change": ((current_value - oldest_value) / oldest_value * 100) if oldest_value != 0 else 0,
-                            "highest_net_worth": max(net_worths),
-                            "lowest_net_worth": min(net_worths),
-                            "average_net_worth": statistics.mean(net_worths),
-                            "volatility": statistics.stdev(net_worths) if len(net_worths) > 1 else 0,
-                            "data_points": len(history),
-                            "period_days": days
-                        }
+                    # Calculate summary statistics (history is newest first)
+                    net_worths = np.array([s['net_worth'] or 0 for s in reversed(history)], dtype=np.float64)
+                    summary_stats = net_worth_summary(net_worths, len(history), days)
                     
                     return {
                         "success": True,
@@ -208,47 +170,51 @@ class PortfolioService:
             logger.error(f"Get portfolio history failed: {e}")
             return {"success": False, "message": "Failed to get portfolio history"}
     
+    def _load_snapshot_series(self, user_id: str) -> List[Tuple]:
+        """
+        All of a user's snapshot metrics, oldest first, for the analytics engine
+        """
+        columns = ", ".join(COLUMNS)
+        with self._get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT snapshot_date, {columns}
+                    FROM portfolio_snapshots 
+                    WHERE user_id = %s 
+                    ORDER BY snapshot_date ASC
+                """, (user_id,))
+                return [(row['snapshot_date'],) + tuple(row[column] for column in COLUMNS)
+                        for row in cursor.fetchall()]
+    
+    def get_performance_summary(self, user_id: str, days: int) -> Dict[str, Any]:
+        """
+        Net worth summary statistics over the last days, served from the analytics engine
+        """
+        try:
+            summary = self.analytics.get_summary(user_id, days, lambda: self._load_snapshot_series(user_id))
+            return {"success": True, "summary": summary}
+        except Exception as e:
+            logger.error(f"Get performance summary failed: {e}")
+            return {"success": False, "message": "Failed to get portfolio performance"}
+    
     def get_detailed_analytics(self, user_id: str) -> Dict[str, Any]:
         """
         Get detailed portfolio analytics with insights
         """
         try:
+            end_date = date.today()
+            start_date = end_date - timedelta(days=self.analytics.window_days)
+            
+            # Maintained by the analytics engine as snapshots are stored
+            analytics, total_snapshots = self.analytics.get_analytics(
+                user_id, lambda: self._load_snapshot_series(user_id)
+            )
+            
+            if not total_snapshots:
+                return {"success": False, "message": "Insufficient data for analytics"}
+            
             with self._get_db_connection() as conn:
                 with conn.cursor() as cursor:
-                    # Get last 90 days of data for detailed analysis
-                    end_date = date.today()
-                    start_date = end_date - timedelta(days=90)
-                    
-                    cursor.execute("""
-                        SELECT snapshot_date, net_worth, total_assets, total_liabilities,
-                               mutual_funds_value, savings_accounts, epf_value,
-                               portfolio_data_encrypted, portfolio_data_nonce, portfolio_data_auth_tag
-                        FROM portfolio_snapshots 
-                        WHERE user_id = %s AND snapshot_date >= %s 
-                        ORDER BY snapshot_date ASC
-                    """, (user_id, start_date))
-                    
-                    snapshots = cursor.fetchall()
-                    
-                    if not snapshots:
-                        return {"success": False, "message": "Insufficient data for analytics"}
-                    
-                    # Process snapshots
-                    analytics_data = []
-                    for snapshot in snapshots:
-                        snapshot_dict = dict(snapshot)
-                        
-                        # Convert Decimals to floats
-                        for key in ['net_worth', 'total_assets', 'total_liabilities', 
-                                   'mutual_funds_value', 'savings_accounts', 'epf_value']:
-                            if snapshot_dict[key]:
-                                snapshot_dict[key] = float(snapshot_dict[key])
-                        
-                        analytics_data.append(snapshot_dict)
-                    
-                    # Calculate comprehensive analytics
-                    analytics = self._calculate_comprehensive_analytics(analytics_data)
-                    
                     # Get user investment preferences for contextualized insights
                     cursor.execute("""
                         SELECT risk_tolerance, investment_horizon, investment_goals,
@@ -258,183 +224,22 @@ class PortfolioService:
                     
                     prefs = cursor.fetchone()
                     preferences = dict(prefs) if prefs else {}
-                    
-                    # Generate personalized insights
-                    insights = self._generate_insights(analytics, preferences)
-                    
-                    return {
-                        "success": True,
-                        "analytics": analytics,
-                        "insights": insights,
-                        "data_period": f"{start_date.isoformat()} to {end_date.isoformat()}",
-                        "total_snapshots": len(analytics_data)
-                    }
+            
+            # Generate personalized insights
+            insights = self._generate_insights(analytics, preferences)
+            
+            return {
+                "success": True,
+                "analytics": analytics,
+                "insights": insights,
+                "data_period": f"{start_date.isoformat()} to {end_date.isoformat()}",
+                "total_snapshots": total_snapshots
+            }
                     
         except Exception as e:
             logger.error(f"Get detailed analytics failed: {e}")
             return {"success": False, "message": "Failed to get portfolio analytics"}
     
-    def _calculate_comprehensive_analytics(self, snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """
-        Calculate comprehensive analytics from snapshot data
-        """
-        if not snapshots:
-            return {}
-        
-        # Extract time series data
-        dates = [s['snapshot_date'] for s in snapshots]
-        net_worths = [s['net_worth'] for s in snapshots if s['net_worth']]
-        assets = [s['total_assets'] for s in snapshots if s['total_assets']]
-        liabilities = [s['total_liabilities'] for s in snapshots if s['total_liabilities']]
-        mf_values = [s['mutual_funds_value'] for s in snapshots if s['mutual_funds_value']]
-        liquid_values = [s['savings_accounts'] for s in snapshots if s['savings_accounts']]
-        epf_values = [s['epf_value'] for s in snapshots if s['epf_value']]
-        
-        analytics = {}
-        
-        if net_worths and len(net_worths) > 1:
-            current_nw = net_worths[-1]
-            previous_nw = net_worths[0]
-            
-            # Growth metrics
-            analytics['growth'] = {
-                "current_net_worth": current_nw,
-                "starting_net_worth": previous_nw,
-                "absolute_growth": current_nw - previous_nw,
-                "percentage_growth": ((current_nw - previous_nw) / previous_nw * 100) if previous_nw != 0 else 0,
-                "avg_daily_growth": (current_nw - previous_nw) / len(net_worths) if len(net_worths) > 0 else 0
-            }
-            
-            # Risk metrics
-            if len(net_worths) > 2:
-                daily_returns = [(net_worths[i] - net_worths[i-1]) / net_worths[i-1] * 100 
-                               for i in range(1, len(net_worths)) if net_worths[i-1] != 0]
-                
-                if daily_returns:
-                    analytics['risk'] = {
-                        "volatility": statistics.stdev(daily_returns) if len(daily_returns) > 1 else 0,
-                        "max_drawdown": self._calculate_max_drawdown(net_worths),
-                        "best_day_return": max(daily_returns) if daily_returns else 0,
-                        "worst_day_return": min(daily_returns) if daily_returns else 0,
-                        "positive_days": len([r for r in daily_returns if r > 0]),
-                        "negative_days": len([r for r in daily_returns if r < 0]),
-                        "win_rate": len([r for r in daily_returns if r > 0]) / len(daily_returns) * 100 if daily_returns else 0
-                    }
-        
-        # Asset allocation analysis
-        if assets and mf_values and liquid_values and epf_values:
-            latest_assets = assets[-1]
-            latest_mf = mf_values[-1] if mf_values else 0
-            latest_liquid = liquid_values[-1] if liquid_values else 0
-            latest_epf = epf_values[-1] if epf_values else 0
-            
-            analytics['allocation'] = {
-                "mutual_funds_percentage": (latest_mf / latest_assets * 100) if latest_assets > 0 else 0,
-                "liquid_funds_percentage": (latest_liquid / latest_assets * 100) if latest_assets > 0 else 0,
-                "epf_percentage": (latest_epf / latest_assets * 100) if latest_assets > 0 else 0,
-                "diversification_score": self._calculate_diversification_score([latest_mf, latest_liquid, latest_epf])
-            }
-        
-        # Trend analysis
-        if len(net_worths) >= 7:
-            recent_trend = self._calculate_trend(net_worths[-7:])  # Last 7 days
-            overall_trend = self._calculate_trend(net_worths)      # Overall trend
-            
-            analytics['trends'] = {
-                "recent_trend": recent_trend,
-                "overall_trend": overall_trend,
-                "momentum": "positive" if recent_trend > overall_trend else "negative" if recent_trend < overall_trend else "neutral"
-            }
-        
-        # Performance benchmarks
-        analytics['benchmarks'] = {
-            "nifty_50_comparison": "Not available",  # Would need market data integration
-            "fd_comparison": self._calculate_fd_comparison(analytics.get('growth', {}).get('percentage_growth', 0)),
-            "inflation_adjusted": "Not available"     # Would need inflation data
-        }
-        
-        return analytics
-    
-    def _calculate_max_drawdown(self, values: List[float]) -> float:
-        """
-        Calculate maximum drawdown from peak
-        """
-        if not values or len(values) < 2:
-            return 0
-        
-        peak = values[0]
-        max_drawdown = 0
-        
-        for value in values[1:]:
-            if value > peak:
-                peak = value
-            else:
-                drawdown = (peak - value) / peak * 100
-                max_drawdown = max(max_drawdown, drawdown)
-        
-        return max_drawdown
-    
-    def _calculate_diversification_score(self, asset_values: List[float]) -> float:
-        """
-        Calculate diversification score based on asset allocation
-        """
-        total = sum(asset_values)
-        if total == 0:
-            return 0
-        
-        # Calculate Herfindahl-Hirschman Index (lower is better diversified)
-        proportions = [value / total for value in asset_values if value > 0]
-        hhi = sum(p ** 2 for p in proportions)
-        
-        # Convert to score (0-100, higher is better)
-        max_hhi = 1.0  # Worst case (all in one asset)
-        min_hhi = 1 / len([v for v in asset_values if v > 0])  # Best case (equal allocation)
-        
-        if max_hhi == min_hhi:
-            return 100
-        
-        score = (1 - (hhi - min_hhi) / (max_hhi - min_hhi)) * 100
-        return max(0, min(100, score))
-    
-    def _calculate_trend(self, values: List[float]) -> float:
-        """
-        Calculate trend using simple linear regression slope
-        """
-        if not values or len(values) < 2:
-            return 0
-        
-        n = len(values)
-        x_vals = list(range(n))
-        x_mean = sum(x_vals) / n
-        y_mean = sum(values) / n
-        
-        numerator = sum((x_vals[i] - x_mean) * (values[i] - y_mean) for i in range(n))
-        denominator = sum((x - x_mean) ** 2 for x in x_vals)
-        
-        if denominator == 0:
-            return 0
-        
-        slope = numerator / denominator
-        return slope
-    
-    def _calculate_fd_comparison(self, portfolio_return: float) -> Dict[str, Any]:
-        """
-        Compare portfolio performance with fixed deposit returns
-        """
-        # Assume average FD rate of 6.5% annually
-        fd_annual_rate = 6.5
-        
-        # Annualize portfolio return (rough estimate)
-        annualized_return = portfolio_return * 4  # Assuming quarterly measurement
-        
-        return {
-            "portfolio_return": portfolio_return,
-            "annualized_portfolio_return": annualized_return,
-            "fd_return": fd_annual_rate,
-            "excess_return": annualized_return - fd_annual_rate,
-            "outperforming": annualized_return > fd_annual_rate
-        }
-    
     def _generate_insights(self, analytics: Dict[str, Any], preferences: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Generate personalized insights based on analytics and user preferences
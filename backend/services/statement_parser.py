@@ -0,0 +1,335 @@
+"""
+Statement Parser for Artha AI
+=============================
+
+Turns text extracted from financial PDFs into accounts and transactions in a
+single pass. All patterns are compiled once per process and keyword rules
+(document type, transaction type, category) are matched by KeywordClassifier,
+which compiles each rule set's keywords into one trie-shaped regex so a
+description is scanned once instead of once per keyword.
+
+pdfplumber tables ("--- Table t on Page N ---" blocks) whose header names a
+date, a description and an amount column are parsed by column, which gives the
+debit/credit side directly. Pages without such a table fall back to the
+line-based date/description/amount pattern.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FinancialTransaction:
+    """Represents a financial transaction extracted from PDF"""
+    date: str
+    description: str
+    amount: float
+    transaction_type: str  # 'debit', 'credit', 'investment'
+    category: str = 'unknown'
+    account: str = 'unknown'
+
+@dataclass
+class FinancialAccount:
+    """Represents a financial account from PDF"""
+    account_number: str
+    account_type: str  # 'savings', 'current', 'investment', 'credit_card'
+    balance: float
+    bank_name: str = 'unknown'
+    currency: str = 'INR'
+
+
+# Keyword rules, highest priority first; a text takes the first rule any of whose keywords it contains
+DOCUMENT_TYPE_RULES = [
+    ('bank_statement', ['bank statement', 'account statement', 'transaction history']),
+    ('investment_report', ['portfolio', 'mutual fund', 'investment report', 'sip']),
+    ('credit_card_statement', ['credit card', 'card statement', 'outstanding amount']),
+    ('epf_statement', ['epf', 'provident fund', 'employee provident fund']),
+    ('insurance_document', ['insurance', 'policy', 'premium']),
+]
+
+TRANSACTION_TYPE_RULES = [
+    ('credit', ['credit', 'cr', 'deposit']),
+    ('investment', ['sip', 'investment', 'mutual fund']),
+]
+
+CATEGORY_RULES = [
+    ('income', ['salary', 'pay', 'wage']),
+    ('food', ['grocery', 'food', 'restaurant']),
+    ('fuel', ['fuel', 'petrol', 'diesel', 'gas']),
+    ('healthcare', ['medical', 'doctor', 'hospital', 'pharmacy']),
+    ('investment', ['sip', 'mutual fund', 'investment']),
+    ('loan', ['emi', 'loan', 'repay']),
+    ('utilities', ['electricity', 'water', 'gas', 'internet']),
+]
+
+BANK_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r'(state bank of india|sbi)',
+        r'(hdfc bank|hdfc)',
+        r'(icici bank|icici)',
+        r'(axis bank|axis)',
+        r'(kotak mahindra|kotak)',
+        r'(punjab national bank|pnb)',
+    )
+]
+
+# Amounts in western (12,345.00) or Indian (1,23,456.00) digit grouping
+AMOUNT = r'(\d+(?:,\d{2,3})*(?:\.\d{2})?)'
+DATE = r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})'
+
+ACCOUNT_NUMBER = re.compile(
+    r'(?:account\s*(?:no|number)[:\s]*|a/c\s*(?:no)?[:\s]*|account[:\s]+)(\d{10,18})', re.IGNORECASE
+)
+BALANCE = re.compile(r'balance[:\s]*(?:rs\.?\s*|₹\s*)?' + AMOUNT, re.IGNORECASE)
+TRANSACTION_LINE = re.compile(DATE + r'\s+(.+?)\s+(?:Dr\.?\s*|Rs\.?\s*|₹\s*)?' + AMOUNT, re.IGNORECASE)
+TABLE_DATE = re.compile(r'\d{1,2}[/\-\s](?:\d{1,2}|[A-Za-z]{3})[/\-\s]\d{2,4}')
+SECTION_MARKER = re.compile(r'^--- (?:Table \d+ on )?Page (\d+)(?: \(OCR\))? ---$', re.MULTILINE)
+CELL_AMOUNT = re.compile(r'(-)?\s*(?:rs\.?|inr|₹)?\s*(\d[\d,]*(?:\.\d+)?)\s*(dr|cr)?\.?$', re.IGNORECASE)
+
+DESCRIPTION_HEADERS = ('narration', 'description', 'particulars', 'details', 'remarks')
+MIN_LINE_LENGTH = 20
+MAX_DESCRIPTION_LENGTH = 100
+BALANCE_WINDOW = 200
+
+
+def _trie_regex(words: Sequence[str]) -> str:
+    """Regex alternation shaped like a trie of words; at any position it matches the longest word"""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+class KeywordClassifier:
+    """First-matching-rule substring classification with one regex scan per text"""
+
+    def __init__(self, rules: Sequence[Tuple[str, Sequence[str]]], default: Optional[str]):
+        rank: Dict[str, int] = {}
+        for index, (_, keywords) in enumerate(rules):
+            for keyword in keywords:
+                rank.setdefault(keyword.lower(), index)
+        # Keywords matched at the same position are prefixes of the longest one,
+        # so each keyword carries the best rank of any keyword it contains
+        self._rank = {keyword: min(r for other, r in rank.items() if other in keyword) for keyword in rank}
+        self._labels = [label for label, _ in rules]
+        self._pattern = re.compile(f'(?=({_trie_regex(list(rank))}))')
+        self.default = default
+
+    def classify(self, text_lower: str) -> Optional[str]:
+        """Label of the highest-priority rule with a keyword in text_lower (already lowercased)"""
+        best = len(self._labels)
+        for keyword in self._pattern.findall(text_lower):
+            best = min(best, self._rank[keyword])
+        return self._labels[best] if best < len(self._labels) else self.default
+
+
+def parse_amount(value: str) -> Tuple[Optional[float], Optional[str]]:
+    """Parse a table cell into (amount, 'dr'/'cr' suffix or '-' sign); (None, None) when empty or not a number"""
+    match = CELL_AMOUNT.search(value.strip())
+    if not match:
+        return None, None
+    try:
+        amount = float(match.group(2).replace(',', ''))
+    except ValueError:
+        return None, None
+    side = (match.group(3) or '').lower() or ('dr' if match.group(1) else None)
+    return amount, side
+
+
+class StatementParser:
+    """Single-pass account and transaction extraction for financial statements"""
+
+    def __init__(self):
+        self.document_types = KeywordClassifier(DOCUMENT_TYPE_RULES, default='financial_document')
+        self.transaction_types = KeywordClassifier(TRANSACTION_TYPE_RULES, default='debit')
+        self.categories = KeywordClassifier(CATEGORY_RULES, default='others')
+        self.investments = KeywordClassifier([('investment', TRANSACTION_TYPE_RULES[1][1])], default=None)
+
+    def detect_document_type(self, text_lower: str) -> str:
+        return self.document_types.classify(text_lower)
+
+    def categorize(self, description: str) -> str:
+        return self.categories.classify(description.lower())
+
+    def extract_accounts(self, text: str) -> List[FinancialAccount]:
+        """Account numbers with the nearest balance; the bank name is looked up once per document"""
+        bank_name = 'unknown'
+        for pattern in BANK_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                bank_name = match.group(1)
+                break
+
+        accounts = []
+        seen = set()
+        for match in ACCOUNT_NUMBER.finditer(text):
+            account_number = match.group(1)
+            if account_number in seen:
+                continue
+            seen.add(account_number)
+            balance = 0.0
+            balance_match = BALANCE.search(text, max(0, match.start() - BALANCE_WINDOW), match.end() + BALANCE_WINDOW)
+            if balance_match:
+                balance = float(balance_match.group(1).replace(',', ''))
+            accounts.append(FinancialAccount(
+                account_number=account_number,
+                account_type='savings',  # Default, could be improved with more detection
+                balance=balance,
+                bank_name=bank_name,
+                currency='INR'
+            ))
+        return accounts
+
+    def extract_transactions(self, text: str) -> List[FinancialTransaction]:
+        """Transactions in document order; tables with a recognised header replace their page's line scan"""
+        pages: Dict[str, List[str]] = {}
+        tables: Dict[str, List[str]] = {}
+        for page, is_table, body in self._sections(text):
+            (tables if is_table else pages).setdefault(page, []).append(body)
+
+        transactions = []
+        for page in dict.fromkeys(list(pages) + list(tables)):
+            from_tables = []
+            for body in tables.get(page, []):
+                from_tables.extend(self._parse_table(body))
+            if from_tables:
+                transactions.extend(from_tables)
+            else:
+                for body in pages.get(page, []):
+                    transactions.extend(self._parse_lines(body))
+        return transactions
+
+    def _sections(self, text: str) -> Iterator[Tuple[str, bool, str]]:
+        """(page, is_table, body) for each marker block; unmarked text is one page"""
+        markers = list(SECTION_MARKER.finditer(text))
+        if not markers:
+            yield '1', False, text
+            return
+        if markers[0].start() > 0:
+            yield markers[0].group(1), False, text[:markers[0].start()]
+        for index, marker in enumerate(markers):
+            end = markers[index + 1].start() if index + 1 < len(markers) else len(text)
+            yield marker.group(1), marker.group(0).startswith('--- Table'), text[marker.end():end]
+
+    def _parse_lines(self, body: str) -> Iterator[FinancialTransaction]:
+        for line in body.split('\n'):
+            line = line.strip()
+            if len(line) < MIN_LINE_LENGTH:
+                continue
+            match = TRANSACTION_LINE.search(line)
+            if not match:
+                continue
+            try:
+                amount = float(match.group(3).replace(',', ''))
+            except ValueError:
+                continue
+            description = match.group(2).strip()
+            yield FinancialTransaction(
+                date=match.group(1),
+                description=description[:MAX_DESCRIPTION_LENGTH],
+                amount=amount,
+                transaction_type=self.transaction_types.classify(line.lower()),
+                category=self.categorize(description)
+            )
+
+    @staticmethod
+    def _map_columns(header: List[str]) -> Optional[Dict[str, int]]:
+        """Column index per role, or None when the header doesn't describe a transaction table"""
+        columns: Dict[str, int] = {}
+        for index, cell in enumerate(header):
+            name = ' '.join(cell.lower().split())
+            if name in ('dr/cr', 'cr/dr', 'type', 'txn type'):
+                role = 'side'
+            elif 'balance' in name:
+                role = 'balance'
+            elif 'debit' in name or 'withdrawal' in name or name in ('dr', 'dr.'):
+                role = 'debit'
+            elif 'credit' in name or 'deposit' in name or name in ('cr', 'cr.'):
+                role = 'credit'
+            elif 'date' in name:
+                role = 'date'
+            elif any(keyword in name for keyword in DESCRIPTION_HEADERS):
+                role = 'description'
+            elif 'amount' in name or 'amt' in name:
+                role = 'amount'
+            else:
+                continue
+            columns.setdefault(role, index)
+        if 'date' in columns and 'description' in columns and (
+                'amount' in columns or 'debit' in columns or 'credit' in columns):
+            return columns
+        return None
+
+    def _parse_table(self, body: str) -> List[FinancialTransaction]:
+        lines = [line for line in body.split('\n') if line.strip()]
+        if not lines:
+            return []
+        columns = self._map_columns(lines[0].split(' | '))
+        if columns is None:
+            return []
+
+        width = len(lines[0].split(' | '))
+        transactions = []
+        pending = ''
+        for line in lines[1:]:
+            # A newline inside a cell splits one row over several lines
+            pending = f'{pending} {line}' if pending else line
+            cells = pending.split(' | ')
+            if len(cells) < width:
+                continue
+            pending = ''
+            transaction = self._parse_row([cell.strip() for cell in cells], columns)
+            if transaction is not None:
+                transactions.append(transaction)
+        return transactions
+
+    def _parse_row(self, cells: List[str], columns: Dict[str, int]) -> Optional[FinancialTransaction]:
+        date = cells[columns['date']]
+        if not TABLE_DATE.match(date):
+            return None
+        description = cells[columns['description']]
+
+        amount, side = None, None
+        for role in ('debit', 'credit'):
+            if role in columns:
+                value, _ = parse_amount(cells[columns[role]])
+                if value:
+                    amount, side = value, role
+                    break
+        if amount is None and 'amount' in columns:
+            amount, marker = parse_amount(cells[columns['amount']])
+            if 'side' in columns:
+                marker = cells[columns['side']].lower().rstrip('.') or marker
+            side = {'cr': 'credit', 'dr': 'debit'}.get(marker)
+        if not amount:
+            return None
+
+        description_lower = description.lower()
+        if side is None:
+            transaction_type = self.transaction_types.classify(description_lower)
+        elif side == 'debit' and self.investments.classify(description_lower):
+            transaction_type = 'investment'
+        else:
+            transaction_type = side
+        return FinancialTransaction(
+            date=date,
+            description=description[:MAX_DESCRIPTION_LENGTH],
+            amount=amount,
+            transaction_type=transaction_type,
+            category=self.categories.classify(description_lower)
+        )
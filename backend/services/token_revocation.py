@@ -0,0 +1,114 @@
+"""
+In-memory revocation index for access tokens
+Holds SHA-256 hashes of access tokens whose session was ended (logout), so
+token verification can reject them without a database round-trip. Local
+revocations are added immediately; revocations made by other workers are
+picked up by an incremental poll of user_sessions at most every
+sync_interval seconds. Entries are dropped once the token would have
+expired anyway.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SYNC_OVERLAP_SECONDS = 30
+
+
+def hash_token(token: str) -> str:
+    """Key used for tokens in the revocation index and the verified-token cache"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class RevocationIndex:
+    """Exact set of revoked token hashes with expiry and incremental DB sync"""
+
+    def __init__(self, max_token_age: float, sync_interval: float = 5.0):
+        # A revoked token is only interesting until it expires on its own
+        self.max_token_age = max_token_age
+        self.sync_interval = sync_interval
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._last_sync = 0.0
+        self._watermark: Optional[datetime] = None
+
+        # Counters
+        self.checks = 0
+        self.rejections = 0
+        self.syncs = 0
+        self.sync_errors = 0
+
+    def add(self, token_hash: str):
+        with self._lock:
+            self._revoked[token_hash] = time.time() + self.max_token_age
+
+    def is_revoked(self, token_hash: str) -> bool:
+        with self._lock:
+            self.checks += 1
+            expires_at = self._revoked.get(token_hash)
+            if expires_at is None:
+                return False
+            if expires_at <= time.time():
+                del self._revoked[token_hash]
+                return False
+            self.rejections += 1
+            return True
+
+    def maybe_sync(self, load_revoked: Callable[[datetime], Iterable[Dict[str, Any]]]):
+        """
+        Pull sessions revoked since the last sync when the interval has passed.
+        load_revoked(since) returns rows with session_token and last_used; only
+        one caller syncs at a time and the rest carry on with the current index.
+        """
+        if time.monotonic() - self._last_sync < self.sync_interval:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            started = datetime.utcnow()
+            # First sync covers every token that could still be unexpired
+            since = self._watermark or started - timedelta(seconds=self.max_token_age)
+            watermark = since
+            for row in load_revoked(since):
+                self.add(hash_token(row['session_token']))
+                last_used = row.get('last_used')
+                if last_used is not None:
+                    watermark = max(watermark, last_used.replace(tzinfo=None))
+            # Re-read a margin so late commits and worker clock skew aren't missed
+            self._watermark = max(watermark, started - timedelta(seconds=SYNC_OVERLAP_SECONDS))
+            self.syncs += 1
+            self.prune()
+        except Exception as e:
+            self.sync_errors += 1
+            logger.error(f"Token revocation sync failed: {e}")
+        finally:
+            self._last_sync = time.monotonic()
+            self._sync_lock.release()
+
+    def prune(self) -> int:
+        """Drop entries for tokens that have expired on their own"""
+        now = time.time()
+        with self._lock:
+            expired = [token_hash for token_hash, expires_at in self._revoked.items() if expires_at <= now]
+            for token_hash in expired:
+                del self._revoked[token_hash]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'revoked_tokens': len(self._revoked),
+            'checks': self.checks,
+            'rejections': self.rejections,
+            'syncs': self.syncs,
+            'sync_errors': self.sync_errors,
+            'sync_interval_seconds': self.sync_interval
+        }
@@ -7,12 +7,11 @@ Comprehensive user profile management with encrypted storage and preferences.
 
 import os
 import sys
+import copy
 import uuid
 import logging
 from datetime import datetime, date
 from typing import Dict, Any, Optional, List
-import psycopg2
-from psycopg2.extras import RealDictCursor
 from decimal import Decimal
 import json
 
@@ -20,10 +19,25 @@ import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.config import get_database_url
+from database.pg_pool import get_pg_pool
 from utils.encryption import EncryptionHelper
+from utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Encrypted profile fields (each stored as *_encrypted / *_nonce / *_auth_tag columns)
+PROFILE_ENCRYPTED_FIELDS = (
+    'full_name', 'phone', 'date_of_birth', 'occupation', 'annual_income', 'company', 'address'
+)
+
+# Decrypted profiles, shared by every UserService in the process and
+# invalidated by the profile and preference updates below
+_profile_cache = TTLCache(
+    max_entries=int(os.getenv('PROFILE_CACHE_MAX_ENTRIES', '1024')),
+    ttl_seconds=float(os.getenv('PROFILE_CACHE_TTL_SECONDS', '60')),
+    name="user_profiles"
+)
+
 class UserService:
     """
     Comprehensive user profile management service
@@ -34,33 +48,8 @@ class UserService:
         self.encryption = EncryptionHelper()
     
     def _get_db_connection(self):
-        """Get database connection with proper error handling"""
-        try:
-            # Parse database URL
-            import re
-            match = re.match(r'postgresql://([^:]+):?([^@]*)@([^:]+):(\d+)/(.+)', self.database_url)
-            if not match:
-                match = re.match(r'postgresql://([^@]+)@([^:]+):(\d+)/(.+)', self.database_url)
-                if match:
-                    user, host, port, database = match.groups()
-                    password = ''
-                else:
-                    raise ValueError(f"Invalid database URL format: {self.database_url}")
-            else:
-                user, password, host, port, database = match.groups()
-            
-            conn = psycopg2.connect(
-                host=host,
-                port=int(port),
-                database=database,
-                user=user,
-                password=password,
-                cursor_factory=RealDictCursor
-            )
-            return conn
-        except Exception as e:
-            logger.error(f"Database connection failed: {e}")
-            raise Exception("Database connection failed")
+        """Borrow a connection from the shared PostgreSQL pool (returned when the block exits)"""
+        return get_pg_pool().connection()
     
     def update_user_profile(self, user_id: str, profile_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -72,7 +61,7 @@ class UserService:
                     # Update basic user info if provided
                     user_updates = {}
                     if 'full_name' in profile_data:
-                        full_name_enc = self.encryption.encrypt_data(profile_data['full_name'])
+                        full_name_enc = self.encryption.encrypt_data_gcm(profile_data['full_name'])
                         user_updates.update({
                             'full_name_encrypted': full_name_enc['encrypted_data'],
                             'full_name_nonce': full_name_enc['nonce'],
@@ -80,7 +69,7 @@ class UserService:
                         })
                     
                     if 'phone' in profile_data:
-                        phone_enc = self.encryption.encrypt_data(profile_data['phone'])
+                        phone_enc = self.encryption.encrypt_data_gcm(profile_data['phone'])
                         user_updates.update({
                             'phone_encrypted': phone_enc['encrypted_data'],
                             'phone_nonce': phone_enc['nonce'],
@@ -88,7 +77,7 @@ class UserService:
                         })
                     
                     if 'date_of_birth' in profile_data:
-                        dob_enc = self.encryption.encrypt_data(profile_data['date_of_birth'])
+                        dob_enc = self.encryption.encrypt_data_gcm(profile_data['date_of_birth'])
                         user_updates.update({
                             'date_of_birth_encrypted': dob_enc['encrypted_data'],
                             'date_of_birth_nonce': dob_enc['nonce'],
@@ -105,7 +94,7 @@ class UserService:
                     # Update extended profile info
                     profile_updates = {}
                     if 'occupation' in profile_data:
-                        occ_enc = self.encryption.encrypt_data(profile_data['occupation'])
+                        occ_enc = self.encryption.encrypt_data_gcm(profile_data['occupation'])
                         profile_updates.update({
                             'occupation_encrypted': occ_enc['encrypted_data'],
                             'occupation_nonce': occ_enc['nonce'],
@@ -113,7 +102,7 @@ class UserService:
                         })
                     
                     if 'annual_income' in profile_data:
-                        income_enc = self.encryption.encrypt_data(str(profile_data['annual_income']))
+                        income_enc = self.encryption.encrypt_data_gcm(str(profile_data['annual_income']))
                         profile_updates.update({
                             'annual_income_encrypted': income_enc['encrypted_data'],
                             'annual_income_nonce': income_enc['nonce'],
@@ -121,7 +110,7 @@ class UserService:
                         })
                     
                     if 'company' in profile_data:
-                        company_enc = self.encryption.encrypt_data(profile_data['company'])
+                        company_enc = self.encryption.encrypt_data_gcm(profile_data['company'])
                         profile_updates.update({
                             'company_encrypted': company_enc['encrypted_data'],
                             'company_nonce': company_enc['nonce'],
@@ -132,7 +121,7 @@ class UserService:
                         profile_updates['experience_years'] = profile_data['experience_years']
                     
                     if 'address' in profile_data:
-                        addr_enc = self.encryption.encrypt_data(profile_data['address'])
+                        addr_enc = self.encryption.encrypt_data_gcm(profile_data['address'])
                         profile_updates.update({
                             'address_encrypted': addr_enc['encrypted_data'],
                             'address_nonce': addr_enc['nonce'],
@@ -162,6 +151,7 @@ class UserService:
                             """, list(profile_updates.values()))
                     
                     conn.commit()
+                    self.invalidate_profile_cache(user_id)
                     
                     logger.info(f"✅ User profile updated successfully: {user_id}")
                     return {"success": True, "message": "Profile updated successfully"}
@@ -250,6 +240,7 @@ class UserService:
                             """, list(update_data.values()))
                     
                     conn.commit()
+                    self.invalidate_profile_cache(user_id)
                     
                     logger.info(f"✅ Investment preferences updated successfully: {user_id}")
                     return {"success": True, "message": "Investment preferences updated successfully"}
@@ -258,10 +249,18 @@ class UserService:
             logger.error(f"Update investment preferences failed: {e}")
             return {"success": False, "message": "Failed to update investment preferences"}
     
+    def invalidate_profile_cache(self, user_id: str):
+        """Drop the cached decrypted profile so the next read sees the update"""
+        _profile_cache.delete(user_id)
+    
     def get_complete_profile(self, user_id: str) -> Dict[str, Any]:
         """
-        Get complete user profile with decrypted data
+        Get complete user profile with decrypted data (served from the profile cache when fresh)
         """
+        cached = _profile_cache.get(user_id)
+        if cached is not None:
+            return {"success": True, "profile": copy.deepcopy(cached)}
+        
         try:
             with self._get_db_connection() as conn:
                 with conn.cursor() as cursor:
@@ -310,82 +309,20 @@ class UserService:
                         "is_verified": user_dict['is_verified']
                     }
                     
-                    # Decrypt personal information
+                    # Decrypt all personal and professional fields in one pass
+                    decrypted = self.encryption.decrypt_record(user_dict, PROFILE_ENCRYPTED_FIELDS)
                     if user_dict.get('full_name_encrypted'):
+                        profile['full_name'] = decrypted.pop('full_name', "User")
+                    if 'annual_income' in decrypted:
                         try:
-                            profile['full_name'] = self.encryption.decrypt_data({
-                                'encrypted_data': user_dict['full_name_encrypted'],
-                                'nonce': user_dict['full_name_nonce'],
-                                'auth_tag': user_dict['full_name_auth_tag']
-                            })
-                        except:
-                            profile['full_name'] = "User"
-                    
-                    if user_dict.get('phone_encrypted'):
-                        try:
-                            profile['phone'] = self.encryption.decrypt_data({
-                                'encrypted_data': user_dict['phone_encrypted'],
-                                'nonce': user_dict['phone_nonce'],
-                                'auth_tag': user_dict['phone_auth_tag']
-                            })
-                        except:
-                            pass
-                    
-                    if user_dict.get('date_of_birth_encrypted'):
-                        try:
-                            profile['date_of_birth'] = self.encryption.decrypt_data({
-                                'encrypted_data': user_dict['date_of_birth_encrypted'],
-                                'nonce': user_dict['date_of_birth_nonce'],
-                                'auth_tag': user_dict['date_of_birth_auth_tag']
-                            })
-                        except:
-                            pass
-                    
-                    # Decrypt professional information
-                    if user_dict.get('occupation_encrypted'):
-                        try:
-                            profile['occupation'] = self.encryption.decrypt_data({
-                                'encrypted_data': user_dict['occupation_encrypted'],
-                                'nonce': user_dict['occupation_nonce'],
-                                'auth_tag': user_dict['occupation_auth_tag']
-                            })
-                        except:
-                            pass
-                    
-                    if user_dict.get('annual_income_encrypted'):
-                        try:
-                            income_str = self.encryption.decrypt_data({
-                                'encrypted_data': user_dict['annual_income_encrypted'],
-                                'nonce': user_dict['annual_income_nonce'],
-                                'auth_tag': user_dict['annual_income_auth_tag']
-                            })
-                            profile['annual_income'] = float(income_str)
-                        except:
-                            pass
-                    
-                    if user_dict.get('company_encrypted'):
-                        try:
-                            profile['company'] = self.encryption.decrypt_data({
-                                'encrypted_data': user_dict['company_encrypted'],
-                                'nonce': user_dict['company_nonce'],
-                                'auth_tag': user_dict['company_auth_tag']
-                            })
-                        except:
-                            pass
+                            decrypted['annual_income'] = float(decrypted['annual_income'])
+                        except (TypeError, ValueError):
+                            del decrypted['annual_income']
+                    profile.update(decrypted)
                     
                     if user_dict.get('experience_years'):
                         profile['experience_years'] = user_dict['experience_years']
                     
-                    if user_dict.get('address_encrypted'):
-                        try:
-                            profile['address'] = self.encryption.decrypt_data({
-                                'encrypted_data': user_dict['address_encrypted'],
-                                'nonce': user_dict['address_nonce'],
-                                'auth_tag': user_dict['address_auth_tag']
-                            })
-                        except:
-                            pass
-                    
                     # Process investment preferences
                     if prefs_dict:
                         investment_prefs = {}
@@ -405,7 +342,8 @@ class UserService:
                         
                         profile['investment_preferences'] = investment_prefs
                     
-                    return {"success": True, "profile": profile}
+                    _profile_cache.set(user_id, profile)
+                    return {"success": True, "profile": copy.deepcopy(profile)}
                     
         except Exception as e:
             logger.error(f"Get complete profile failed: {e}")
@@ -423,7 +361,7 @@ class UserService:
                     # Encrypt description if provided
                     description_enc = None
                     if goal_data.get('description'):
-                        description_enc = self.encryption.encrypt_data(goal_data['description'])
+                        description_enc = self.encryption.encrypt_data_gcm(goal_data['description'])
                     
                     cursor.execute("""
                         INSERT INTO user_goals (
@@ -471,9 +409,10 @@ class UserService:
                     """, (user_id,))
                     
                     goals_data = cursor.fetchall()
+                    descriptions = self.encryption.decrypt_records(goals_data, ('description',))
                     goals = []
                     
-                    for goal in goals_data:
+                    for goal, decrypted in zip(goals_data, descriptions):
                         goal_dict = dict(goal)
                         
                         # Convert decimals to floats
@@ -484,16 +423,9 @@ class UserService:
                         if goal_dict['monthly_contribution']:
                             goal_dict['monthly_contribution'] = float(goal_dict['monthly_contribution'])
                         
-                        # Decrypt description
+                        # Decrypted description
                         if goal_dict.get('description_encrypted'):
-                            try:
-                                goal_dict['description'] = self.encryption.decrypt_data({
-                                    'encrypted_data': goal_dict['description_encrypted'],
-                                    'nonce': goal_dict['description_nonce'],
-                                    'auth_tag': goal_dict['description_auth_tag']
-                                })
-                            except:
-                                goal_dict['description'] = None
+                            goal_dict['description'] = decrypted.get('description')
                         
                         # Remove encrypted fields from response
                         goal_dict.pop('description_encrypted', None)
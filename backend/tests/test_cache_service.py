@@ -0,0 +1,152 @@
+import os
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+os.environ.setdefault('ARTHA_ENCRYPTION_KEY', 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA')
+
+from database.config import Base, SecureCache, upgrade_envelope_columns
+from services.cache_service import CacheService
+from utils.ttl_cache import TTLCache
+
+
+class TestCacheService:
+    """Test cases for the two-tier financial data cache."""
+
+    @pytest.fixture
+    def session_factory(self):
+        """In-memory SQLite stand-in for the PostgreSQL cache tables."""
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+        @contextmanager
+        def get_session():
+            session = factory()
+            try:
+                yield session
+                session.commit()
+            finally:
+                session.close()
+
+        with patch('services.cache_service.get_session', get_session):
+            yield factory
+
+    @pytest.fixture
+    def cache(self, session_factory):
+        return CacheService()
+
+    def test_store_and_read_through_l1(self, cache, session_factory):
+        """Test that a write populates L1 so the read skips the decrypt."""
+        data = {"net_worth": {"units": "500000"}}
+        assert cache.cache_financial_data("user@example.com", data) is True
+
+        with patch.object(cache.encryption_manager, 'decrypt_from_database') as decrypt:
+            assert cache.get_cached_financial_data("user@example.com") == data
+            decrypt.assert_not_called()
+        assert cache.l1_cache.get_stats()["hits"] == 1
+
+    def test_l1_miss_falls_back_to_database(self, cache):
+        """Test that a cold L1 decrypts from the SecureCache row and refills L1."""
+        data = {"credit_score": 780}
+        cache.cache_financial_data("user@example.com", data)
+        cache.l1_cache.clear()
+
+        assert cache.get_cached_financial_data("user@example.com") == data
+        assert len(cache.l1_cache) == 1
+
+    def test_rewrite_is_an_upsert(self, cache, session_factory):
+        """Test that caching twice replaces the row instead of duplicating it."""
+        cache.cache_financial_data("user@example.com", {"v": 1})
+        cache.cache_financial_data("user@example.com", {"v": 2})
+
+        session = session_factory()
+        try:
+            assert session.query(SecureCache).count() == 1
+        finally:
+            session.close()
+
+        cache.l1_cache.clear()
+        assert cache.get_cached_financial_data("user@example.com") == {"v": 2}
+
+    def test_invalidate_clears_both_tiers(self, cache):
+        """Test that invalidate_user_cache drops L1 as well as the row."""
+        cache.cache_financial_data("user@example.com", {"v": 1})
+        assert cache.invalidate_user_cache("user@example.com") is True
+
+        assert len(cache.l1_cache) == 0
+        assert cache.get_cached_financial_data("user@example.com") is None
+
+    def test_rows_are_stored_as_envelopes(self, cache, session_factory):
+        """Test that new rows use the binary envelope and leave the base64 columns empty."""
+        cache.cache_financial_data("user@example.com", {"v": 1})
+
+        session = session_factory()
+        try:
+            entry = session.query(SecureCache).one()
+        finally:
+            session.close()
+
+        assert cache.encryption_manager.is_envelope(entry.encrypted_blob)
+        assert entry.encrypted_data is None
+        assert entry.cache_version == '3.0'
+
+    def test_legacy_rows_are_still_readable(self, cache, session_factory):
+        """Test that rows written in the base64 format before the envelope still decrypt."""
+        user_hash = cache._create_user_hash("user@example.com")
+        encrypted_data, nonce, auth_tag = cache.encryption_manager.encrypt_for_database(
+            {"financial_data": {"v": "legacy"}}
+        )
+        session = session_factory()
+        try:
+            session.add(SecureCache(
+                user_email_hash=user_hash, encrypted_data=encrypted_data, encryption_nonce=nonce,
+                encryption_tag=auth_tag, expires_at=datetime.utcnow() + timedelta(hours=1)
+            ))
+            session.commit()
+        finally:
+            session.close()
+
+        assert cache.get_cached_financial_data("user@example.com") == {"v": "legacy"}
+
+
+    def test_upgrade_adds_envelope_column(self):
+        """Test that an existing pre-envelope table gets its blob column, once."""
+        engine = create_engine("sqlite://", poolclass=StaticPool)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE secure_cache (user_email_hash VARCHAR(64) PRIMARY KEY, encrypted_data TEXT NOT NULL)"
+            ))
+
+        assert upgrade_envelope_columns(engine) == ["secure_cache.encrypted_blob"]
+        assert upgrade_envelope_columns(engine) == []
+
+
+class TestTTLCache:
+    """Test cases for the bounded L1 cache"""
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = TTLCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_entries_expire(self):
+        """Test that entries past their TTL are treated as misses"""
+        cache = TTLCache(max_entries=4, ttl_seconds=60)
+        with patch('utils.ttl_cache.time.monotonic', return_value=1000.0):
+            cache.set("a", 1, ttl_seconds=5)
+        with patch('utils.ttl_cache.time.monotonic', return_value=1006.0):
+            assert cache.get("a") is None
+        assert cache.get_stats()["expirations"] == 1
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+
+os.environ.setdefault('ARTHA_ENCRYPTION_KEY', 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA')
+
+from database.chat_models import ChatConversation, ChatMessage
+from services.chat_service import ChatService
+from services.chat_write_queue import ChatWriteBehindQueue
+from utils.encryption import encryption
+
+
+def exchange_messages(query, response):
+    return [
+        {"message_type": "user", "content": query, "tokens_used": 3},
+        {"message_type": "assistant", "content": response, "tokens_used": 5, "metadata": {"sources": 2}}
+    ]
+
+
+@pytest.fixture
+def chat_service(tmp_path):
+    """ChatService backed by a throwaway SQLite file instead of PostgreSQL."""
+    with patch('services.chat_service.get_database_url', return_value=f"sqlite:///{tmp_path / 'chat.db'}"):
+        service = ChatService()
+    yield service
+    service.engine.dispose()
+
+
+def count_commits(engine):
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    return commits
+
+
+class TestChatServiceBatchWrites:
+    """Test cases for single-transaction message persistence."""
+
+    def test_add_messages_commits_once(self, chat_service):
+        """Test that a chat turn is one commit and keeps message order."""
+        conversation_id = chat_service.create_conversation("user@example.com", agent_mode="gemini")
+        commits = count_commits(chat_service.engine)
+
+        ids = chat_service.add_messages(conversation_id, exchange_messages("What is my net worth?", "About 5 lakh."))
+
+        assert len(commits) == 1
+        history = chat_service.get_conversation_history("user@example.com", conversation_id)
+        assert [m["id"] for m in history["messages"]] == ids
+        assert history["messages"][1]["metadata"] == {"sources": 2}
+        assert history["conversation"]["message_count"] == 2
+        assert history["conversation"]["total_tokens_used"] == 8
+        assert history["conversation"]["title"] == "What is my net worth?"
+
+    def test_add_message_still_works(self, chat_service):
+        """Test that the single-message API delegates to the batch path."""
+        conversation_id = chat_service.create_conversation("user@example.com")
+        message_id = chat_service.add_message(conversation_id, "user", "Hello")
+
+        history = chat_service.get_conversation_history("user@example.com", conversation_id)
+        assert history["messages"][0]["id"] == message_id
+
+    def test_add_messages_unknown_conversation(self, chat_service):
+        """Test that messages for a missing conversation are rejected."""
+        with pytest.raises(ValueError):
+            chat_service.add_messages("missing", exchange_messages("q", "a"))
+
+    def test_save_exchanges_creates_conversations_in_one_transaction(self, chat_service):
+        """Test that a batch of exchanges, including new conversations, is one commit."""
+        existing = chat_service.create_conversation("a@example.com")
+        commits = count_commits(chat_service.engine)
+
+        written = chat_service.save_exchanges([
+            {"user_id": "a@example.com", "conversation_id": existing, "create": False,
+             "agent_mode": "quick", "messages": exchange_messages("q1", "a1")},
+            {"user_id": "b@example.com", "conversation_id": "new-conv", "create": True,
+             "agent_mode": "gemini", "messages": exchange_messages("q2", "a2")},
+            {"user_id": "b@example.com", "conversation_id": "new-conv", "create": True,
+             "agent_mode": "gemini", "messages": exchange_messages("q3", "a3")}
+        ])
+
+        assert written == 6
+        assert len(commits) == 1
+        history = chat_service.get_conversation_history("b@example.com", "new-conv")
+        assert [m["content"] for m in history["messages"]] == ["q2", "a2", "q3", "a3"]
+        assert history["conversation"]["message_count"] == 4
+
+    def test_failed_batch_writes_nothing(self, chat_service):
+        """Test that one invalid exchange rolls back the whole transaction."""
+        with pytest.raises(ValueError):
+            chat_service.save_exchanges([
+                {"user_id": "a@example.com", "conversation_id": "new-conv", "create": True,
+                 "messages": exchange_messages("q", "a")},
+                {"user_id": "a@example.com", "conversation_id": "missing", "create": False,
+                 "messages": exchange_messages("q", "a")}
+            ])
+
+        with chat_service.SessionLocal() as session:
+            assert session.query(ChatConversation).count() == 0
+            assert session.query(ChatMessage).count() == 0
+
+    def test_financial_context_round_trips_as_envelope(self, chat_service):
+        """Test that financial context is stored as a binary envelope and read back."""
+        context = {"net_worth": 500000, "holdings": ["NIFTY 50"]}
+        conversation_id = chat_service.create_conversation("user@example.com", financial_context=context)
+
+        with chat_service.SessionLocal() as session:
+            conversation = session.get(ChatConversation, conversation_id)
+            assert isinstance(conversation.financial_context_blob, bytes)
+            assert conversation.financial_context is None
+
+        history = chat_service.get_conversation_history("user@example.com", conversation_id)
+        assert history["financial_context"] == context
+
+    def test_legacy_financial_context_is_readable(self, chat_service):
+        """Test that contexts stored in the old JSON column still decrypt."""
+        conversation_id = chat_service.create_conversation("user@example.com")
+        with chat_service.SessionLocal() as session:
+            conversation = session.get(ChatConversation, conversation_id)
+            conversation.financial_context = list(encryption.encrypt_for_database(json.dumps({"v": 1})))
+            session.commit()
+        chat_service._invalidate_conversation_cache(conversation_id)
+
+        history = chat_service.get_conversation_history("user@example.com", conversation_id)
+        assert history["financial_context"] == {"v": 1}
+
+
+class TestChatWriteBehindQueue:
+    """Test cases for the background chat writer."""
+
+    def test_submit_returns_immediately_and_flushes_in_batches(self, chat_service):
+        """Test that queued exchanges are coalesced into few transactions."""
+        async def run():
+            writer = ChatWriteBehindQueue(chat_service, max_batch=50)
+            ids = [await writer.submit(f"user{i}@example.com", exchange_messages(f"q{i}", f"a{i}"))
+                   for i in range(20)]
+            await writer.stop()
+            return writer, ids
+
+        writer, ids = asyncio.run(run())
+
+        stats = writer.get_stats()
+        assert stats["written_exchanges"] == 20
+        assert stats["written_messages"] == 40
+        assert stats["batches"] < 20
+        assert stats["running"] is False
+        history = chat_service.get_conversation_history("user7@example.com", ids[7])
+        assert [m["content"] for m in history["messages"]] == ["q7", "a7"]
+
+    def test_bad_exchange_does_not_lose_batch(self, chat_service):
+        """Test that a failing exchange is retried alone and the rest are written."""
+        async def run():
+            writer = ChatWriteBehindQueue(chat_service)
+            good = await writer.submit("a@example.com", exchange_messages("q", "a"))
+            await writer.submit("a@example.com", exchange_messages("q", "a"), conversation_id="missing")
+            await writer.stop()
+            return writer, good
+
+        writer, good = asyncio.run(run())
+
+        assert writer.get_stats()["failed"] == 1
+        assert writer.get_stats()["written_exchanges"] == 1
+        assert chat_service.get_conversation_history("a@example.com", good)["conversation"]["message_count"] == 2
+
+    def test_full_queue_writes_inline(self, chat_service):
+        """Test that a full queue applies backpressure instead of dropping history."""
+        async def run():
+            writer = ChatWriteBehindQueue(chat_service, max_size=1)
+            for i in range(3):
+                await writer.submit("a@example.com", exchange_messages(f"q{i}", f"a{i}"))
+            await writer.stop()
+            return writer
+
+        stats = asyncio.run(run()).get_stats()
+
+        assert stats["backpressured"] >= 1
+        assert stats["written_exchanges"] == 3
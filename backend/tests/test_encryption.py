@@ -0,0 +1,101 @@
+import os
+from unittest.mock import patch
+
+import pytest
+from cryptography.exceptions import InvalidTag
+
+os.environ.setdefault('ARTHA_ENCRYPTION_KEY', 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA')
+
+from utils import encryption as encryption_module
+from utils.encryption import (
+    COMPRESSION_NONE, COMPRESSION_ZLIB, ENVELOPE_OVERHEAD, EncryptionManager
+)
+
+
+def fi_payload(holdings):
+    return {
+        "net_worth": {"total": "1250000.50", "currency": "INR"},
+        "holdings": [
+            {"isin": f"INF{i:09d}", "name": f"Example Flexi Cap Fund {i}", "units": i * 1.5, "nav": 101.25}
+            for i in range(holdings)
+        ]
+    }
+
+
+class TestEnvelope:
+    """Test cases for the binary encryption envelope."""
+
+    @pytest.fixture
+    def manager(self):
+        return EncryptionManager()
+
+    def test_round_trip(self, manager):
+        """Test that small payloads round-trip uncompressed."""
+        data = {"credit_score": 780, "name": "Asha Rao ₹"}
+
+        envelope = manager.encrypt_envelope(data)
+
+        assert isinstance(envelope, bytes)
+        assert envelope[2] == COMPRESSION_NONE
+        assert manager.decrypt_envelope(envelope) == data
+        assert manager.decrypt_envelope(memoryview(envelope)) == data
+
+    def test_large_payloads_are_compressed(self, manager):
+        """Test that Fi-sized payloads are compressed and beat the base64 format."""
+        data = fi_payload(200)
+
+        envelope = manager.encrypt_envelope(data, compression="zlib")
+        legacy = manager.encrypt_for_database(data)
+
+        assert envelope[2] == COMPRESSION_ZLIB
+        assert len(envelope) < sum(len(part) for part in legacy) / 4
+        assert manager.decrypt_envelope(envelope) == data
+
+    def test_uncompressed_overhead_is_fixed(self, manager):
+        """Test that an uncompressed envelope is the JSON plus a fixed header."""
+        data = fi_payload(200)
+
+        envelope = manager.encrypt_envelope(data, compression="none")
+
+        plaintext = manager.decrypt_envelope(envelope)
+        assert plaintext == data
+        assert len(envelope) - ENVELOPE_OVERHEAD == len(
+            encryption_module.json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode()
+        )
+
+    def test_header_is_authenticated(self, manager):
+        """Test that flipping the compression flag fails authentication."""
+        envelope = bytearray(manager.encrypt_envelope({"v": 1}))
+        envelope[2] = COMPRESSION_ZLIB
+
+        with pytest.raises(InvalidTag):
+            manager.decrypt_envelope(bytes(envelope))
+
+    def test_missing_zstd_falls_back_to_zlib(self, manager):
+        """Test that asking for zstd without zstandard installed uses zlib."""
+        with patch.object(encryption_module, 'ZSTD_AVAILABLE', False):
+            envelope = manager.encrypt_envelope(fi_payload(50), compression="zstd")
+
+        assert envelope[2] == COMPRESSION_ZLIB
+
+
+class TestDecryptStored:
+    """Test cases for reading both storage formats."""
+
+    @pytest.fixture
+    def manager(self):
+        return EncryptionManager()
+
+    def test_reads_envelopes(self, manager):
+        """Test that envelope bytes are detected and decrypted."""
+        assert manager.decrypt_stored(manager.encrypt_envelope({"v": 1})) == {"v": 1}
+
+    def test_reads_legacy_base64_columns(self, manager):
+        """Test that base64 triples are still readable, as text or as bytea."""
+        encrypted_data, nonce, auth_tag = manager.encrypt_for_database({"v": 2})
+
+        assert not manager.is_envelope(encrypted_data.encode())
+        assert manager.decrypt_stored(encrypted_data, nonce, auth_tag) == {"v": 2}
+        assert manager.decrypt_stored(
+            memoryview(encrypted_data.encode()), nonce.encode(), auth_tag.encode()
+        ) == {"v": 2}
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import os
+import time
+
+from aiohttp import web
+
+from core.fi_mcp import production_client
+from core.fi_mcp.production_client import FiAuthSession, FiMoneyMCPClient, FINANCIAL_DATA_TOOLS
+
+SAMPLE_RESPONSES_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'mcp-docs', 'sample_responses')
+
+# Used when the mcp-docs sample responses aren't checked out
+FALLBACK_SAMPLES = {
+    'fetch_net_worth': {"netWorthResponse": {"totalNetWorthValue": {"currencyCode": "INR", "units": "658305"}}},
+    'fetch_credit_report': {"creditReports": [{"creditReportData": {"score": {"bureauScore": "746"}}}]},
+    'fetch_epf_details': {"uanAccounts": [{"rawDetails": {"overall_pf_balance": {"current_pf_balance": "211111"}}}]},
+    'fetch_mf_transactions': {"transactions": [{"schemeName": "Parag Parikh Flexi Cap", "transactionAmount": 5000}]},
+    'fetch_bank_transactions': {"transactions": [{"narration": "UPI/Swiggy", "amount": 450}]},
+}
+
+
+def load_sample(tool_name):
+    path = os.path.join(SAMPLE_RESPONSES_DIR, f"{tool_name}.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return FALLBACK_SAMPLES[tool_name]
+
+
+class StubMCPServer:
+    """Local MCP server answering tools/call from sample responses, singly or in batches."""
+
+    def __init__(self, supports_batch=True, failing_tools=()):
+        self.supports_batch = supports_batch
+        self.failing_tools = set(failing_tools)
+        self.requests = []
+
+    def _answer(self, call, in_batch=False):
+        tool_name = call["params"]["name"]
+        # failing_tools only fail inside a batch, so the individual retry succeeds
+        if in_batch and tool_name in self.failing_tools:
+            return {"jsonrpc": "2.0", "id": call["id"], "error": {"code": -32000, "message": f"{tool_name} unavailable"}}
+        text = json.dumps(load_sample(tool_name))
+        return {"jsonrpc": "2.0", "id": call["id"], "result": {"content": [{"type": "text", "text": text}]}}
+
+    async def handle(self, request):
+        body = await request.json()
+        self.requests.append(body)
+        if isinstance(body, list):
+            if not self.supports_batch:
+                return web.json_response(
+                    {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Batch not supported"}},
+                    status=400
+                )
+            # Answer out of order to exercise demultiplexing by id
+            return web.json_response([self._answer(call, in_batch=True) for call in reversed(body)])
+        return web.json_response(self._answer(body))
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/mcp/stream", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/mcp/stream"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+def fetch_with(server):
+    async def run():
+        url = await server.start()
+        client = FiMoneyMCPClient(mcp_url=url)
+        client.session = FiAuthSession(session_id="stub-session", passcode="1234",
+                                       authenticated=True, expires_at=time.time() + 600)
+        try:
+            return client, await client._fetch_all_financial_data()
+        finally:
+            await client.http_pool.close()
+            await server.stop()
+
+    return asyncio.run(run())
+
+
+class TestMCPBatchCalls:
+    """Test cases for batched JSON-RPC tool calls against a stub MCP server"""
+
+    def test_financial_data_fetched_in_one_request(self):
+        """Test that all five tools go out as a single batch and are demultiplexed by id"""
+        server = StubMCPServer()
+        client, data = fetch_with(server)
+
+        assert len(server.requests) == 1
+        assert isinstance(server.requests[0], list)
+        assert [call["params"]["name"] for call in server.requests[0]] == FINANCIAL_DATA_TOOLS
+        assert data.net_worth == load_sample('fetch_net_worth')
+        assert data.credit_report == load_sample('fetch_credit_report')
+        assert data.bank_transactions == load_sample('fetch_bank_transactions').get('transactions', [])
+
+    def test_failed_calls_in_batch_retry_individually(self):
+        """Test that only the tools that errored inside the batch are re-sent on their own"""
+        server = StubMCPServer(failing_tools={'fetch_epf_details'})
+        client, data = fetch_with(server)
+
+        assert len(server.requests) == 2
+        assert server.requests[1]["params"]["name"] == 'fetch_epf_details'
+        assert data.epf_details == load_sample('fetch_epf_details')
+        assert client.batch_supported is True
+
+    def test_server_without_batch_support_falls_back(self):
+        """Test that a rejected batch falls back to individual calls and stays off for the client"""
+        server = StubMCPServer(supports_batch=False)
+        client, data = fetch_with(server)
+
+        assert len(server.requests) == 1 + len(FINANCIAL_DATA_TOOLS)
+        assert data.net_worth == load_sample('fetch_net_worth')
+        assert client.batch_supported is False
+
+    def test_batching_can_be_disabled(self, monkeypatch):
+        """Test that FI_MCP_BATCH_CALLS=false keeps the one-request-per-tool behaviour"""
+        monkeypatch.setattr(production_client, 'FI_MCP_BATCH_CALLS', False)
+        server = StubMCPServer()
+        client, data = fetch_with(server)
+
+        assert len(server.requests) == len(FINANCIAL_DATA_TOOLS)
+        assert all(isinstance(body, dict) for body in server.requests)
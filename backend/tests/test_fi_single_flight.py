@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from core.fi_mcp.single_flight import SingleFlightCache
+
+
+class TestSingleFlightCache:
+    """Test cases for Fi MCP fetch coalescing."""
+
+    def test_concurrent_callers_share_one_fetch(self):
+        """Test that concurrent callers for one key trigger a single upstream fetch."""
+        cache = SingleFlightCache(ttl_seconds=30)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"net_worth": 100}
+
+        async def run():
+            return await asyncio.gather(*[cache.get("session-1", fetch) for _ in range(10)])
+
+        results = asyncio.run(run())
+        assert len(calls) == 1
+        assert all(r == {"net_worth": 100} for r in results)
+        stats = cache.get_stats()
+        assert stats["misses"] == 1
+        assert stats["coalesced"] == 9
+        assert stats["upstream_fetches_saved"] == 9
+
+    def test_snapshot_served_within_ttl(self):
+        """Test that a completed fetch is reused until the TTL expires."""
+        cache = SingleFlightCache(ttl_seconds=30)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return len(calls)
+
+        async def run():
+            first = await cache.get("session-1", fetch)
+            second = await cache.get("session-1", fetch)
+            other = await cache.get("session-2", fetch)
+            return first, second, other
+
+        assert asyncio.run(run()) == (1, 1, 2)
+        assert cache.get_stats()["hits"] == 1
+
+    def test_expired_snapshot_refetches(self):
+        """Test that an expired snapshot triggers a new fetch."""
+        cache = SingleFlightCache(ttl_seconds=0.01)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return len(calls)
+
+        async def run():
+            await cache.get("s", fetch)
+            await asyncio.sleep(0.02)
+            return await cache.get("s", fetch)
+
+        assert asyncio.run(run()) == 2
+
+    def test_errors_propagate_and_are_not_cached(self):
+        """Test that a failed fetch reaches every waiter and is retried next time."""
+        cache = SingleFlightCache(ttl_seconds=30)
+        attempts = []
+
+        async def fetch():
+            attempts.append(1)
+            await asyncio.sleep(0.01)
+            if len(attempts) == 1:
+                raise RuntimeError("MCP call failed: 503")
+            return "ok"
+
+        async def run():
+            results = await asyncio.gather(*[cache.get("s", fetch) for _ in range(3)], return_exceptions=True)
+            retry = await cache.get("s", fetch)
+            return results, retry
+
+        results, retry = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert retry == "ok"
+        assert cache.get_stats()["errors"] == 1
+
+    def test_invalidate_during_fetch_discards_result(self):
+        """Test that invalidation mid-flight keeps the stale result out of the snapshot."""
+        cache = SingleFlightCache(ttl_seconds=30)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return len(calls)
+
+        async def run():
+            task = asyncio.ensure_future(cache.get("s", fetch))
+            await asyncio.sleep(0)
+            cache.invalidate("s")
+            await task
+            return await cache.get("s", fetch)
+
+        assert asyncio.run(run()) == 2
+
+    def test_cancelled_caller_does_not_cancel_shared_fetch(self):
+        """Test that one caller going away leaves the fetch running for the others."""
+        cache = SingleFlightCache(ttl_seconds=30)
+
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "data"
+
+        async def run():
+            leader = asyncio.ensure_future(cache.get("s", fetch))
+            follower = asyncio.ensure_future(cache.get("s", fetch))
+            await asyncio.sleep(0)
+            leader.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return await follower
+
+        assert asyncio.run(run()) == "data"
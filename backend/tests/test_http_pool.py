@@ -0,0 +1,88 @@
+import asyncio
+
+from aiohttp import web
+
+from core.http_pool import HTTPConnectionPool, get_http_pool
+
+
+async def start_server():
+    async def handle(request):
+        await asyncio.sleep(0.01)
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_post("/mcp/stream", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/mcp/stream"
+
+
+class TestHTTPConnectionPool:
+    """Test cases for the shared keep-alive connection pool"""
+
+    def test_sequential_calls_reuse_one_connection(self):
+        """Test that back-to-back requests ride the same keep-alive connection"""
+        async def run():
+            runner, url = await start_server()
+            pool = HTTPConnectionPool(name="test")
+            try:
+                session = await pool.get_session()
+                for _ in range(5):
+                    async with session.post(url, json={}) as response:
+                        assert (await response.json())["ok"] is True
+                return pool.get_stats()
+            finally:
+                await pool.close()
+                await runner.cleanup()
+
+        stats = asyncio.run(run())
+        assert stats["requests"] == 5
+        assert stats["connections_created"] == 1
+        assert stats["connections_reused"] == 4
+        assert stats["reuse_ratio"] == 0.8
+
+    def test_saturation_is_reported_when_per_host_limit_is_hit(self):
+        """Test that requests beyond limit_per_host queue for a connection"""
+        async def run():
+            runner, url = await start_server()
+            pool = HTTPConnectionPool(name="test", limit=10, limit_per_host=2)
+            try:
+                session = await pool.get_session()
+
+                async def call():
+                    async with session.post(url, json={}) as response:
+                        await response.read()
+
+                await asyncio.gather(*[call() for _ in range(6)])
+                return pool.get_stats()
+            finally:
+                await pool.close()
+                await runner.cleanup()
+
+        stats = asyncio.run(run())
+        assert stats["connections_created"] == 2
+        assert stats["queued_for_connection"] == 4
+        assert stats["in_flight"] == 0
+
+    def test_session_is_shared_and_rebound_per_loop(self):
+        """Test that one loop gets one session and a new loop gets a fresh one"""
+        pool = HTTPConnectionPool(name="test")
+
+        async def open_twice():
+            first = await pool.get_session()
+            second = await pool.get_session()
+            assert first is second
+            return first
+
+        first_loop_session = asyncio.run(open_twice())
+        second_loop_session = asyncio.run(open_twice())
+        assert first_loop_session is not second_loop_session
+        asyncio.run(pool.close())
+
+    def test_named_pools_are_process_wide(self):
+        """Test that get_http_pool returns the same pool for a name"""
+        assert get_http_pool("shared") is get_http_pool("shared")
+        assert get_http_pool("shared") is not get_http_pool("other")
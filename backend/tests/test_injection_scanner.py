@@ -0,0 +1,108 @@
+import re
+
+import pytest
+from fastapi import HTTPException
+
+from middleware.input_validator import InputValidationMiddleware
+from middleware.security_middleware import SecurityConfig
+from utils.injection_scanner import (
+    PATH_TRAVERSAL, SQL_INJECTION, XSS, InjectionScanner, get_injection_scanner, required_literals
+)
+
+CORPUS = [
+    "How much should I invest in my SIP this month?",
+    "I'd like to update my risk profile and select a new fund from the list",
+    "Please UPDATE users SET role='admin'",
+    "1' OR 1=1",
+    "union select password from users",
+    "<ScRiPt>alert(document.cookie)</script>",
+    "javascript:void(0)",
+    "../../etc/passwd",
+    "%2E%2E%2Fconfig",
+    "; rm -rf /",
+    "{\"$where\": \"sleep(1000)\"}",
+    "admin*)(uid=*",
+    "Mera portfolio kaisa hai? ₹25,000 SIP",
+    "ſelect name from users",
+    "",
+]
+
+
+def loop_matches(rules, text):
+    """The per-pattern loop the call sites used before"""
+    return any(re.search(pattern, text, re.IGNORECASE) for _, pattern in rules)
+
+
+class TestInjectionScanner:
+    """Test cases for the shared prefiltered injection scanner."""
+
+    def test_required_literals(self):
+        """Test that literal prefixes are derived through groups and alternations."""
+        assert required_literals(r"(?i)(union\s+select|select\s+.*\s+from)") == {"union", "select"}
+        assert required_literals(r"(exec\s*\(|execute\s*\(|sp_executesql)") == {"exec"}
+        assert required_literals(r"(\b(OR|AND)\s+\d+\s*=\s*\d+)") == {"or", "and"}
+        assert required_literals(r"<script[^>]*>.*?</script>") == {"<script"}
+        # No literal every match starts with
+        assert required_literals(r"..%2f") is None
+        assert required_literals(r"\w+=") is None
+
+    @pytest.mark.parametrize("rules", [
+        SecurityConfig().injection_rules,
+        InputValidationMiddleware(app=None).scanner.rules,
+    ], ids=["security_middleware", "input_validator"])
+    def test_agrees_with_pattern_loop(self, rules):
+        """Test that the prefilter never changes what the rule set matches."""
+        scanner = InjectionScanner(rules)
+
+        for text in CORPUS:
+            assert scanner.matches(text) == loop_matches(rules, text), text
+
+    def test_first_category_in_rule_order(self):
+        """Test that the earliest matching rule decides the category."""
+        scanner = InjectionScanner([(SQL_INJECTION, r"drop\s+table"), (XSS, r"<script"), (PATH_TRAVERSAL, r"\.\./")])
+
+        assert scanner.scan("<script> ../ drop table x") == SQL_INJECTION
+        assert scanner.scan("<script> ../") == XSS
+        assert scanner.scan("fine") is None
+
+    def test_non_ascii_text_skips_prefilter(self):
+        """Test that text the lowercase prefilter can't vouch for is fully scanned."""
+        scanner = InjectionScanner([(SQL_INJECTION, r"select\s+.*\s+from")])
+
+        # 'ſ' case-folds to 's' in the regex but not in str.lower()
+        assert scanner.scan("ſelect name from users") == SQL_INJECTION
+
+    def test_scan_value_walks_nested_json(self):
+        """Test that strings anywhere in a nested payload are scanned in one walk."""
+        scanner = get_injection_scanner(SecurityConfig().injection_rules)
+        payload = {
+            "message": "hello",
+            "context": {"history": [{"role": "user", "content": "fine"}, {"content": ["ok", "../../etc/passwd"]}]},
+            "count": 3,
+        }
+
+        assert scanner.scan_value(payload) == PATH_TRAVERSAL
+        assert scanner.scan_value({"message": "hello", "n": [1, 2.5, None]}) is None
+
+    def test_scanner_is_shared_across_configs(self):
+        """Test that rebuilding a config reuses the compiled scanner."""
+        assert SecurityConfig().injection_scanner is SecurityConfig().injection_scanner
+
+
+class TestInputValidationMiddlewareScanner:
+    """Test cases for InputValidationMiddleware on the shared scanner."""
+
+    def test_nested_malicious_value_rejected(self):
+        """Test that a nested injection is refused."""
+        middleware = InputValidationMiddleware(app=None)
+
+        with pytest.raises(HTTPException) as error:
+            middleware._validate_value({"items": [{"note": "1 OR 1=1"}]})
+        assert error.value.status_code == 400
+
+    def test_benign_value_sanitized(self):
+        """Test that clean values are still HTML-escaped outside strict mode."""
+        middleware = InputValidationMiddleware(app=None)
+
+        assert middleware._validate_value({"note": ["a & b"]}) == {"note": ["a &amp; b"]}
+        assert middleware._validate_value({"note": ["a & b"]}, strict=True) == {"note": ["a & b"]}
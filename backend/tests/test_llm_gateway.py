@@ -0,0 +1,122 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.llm_gateway import GeminiGateway, _parse_model_limits
+from core.google_grounding.grounding_client import GoogleGroundingClient
+
+
+class FakeAsyncModels:
+    """Stand-in for client.aio.models with a fixed round-trip latency."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def generate_content(self, model, contents, config=None):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text=f"{model}:{contents}", candidates=[])
+
+
+class FakeSyncModels:
+    """Stand-in for the blocking client.models surface."""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def generate_content(self, model, contents, config=None):
+        time.sleep(self.latency)
+        return SimpleNamespace(text=f"{model}:{contents}", candidates=[])
+
+
+def make_async_client(latency=0.1):
+    return SimpleNamespace(aio=SimpleNamespace(models=FakeAsyncModels(latency)))
+
+
+def make_sync_client(latency=0.1):
+    return SimpleNamespace(models=FakeSyncModels(latency))
+
+
+class TestGeminiGateway:
+    """Test cases for the shared Gemini gateway."""
+
+    def test_parse_model_limits(self):
+        """Test per-model limit parsing ignores malformed entries."""
+        limits = _parse_model_limits("gemini-2.5-pro=2, gemini-2.5-flash=10,bad,x=oops")
+        assert limits == {"gemini-2.5-pro": 2, "gemini-2.5-flash": 10}
+
+    def test_async_calls_overlap(self):
+        """Test that concurrent calls through the async API run in parallel."""
+        gateway = GeminiGateway(api_key="test", client=make_async_client(0.1), default_limit=8)
+
+        async def run():
+            start = time.perf_counter()
+            await asyncio.gather(*[
+                gateway.generate_content(model="m", contents=str(i)) for i in range(5)
+            ])
+            return time.perf_counter() - start
+
+        elapsed = asyncio.run(run())
+        assert elapsed < 0.3
+        assert gateway.get_stats()["m"]["peak_in_flight"] == 5
+
+    def test_sync_client_offloaded_to_thread_pool(self):
+        """Test that a blocking client is offloaded and does not serialize calls."""
+        gateway = GeminiGateway(api_key="test", client=make_sync_client(0.1), default_limit=8, max_workers=8)
+
+        async def run():
+            start = time.perf_counter()
+            await asyncio.gather(*[
+                gateway.generate_content(model="m", contents=str(i)) for i in range(5)
+            ])
+            return time.perf_counter() - start
+
+        try:
+            assert asyncio.run(run()) < 0.3
+        finally:
+            gateway.shutdown()
+
+    def test_per_model_concurrency_limit(self):
+        """Test that the per-model limit caps in-flight calls."""
+        gateway = GeminiGateway(
+            api_key="test", client=make_async_client(0.05),
+            default_limit=8, model_limits={"gemini-2.5-pro": 2}
+        )
+
+        async def run():
+            await asyncio.gather(*[
+                gateway.generate_content(model="gemini-2.5-pro", contents=str(i)) for i in range(6)
+            ])
+
+        asyncio.run(run())
+        stats = gateway.get_stats()["gemini-2.5-pro"]
+        assert stats["limit"] == 2
+        assert stats["peak_in_flight"] == 2
+        assert stats["calls"] == 6
+
+    def test_errors_are_counted_and_raised(self):
+        """Test that failed calls propagate and are recorded."""
+        class FailingModels:
+            async def generate_content(self, model, contents, config=None):
+                raise RuntimeError("quota exceeded")
+
+        gateway = GeminiGateway(api_key="test", client=SimpleNamespace(aio=SimpleNamespace(models=FailingModels())))
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(gateway.generate_content(model="m", contents="q"))
+        assert gateway.get_stats()["m"]["errors"] == 1
+
+    def test_grounded_queries_overlap(self):
+        """Test that ground_multiple_queries no longer runs in series."""
+        client = GoogleGroundingClient(api_key="test")
+        client.gateway = GeminiGateway(api_key="test", client=make_async_client(0.1))
+
+        async def run():
+            start = time.perf_counter()
+            results = await client.ground_multiple_queries([f"q{i}" for i in range(5)])
+            return results, time.perf_counter() - start
+
+        results, elapsed = asyncio.run(run())
+        assert len(results) == 5
+        assert elapsed < 0.3
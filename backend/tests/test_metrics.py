@@ -0,0 +1,147 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from core.metrics import (
+    OVERFLOW_LABEL_VALUE, MetricsRegistry, cache_totals, exponential_buckets, instrument_stream, metrics
+)
+from middleware.metrics_middleware import HTTP_REQUEST_SECONDS, HTTP_REQUESTS, MetricsMiddleware
+from utils.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+class TestMetricsRegistry:
+    """Test cases for counters, gauges, histograms and text exposition."""
+
+    def test_concurrent_writers_lose_no_updates(self, registry):
+        """Test that per-thread accumulators add up exactly under concurrent writes."""
+        counter = registry.counter("jobs_total", "Jobs", ("queue",))
+        histogram = registry.histogram("job_seconds", "Job time", buckets=(0.5, 1.0))
+
+        def work():
+            child = counter.labels("default")
+            for _ in range(20000):
+                child.inc()
+                histogram.observe(0.75)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counter.labels(queue="default").get() == 160000
+        counts, count, total = histogram.totals()
+        assert counts == [0, 160000, 0] and count == 160000 and total == pytest.approx(120000)
+
+    def test_histogram_percentiles_interpolate_within_bucket(self, registry):
+        """Test that percentiles interpolate inside buckets and clamp past the last bound."""
+        histogram = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 0.2, 0.4))
+        for value in [0.05] * 50 + [0.15] * 40 + [0.3] * 9 + [5.0]:
+            histogram.observe(value)
+
+        assert histogram.percentile(0.5) == pytest.approx(0.1)
+        assert histogram.percentile(0.7) == pytest.approx(0.15)
+        assert 0.2 < histogram.percentile(0.95) < 0.4
+        assert histogram.percentile(1.0) == 0.4
+
+    def test_render_prometheus_text(self, registry):
+        """Test exposition of counters, gauges and cumulative histogram buckets."""
+        registry.counter("requests_total", "Requests", ("path",)).labels('/a"b').inc(2)
+        registry.gauge("in_flight", "In flight").set(3)
+        histogram = registry.histogram("latency_seconds", "Latency", ("model",), buckets=(0.1, 1.0))
+        histogram.labels("flash").observe(0.05)
+        histogram.labels("flash").observe(0.5)
+        registry.register_collector("pool", lambda: [("pool_in_use", "gauge", "In use", [({}, 4)])])
+
+        text = registry.render()
+        assert '# TYPE requests_total counter\nrequests_total{path="/a\\"b"} 2.0' in text
+        assert "in_flight 3.0" in text
+        assert 'latency_seconds_bucket{model="flash",le="0.1"} 1.0' in text
+        assert 'latency_seconds_bucket{model="flash",le="1.0"} 2.0' in text
+        assert 'latency_seconds_bucket{model="flash",le="+Inf"} 2.0' in text
+        assert 'latency_seconds_count{model="flash"} 2.0' in text
+        assert "# TYPE pool_in_use gauge\npool_in_use 4" in text
+        assert registry.collected_value("pool_in_use") == 4
+
+    def test_label_cardinality_is_capped(self, registry):
+        """Test that label sets past the series cap share one overflow series."""
+        counter = registry.counter("by_user_total", "Per user", ("user",))
+        counter.max_series = 3
+        for user in range(10):
+            counter.labels(str(user)).inc()
+
+        series = dict(counter.children())
+        assert len(series) == 4
+        assert series[(OVERFLOW_LABEL_VALUE,)].get() == 7
+
+    def test_conflicting_registration_is_rejected(self, registry):
+        """Test that a name can't be re-registered with another type or labels."""
+        assert registry.counter("calls_total", "Calls", ("model",)) is registry.counter("calls_total", "Calls", ("model",))
+        with pytest.raises(ValueError):
+            registry.gauge("calls_total", "Calls", ("model",))
+
+    def test_exponential_buckets(self):
+        """Test geometric bucket bounds."""
+        assert exponential_buckets(0.001, 10, 4) == pytest.approx((0.001, 0.01, 0.1, 1.0))
+
+
+class TestInstrumentation:
+    """Test cases for request, cache and stream instrumentation."""
+
+    def test_middleware_labels_by_route_template(self):
+        """Test that requests are labelled by route template and unmatched paths share a label."""
+        router = APIRouter(prefix="/api/test-metrics")
+
+        @router.get("/jobs/{job_id}")
+        async def get_job(job_id: str):
+            return {"job_id": job_id}
+
+        app = FastAPI()
+        app.include_router(router)
+        app.add_middleware(MetricsMiddleware)
+        endpoint = "/api/test-metrics/jobs/{job_id}"
+        before = HTTP_REQUESTS.labels("GET", endpoint, "200").get()
+
+        client = TestClient(app)
+        for job_id in ("a", "b", "c"):
+            assert client.get(f"/api/test-metrics/jobs/{job_id}").status_code == 200
+        client.get("/api/test-metrics/missing")
+
+        assert HTTP_REQUESTS.labels("GET", endpoint, "200").get() == before + 3
+        assert HTTP_REQUESTS.labels("GET", "unmatched", "404").get() >= 1
+        assert HTTP_REQUEST_SECONDS.labels("GET", endpoint).snapshot()[1] >= 3
+
+    def test_caches_are_exported_by_tier(self):
+        """Test that TTLCache hit counters show up under artha_cache_lookups_total."""
+        cache = TTLCache(max_entries=4, name="test_metrics_cache")
+        cache.set("k", 1)
+        cache.get("k")
+        cache.get("missing")
+
+        assert cache_totals()[("test_metrics_cache", "memory")]["hits"] == 1
+        assert 'artha_cache_lookups_total{cache="test_metrics_cache",tier="memory",result="miss"} 1' in metrics.render()
+
+    def test_instrument_stream_tracks_open_streams(self):
+        """Test that SSE wrappers count chunks and close the active gauge."""
+        active = metrics.get("artha_sse_streams_active").labels("test_stream")
+        seen = []
+
+        async def chunks():
+            for n in range(3):
+                seen.append(active.get())
+                yield f"data: {n}\n\n"
+
+        async def consume():
+            return [chunk async for chunk in instrument_stream("test_stream", chunks())]
+
+        assert len(asyncio.run(consume())) == 3
+        assert seen == [1, 1, 1] and active.get() == 0
+        assert metrics.get("artha_sse_events_total").labels("test_stream").get() == 3
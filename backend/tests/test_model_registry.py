@@ -0,0 +1,66 @@
+import pytest
+
+from core.metrics import MetricsRegistry
+from core.model_registry import GenerativeModelRegistry
+
+
+class FakeModel:
+    def __init__(self, model_name, **options):
+        self.model_name = model_name
+        self.options = options
+
+
+class TestGenerativeModelRegistry:
+    """Test cases for model reuse and per-model latency histograms"""
+
+    def test_model_is_built_once_per_name_and_config(self):
+        """Test that repeated lookups with equal options return the same instance"""
+        registry = GenerativeModelRegistry(factory=FakeModel)
+        options = {"generation_config": {"temperature": 0.7, "top_k": 40}, "system_instruction": "You are Artha AI"}
+
+        first = registry.get("gemini-2.5-flash", **options)
+        again = registry.get("gemini-2.5-flash", **{"system_instruction": "You are Artha AI",
+                                                      "generation_config": {"top_k": 40, "temperature": 0.7}})
+
+        assert first is again
+        assert registry.builds == 1
+        assert registry.reuses == 1
+
+    def test_different_config_builds_a_new_model(self):
+        """Test that a changed generation config is a separate registry entry"""
+        registry = GenerativeModelRegistry(factory=FakeModel)
+        registry.warm(["gemini-2.5-pro", "gemini-2.5-flash"], generation_config={"temperature": 0.7})
+
+        hotter = registry.get("gemini-2.5-flash", generation_config={"temperature": 1.0})
+
+        assert hotter.options["generation_config"]["temperature"] == 1.0
+        assert registry.builds == 3
+
+    def test_records_latency_per_model(self):
+        """Test that calls are bucketed per model with status counts"""
+        registry = GenerativeModelRegistry(factory=FakeModel, metrics_registry=MetricsRegistry())
+        for latency in (0.2, 0.4, 0.9, 3.0):
+            registry.record("gemini-2.5-flash", "success", latency)
+        registry.record("gemini-2.5-flash", "timeout", 30.0)
+        registry.record("gemini-2.5-pro", "success", 6.0, ttft=1.2, tokens_per_sec=80.0)
+
+        stats = registry.get_stats()["models"]
+        flash = stats["gemini-2.5-flash"]
+        assert flash["statuses"] == {"success": 4, "timeout": 1}
+        assert flash["latency"]["count"] == 5
+        assert flash["latency"]["buckets"]["200"] == 1
+        assert flash["latency"]["buckets"]["+Inf"] == 5
+        assert stats["gemini-2.5-pro"]["ttft"]["p50_ms"] == pytest.approx(1200)
+        assert stats["gemini-2.5-pro"]["avg_tokens_per_sec"] == 80.0
+
+    def test_calls_are_exported_to_the_metrics_registry(self):
+        """Test that the stats and /metrics read the same labelled histograms"""
+        metrics_registry = MetricsRegistry()
+        registry = GenerativeModelRegistry(factory=FakeModel, metrics_registry=metrics_registry)
+        registry.record("gemini-2.5-flash", "success", 0.3)
+        registry.record("gemini-2.5-flash", "error", 0.1)
+
+        text = metrics_registry.render()
+        assert 'artha_gemini_request_duration_seconds_count{model="gemini-2.5-flash",status="success"} 1.0' in text
+        assert 'artha_gemini_request_duration_seconds_bucket{model="gemini-2.5-flash",status="error",le="0.1"} 1.0' in text
+        assert "artha_gemini_time_to_first_token_seconds_count" not in text
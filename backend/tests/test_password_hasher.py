@@ -0,0 +1,143 @@
+import asyncio
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import bcrypt
+import pytest
+
+os.environ.setdefault('ARTHA_ENCRYPTION_KEY', 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA')
+
+from services.auth_service import AuthService
+from services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+class TestPasswordHasher:
+    """Test cases for the bounded password hashing pool."""
+
+    def test_hash_and_verify_on_pool(self):
+        """Test that pooled hashing uses the configured cost and verifies."""
+        hasher = PasswordHasher(rounds=4, max_workers=2)
+
+        async def run():
+            hashed = await hasher.hash(b"Secret#Passw0rd")
+            return hashed, await hasher.verify(b"Secret#Passw0rd", hashed), await hasher.verify(b"wrong", hashed)
+
+        hashed, valid, invalid = asyncio.run(run())
+
+        assert hashed.startswith("$2b$04$")
+        assert valid is True
+        assert invalid is False
+        assert hasher.get_stats()["verifications"] == 2
+
+    def test_needs_rehash_below_configured_cost(self):
+        """Test that only hashes cheaper than the configured cost are flagged."""
+        hasher = PasswordHasher(rounds=5)
+
+        assert hasher.needs_rehash(bcrypt.hashpw(b"pw", bcrypt.gensalt(4)).decode())
+        assert not hasher.needs_rehash(bcrypt.hashpw(b"pw", bcrypt.gensalt(5)).decode())
+        assert not hasher.needs_rehash("not-a-bcrypt-hash")
+
+    def test_saturated_pool_rejects_fast(self):
+        """Test that work beyond max_pending is refused instead of queued."""
+        hasher = PasswordHasher(rounds=4, max_workers=1, max_pending=2)
+        release = threading.Event()
+
+        def slow_hash(password):
+            release.wait()
+            return "hash"
+
+        async def run():
+            with patch.object(hasher, 'hash_sync', slow_hash):
+                running = [asyncio.create_task(hasher.hash(b"pw")) for _ in range(2)]
+                await asyncio.sleep(0.01)
+                start = time.perf_counter()
+                with pytest.raises(PasswordHasherBusy):
+                    await hasher.hash(b"pw")
+                rejected_in = time.perf_counter() - start
+                release.set()
+                await asyncio.gather(*running)
+                return rejected_in
+
+        assert asyncio.run(run()) < 0.05
+        stats = hasher.get_stats()
+        assert stats["rejected"] == 1
+        assert stats["peak_pending"] == 2
+        assert stats["pending"] == 0
+
+    def test_event_loop_stays_responsive(self):
+        """Test that the loop keeps ticking while hashes run on the pool."""
+        hasher = PasswordHasher(rounds=10, max_workers=2)
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.001)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            await asyncio.gather(*(hasher.hash(b"pw") for _ in range(4)))
+            task.cancel()
+            return ticks
+
+        assert asyncio.run(run()) > 5
+
+
+class TestAsyncLogin:
+    """Test cases for AuthService.login_user_async."""
+
+    @pytest.fixture
+    def auth_service(self):
+        service = AuthService()
+        service.password_hasher = PasswordHasher(rounds=5, max_workers=2)
+        return service
+
+    def user_row(self, password, rounds):
+        salt = "a" * 32
+        return {
+            'id': 'u1', 'salt': salt, 'login_attempts': 0,
+            'password_hash': bcrypt.hashpw((password + salt).encode(), bcrypt.gensalt(rounds)).decode()
+        }
+
+    def login(self, auth_service, user, password):
+        completed = {}
+
+        def complete(user_dict, email, password_valid, new_hash, ip_address, user_agent):
+            completed.update(password_valid=password_valid, new_hash=new_hash)
+            return {"success": password_valid}
+
+        with patch.object(auth_service, '_load_login_user', return_value=user), \
+                patch.object(auth_service, '_complete_login', side_effect=complete):
+            result = asyncio.run(auth_service.login_user_async("user@example.com", password))
+        return result, completed
+
+    def test_weak_hash_is_upgraded_on_login(self, auth_service):
+        """Test that a successful login re-hashes at the configured cost."""
+        user = self.user_row("Secret#Passw0rd", rounds=4)
+
+        result, completed = self.login(auth_service, user, "Secret#Passw0rd")
+
+        assert result["success"]
+        assert completed["new_hash"].startswith("$2b$05$")
+        assert auth_service._verify_password("Secret#Passw0rd", user['salt'], completed["new_hash"])
+
+    def test_failed_login_is_not_rehashed(self, auth_service):
+        """Test that a wrong password records a failure and never re-hashes."""
+        user = self.user_row("Secret#Passw0rd", rounds=4)
+
+        result, completed = self.login(auth_service, user, "wrong")
+
+        assert not result["success"]
+        assert completed == {"password_valid": False, "new_hash": None}
+
+    def test_busy_pool_propagates(self, auth_service):
+        """Test that saturation reaches the endpoint instead of becoming a 401."""
+        user = self.user_row("Secret#Passw0rd", rounds=4)
+
+        with patch.object(auth_service.password_hasher, 'verify', side_effect=PasswordHasherBusy("full")):
+            with pytest.raises(PasswordHasherBusy):
+                self.login(auth_service, user, "Secret#Passw0rd")
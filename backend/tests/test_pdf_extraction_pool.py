@@ -0,0 +1,85 @@
+import asyncio
+import io
+
+import pytest
+
+from services.pdf_extraction_pool import PDFExtractionBusy, PDFExtractionPool
+
+canvas = pytest.importorskip("reportlab.pdfgen.canvas")
+
+
+def make_pdf(pages, blank=()):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for page_number in range(1, pages + 1):
+        if page_number not in blank:
+            pdf.drawString(72, 720, f"Statement page {page_number}")
+            pdf.drawString(72, 700, f"01/04/2024 Salary credit {page_number * 1000}.00")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = PDFExtractionPool(max_workers=2, max_jobs=2, max_queued=1, pages_per_task=2)
+    yield pool
+    pool.shutdown()
+
+
+class TestPDFExtractionPool:
+    """Test cases for process-pool PDF page extraction."""
+
+    def test_extract_text_keeps_page_order(self, pool):
+        """Test that pages extracted out of order are joined in page order."""
+        text = run(pool.extract_text(make_pdf(5), "statement.pdf"))
+
+        positions = [text.index(f"--- Page {n} ---\nStatement page {n}") for n in range(1, 6)]
+        assert positions == sorted(positions)
+        assert "Salary credit 5000.00" in text
+
+    def test_iter_pages_streams_every_page(self, pool):
+        """Test that iter_pages yields one result per page with its method."""
+        async def collect():
+            return [page async for page in pool.iter_pages(make_pdf(3, blank={2}), "scan.pdf", ocr=False)]
+
+        pages = sorted(run(collect()), key=lambda page: page.page_number)
+        assert [page.page_number for page in pages] == [1, 2, 3]
+        assert pages[0].method == "pdfplumber"
+        assert pages[1].method is None and pages[1].text == ""
+
+    def test_blank_document_returns_none(self, pool):
+        """Test that a document without any extractable text returns None."""
+        assert run(pool.extract_text(make_pdf(2, blank={1, 2}), "blank.pdf")) is None
+
+    def test_invalid_pdf_releases_slot(self, pool):
+        """Test that a corrupt upload fails without leaking a job slot."""
+        with pytest.raises(Exception):
+            run(pool.extract_text(b"not a pdf", "broken.pdf"))
+
+        stats = pool.get_stats()
+        assert stats["running"] == 0
+        assert stats["failed_jobs"] >= 1
+
+    def test_saturated_pool_rejects_jobs(self):
+        """Test that jobs beyond the running and queued caps fail fast."""
+        saturated = PDFExtractionPool(max_workers=1, max_jobs=1, max_queued=1)
+        document = make_pdf(1)
+
+        async def scenario():
+            jobs = [asyncio.ensure_future(saturated.extract_text(document, f"f{n}.pdf")) for n in range(3)]
+            return await asyncio.gather(*jobs, return_exceptions=True)
+
+        try:
+            results = run(scenario())
+        finally:
+            saturated.shutdown()
+
+        assert sum(isinstance(result, PDFExtractionBusy) for result in results) == 1
+        assert sum(isinstance(result, str) for result in results) == 2
+        assert saturated.get_stats()["rejected"] == 1
+        assert saturated.get_stats()["running"] == 0
@@ -0,0 +1,197 @@
+import asyncio
+import io
+import json
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+os.environ.setdefault('ARTHA_ENCRYPTION_KEY', 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA')
+
+from api.pdf_upload_endpoints import router
+from services import pdf_ingestion
+from services.pdf_extraction_pool import PDFExtractionPool
+from services.pdf_ingestion import (
+    IngestionJob, InvalidUpload, PDFIngestionManager, UploadTooLarge, spool_upload
+)
+from services.pdf_parse_cache import PDFParseCache
+from services.pdf_processor_service import PDFProcessorService
+from utils.encryption import EncryptionManager
+
+canvas = pytest.importorskip("reportlab.pdfgen.canvas")
+
+
+def make_statement(pages):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for page_number in range(1, pages + 1):
+        pdf.drawString(72, 740, "HDFC Bank Account Statement")
+        pdf.drawString(72, 720, "Account No: 123456789012")
+        pdf.drawString(72, 700, f"0{page_number}/04/2024 Salary credit {page_number},000.00")
+        pdf.drawString(72, 680, f"1{page_number}/04/2024 UPI Swiggy food 450.00")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+async def chunked(data, size=1000):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = PDFExtractionPool(max_workers=2, max_jobs=2, max_queued=4, pages_per_task=1)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def processor(pool, tmp_path):
+    service = PDFProcessorService()
+    service.extraction_pool = pool
+    service._parse_cache = PDFParseCache(path=str(tmp_path / "cache.db"), encryption_manager=EncryptionManager())
+    yield service
+    service._parse_cache.close()
+
+
+@pytest.fixture
+def client(processor, monkeypatch):
+    monkeypatch.setattr(pdf_ingestion, "_pdf_ingestion_manager", PDFIngestionManager(processor=processor))
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        yield client
+
+
+def read_events(response):
+    events = []
+    for block in response.text.split("\n\n"):
+        data = [line[6:] for line in block.split("\n") if line.startswith("data: ")]
+        if data and data[0] != "[DONE]":
+            events.append(json.loads(data[0]))
+    return events
+
+
+class TestSpoolUpload:
+    """Test cases for spooling request streams to disk."""
+
+    def test_spools_to_file(self):
+        """Test that chunks are written to a temp file and the size is reported."""
+        data = make_statement(1)
+        path, size = asyncio.run(spool_upload(chunked(data), max_bytes=len(data)))
+        try:
+            assert size == len(data)
+            with open(path, "rb") as f:
+                assert f.read() == data
+        finally:
+            os.unlink(path)
+
+    def test_oversized_upload_stops_early(self, tmp_path, monkeypatch):
+        """Test that spooling stops at the limit without draining the stream and removes the file."""
+        monkeypatch.setattr(pdf_ingestion.tempfile, "tempdir", str(tmp_path))
+        consumed = []
+
+        async def endless():
+            yield b"%PDF-1.4\n"
+            while True:
+                consumed.append(1)
+                yield b"x" * 1000
+
+        with pytest.raises(UploadTooLarge):
+            asyncio.run(spool_upload(endless(), max_bytes=10_000))
+        assert len(consumed) == 10
+        assert os.listdir(tmp_path) == []
+
+    def test_rejects_non_pdf(self):
+        """Test that bodies without a PDF header are rejected."""
+        with pytest.raises(InvalidUpload):
+            asyncio.run(spool_upload(chunked(b"<html>" * 500), max_bytes=10_000))
+        with pytest.raises(InvalidUpload):
+            asyncio.run(spool_upload(chunked(b""), max_bytes=10_000))
+
+
+class TestIngestionJob:
+    """Test cases for job event history and resumable subscriptions."""
+
+    def collect(self, job, last_seq=None):
+        async def run():
+            return [(seq, event["type"]) async for seq, event in job.subscribe(last_seq) if event]
+        return asyncio.run(run())
+
+    def test_subscriber_resumes_after_last_event_id(self):
+        """Test that a reconnecting subscriber only gets the events it missed."""
+        job = IngestionJob("job", "a.pdf", 100)
+        job.publish("extracting", {})
+        job.publish("page", {"page": 1, "pages_total": 2, "transactions": [{}, {}]})
+        job.publish("page", {"page": 2, "pages_total": 2, "transactions": [{}]})
+        job.publish("complete", {"result": {"success": True}})
+
+        assert self.collect(job, last_seq=2) == [(3, "page"), (4, "complete")]
+        assert (job.pages_done, job.pages_total, job.transactions_found) == (2, 2, 3)
+
+    def test_lagging_subscriber_gets_snapshot(self):
+        """Test that events dropped from the ring are replaced by a snapshot."""
+        job = IngestionJob("job", "a.pdf", 100, event_buffer=2)
+        for page in range(1, 5):
+            job.publish("page", {"page": page, "pages_total": 4, "transactions": []})
+        job.publish("failed", {"error": "boom"})
+
+        assert self.collect(job, last_seq=1) == [(5, "snapshot")]
+        assert self.collect(job) == [(5, "snapshot")]
+        job.publish("page", {"page": 5})
+        assert job.seq == 5
+
+
+class TestIngestEndpoints:
+    """Test cases for streaming ingestion over HTTP and SSE."""
+
+    def test_ingest_streams_pages_then_result(self, client):
+        """Test that page events carry partial transactions and the job completes."""
+        response = client.post("/api/pdf/ingest?filename=april.pdf", content=make_statement(3),
+                               headers={"Content-Type": "application/pdf"})
+        assert response.status_code == 202
+        job = response.json()
+
+        events = read_events(client.get(job["events_url"]))
+        pages = [event for event in events if event["type"] == "page"]
+        assert events[-1]["type"] == "complete"
+        assert sorted(event["page"] for event in pages) == [1, 2, 3]
+        assert all(event["pages_total"] == 3 and len(event["transactions"]) == 2 for event in pages)
+
+        status = client.get(job["status_url"]).json()
+        assert status["status"] == "complete"
+        assert status["pages_done"] == 3 and status["transactions_found"] == 6
+        assert len(status["result"]["transactions"]) == 6
+        assert "cached" not in status["result"]
+
+    def test_reingest_is_served_from_cache(self, client, processor):
+        """Test that re-ingesting the same statement completes from the parse cache."""
+        statement = make_statement(2)
+        for expected_hits in (0, 1):
+            job = client.post("/api/pdf/ingest", content=statement,
+                              headers={"Content-Type": "application/pdf"}).json()
+            events = read_events(client.get(job["events_url"]))
+            assert events[-1]["type"] == "complete"
+            assert "cached" not in events[-1]["result"]
+            assert processor.parse_cache.get_stats()["hits"] == expected_hits
+
+    def test_rejects_oversized_and_invalid_bodies(self, client):
+        """Test early 413 on Content-Length and 400/415 for bodies that aren't PDFs."""
+        oversized = client.post("/api/pdf/ingest", content=b"%PDF-" + b"x" * (10 * 1024 * 1024),
+                                headers={"Content-Type": "application/pdf"})
+        assert oversized.status_code == 413
+        assert client.post("/api/pdf/ingest", content=b"hello" * 300,
+                           headers={"Content-Type": "application/pdf"}).status_code == 400
+        assert client.post("/api/pdf/ingest", content=b"%PDF-1.4",
+                           headers={"Content-Type": "text/plain"}).status_code == 415
+        assert client.get("/api/pdf/jobs/missing").status_code == 404
+
+    def test_full_manager_returns_503(self, client):
+        """Test that ingestion sheds load once the active job cap is reached."""
+        pdf_ingestion.get_pdf_ingestion_manager().max_active_jobs = 0
+        response = client.post("/api/pdf/ingest", content=make_statement(1),
+                               headers={"Content-Type": "application/pdf"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+
+import pytest
+
+os.environ.setdefault('ARTHA_ENCRYPTION_KEY', 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA')
+
+from services.pdf_parse_cache import PDF_CACHE_TABLE, PDFParseCache
+from services.pdf_processor_service import PDF_PARSER_VERSION, PDFProcessorService
+from utils.encryption import EncryptionManager
+
+STATEMENT_TEXT = """
+--- Page 1 ---
+HDFC Bank Account Statement
+Account No: 123456789012
+Available Balance: Rs. 45,000.00
+01/04/2024 Salary credit 50,000.00
+03/04/2024 UPI Swiggy 450.00
+"""
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def parsed(transactions=1):
+    return {
+        "document_type": "bank_statement",
+        "accounts": [{"account_number": "XXXX9012", "account_type": "savings", "balance": 45000.0}],
+        "transactions": [{"date": "01/04/2024", "description": f"Salary {n}", "amount": 50000.0}
+                         for n in range(transactions)]
+    }
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PDFParseCache(path=str(tmp_path / "cache.db"), encryption_manager=EncryptionManager(), clock=FakeClock())
+    yield cache
+    cache.close()
+
+
+class TestPDFParseCache:
+    """Test cases for the encrypted content-addressed parse cache."""
+
+    def test_round_trip_is_encrypted_at_rest(self, cache):
+        """Test that a stored parse round-trips and is not stored in plaintext."""
+        digest = cache.digest(b"%PDF statement bytes")
+        assert cache.put(digest, "1", parsed())
+        assert cache.get(digest, "1") == parsed()
+
+        with open(cache.path, "rb") as f:
+            assert b"Salary" not in f.read()
+        assert cache.get_stats()["hits"] == 1
+
+    def test_digest_depends_on_content_and_key(self, cache):
+        """Test that digests are keyed, so they differ from a plain SHA-256 of the file."""
+        content = b"%PDF statement bytes"
+        assert cache.digest(content) == cache.digest(content)
+        assert cache.digest(content) != cache.digest(content + b" ")
+        assert cache.digest(content) != hashlib.sha256(content).hexdigest()
+
+    def test_other_parser_version_misses(self, cache):
+        """Test that parses from an older parser version are not served."""
+        digest = cache.digest(b"statement")
+        cache.put(digest, "1", parsed())
+        assert cache.get(digest, "2") is None
+
+    def test_entries_expire(self, cache):
+        """Test that entries older than the TTL are misses."""
+        digest = cache.digest(b"statement")
+        cache.put(digest, "1", parsed())
+        cache.clock.now += cache.ttl_seconds
+        assert cache.get(digest, "1") is None
+        assert cache.get_stats()["entries"] == 0
+
+    def test_size_bound_evicts_least_recently_used(self, tmp_path):
+        """Test that the byte bound evicts the least recently used parse first."""
+        clock = FakeClock()
+        manager = EncryptionManager()
+        entry_size = len(manager.encrypt_envelope({"digest": "x" * 64, "data": parsed(20)}))
+        cache = PDFParseCache(path=str(tmp_path / "cache.db"), max_bytes=int(entry_size * 2.5),
+                              encryption_manager=manager, clock=clock)
+        digests = [cache.digest(bytes([n])) for n in range(3)]
+
+        cache.put(digests[0], "1", parsed(20))
+        clock.now += 1
+        cache.put(digests[1], "1", parsed(20))
+        clock.now += 1
+        cache.get(digests[0], "1")
+        clock.now += 1
+        cache.put(digests[2], "1", parsed(20))
+
+        assert cache.get(digests[1], "1") is None
+        assert cache.get(digests[0], "1") is not None
+        assert cache.get_stats()["evictions"] == 1
+        assert cache.get_stats()["size_bytes"] <= cache.max_bytes
+        cache.close()
+
+    def test_swapped_rows_are_rejected(self, cache):
+        """Test that an envelope moved to another digest's row is not served."""
+        first, second = cache.digest(b"first"), cache.digest(b"second")
+        cache.put(first, "1", parsed(1))
+        cache.put(second, "1", parsed(2))
+
+        conn = sqlite3.connect(cache.path)
+        envelope = conn.execute(f"SELECT envelope FROM {PDF_CACHE_TABLE} WHERE digest = ?", (first,)).fetchone()[0]
+        conn.execute(f"UPDATE {PDF_CACHE_TABLE} SET envelope = ? WHERE digest = ?", (envelope, second))
+        conn.commit()
+        conn.close()
+
+        assert cache.get(second, "1") is None
+        assert cache.get_stats()["errors"] == 1
+
+
+class TestPDFProcessorCache:
+    """Test cases for cached re-uploads in PDFProcessorService."""
+
+    def test_reupload_skips_extraction(self, cache):
+        """Test that a second upload of the same bytes is served from the cache."""
+        service = PDFProcessorService()
+        service._parse_cache = cache
+        calls = []
+
+        async def extract(file_content, filename):
+            calls.append(filename)
+            return STATEMENT_TEXT
+
+        service._extract_pdf_data = extract
+        first = asyncio.run(service.process_financial_pdf(b"%PDF-1.4 statement", "a.pdf"))
+        second = asyncio.run(service.process_financial_pdf(b"%PDF-1.4 statement", "b.pdf"))
+
+        assert calls == ["a.pdf"]
+        assert cache.get_stats()["hits"] == 1
+        # The parse cache is shared across users; responses must not reveal a hit
+        assert "cached" not in first and "cached" not in second
+        assert second["filename"] == "b.pdf"
+        for field in ("document_type", "accounts", "transactions", "summary", "insights", "confidence_score"):
+            assert second[field] == first[field]
+        assert cache.get(cache.digest(b"%PDF-1.4 statement"), PDF_PARSER_VERSION) is not None
@@ -0,0 +1,144 @@
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import psycopg2
+import pytest
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor
+
+from database.pg_pool import PoolTimeoutError, PostgresConnectionPool
+
+
+class FakeConnection:
+    """Just enough of a psycopg2 connection for the pool."""
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        self.closed = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.info = SimpleNamespace(transaction_status=extensions.TRANSACTION_STATUS_IDLE)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connect():
+    opened = []
+
+    def fake_connect(*args, **kwargs):
+        conn = FakeConnection(*args, **kwargs)
+        opened.append(conn)
+        return conn
+
+    with patch('psycopg2.pool.psycopg2.connect', side_effect=fake_connect):
+        yield opened
+
+
+def make_pool(**kwargs):
+    options = dict(dsn="postgresql://artha@localhost:5432/artha", min_connections=2,
+                   max_connections=4, statement_timeout_ms=5000)
+    options.update(kwargs)
+    return PostgresConnectionPool(**options)
+
+
+class TestPostgresConnectionPool:
+    """Test cases for the shared psycopg2 pool."""
+
+    def test_warm_opens_min_connections_with_timeout(self, connect):
+        """Test that warm-up pre-opens connections with a statement timeout."""
+        make_pool().warm()
+
+        assert len(connect) == 2
+        assert connect[0].args == ("postgresql://artha@localhost:5432/artha",)
+        assert connect[0].kwargs["options"] == "-c statement_timeout=5000"
+        assert connect[0].kwargs["cursor_factory"] is RealDictCursor
+
+    def test_connections_are_reused(self, connect):
+        """Test that sequential calls reuse pooled connections."""
+        pool = make_pool()
+
+        for _ in range(50):
+            with pool.connection():
+                pass
+
+        stats = pool.get_stats()
+        assert stats["checkouts"] == 50
+        assert stats["connections_opened"] == 2
+        assert stats["in_use"] == 0
+        assert stats["reuse_ratio"] == 0.96
+
+    def test_commit_and_rollback(self, connect):
+        """Test that the block commits on success and rolls back on error."""
+        pool = make_pool(min_connections=1)
+
+        with pool.connection() as conn:
+            pass
+        with pytest.raises(ValueError):
+            with pool.connection() as same_conn:
+                raise ValueError("bad input")
+
+        assert same_conn is conn
+        assert conn.commits == 1
+        assert conn.rollbacks == 1
+
+    def test_broken_connection_is_discarded(self, connect):
+        """Test that an OperationalError drops the connection instead of pooling it."""
+        pool = make_pool(min_connections=1)
+
+        with pytest.raises(psycopg2.OperationalError):
+            with pool.connection() as broken:
+                raise psycopg2.OperationalError("server closed the connection")
+        with pool.connection() as fresh:
+            pass
+
+        assert broken.closed
+        assert fresh is not broken
+        assert pool.get_stats()["connections_discarded"] == 1
+
+    def test_old_connections_are_recycled(self, connect):
+        """Test that connections past the recycle age are closed on return."""
+        pool = make_pool(min_connections=1, recycle_seconds=1e-9)
+
+        with pool.connection() as conn:
+            pass
+
+        assert conn.closed
+        assert pool.get_stats()["connections_discarded"] == 1
+
+    def test_exhausted_pool_waits_then_times_out(self, connect):
+        """Test that checkouts beyond the maximum wait and then fail."""
+        pool = make_pool(min_connections=0, max_connections=1, pool_timeout=0.05)
+        held = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with pool.connection():
+                held.set()
+                release.wait()
+
+        worker = threading.Thread(target=hold)
+        worker.start()
+        held.wait()
+        try:
+            with pytest.raises(PoolTimeoutError):
+                with pool.connection():
+                    pass
+        finally:
+            release.set()
+            worker.join()
+
+        with pool.connection():
+            pass
+        stats = pool.get_stats()
+        assert stats["timeouts"] == 1
+        assert stats["peak_in_use"] == 1
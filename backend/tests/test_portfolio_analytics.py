@@ -0,0 +1,138 @@
+import random
+import statistics
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from services.portfolio_analytics import (
+    LifetimeStats, PortfolioAnalyticsEngine, SnapshotSeries, max_drawdown, rows_to_array,
+    sharpe_ratio, sortino_ratio, to_row, trend_slope, window_analytics
+)
+
+
+def make_rows(days, start=None, seed=3):
+    """Daily (snapshot_date, *COLUMNS) rows ending today, random-walk net worth"""
+    rng = random.Random(seed)
+    start = start or date.today() - timedelta(days=days - 1)
+    net_worth, rows = 1_000_000.0, []
+    for offset in range(days):
+        net_worth *= 1 + rng.gauss(0.0004, 0.01)
+        mutual_funds, savings, epf = net_worth * 0.5, net_worth * 0.2, net_worth * 0.3
+        rows.append((start + timedelta(days=offset), net_worth, net_worth + 50_000, 50_000,
+                     mutual_funds, savings, epf))
+    return rows
+
+
+def legacy_max_drawdown(values):
+    peak, worst = values[0], 0
+    for value in values[1:]:
+        if value > peak:
+            peak = value
+        else:
+            worst = max(worst, (peak - value) / peak * 100)
+    return worst
+
+
+def legacy_trend(values):
+    n = len(values)
+    x_mean, y_mean = (n - 1) / 2, sum(values) / n
+    return sum((i - x_mean) * (values[i] - y_mean) for i in range(n)) / sum((i - x_mean) ** 2 for i in range(n))
+
+
+class TestVectorizedMetrics:
+    """Test cases for the NumPy metrics against the pure-Python definitions."""
+
+    def test_window_metrics_match_python_loops(self):
+        """Test that returns, volatility, drawdown and trend match the old loops."""
+        values = [row[1] for row in make_rows(90)]
+        series = rows_to_array(make_rows(90))
+        analytics = window_analytics(series)
+
+        returns = [(values[i] - values[i - 1]) / values[i - 1] * 100 for i in range(1, len(values))]
+        assert analytics['risk']['volatility'] == pytest.approx(statistics.stdev(returns))
+        assert analytics['risk']['max_drawdown'] == pytest.approx(legacy_max_drawdown(values))
+        assert analytics['risk']['positive_days'] == len([r for r in returns if r > 0])
+        assert analytics['trends']['overall_trend'] == pytest.approx(legacy_trend(values))
+        assert analytics['trends']['recent_trend'] == pytest.approx(legacy_trend(values[-7:]))
+        assert analytics['growth']['avg_daily_growth'] == pytest.approx((values[-1] - values[0]) / len(values))
+        assert analytics['allocation']['mutual_funds_percentage'] == pytest.approx(
+            values[-1] * 0.5 / (values[-1] + 50_000) * 100)
+
+    def test_zero_net_worth_rows_are_skipped(self):
+        """Test that missing net worth values are left out like the old list filters."""
+        rows = make_rows(10)
+        rows[4] = (rows[4][0], None) + rows[4][2:]
+        analytics = window_analytics(rows_to_array(rows))
+
+        assert analytics['growth']['avg_daily_growth'] == pytest.approx((rows[-1][1] - rows[0][1]) / 9)
+
+    def test_ratio_edge_cases(self):
+        """Test that flat or tiny series give zero ratios rather than dividing by zero."""
+        flat = np.full(10, 0.0)
+        assert sharpe_ratio(flat) == 0.0
+        assert sortino_ratio(np.full(10, 1.0)) == 0.0
+        assert max_drawdown(np.array([5.0])) == 0.0
+        assert trend_slope(np.array([1.0])) == 0.0
+
+
+class TestIncrementalAnalytics:
+    """Test cases for the incrementally maintained series and engine."""
+
+    def test_lifetime_stats_fold_matches_full_recompute(self):
+        """Test that folding snapshots one by one equals computing over the whole history."""
+        rows = make_rows(400)
+        series = rows_to_array(rows)
+        incremental = LifetimeStats()
+        for row in series:
+            # Today's snapshot is stored several times before the next day arrives
+            incremental.observe(int(row[0]), row[1] * 0.9)
+            incremental.observe(int(row[0]), row[1])
+
+        expected = LifetimeStats.from_series(series[:, 0], series[:, 1]).summary()
+        for key, value in incremental.summary().items():
+            assert value == pytest.approx(expected[key]), key
+        assert expected['max_drawdown'] == pytest.approx(legacy_max_drawdown([row[1] for row in rows]))
+
+    def test_series_trims_to_retention_and_replaces_same_day(self):
+        """Test that the series keeps retain_days of rows and rewrites today's row."""
+        rows = make_rows(100)
+        series = SnapshotSeries(rows_to_array(rows[:50]), retain_days=30)
+        for row in rows[50:]:
+            assert series.append(to_row(row[0], row[1:]))
+        last = rows[-1]
+        assert series.append(to_row(last[0], (1.0,) + last[2:]))
+
+        assert series.rows[-1, 1] == 1.0
+        assert series.rows[0, 0] >= last[0].toordinal() - 30
+        assert not series.append(to_row(rows[0][0], rows[0][1:]))
+
+    def test_reads_are_cached_and_kept_current_by_snapshots(self):
+        """Test that the engine loads once and folds new snapshots into cached results."""
+        rows = make_rows(120, start=date.today() - timedelta(days=120))
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return rows
+
+        engine = PortfolioAnalyticsEngine(window_days=90, retain_days=365)
+        first, count = engine.get_analytics("u1", loader)
+        assert engine.get_analytics("u1", loader)[0] is first
+        assert count == 90
+
+        engine.record_snapshot("u1", date.today(), (rows[-1][1] * 2,) + rows[-1][2:])
+        analytics, count = engine.get_analytics("u1", loader)
+        assert count == 91
+        assert analytics['growth']['current_net_worth'] == pytest.approx(rows[-1][1] * 2)
+        assert analytics['lifetime']['data_points'] == 121
+        assert engine.get_summary("u1", 7, loader)['current_net_worth'] == pytest.approx(rows[-1][1] * 2)
+        assert len(loads) == 1
+
+    def test_snapshot_for_uncached_user_is_ignored(self):
+        """Test that snapshots for users never read don't allocate state."""
+        engine = PortfolioAnalyticsEngine()
+        engine.record_snapshot("u2", date.today(), (1.0,) * 6)
+
+        assert engine.get_stats()['size'] == 0
+        assert engine.get_analytics("u2", lambda: []) == ({}, 0)
@@ -0,0 +1,172 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from core.rate_limit import (
+    InMemoryRateLimitBackend, RateLimit, RateLimiter, RedisRateLimitBackend, gcra
+)
+from middleware.rate_limiter import RateLimitMiddleware
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    """Stand-in for a redis.asyncio client: runs the GCRA script's logic on a local dict."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.store = {}
+        self.calls = 0
+
+    def register_script(self, script):
+        assert "redis.call('TIME')" in script
+
+        async def run(keys, args):
+            self.calls += 1
+            now = self.clock() * 1000
+            key, (interval, capacity, cost) = keys[0], args
+            value, expires_at = self.store.get(key, (None, 0))
+            tat = value if value is not None and expires_at > now else now
+            allowed, new_tat, remaining, retry_after, reset_after = gcra(tat, now, interval, capacity, cost)
+            if allowed:
+                self.store[key] = (new_tat, new_tat)  # PX expiry lands when the bucket refills
+            return [int(allowed), remaining, str(retry_after), str(reset_after)]
+
+        return run
+
+
+def hit(limiter, key, limit, times=1):
+    async def run():
+        return [await limiter.hit(key, limit) for _ in range(times)]
+    return asyncio.run(run())
+
+
+class TestGCRA:
+    """Test cases for the rate limiting algorithm and in-memory backend."""
+
+    def test_burst_then_steady_rate(self):
+        """Test that a full bucket allows a burst and then one request per interval."""
+        clock = FakeClock()
+        limiter = RateLimiter(InMemoryRateLimitBackend())
+        limit = RateLimit(requests=5, period=10)
+
+        with patch('core.rate_limit.time.monotonic', clock):
+            results = hit(limiter, "user", limit, times=6)
+            assert [r.allowed for r in results] == [True] * 5 + [False]
+            assert [r.remaining for r in results[:5]] == [4, 3, 2, 1, 0]
+            assert results[5].retry_after == 2.0
+
+            clock.now += 2.0
+            assert hit(limiter, "user", limit)[0].allowed
+            assert not hit(limiter, "user", limit)[0].allowed
+
+        assert limiter.get_stats()["denied"] == 2
+
+    def test_keys_are_independent(self):
+        """Test that one client's usage doesn't affect another's."""
+        limiter = RateLimiter(InMemoryRateLimitBackend())
+        limit = RateLimit(requests=1, period=60)
+
+        assert hit(limiter, "a", limit)[0].allowed
+        assert not hit(limiter, "a", limit)[0].allowed
+        assert hit(limiter, "b", limit)[0].allowed
+
+    def test_memory_is_one_entry_per_key(self):
+        """Test that many hits on one key don't grow storage."""
+        backend = InMemoryRateLimitBackend(stripes=4)
+        limiter = RateLimiter(backend)
+
+        hit(limiter, "user", RateLimit(requests=1000, period=1), times=500)
+
+        assert backend.get_stats()["keys"] == 1
+
+    def test_idle_keys_are_evicted(self):
+        """Test that keys with a full bucket are swept away."""
+        clock = FakeClock()
+        backend = InMemoryRateLimitBackend(stripes=4, sweep_every=10_000)
+        limiter = RateLimiter(backend)
+        limit = RateLimit(requests=10, period=10)
+
+        with patch('core.rate_limit.time.monotonic', clock):
+            for i in range(20):
+                hit(limiter, f"client-{i}", limit)
+            clock.now += 0.5
+            assert backend.sweep() == 0
+
+            clock.now += 1.0
+            assert backend.sweep() == 20
+
+        assert backend.get_stats()["keys"] == 0
+
+    def test_backend_error_fails_open(self):
+        """Test that a broken backend lets requests through and is counted."""
+        class BrokenBackend:
+            async def hit(self, key, limit, cost=1):
+                raise ConnectionError("redis down")
+
+            def get_stats(self):
+                return {'backend': 'broken'}
+
+        limiter = RateLimiter(BrokenBackend())
+
+        assert hit(limiter, "user", RateLimit(requests=1, period=60))[0].allowed
+        assert limiter.get_stats()["errors"] == 1
+
+
+class TestRedisBackend:
+    """Test cases for the shared Redis backend."""
+
+    def test_limit_is_shared_across_workers(self):
+        """Test that two limiters on the same Redis share one allowance."""
+        redis = FakeRedis(FakeClock())
+        worker_a = RateLimiter(RedisRateLimitBackend(redis))
+        worker_b = RateLimiter(RedisRateLimitBackend(redis))
+        limit = RateLimit(requests=3, period=60)
+
+        results = hit(worker_a, "user", limit, times=2) + hit(worker_b, "user", limit, times=2)
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert results[3].retry_after == 20.0
+        assert list(redis.store) == ["ratelimit:user"]
+
+
+class TestRateLimitMiddleware:
+    """Test cases for the HTTP rate limiting middleware."""
+
+    def make_client(self, limiter):
+        app = FastAPI()
+        app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+        @app.get("/api/auth/login")
+        async def login():
+            return {"ok": True}
+
+        return TestClient(app)
+
+    def test_returns_429_with_retry_after(self):
+        """Test that the auth tier rejects the 11th request in a minute."""
+        client = self.make_client(RateLimiter(InMemoryRateLimitBackend()))
+
+        responses = [client.get("/api/auth/login") for _ in range(11)]
+
+        assert [r.status_code for r in responses] == [200] * 10 + [429]
+        assert responses[0].headers["X-RateLimit-Limit"] == "10"
+        assert responses[0].headers["X-RateLimit-Remaining"] == "9"
+        assert int(responses[10].headers["Retry-After"]) > 0
+        assert int(responses[0].headers["X-RateLimit-Reset"]) >= int(time.time())
+
+    def test_pdf_ingest_uses_upload_tier(self):
+        """Test that the streaming PDF ingest endpoint gets the strict upload limit."""
+        middleware = RateLimitMiddleware(FastAPI(), limiter=RateLimiter(InMemoryRateLimitBackend()))
+
+        assert middleware._get_endpoint_category("/api/pdf/ingest") == "upload"
+        assert middleware._get_endpoint_category("/api/pdf/jobs/abc") == "api"
@@ -0,0 +1,155 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agents.base_agent import BaseFinancialAgent
+from config.settings import config
+from utils.response_cache import ResponseCache, normalize_query, response_cache_namespace
+
+
+@pytest.fixture(autouse=True)
+def enable_caching(monkeypatch):
+    monkeypatch.setattr(config, 'ENABLE_RESPONSE_CACHING', True)
+
+
+class TestResponseCache:
+    """Test cases for the bounded, per-user LLM response cache"""
+
+    def test_entries_are_bounded_lru(self):
+        """Test that the cache evicts instead of growing without limit"""
+        cache = ResponseCache(max_entries=3, normalize_queries=False)
+        for i in range(10):
+            cache.set(f"question {i}", f"answer {i}")
+
+        stats = cache.get_stats()
+        assert stats["size"] == 3
+        assert stats["evictions"] == 7
+        assert cache.get("question 0") is None
+        assert cache.get("question 9") == "answer 9"
+
+    def test_memory_bound_evicts_oldest(self):
+        """Test that the byte budget is enforced and reported"""
+        cache = ResponseCache(max_entries=100, max_bytes=10_000, normalize_queries=False)
+        for i in range(10):
+            cache.set(f"question {i}", "x" * 3000)
+
+        stats = cache.get_stats()
+        assert stats["size_bytes"] <= 10_000
+        assert stats["size"] == 3
+
+    def test_users_do_not_share_entries(self):
+        """Test that a response cached for one user is not served to another"""
+        cache = ResponseCache()
+        with response_cache_namespace("user-a"):
+            cache.set("How is my portfolio doing?", "Your equity is up 12%", "analyst")
+        with response_cache_namespace("user-b"):
+            assert cache.get("How is my portfolio doing?", "analyst") is None
+        with response_cache_namespace("user-a"):
+            assert cache.get("How is my portfolio doing?", "analyst") == "Your equity is up 12%"
+
+    def test_different_user_data_never_shares_an_entry(self):
+        """Test that prompts whose figures round alike stay apart, even with normalization"""
+        cache = ResponseCache(normalize_queries=True)
+        portfolio_a = '{"net_worth": 52340, "equity": 18000}'
+        portfolio_b = '{"net_worth": 52310, "equity": 18400}'
+        with response_cache_namespace("user-a"):
+            cache.set("analyst", "Your net worth is ₹52,340", portfolio_a)
+        with response_cache_namespace("user-b"):
+            assert cache.get("analyst", portfolio_b) is None
+        assert cache.get("analyst", portfolio_b, namespace="user-a") is None
+        assert cache.get("analyst", portfolio_a, namespace="user-a") == "Your net worth is ₹52,340"
+
+    def test_namespace_follows_spawned_tasks(self):
+        """Test that tasks started inside a namespace keep using it"""
+        cache = ResponseCache()
+
+        async def lookup():
+            await asyncio.sleep(0)
+            return cache.get("net worth?", "analyst")
+
+        async def run():
+            with response_cache_namespace("user-a"):
+                cache.set("net worth?", "₹6.5L", "analyst")
+                return await asyncio.gather(lookup(), lookup())
+
+        assert asyncio.run(run()) == ["₹6.5L", "₹6.5L"]
+
+    def test_normalized_queries_share_an_entry(self):
+        """Test that case, spacing, punctuation and nearby amounts hit the same entry"""
+        cache = ResponseCache(normalize_queries=True)
+        cache.set("Should I invest ₹52,340 in ELSS?", "Yes, up to the 80C limit")
+
+        assert cache.get("should i invest  ₹52,000 in elss") == "Yes, up to the 80C limit"
+        assert cache.get("Should I invest ₹90,000 in ELSS?") is None
+
+    def test_disabled_cache_is_a_no_op(self, monkeypatch):
+        """Test that ENABLE_RESPONSE_CACHING=false bypasses the cache"""
+        monkeypatch.setattr(config, 'ENABLE_RESPONSE_CACHING', False)
+        cache = ResponseCache()
+        cache.set("q", "a")
+        assert cache.get("q") is None
+
+
+class CountingGateway:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_content(self, model, contents, config):
+        self.calls += 1
+        return SimpleNamespace(text=f"answer {self.calls}", candidates=[])
+
+
+class TestAgentResponseCaching:
+    """Test cases for how agents key the response cache"""
+
+    @pytest.fixture
+    def agent(self, monkeypatch):
+        monkeypatch.setattr(BaseFinancialAgent, "__abstractmethods__", frozenset())
+        agent = object.__new__(BaseFinancialAgent)
+        agent.agent_type, agent.name, agent.personality = "analyst", "Analyst", "curious"
+        agent.grounding_focus = agent.response_style = ""
+        agent.llm_gateway = CountingGateway()
+        monkeypatch.setattr(agent, "_add_agent_personality", lambda text: text)
+        monkeypatch.setattr("agents.base_agent.response_cache", ResponseCache(normalize_queries=True))
+        return agent
+
+    def ask(self, agent, question, data):
+        return asyncio.run(agent.generate_ai_response(
+            "", f"USER QUERY: {question}\nDATA: {data}", user_query=question, data_context=data
+        ))
+
+    def test_rephrased_question_hits_for_the_same_data(self, agent):
+        """Test that the user's question is the normalized part of the key"""
+        with response_cache_namespace("user-a"):
+            first = self.ask(agent, "Should I invest ₹52,340 in ELSS?", '{"net_worth": 52340}')
+            again = self.ask(agent, "should i invest  ₹52,000 in elss", '{"net_worth": 52340}')
+
+        assert again == first
+        assert agent.llm_gateway.calls == 1
+
+    def test_changed_data_misses(self, agent):
+        """Test that the user's data stays exact even when figures round alike"""
+        with response_cache_namespace("user-a"):
+            self.ask(agent, "How am I doing?", '{"net_worth": 52340}')
+            self.ask(agent, "How am I doing?", '{"net_worth": 52310}')
+
+        assert agent.llm_gateway.calls == 2
+
+
+class TestNormalizeQuery:
+    """Test cases for query normalization"""
+
+    def test_small_numbers_stay_exact(self):
+        """Test that years, ages and rates are not bucketed together"""
+        assert normalize_query("Tax slabs for FY 2024?") != normalize_query("Tax slabs for FY 2025?")
+        assert normalize_query("FD at 7.25%") == "fd at 7.25%"
+
+    def test_large_amounts_are_bucketed(self):
+        """Test that amounts round to two significant figures"""
+        assert normalize_query("Loan of 10,40,000") == normalize_query("loan of 1010000")
+
+    def test_list_commas_split_numbers(self):
+        """Test that commas between list items are not read as digit grouping"""
+        assert normalize_query("[1,2,3]") == "[1,2,3]"
+        assert normalize_query("funds 12,345 and 67,890") == "funds 12000 and 68000"
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+
+import httpx
+from fastapi import FastAPI, File, Form, Request, UploadFile
+
+from middleware.body_scanner import MultipartBodyScanner, TextBodyScanner, create_body_scanner
+from middleware.security_middleware import InputValidator, RateLimiter, SecurityConfig, SecurityMiddleware
+
+BOUNDARY = "artha-test-boundary"
+
+
+def build_app(max_body_size=1024 * 1024, max_upload_size=4 * 1024 * 1024):
+    config = SecurityConfig()
+    config.rate_limits = {category: {'requests': 10000, 'window': 60} for category in config.rate_limits}
+    config.max_body_size = max_body_size
+    config.max_upload_size = max_upload_size
+    calls = []
+
+    app = FastAPI()
+
+    @app.post("/api/chat")
+    async def chat(payload: dict):
+        calls.append("chat")
+        return payload
+
+    @app.post("/api/pdf/upload")
+    async def upload(file: UploadFile = File(...), user_query: str = Form(None)):
+        calls.append("upload")
+        digest = hashlib.sha256()
+        while chunk := await file.read(64 * 1024):
+            digest.update(chunk)
+        return {"sha256": digest.hexdigest(), "user_query": user_query}
+
+    app.add_middleware(SecurityMiddleware, config=config)
+    return app, calls
+
+
+def multipart_body(file_bytes, user_query="monthly summary"):
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="user_query"\r\n\r\n'
+        f"{user_query}\r\n"
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="statement.pdf"\r\n'
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode() + file_bytes + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def chunked(data, size):
+    async def stream():
+        for start in range(0, len(data), size):
+            yield data[start:start + size]
+    return stream()
+
+
+def post(app, path, **kwargs):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, **kwargs)
+    return asyncio.run(run())
+
+
+class TestBodyScanner:
+    """Test cases for incremental body scanning."""
+
+    def matcher(self):
+        return InputValidator(SecurityConfig()).matches_malicious_content
+
+    def test_pattern_split_across_chunks_is_found(self):
+        """Test that the lookahead window catches a match straddling two chunks."""
+        scanner = TextBodyScanner(self.matcher(), lookahead=64)
+
+        assert scanner.feed(b'{"message": "hello <scr') is None
+        assert scanner.feed(b'ipt>alert(1)"}') is not None
+
+    def test_file_parts_are_skipped(self):
+        """Test that file contents are never scanned while text fields are."""
+        scanner = MultipartBodyScanner(BOUNDARY.encode(), self.matcher(), lookahead=64)
+        body = multipart_body(b"%PDF-1.4 <script> union select * from x ../../etc/passwd" * 100)
+
+        for start in range(0, len(body), 7):
+            assert scanner.feed(body[start:start + 7]) is None
+        assert scanner.close() is None
+        assert scanner.skipped_bytes > 5000
+        assert scanner.scanned_bytes < 500
+
+    def test_malicious_field_split_by_boundary_scan(self):
+        """Test that a text field is still scanned when chunks cut through it."""
+        scanner = MultipartBodyScanner(BOUNDARY.encode(), self.matcher(), lookahead=64)
+        body = multipart_body(b"%PDF", user_query="x' or 1=1; drop table users")
+
+        reasons = [scanner.feed(body[start:start + 5]) for start in range(0, len(body), 5)]
+
+        assert any(reasons)
+
+    def test_binary_content_types_are_not_scanned(self):
+        """Test that opaque bodies get no scanner at all."""
+        assert create_body_scanner("application/pdf", self.matcher()) is None
+        assert isinstance(create_body_scanner(f"multipart/form-data; boundary={BOUNDARY}", self.matcher()),
+                          MultipartBodyScanner)
+
+
+class TestSecurityMiddleware:
+    """Test cases for the streaming ASGI security middleware."""
+
+    def test_upload_streams_through_untouched(self):
+        """Test that a large upload reaches the endpoint intact and unscanned."""
+        app, calls = build_app()
+        file_bytes = b"<script>alert(1)</script> union select " * 50000
+
+        response = post(app, "/api/pdf/upload", content=chunked(multipart_body(file_bytes), 64 * 1024),
+                        headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+
+        assert response.status_code == 200
+        assert response.json()["sha256"] == hashlib.sha256(file_bytes).hexdigest()
+        assert response.headers["X-Content-Type-Options"] == "nosniff"
+        assert "X-Process-Time" in response.headers
+
+    def test_malicious_json_body_rejected(self):
+        """Test that an injection in a JSON body is refused with 400."""
+        app, calls = build_app()
+
+        response = post(app, "/api/chat", json={"message": "1; DROP TABLE users"})
+
+        assert response.status_code == 400
+        assert response.json() == {"detail": "Invalid input detected"}
+        assert calls == []
+
+    def test_malicious_form_field_in_upload_rejected(self):
+        """Test that text fields of a multipart upload are still validated."""
+        app, calls = build_app()
+
+        response = post(app, "/api/pdf/upload", content=multipart_body(b"%PDF", user_query="<script>x</script>"),
+                        headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+
+        assert response.status_code == 400
+        assert calls == []
+
+    def test_declared_oversize_rejected_before_app(self):
+        """Test that Content-Length over the limit is refused without reading the body."""
+        app, calls = build_app(max_upload_size=1024)
+
+        response = post(app, "/api/pdf/upload", content=multipart_body(b"0" * 4096),
+                        headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+
+        assert response.status_code == 413
+        assert calls == []
+
+    def test_chunked_oversize_rejected_while_streaming(self):
+        """Test that a body without Content-Length is cut off once it passes the limit."""
+        app, calls = build_app(max_upload_size=256 * 1024)
+
+        response = post(app, "/api/pdf/upload", content=chunked(multipart_body(b"0" * 1024 * 1024), 16 * 1024),
+                        headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"})
+
+        assert response.status_code == 413
+        assert response.json() == {"detail": "Request too large"}
+        assert calls == []
+
+    def test_blocked_user_agent(self):
+        """Test that scanner user agents get a 403 response rather than an error."""
+        app, calls = build_app()
+
+        response = post(app, "/api/chat", json={"message": "hi"}, headers={"user-agent": "sqlmap/1.7"})
+
+        assert response.status_code == 403
+        assert calls == []
+
+    def test_pdf_ingest_is_rate_limited_as_upload(self):
+        """Test that the streaming PDF ingest endpoint falls in the upload tier."""
+        limiter = RateLimiter(SecurityConfig(), limiter=object())
+
+        def category(path):
+            return limiter._get_rate_limit_key(Request({"type": "http", "path": path, "headers": [], "query_string": b""}))
+
+        assert category("/api/pdf/ingest") == "upload"
+        assert category("/api/pdf/jobs/abc") == "api"
@@ -0,0 +1,179 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.session_endpoints import router
+from core.session_store import (
+    InMemorySessionBackend, RedisSessionBackend, SessionStore, get_session_store
+)
+
+SESSION = "sess_abc123xyz"
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestInMemorySessionBackend:
+    """Test cases for the in-memory LRU/TTL session fallback."""
+
+    def test_sessions_expire_without_explicit_cleanup(self):
+        """Test that expired sessions are swept by ordinary traffic."""
+        clock = FakeClock()
+        backend = InMemorySessionBackend(max_sessions=100, ttl_seconds=60, clock=clock)
+        run(backend.set("sess_old", "userData", "1", "127.0.0.1"))
+        clock.now += 30
+        run(backend.set("sess_new", "userData", "2", "127.0.0.1"))
+
+        clock.now += 31
+        assert run(backend.get_many("sess_new", ["userData"])) == {"userData": "2"}
+        assert backend.get_stats()["sessions"] == 1
+        assert backend.expired == 1
+
+    def test_set_refreshes_expiry(self):
+        """Test that writing to a session pushes its expiry out."""
+        clock = FakeClock()
+        backend = InMemorySessionBackend(max_sessions=100, ttl_seconds=60, clock=clock)
+        run(backend.set(SESSION, "a", "1", "127.0.0.1"))
+        clock.now += 50
+        run(backend.set(SESSION, "b", "2", "127.0.0.1"))
+        clock.now += 50
+
+        assert run(backend.get_many(SESSION, ["a", "b"])) == {"a": "1", "b": "2"}
+        clock.now += 11
+        assert backend.sweep() == 1
+
+    def test_least_recently_used_session_evicted(self):
+        """Test that the session cap evicts the least recently used session."""
+        backend = InMemorySessionBackend(max_sessions=2, ttl_seconds=60, clock=FakeClock())
+        run(backend.set("sess_one", "k", "1", "127.0.0.1"))
+        run(backend.set("sess_two", "k", "2", "127.0.0.1"))
+        run(backend.get_many("sess_one", ["k"]))
+        run(backend.set("sess_three", "k", "3", "127.0.0.1"))
+
+        assert run(backend.get_many("sess_two", ["k"])) == {"k": None}
+        assert run(backend.get_many("sess_one", ["k"])) == {"k": "1"}
+        assert backend.evicted == 1
+
+    def test_expiry_heap_stays_bounded(self):
+        """Test that repeated writes to one session don't grow the heap without bound."""
+        backend = InMemorySessionBackend(max_sessions=10, ttl_seconds=60, clock=FakeClock())
+        for index in range(1000):
+            run(backend.set(SESSION, "counter", str(index), "127.0.0.1"))
+
+        assert len(backend._expiry_heap) <= 2 * 1 + 64 + 1
+
+
+class TestSessionEndpoints:
+    """Test cases for /api/session on the in-memory store."""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.include_router(router)
+        store = SessionStore(InMemorySessionBackend(max_sessions=100, ttl_seconds=60))
+
+        async def override():
+            return store
+
+        app.dependency_overrides[get_session_store] = override
+        return TestClient(app)
+
+    def test_set_get_many_and_clear(self, client):
+        """Test that get-many returns every requested key in one call."""
+        for key, value in [("userData", '{"id": 1}'), ("authToken", "tok")]:
+            assert client.post("/api/session/set", json={"sessionId": SESSION, "key": key, "value": value}).json()["success"]
+
+        response = client.post("/api/session/get-many",
+                               json={"sessionId": SESSION, "keys": ["userData", "authToken", "missing"]})
+        assert response.json()["values"] == {"userData": '{"id": 1}', "authToken": "tok", "missing": None}
+        assert client.post("/api/session/get", json={"sessionId": SESSION, "key": "authToken"}).json()["value"] == "tok"
+
+        client.post("/api/session/clear", json={"sessionId": SESSION, "key": ""})
+        assert client.post("/api/session/get", json={"sessionId": SESSION, "key": "authToken"}).json()["value"] is None
+
+    def test_metadata_fields_are_not_exposed(self, client):
+        """Test that reserved metadata keys can't be read or overwritten."""
+        client.post("/api/session/set", json={"sessionId": SESSION, "key": "userData", "value": "x"})
+
+        assert client.post("/api/session/set", json={"sessionId": SESSION, "key": "_client_ip", "value": "1.2.3.4"}).status_code == 400
+        assert client.post("/api/session/get", json={"sessionId": SESSION, "key": "_client_ip"}).json()["value"] is None
+        assert client.post("/api/session/get-many", json={"sessionId": SESSION, "keys": ["_created_at"]}).status_code == 400
+
+    def test_get_many_validation(self, client):
+        """Test that get-many rejects bad session IDs and key lists."""
+        assert client.post("/api/session/get-many", json={"sessionId": "bad", "keys": ["a"]}).status_code == 400
+        assert client.post("/api/session/get-many", json={"sessionId": SESSION, "keys": []}).status_code == 400
+        assert client.post("/api/session/get-many",
+                           json={"sessionId": SESSION, "keys": [f"k{i}" for i in range(51)]}).status_code == 400
+
+
+class TestRedisSessionBackend:
+    """Test cases for the hash-per-session Redis backend."""
+
+    @pytest.fixture
+    def redis_client(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        return fakeredis.FakeAsyncRedis(decode_responses=True)
+
+    def test_session_is_one_hash_with_one_ttl(self, redis_client):
+        """Test that a session's keys share one hash and one expiry."""
+        async def scenario():
+            backend = RedisSessionBackend(redis_client, prefix="test_session:", ttl_seconds=60)
+            await backend.set(SESSION, "userData", "u", "127.0.0.1")
+            await backend.set(SESSION, "authToken", "t", "127.0.0.1")
+
+            assert await redis_client.keys("test_session:*") == [f"test_session:{SESSION}"]
+            assert 0 < await redis_client.ttl(f"test_session:{SESSION}") <= 60
+            assert await backend.get_many(SESSION, ["userData", "authToken", "x"]) == {
+                "userData": "u", "authToken": "t", "x": None
+            }
+
+            await backend.remove(SESSION, "userData")
+            assert await backend.get_many(SESSION, ["userData"]) == {"userData": None}
+            await backend.clear(SESSION)
+            assert await redis_client.exists(f"test_session:{SESSION}") == 0
+
+        run(scenario())
+
+    def test_read_of_missing_session_creates_nothing(self, redis_client):
+        """Test that reads never recreate an expired session without a TTL."""
+        async def scenario():
+            backend = RedisSessionBackend(redis_client, prefix="test_session:", ttl_seconds=60)
+            assert await backend.get_many(SESSION, ["userData"]) == {"userData": None}
+            assert await redis_client.exists(f"test_session:{SESSION}") == 0
+
+        run(scenario())
+
+    def test_read_touches_last_access_and_keeps_ttl(self, redis_client):
+        """Test that a read refreshes _last_accessed in the same call and leaves the expiry alone."""
+        async def scenario():
+            backend = RedisSessionBackend(redis_client, prefix="test_session:", ttl_seconds=60)
+            key = f"test_session:{SESSION}"
+            await backend.set(SESSION, "userData", "u", "127.0.0.1")
+            await redis_client.hset(key, "_last_accessed", "2000-01-01T00:00:00")
+
+            assert await backend.get_many(SESSION, ["missing"]) == {"missing": None}
+            assert await redis_client.hget(key, "_last_accessed") > "2000-01-01T00:00:00"
+            assert 0 < await redis_client.ttl(key) <= 60
+
+        run(scenario())
+
+    def test_unreachable_redis_falls_back_to_memory(self):
+        """Test that the store switches to memory when the first ping fails."""
+        class DownClient:
+            async def ping(self):
+                raise ConnectionError("redis down")
+
+        store = run(SessionStore(RedisSessionBackend(DownClient())).ready())
+        assert store.storage_type == "Memory"
@@ -0,0 +1,119 @@
+import random
+import time
+
+from services.statement_parser import (
+    CATEGORY_RULES, DOCUMENT_TYPE_RULES, KeywordClassifier, StatementParser, parse_amount
+)
+
+
+def linear_classify(rules, default, text_lower):
+    """The per-keyword scan the classifier replaces"""
+    for label, keywords in rules:
+        if any(keyword in text_lower for keyword in keywords):
+            return label
+    return default
+
+
+def table_statement(rows):
+    lines = ["--- Page 1 ---", "HDFC Bank Account Statement", "Account No: 123456789012",
+             "Closing Balance: Rs. 1,45,000.00", "", "--- Table 1 on Page 1 ---",
+             "Date | Narration | Chq./Ref.No. | Withdrawal Amt. | Deposit Amt. | Closing Balance"]
+    for n in range(rows):
+        if n % 3 == 0:
+            lines.append(f"{n % 28 + 1:02d}/04/2024 | NEFT SALARY ACME {n} | REF{n} |  | 50,000.00 | 1,50,000.00")
+        else:
+            lines.append(f"{n % 28 + 1:02d}/04/2024 | UPI/SWIGGY {n} | REF{n} | 450.00 |  | 1,49,550.00")
+    return "\n".join(lines)
+
+
+class TestKeywordClassifier:
+    """Test cases for trie-regex keyword classification."""
+
+    def test_matches_linear_scan(self):
+        """Test that the classifier agrees with first-matching-rule substring scans."""
+        vocabulary = [k for _, keywords in CATEGORY_RULES + DOCUMENT_TYPE_RULES for k in keywords]
+        vocabulary += ["upi", "neft", "x", "re", "p", "ga", "salar", " "]
+        rng = random.Random(7)
+        for rules in (CATEGORY_RULES, DOCUMENT_TYPE_RULES):
+            classifier = KeywordClassifier(rules, default="none")
+            for _ in range(2000):
+                text = "".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 6)))
+                assert classifier.classify(text) == linear_classify(rules, "none", text), text
+
+    def test_overlapping_keywords_use_rule_priority(self):
+        """Test that a keyword inside a longer one still counts ('pay' in 'repay')."""
+        classifier = KeywordClassifier(CATEGORY_RULES, default="others")
+        assert classifier.classify("loan repay") == "income"
+        assert classifier.classify("emi") == "loan"
+        assert classifier.classify("gas bill") == "fuel"
+        assert classifier.classify("nothing here") == "others"
+
+
+class TestStatementParser:
+    """Test cases for single-pass statement parsing."""
+
+    def test_table_columns_give_transaction_side(self):
+        """Test that withdrawal/deposit columns set the type and page text isn't double counted."""
+        text = (
+            "--- Page 1 ---\n01/04/2024 NEFT SALARY ACME 50,000.00 1,50,000.00\n"
+            "03/04/2024 UPI/SWIGGY FOOD 450.00 1,49,550.00\n"
+            "--- Table 1 on Page 1 ---\n"
+            "Date | Narration | Withdrawal Amt. | Deposit Amt. | Closing Balance\n"
+            "01/04/2024 | NEFT SALARY ACME |  | 50,000.00 | 1,50,000.00\n"
+            "03/04/2024 | UPI/SWIGGY\nFOOD | 450.00 |  | 1,49,550.00\n"
+            "05/04/2024 | SIP HDFC MUTUAL FUND | 5,000.00 |  | 1,44,550.00\n"
+        )
+        transactions = StatementParser().extract_transactions(text)
+
+        assert [(t.description, t.amount, t.transaction_type, t.category) for t in transactions] == [
+            ("NEFT SALARY ACME", 50000.0, "credit", "income"),
+            ("UPI/SWIGGY FOOD", 450.0, "debit", "food"),
+            ("SIP HDFC MUTUAL FUND", 5000.0, "investment", "investment"),
+        ]
+
+    def test_amount_column_with_dr_cr_marker(self):
+        """Test tables with one amount column and a Dr/Cr column."""
+        text = ("--- Table 1 on Page 1 ---\nTxn Date | Description | Amount | Dr/Cr\n"
+                "01-Apr-2024 | Salary | 50,000.00 | Cr\n02-Apr-2024 | Electricity bill | 1,200.00 | Dr\n")
+        transactions = StatementParser().extract_transactions(text)
+
+        assert [(t.amount, t.transaction_type) for t in transactions] == [(50000.0, "credit"), (1200.0, "debit")]
+
+    def test_line_fallback_yields_one_transaction_per_line(self):
+        """Test that text lines without a usable table are parsed once each."""
+        text = "--- Page 1 ---\n01/04/2024 Salary credit 50,000.00\n03/04/2024 UPI Swiggy Rs. 450.00\nshort 1/1/24 5\n"
+        transactions = StatementParser().extract_transactions(text)
+
+        assert [(t.date, t.description, t.amount, t.transaction_type) for t in transactions] == [
+            ("01/04/2024", "Salary credit", 50000.0, "credit"),
+            ("03/04/2024", "UPI Swiggy", 450.0, "debit"),
+        ]
+
+    def test_accounts_use_nearby_balance(self):
+        """Test account numbers, nearest balance and Indian digit grouping."""
+        accounts = StatementParser().extract_accounts(
+            "ICICI Bank\nAccount No: 123456789012\nAvailable Balance: Rs. 1,45,000.50\n" + "x" * 500 +
+            "\nA/C 987654321098 Balance: ₹2,000.00"
+        )
+
+        assert [(a.account_number, a.balance, a.bank_name) for a in accounts] == [
+            ("123456789012", 145000.5, "ICICI Bank"), ("987654321098", 2000.0, "ICICI Bank")
+        ]
+
+    def test_parse_amount(self):
+        """Test table cell amount parsing."""
+        assert parse_amount("1,23,456.78") == (123456.78, None)
+        assert parse_amount("₹ 450.00 Cr") == (450.0, "cr")
+        assert parse_amount("-200") == (200.0, "dr")
+        assert parse_amount("") == (None, None)
+
+    def test_large_statement_is_not_capped(self):
+        """Test that 2,000+ row statements parse completely and quickly."""
+        text = table_statement(2500)
+        start = time.perf_counter()
+        transactions = StatementParser().extract_transactions(text)
+        elapsed = time.perf_counter() - start
+
+        assert len(transactions) == 2500
+        assert sum(t.transaction_type == "credit" for t in transactions) == 834
+        assert elapsed < 1.0
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+
+class FakeStream:
+    """Async iterable of text chunks, like a streamed generate_content_async result."""
+
+    def __init__(self, parts, delay=0.0, fail_after=None):
+        self.parts = parts
+        self.delay = delay
+        self.fail_after = fail_after
+        self.usage_metadata = SimpleNamespace(candidates_token_count=len(parts))
+
+    async def _chunks(self):
+        for i, part in enumerate(self.parts):
+            if self.fail_after is not None and i == self.fail_after:
+                raise RuntimeError("stream reset")
+            await asyncio.sleep(self.delay)
+            yield SimpleNamespace(text=part)
+
+    def __aiter__(self):
+        return self._chunks()
+
+
+class FakeModel:
+    def __init__(self, stream):
+        self.stream = stream
+
+    async def generate_content_async(self, prompt, stream=False):
+        assert stream is True
+        return self.stream
+
+
+@pytest.fixture
+def chat_system(mock_env):
+    from api_server import ArthaAIChatSystem
+
+    system = ArthaAIChatSystem()
+    system.gemini_client = SimpleNamespace()
+    system.chat_service = None
+    return system
+
+
+async def collect(chat_system, query="How much should I save for a car?"):
+    events = []
+    first_content_at = None
+    start = time.perf_counter()
+    async for event in chat_system.stream_query(query, user_id="user-1", demo_mode=True):
+        if event["type"] == "content" and first_content_at is None:
+            first_content_at = time.perf_counter() - start
+        events.append(event)
+    return events, first_content_at
+
+
+class TestStreamQuery:
+    """Test cases for the Gemini streaming path used by the SSE endpoints"""
+
+    def test_chunks_are_forwarded_as_they_arrive(self, chat_system):
+        """Test that the first chunk is yielded before the stream finishes"""
+        stream = FakeStream([f"part{i} " for i in range(10)], delay=0.05)
+        with patch.object(chat_system, '_get_model', return_value=FakeModel(stream)):
+            events, first_content_at = asyncio.run(collect(chat_system))
+
+        content = [e["content"] for e in events if e["type"] == "content"]
+        assert content == [f"part{i} " for i in range(10)]
+        assert first_content_at < 0.25
+
+    def test_reports_ttft_and_throughput(self, chat_system):
+        """Test that a single metrics event closes the stream"""
+        stream = FakeStream(["a ", "b ", "c "], delay=0.01)
+        with patch.object(chat_system, '_get_model', return_value=FakeModel(stream)):
+            events, _ = asyncio.run(collect(chat_system))
+
+        metrics = events[-1]
+        assert metrics["type"] == "metrics"
+        assert metrics["status"] == "success"
+        assert metrics["ttft_ms"] > 0
+        assert metrics["output_tokens"] == 3
+        assert metrics["tokens_per_sec"] > 0
+
+    def test_failure_before_first_chunk_uses_fallback(self, chat_system):
+        """Test that an upstream error with nothing sent yet yields the fallback answer"""
+        stream = FakeStream(["never sent"], fail_after=0)
+        with patch.object(chat_system, '_get_model', return_value=FakeModel(stream)):
+            events, _ = asyncio.run(collect(chat_system, "Help with my tax saving"))
+
+        content = "".join(e["content"] for e in events if e["type"] == "content")
+        assert "Section 80C" in content
+        assert events[-1]["status"] == "error"
+
+    def test_exchange_is_remembered_after_stream(self, chat_system):
+        """Test that the streamed answer feeds the in-memory prompt history"""
+        stream = FakeStream(["Keep ", "an ", "emergency fund."])
+        with patch.object(chat_system, '_get_model', return_value=FakeModel(stream)):
+            asyncio.run(collect(chat_system))
+
+        assert chat_system.conversation_history[-1]["response"] == "Keep an emergency fund."
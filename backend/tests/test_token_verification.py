@@ -0,0 +1,142 @@
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+os.environ.setdefault('ARTHA_ENCRYPTION_KEY', 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA')
+
+from services import auth_service as auth_module
+from services.auth_service import AuthService
+from services.token_revocation import RevocationIndex
+
+
+class FakeUsersDatabase:
+    """Answers the users and user_sessions queries made during token verification."""
+
+    def __init__(self):
+        self.statements = []
+        self.revoked_sessions = []
+        self.user = {
+            "id": "u1", "email": "user@example.com", "is_active": True, "is_verified": True,
+            "full_name_encrypted": None, "full_name_nonce": None, "full_name_auth_tag": None
+        }
+
+    @contextmanager
+    def connection(self):
+        db = self
+
+        class Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql, params=None):
+                self.sql = " ".join(sql.split())
+                db.statements.append(self.sql)
+
+            def fetchone(self):
+                return db.user
+
+            def fetchall(self):
+                return db.revoked_sessions
+
+        class Connection:
+            def cursor(self):
+                return Cursor()
+
+            def commit(self):
+                pass
+
+        yield Connection()
+
+    def user_lookups(self):
+        return [sql for sql in self.statements if sql.startswith("SELECT id, email")]
+
+
+class TestTokenVerificationCache:
+    """Test cases for the verified-token cache and revocation index."""
+
+    @pytest.fixture
+    def db(self):
+        database = FakeUsersDatabase()
+        auth_module._verified_tokens.clear()
+        with patch.object(AuthService, '_get_db_connection', lambda self: database.connection()), \
+                patch.object(auth_module, '_revoked_tokens', RevocationIndex(max_token_age=86400, sync_interval=60)):
+            yield database
+        auth_module._verified_tokens.clear()
+
+    @pytest.fixture
+    def auth_service(self, db):
+        return AuthService()
+
+    def token(self, auth_service, expires_in=3600):
+        now = datetime.utcnow()
+        return jwt.encode(
+            {'user_id': 'u1', 'email': 'user@example.com', 'type': 'access',
+             'exp': now + timedelta(seconds=expires_in), 'iat': now},
+            auth_service.jwt_secret, algorithm=auth_service.jwt_algorithm
+        )
+
+    def test_repeat_verification_skips_database(self, auth_service, db):
+        """Test that a verified token is served from cache without DB I/O."""
+        token = self.token(auth_service)
+        hits_before = auth_service.get_token_verification_stats()["cache"]["hits"]
+
+        results = [auth_service.verify_token(token) for _ in range(5)]
+
+        assert all(r["valid"] for r in results)
+        assert results[4]["user"]["email"] == "user@example.com"
+        assert len(db.user_lookups()) == 1
+        assert auth_service.get_token_verification_stats()["cache"]["hits"] - hits_before == 4
+
+    def test_cache_never_outlives_token(self, auth_service, db):
+        """Test that a cached token stops verifying once its exp passes."""
+        token = self.token(auth_service, expires_in=2)
+        assert auth_service.verify_token(token)["valid"]
+
+        later = time.monotonic() + 5
+        with patch('utils.ttl_cache.time.monotonic', return_value=later), \
+                patch('jwt.api_jwt.datetime') as jwt_datetime:
+            jwt_datetime.now.return_value = datetime.now(timezone.utc) + timedelta(seconds=5)
+            result = auth_service.verify_token(token)
+
+        assert result == {"valid": False, "message": "Token expired"}
+
+    def test_logout_revokes_immediately(self, auth_service, db):
+        """Test that a cached token is rejected right after logout in this worker."""
+        token = self.token(auth_service)
+        assert auth_service.verify_token(token)["valid"]
+
+        assert auth_service.logout_user(token)["success"]
+
+        assert auth_service.verify_token(token) == {"valid": False, "message": "Token revoked"}
+        assert any(sql.startswith("UPDATE user_sessions SET is_active = FALSE") for sql in db.statements)
+
+    def test_revocations_from_other_workers_are_synced(self, auth_service, db):
+        """Test that sessions deactivated elsewhere are picked up from user_sessions."""
+        token = self.token(auth_service)
+        assert auth_service.verify_token(token)["valid"]
+
+        db.revoked_sessions = [{"session_token": token, "last_used": datetime.utcnow()}]
+        auth_module._revoked_tokens._last_sync = 0.0
+
+        assert auth_service.verify_token(token)["message"] == "Token revoked"
+        assert auth_service.get_token_verification_stats()["revocations"]["syncs"] == 2
+
+    def test_latency_is_recorded(self, auth_service, db):
+        """Test that every verification lands in the latency histogram."""
+        token = self.token(auth_service)
+        before = auth_service.get_token_verification_stats()["latency"]["count"]
+
+        auth_service.verify_token(token)
+        auth_service.verify_token("not-a-jwt")
+
+        stats = auth_service.get_token_verification_stats()
+        assert stats["latency"]["count"] == before + 2
+        assert stats["rejected"] >= 1
@@ -0,0 +1,174 @@
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+os.environ.setdefault('ARTHA_ENCRYPTION_KEY', 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA')
+
+from services import user_service
+from services.user_service import UserService
+from utils.encryption import EncryptionManager
+
+
+def encrypted_columns(manager, field, value):
+    package = manager.encrypt_data_gcm(value)
+    return {
+        f"{field}_encrypted": package['encrypted_data'],
+        f"{field}_nonce": package['nonce'],
+        f"{field}_auth_tag": package['auth_tag']
+    }
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.db.statements.append(" ".join(sql.split()))
+
+    def fetchone(self):
+        return self.db.rows.pop(0) if self.db.rows else None
+
+
+class FakeDatabase:
+    """Queued rows served to the service through a fake pooled connection."""
+
+    def __init__(self):
+        self.rows = []
+        self.statements = []
+
+    @contextmanager
+    def connection(self):
+        db = self
+
+        class Connection:
+            def cursor(self):
+                return FakeCursor(db)
+
+            def commit(self):
+                pass
+
+        yield Connection()
+
+
+class TestDecryptRecord:
+    """Test cases for batched field-level decryption."""
+
+    @pytest.fixture
+    def manager(self):
+        return EncryptionManager()
+
+    def test_decrypts_all_fields_of_a_row(self, manager):
+        """Test that every present field round-trips through one call."""
+        row = {"id": "u1"}
+        row.update(encrypted_columns(manager, "full_name", "Asha Rao"))
+        row.update(encrypted_columns(manager, "annual_income", "1800000"))
+        row.update(encrypted_columns(manager, "address", {"city": "Pune", "pin": 411001}))
+        row.update({"phone_encrypted": None, "phone_nonce": None, "phone_auth_tag": None})
+
+        decrypted = manager.decrypt_record(row, ("full_name", "phone", "annual_income", "address"))
+
+        assert decrypted == {
+            "full_name": "Asha Rao",
+            "annual_income": "1800000",
+            "address": {"city": "Pune", "pin": 411001}
+        }
+
+    def test_tampered_field_is_dropped(self, manager):
+        """Test that a field failing authentication doesn't take the row down with it."""
+        row = {}
+        row.update(encrypted_columns(manager, "full_name", "Asha Rao"))
+        row.update(encrypted_columns(manager, "phone", "+91 98765 43210"))
+        row["phone_auth_tag"] = encrypted_columns(manager, "x", "other")["x_auth_tag"]
+
+        assert manager.decrypt_record(row, ("full_name", "phone")) == {"full_name": "Asha Rao"}
+
+    def test_matches_single_field_decrypt(self, manager):
+        """Test that batched results agree with decrypt_data_gcm across a result set."""
+        rows = [encrypted_columns(manager, "description", f"Goal {i}, with commas") for i in range(5)]
+
+        decrypted = manager.decrypt_records(rows, ("description",))
+
+        assert [d["description"] for d in decrypted] == [
+            manager.decrypt_data_gcm({
+                'encrypted_data': row['description_encrypted'],
+                'nonce': row['description_nonce'],
+                'auth_tag': row['description_auth_tag']
+            })
+            for row in rows
+        ]
+
+
+class TestProfileCache:
+    """Test cases for the decrypted profile cache."""
+
+    @pytest.fixture
+    def db(self):
+        user_service._profile_cache.clear()
+        database = FakeDatabase()
+        with patch.object(UserService, '_get_db_connection', lambda self: database.connection()):
+            yield database
+        user_service._profile_cache.clear()
+
+    @pytest.fixture
+    def service(self, db):
+        return UserService()
+
+    def queue_profile(self, service, db, name="Asha Rao"):
+        row = {
+            "id": "u1", "email": "asha@example.com", "created_at": datetime(2025, 1, 1),
+            "last_login": None, "is_verified": True, "experience_years": 6
+        }
+        row.update(encrypted_columns(service.encryption, "full_name", name))
+        row.update(encrypted_columns(service.encryption, "annual_income", "1800000"))
+        db.rows = [row, None]
+
+    def test_profile_is_cached(self, service, db):
+        """Test that a second read is served without touching the database."""
+        self.queue_profile(service, db)
+
+        first = service.get_complete_profile("u1")
+        queries = len(db.statements)
+        second = service.get_complete_profile("u1")
+
+        assert first["profile"]["full_name"] == "Asha Rao"
+        assert first["profile"]["annual_income"] == 1800000.0
+        assert second == first
+        assert len(db.statements) == queries
+
+    def test_cached_profile_is_not_shared(self, service, db):
+        """Test that callers mutating a result don't corrupt the cache."""
+        self.queue_profile(service, db)
+
+        service.get_complete_profile("u1")["profile"]["full_name"] = "changed"
+
+        assert service.get_complete_profile("u1")["profile"]["full_name"] == "Asha Rao"
+
+    def test_profile_update_invalidates(self, service, db):
+        """Test that update_user_profile drops the cached profile."""
+        self.queue_profile(service, db)
+        service.get_complete_profile("u1")
+
+        db.rows = [None]
+        assert service.update_user_profile("u1", {"full_name": "Asha R"})["success"]
+        self.queue_profile(service, db, name="Asha R")
+
+        assert service.get_complete_profile("u1")["profile"]["full_name"] == "Asha R"
+
+    def test_preferences_update_invalidates(self, service, db):
+        """Test that update_investment_preferences drops the cached profile."""
+        self.queue_profile(service, db)
+        service.get_complete_profile("u1")
+
+        db.rows = [None]
+        assert service.update_investment_preferences("u1", {"risk_tolerance": "high"})["success"]
+
+        assert user_service._profile_cache.get("u1") is None
@@ -0,0 +1,208 @@
+import json
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from migrate_user_data import migrate
+from models.user_models import (
+    InvestmentPreferences, PersonalInfo, ProfessionalInfo, UserDataStorage, UserProfile,
+    create_user_id_from_email
+)
+from models.user_storage import JSONFileBackend, PostgresBackend, SQLiteBackend, hash_email
+
+
+def make_profile(user_id="u1", email="priya@example.com", risk="moderate"):
+    return UserProfile(
+        user_id=user_id,
+        personalInfo=PersonalInfo(fullName="Priya Shah", email=email, phoneNumber="9876543210",
+                                  dateOfBirth="1992-04-01", occupation="Engineer"),
+        professionalInfo=ProfessionalInfo(occupation="Engineer", annualIncome="10-20L"),
+        investmentPreferences=InvestmentPreferences(riskTolerance=risk, investmentGoals=["retirement"])
+    )
+
+
+class CountingBackend:
+    """Delegates to a real backend and counts reads"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = backend.name
+        self.gets = 0
+
+    def get(self, user_id):
+        self.gets += 1
+        return self.backend.get(user_id)
+
+    def __getattr__(self, attr):
+        return getattr(self.backend, attr)
+
+
+class TestUserDataStorage:
+    """Test cases for UserDataStorage on the pluggable backends."""
+
+    @pytest.fixture(params=["json", "sqlite"])
+    def storage(self, request, tmp_path):
+        if request.param == "json":
+            backend = JSONFileBackend(str(tmp_path))
+        else:
+            backend = SQLiteBackend(str(tmp_path / "user_profiles.db"))
+        return UserDataStorage(str(tmp_path), backend=backend)
+
+    def test_round_trip_and_listing(self, storage):
+        """Test that profiles save, load, list and delete on every backend."""
+        assert storage.save_user_data(make_profile("u1"))
+        assert storage.save_user_data(make_profile("u2", email="ravi@example.com"))
+
+        assert storage.load_user_data("u1").personalInfo.email == "priya@example.com"
+        assert storage.list_all_users() == ["u1", "u2"]
+        assert storage.delete_user_data("u1")
+        assert storage.load_user_data("u1") is None
+        assert storage.list_all_users() == ["u2"]
+
+    def test_concurrent_partial_updates_keep_both_fields(self, storage):
+        """Test that updates to different fields from many threads are not lost."""
+        storage.save_user_data(make_profile("u1"))
+        professional = {"occupation": "Doctor", "annualIncome": "20-50L"}
+        preferences = {"riskTolerance": "aggressive", "investmentGoals": ["wealth"]}
+
+        def update(field, value):
+            for _ in range(20):
+                assert storage.update_user_data("u1", {field: value})
+
+        threads = [threading.Thread(target=update, args=("professionalInfo", professional)),
+                   threading.Thread(target=update, args=("investmentPreferences", preferences))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        profile = storage.load_user_data("u1")
+        assert profile.professionalInfo.occupation == "Doctor"
+        assert profile.investmentPreferences.riskTolerance == "aggressive"
+
+    def test_invalid_update_writes_nothing(self, storage):
+        """Test that an update failing validation leaves the stored profile untouched."""
+        storage.save_user_data(make_profile("u1"))
+
+        assert not storage.update_user_data("u1", {"personalInfo": {"email": "not-an-email"}})
+        assert storage.load_user_data("u1").personalInfo.fullName == "Priya Shah"
+        assert not storage.update_user_data("missing", {"professionalInfo": {}})
+
+
+class TestSQLiteUserStorage:
+    """Test cases for the SQLite backend, cache and legacy import."""
+
+    @pytest.fixture
+    def storage(self, tmp_path):
+        backend = CountingBackend(SQLiteBackend(str(tmp_path / "user_profiles.db")))
+        return UserDataStorage(str(tmp_path), backend=backend)
+
+    def test_reads_are_cached_until_update(self, storage):
+        """Test that repeat loads skip the backend and updates invalidate."""
+        storage.save_user_data(make_profile("u1"))
+
+        first = storage.load_user_data("u1")
+        first.personalInfo.fullName = "mutated by caller"
+        assert storage.load_user_data("u1").personalInfo.fullName == "Priya Shah"
+        assert storage.backend.gets == 1
+
+        storage.update_user_data("u1", {"investmentPreferences": {"riskTolerance": "low", "investmentGoals": []}})
+        assert storage.load_user_data("u1").investmentPreferences.riskTolerance == "low"
+        assert storage.backend.gets == 2
+
+    def test_lookup_by_email_hash_index(self, storage):
+        """Test that lookups by email use the index regardless of case."""
+        storage.save_user_data(make_profile("u1", email="Priya@Example.com"))
+
+        assert storage.load_user_data_by_email(" priya@example.COM ").user_id == "u1"
+        assert storage.load_user_data_by_email("nobody@example.com") is None
+
+    def test_legacy_json_file_imported_on_read(self, storage, tmp_path):
+        """Test that an unmigrated user_data/<id>.json profile is moved in on first read."""
+        (tmp_path / "legacy1.json").write_text(json.dumps(make_profile("legacy1").dict(), default=str))
+
+        assert storage.load_user_data("legacy1").user_id == "legacy1"
+        assert storage.backend.backend.get("legacy1") is not None
+        assert storage.delete_user_data("legacy1")
+        assert not (tmp_path / "legacy1.json").exists()
+        assert storage.load_user_data("legacy1") is None
+
+    def test_legacy_json_files_are_listed_before_import(self, storage, tmp_path):
+        """Test that unmigrated profiles show up in listings next to stored ones."""
+        storage.save_user_data(make_profile("u1"))
+        (tmp_path / "legacy1.json").write_text(json.dumps(make_profile("legacy1").dict(), default=str))
+
+        assert storage.list_all_users() == ["legacy1", "u1"]
+        storage.load_user_data("legacy1")
+        assert storage.list_all_users() == ["legacy1", "u1"]
+
+    def test_email_change_moves_the_index(self, storage):
+        """Test that a partial update changing the email re-indexes the profile."""
+        user_id = create_user_id_from_email("old@example.com")
+        storage.save_user_data(make_profile(user_id, email="old@example.com"))
+        personal = make_profile(user_id, email="new@example.com").personalInfo.dict()
+
+        assert storage.update_user_data(user_id, {"personalInfo": personal})
+        assert storage.load_user_data_by_email("new@example.com").user_id == user_id
+        assert storage.load_user_data_by_email("old@example.com") is None
+
+    def test_migration_moves_json_files(self, tmp_path):
+        """Test that the migration script upserts every valid file and skips invalid ones."""
+        for index in range(3):
+            profile = make_profile(f"m{index}", email=f"user{index}@example.com")
+            (tmp_path / f"m{index}.json").write_text(json.dumps(profile.dict(), default=str))
+        (tmp_path / "broken.json").write_text("{not json")
+
+        counts = migrate(str(tmp_path), "sqlite", str(tmp_path / "migrated.db"), batch_size=2)
+
+        assert counts == {"migrated": 3, "invalid": 1}
+        backend = SQLiteBackend(str(tmp_path / "migrated.db"))
+        assert backend.list_user_ids() == ["m0", "m1", "m2"]
+        assert backend.find_user_id(hash_email("user1@example.com")) == "m1"
+
+
+class TestPostgresUserStorage:
+    """Test cases for the PostgreSQL backend's atomic update."""
+
+    def test_update_locks_row(self):
+        """Test that update reads the row FOR UPDATE and writes in the same transaction."""
+        statements = []
+        stored = make_profile("u1").dict()
+
+        class Cursor:
+            rowcount = 1
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def execute(self, sql, params=None):
+                statements.append(" ".join(sql.split()))
+
+            def fetchone(self):
+                return {"data": stored}
+
+        class Pool:
+            connections = 0
+
+            @contextmanager
+            def connection(self):
+                Pool.connections += 1
+
+                class Connection:
+                    def cursor(self):
+                        return Cursor()
+
+                yield Connection()
+
+        backend = PostgresBackend(pool=Pool())
+        updated = backend.update("u1", lambda data: {**data, "user_id": "u1"})
+
+        assert updated["user_id"] == "u1"
+        assert statements[-2].endswith("WHERE user_id = %s FOR UPDATE")
+        assert statements[-1].startswith("UPDATE user_profile_store SET data")
+        # Schema setup, then one connection for the whole read-modify-write
+        assert Pool.connections == 2
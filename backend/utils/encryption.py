@@ -8,13 +8,17 @@ Provides high-security encryption with proper key management.
 
 import os
 import base64
+import binascii
 import json
 import hashlib
-from typing import Any, Dict, Optional, Tuple
+import struct
+import zlib
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 from Crypto.Cipher import AES
 from Crypto.Random import get_random_bytes
 from Crypto.Util.Padding import pad, unpad
 from Crypto.Protocol.KDF import PBKDF2
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from pathlib import Path
 import logging
 
@@ -24,6 +28,30 @@ load_dotenv(Path(__file__).parent.parent / '.env')
 
 logger = logging.getLogger(__name__)
 
+# Optional zstd for compressing large payloads before encryption
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Binary envelope: magic | version | compression | nonce(12) | tag(16) | ciphertext.
+# The 3-byte header is bound to the ciphertext as associated data.
+ENVELOPE_MAGIC = 0xAE  # never a base64 character, so legacy text values can't be mistaken for envelopes
+ENVELOPE_VERSION = 1
+ENVELOPE_HEADER = struct.Struct("!BBB")
+ENVELOPE_NONCE_SIZE = 12
+ENVELOPE_TAG_SIZE = 16
+ENVELOPE_OVERHEAD = ENVELOPE_HEADER.size + ENVELOPE_NONCE_SIZE + ENVELOPE_TAG_SIZE
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_CODECS = {"none": COMPRESSION_NONE, "zlib": COMPRESSION_ZLIB, "zstd": COMPRESSION_ZSTD}
+
+ENCRYPTION_COMPRESSION = os.getenv("ENCRYPTION_COMPRESSION", "zstd" if ZSTD_AVAILABLE else "zlib").lower()
+ENCRYPTION_COMPRESS_MIN_BYTES = int(os.getenv("ENCRYPTION_COMPRESS_MIN_BYTES", "1024"))
+
 class EncryptionManager:
     """
     AES-256 encryption manager for secure data storage
@@ -38,7 +66,22 @@ class EncryptionManager:
     def __init__(self):
         self.key = self._get_encryption_key()
         self.algorithm = "AES-256-CBC"
+        # Keyed once and reused for batched GCM decryption and the binary envelope
+        self._aesgcm = AESGCM(self.key)
+        self.compression = self._resolve_compression(ENCRYPTION_COMPRESSION)
+        self.compress_min_bytes = ENCRYPTION_COMPRESS_MIN_BYTES
         
+    @staticmethod
+    def _resolve_compression(name: str) -> int:
+        codec = COMPRESSION_CODECS.get(name)
+        if codec is None:
+            logger.warning(f"Unknown ENCRYPTION_COMPRESSION '{name}', using zlib")
+            return COMPRESSION_ZLIB
+        if codec == COMPRESSION_ZSTD and not ZSTD_AVAILABLE:
+            logger.warning("zstandard not installed, compressing encrypted payloads with zlib")
+            return COMPRESSION_ZLIB
+        return codec
+    
     def _get_encryption_key(self) -> bytes:
         """Get encryption key from environment variable"""
         key_string = os.getenv("ARTHA_ENCRYPTION_KEY")
@@ -342,6 +385,180 @@ class EncryptionManager:
         }
         return self.decrypt_data_gcm(encrypted_package)
 
+    def decrypt_record(self, record: Mapping[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+        """
+        Decrypt several GCM-encrypted fields of one database row in one pass
+        
+        Args:
+            record: Row with <field>_encrypted, <field>_nonce and <field>_auth_tag columns
+            fields: Field names to decrypt
+            
+        Returns:
+            {field: value} for each field that is present and authenticates;
+            empty or tampered fields are left out
+        """
+        return self.decrypt_records([record], fields)[0]
+    
+    def decrypt_records(self, records: Sequence[Mapping[str, Any]], fields: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Decrypt the same GCM-encrypted fields across a whole result set
+        
+        Uses one keyed AES-GCM instance for every field and parses each row's
+        plaintexts with a single JSON parse.
+        
+        Args:
+            records: Rows as returned by the database
+            fields: Field names to decrypt in every row
+            
+        Returns:
+            One {field: value} dict per row, in the same order
+        """
+        columns = [(field, f"{field}_encrypted", f"{field}_nonce", f"{field}_auth_tag") for field in fields]
+        results = []
+        for record in records:
+            names = []
+            plaintexts = []
+            for field, data_column, nonce_column, tag_column in columns:
+                ciphertext = record.get(data_column)
+                if not ciphertext:
+                    continue
+                try:
+                    plaintexts.append(self._aesgcm.decrypt(
+                        binascii.a2b_base64(record[nonce_column]),
+                        binascii.a2b_base64(ciphertext) + binascii.a2b_base64(record[tag_column]),
+                        None
+                    ))
+                    names.append(field)
+                except Exception as e:
+                    logger.error(f"GCM decryption failed for field {field}: {e}")
+            results.append(self._parse_plaintexts(names, plaintexts))
+        return results
+    
+    def _parse_plaintexts(self, names: List[str], plaintexts: List[bytes]) -> Dict[str, Any]:
+        """Parse a row's JSON plaintexts together, falling back to field by field"""
+        if not plaintexts:
+            return {}
+        try:
+            values = json.loads(b"[" + b",".join(plaintexts) + b"]")
+            if len(values) == len(names):
+                return dict(zip(names, values))
+        except ValueError:
+            pass
+        decrypted = {}
+        for name, plaintext in zip(names, plaintexts):
+            try:
+                decrypted[name] = json.loads(plaintext)
+            except ValueError as e:
+                logger.error(f"Decrypted field {name} is not valid JSON: {e}")
+        return decrypted
+
+    def encrypt_envelope(self, data: Any, compression: Optional[str] = None) -> bytes:
+        """
+        Encrypt data into a single binary envelope for bytea/LargeBinary columns
+        
+        Payloads of at least ENCRYPTION_COMPRESS_MIN_BYTES are compressed before
+        encryption. Only use this for data that doesn't mix attacker-chosen text
+        with secrets, since compressed length can leak content.
+        
+        Args:
+            data: Data to encrypt (will be JSON serialized)
+            compression: "none", "zlib" or "zstd"; defaults to ENCRYPTION_COMPRESSION
+            
+        Returns:
+            header | nonce | tag | ciphertext
+        """
+        try:
+            plaintext = json.dumps(data, default=str, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            
+            codec = self.compression if compression is None else self._resolve_compression(compression)
+            if len(plaintext) < self.compress_min_bytes:
+                codec = COMPRESSION_NONE
+            if codec == COMPRESSION_ZSTD:
+                plaintext = zstandard.ZstdCompressor().compress(plaintext)
+            elif codec == COMPRESSION_ZLIB:
+                plaintext = zlib.compress(plaintext, 6)
+            
+            header = ENVELOPE_HEADER.pack(ENVELOPE_MAGIC, ENVELOPE_VERSION, codec)
+            nonce = os.urandom(ENVELOPE_NONCE_SIZE)
+            sealed = self._aesgcm.encrypt(nonce, plaintext, header)
+            return b"".join((header, nonce, sealed[-ENVELOPE_TAG_SIZE:], sealed[:-ENVELOPE_TAG_SIZE]))
+            
+        except Exception as e:
+            logger.error(f"Envelope encryption failed: {e}")
+            raise
+    
+    def decrypt_envelope(self, envelope: bytes) -> Any:
+        """
+        Decrypt a binary envelope produced by encrypt_envelope
+        
+        Args:
+            envelope: Envelope bytes (bytes or memoryview as returned by the driver)
+            
+        Returns:
+            Decrypted data (original Python object)
+        """
+        try:
+            envelope = memoryview(envelope)
+            if not self.is_envelope(envelope):
+                raise ValueError("Not an encryption envelope")
+            header = envelope[:ENVELOPE_HEADER.size]
+            _, version, codec = ENVELOPE_HEADER.unpack(header)
+            if version != ENVELOPE_VERSION:
+                raise ValueError(f"Unsupported envelope version {version}")
+            
+            nonce_end = ENVELOPE_HEADER.size + ENVELOPE_NONCE_SIZE
+            tag = envelope[nonce_end:ENVELOPE_OVERHEAD]
+            plaintext = self._aesgcm.decrypt(
+                bytes(envelope[ENVELOPE_HEADER.size:nonce_end]),
+                bytes(envelope[ENVELOPE_OVERHEAD:]) + bytes(tag),
+                bytes(header)
+            )
+            
+            if codec == COMPRESSION_ZLIB:
+                plaintext = zlib.decompress(plaintext)
+            elif codec == COMPRESSION_ZSTD:
+                if not ZSTD_AVAILABLE:
+                    raise ValueError("Envelope is zstd-compressed but zstandard is not installed")
+                plaintext = zstandard.ZstdDecompressor().decompress(plaintext)
+            elif codec != COMPRESSION_NONE:
+                raise ValueError(f"Unknown envelope compression {codec}")
+            
+            return json.loads(plaintext)
+            
+        except Exception as e:
+            logger.error(f"Envelope decryption failed: {e}")
+            raise
+    
+    @staticmethod
+    def is_envelope(value: Any) -> bool:
+        """Whether a stored value is a binary envelope rather than legacy base64 text"""
+        if not isinstance(value, (bytes, bytearray, memoryview)) or len(value) < ENVELOPE_OVERHEAD:
+            return False
+        return value[0] == ENVELOPE_MAGIC
+    
+    def decrypt_stored(self, encrypted_data: Any, nonce: Any = None, auth_tag: Any = None) -> Any:
+        """
+        Decrypt a stored value in either format
+        
+        Reads binary envelopes as well as the legacy base64 ciphertext/nonce/tag
+        columns written by encrypt_for_database, so rows can be migrated lazily.
+        
+        Args:
+            encrypted_data: Envelope bytes, or legacy base64 ciphertext (str or bytea)
+            nonce: Legacy base64 nonce, unused for envelopes
+            auth_tag: Legacy base64 authentication tag, unused for envelopes
+            
+        Returns:
+            Decrypted data (original Python object)
+        """
+        if self.is_envelope(encrypted_data):
+            return self.decrypt_envelope(encrypted_data)
+        
+        def as_text(value: Any) -> str:
+            return bytes(value).decode('ascii') if isinstance(value, (bytes, bytearray, memoryview)) else value
+        
+        return self.decrypt_from_database(as_text(encrypted_data), as_text(nonce), as_text(auth_tag))
+
 def generate_encryption_key() -> str:
     """
     Generate a new secure encryption key
@@ -0,0 +1,144 @@
+"""
+Shared injection pattern scanner
+Used by SecurityMiddleware, InputValidationMiddleware and InputSanitizer so
+SQL injection, XSS, path traversal (and friends) are detected by one engine
+instead of each caller looping over its own regex list.
+
+Each rule is a (category, pattern) pair. At construction the literal text
+every match of a pattern has to start with (e.g. "select" for
+select\\s+.*\\s+from) is derived from the parsed regex. A scan lowercases the
+text once, checks those literals with plain substring tests, and only runs
+the regexes of rules whose literal is present. Rules with no usable literal
+are always run, and text that is not pure ASCII skips the prefilter, since
+Unicode case folding can match pattern letters with other characters.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse, sre_constants
+
+# Categories
+SQL_INJECTION = "sql_injection"
+XSS = "xss"
+PATH_TRAVERSAL = "path_traversal"
+COMMAND_INJECTION = "command_injection"
+LDAP_INJECTION = "ldap_injection"
+NOSQL_INJECTION = "nosql_injection"
+
+# Beyond this many alternative prefixes a rule is cheaper to just run
+MAX_PREFIXES_PER_RULE = 32
+
+Rule = Tuple[str, str]
+
+
+def _literal_prefixes(items) -> Tuple[Set[str], bool]:
+    """
+    Lowercased literal prefixes every match of a parsed sequence starts with,
+    and whether the sequence is entirely literal (so a following item extends them)
+    """
+    prefixes = {''}
+    for op, av in items:
+        if op is sre_constants.AT:
+            # Zero-width (\b, ^, $) - doesn't consume text
+            continue
+        if op is sre_constants.LITERAL:
+            prefixes = {prefix + chr(av).lower() for prefix in prefixes}
+            continue
+        if op is sre_constants.SUBPATTERN:
+            inner, complete = _literal_prefixes(av[-1])
+        elif op is sre_constants.BRANCH:
+            inner, complete = set(), True
+            for alternative in av[1]:
+                alt_prefixes, alt_complete = _literal_prefixes(alternative)
+                inner |= alt_prefixes
+                complete = complete and alt_complete
+        else:
+            return prefixes, False
+        prefixes = {prefix + suffix for prefix in prefixes for suffix in inner}
+        if not complete or len(prefixes) > MAX_PREFIXES_PER_RULE:
+            return prefixes, False
+    return prefixes, True
+
+
+def required_literals(pattern: str) -> Optional[Set[str]]:
+    """Literals one of which every match must contain, or None when there's no such guarantee"""
+    try:
+        prefixes, _ = _literal_prefixes(sre_parse.parse(pattern).data)
+    except Exception:
+        return None
+    if not prefixes or '' in prefixes or len(prefixes) > MAX_PREFIXES_PER_RULE:
+        return None
+    # "execute" can't be present without "exec"
+    return {literal for literal in prefixes if not any(other != literal and other in literal for other in prefixes)}
+
+
+class InjectionScanner:
+    """Literal-prefiltered matcher over a list of (category, pattern) rules"""
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules: List[Rule] = list(rules)
+        self._compiled = [re.compile(pattern, re.IGNORECASE) for _, pattern in self.rules]
+        # literal -> indexes of the rules it gates; rules without one always run
+        self._literals: Dict[str, List[int]] = {}
+        self._unfiltered: List[int] = []
+        for index, (_, pattern) in enumerate(self.rules):
+            literals = required_literals(pattern)
+            if literals is None:
+                self._unfiltered.append(index)
+                continue
+            for literal in literals:
+                self._literals.setdefault(literal, []).append(index)
+
+    def scan(self, text: str) -> Optional[str]:
+        """Category of the first rule (in rule order) that matches, or None"""
+        if not text:
+            return None
+        if text.isascii():
+            lowered = text.lower()
+            candidates = set(self._unfiltered)
+            for literal, indexes in self._literals.items():
+                if literal in lowered:
+                    candidates.update(indexes)
+            if not candidates:
+                return None
+            indexes: Sequence[int] = sorted(candidates)
+        else:
+            indexes = range(len(self.rules))
+
+        for index in indexes:
+            if self._compiled[index].search(text):
+                return self.rules[index][0]
+        return None
+
+    def scan_value(self, value: Any) -> Optional[str]:
+        """Scan every string in a nested JSON-like value in one walk; first category found or None"""
+        stack = [value]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                category = self.scan(item)
+                if category:
+                    return category
+            elif isinstance(item, dict):
+                stack.extend(reversed(list(item.values())))
+            elif isinstance(item, (list, tuple)):
+                stack.extend(reversed(item))
+        return None
+
+    def matches(self, text: str) -> bool:
+        return self.scan(text) is not None
+
+
+@lru_cache(maxsize=32)
+def _cached_scanner(rules: Tuple[Rule, ...]) -> InjectionScanner:
+    return InjectionScanner(rules)
+
+
+def get_injection_scanner(rules: Iterable[Rule]) -> InjectionScanner:
+    """Shared scanner for a rule list, so callers that rebuild their config don't recompile"""
+    return _cached_scanner(tuple(rules))
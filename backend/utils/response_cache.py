@@ -1,66 +1,119 @@
 """
-Simple response caching for faster LLM responses
+Bounded response caching for faster LLM responses
+Entries are namespaced per user, evicted LRU/TTL within entry and memory
+limits, and optionally keyed on a normalized form of the query so trivially
+different phrasings of the same question share an entry. Only the query is
+normalized; the context, which carries the user's data, is hashed verbatim.
 """
 
+import contextvars
 import hashlib
-import json
-import time
-from typing import Dict, Any, Optional
+import math
+import re
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Tuple
+
 from config.settings import config
+from utils.ttl_cache import TTLCache
+
+# Namespace for the request being served; set where the user is known so one
+# user's cached answers are never served to another
+_cache_namespace: contextvars.ContextVar = contextvars.ContextVar("response_cache_namespace", default="global")
+
+_WHITESPACE = re.compile(r"\s+")
+# Digit groups are 2-3 digits long (52,340 and 10,40,000), so list commas ("1,2,3") split numbers
+_NUMBER = re.compile(r"\d+(?:,\d{2,3}(?!\d))*(?:\.\d+)?")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?.!]+$")
+
+
+def _bucket_number(match: "re.Match") -> str:
+    """
+    Round amounts to two significant figures (52,340 -> 52000) so near-identical
+    figures share a key; numbers below 10,000 (years, ages, rates) stay exact
+    """
+    text = match.group(0).replace(",", "")
+    try:
+        value = float(text)
+    except ValueError:
+        return text
+    if value < 10000:
+        return f"{value:g}"
+    magnitude = math.floor(math.log10(value))
+    return str(int(round(value, 1 - magnitude)))
+
+
+def normalize_query(query: str) -> str:
+    """Casefold, collapse whitespace, drop trailing punctuation and bucket numbers"""
+    normalized = _WHITESPACE.sub(" ", query.casefold()).strip()
+    normalized = _TRAILING_PUNCTUATION.sub("", normalized)
+    return _NUMBER.sub(_bucket_number, normalized)
+
+
+@contextmanager
+def response_cache_namespace(namespace: str):
+    """Scope cache reads and writes in this context (and tasks it spawns) to a namespace"""
+    token = _cache_namespace.set(namespace or "global")
+    try:
+        yield
+    finally:
+        _cache_namespace.reset(token)
+
+
+def _response_size(response: str) -> int:
+    return sys.getsizeof(response)
+
 
 class ResponseCache:
-    """Simple in-memory cache for LLM responses"""
-    
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
-    
-    def _generate_key(self, query: str, financial_context: str) -> str:
-        """Generate cache key from query and context"""
-        content = f"{query}_{financial_context}"
-        return hashlib.md5(content.encode()).hexdigest()
-    
-    def get(self, query: str, financial_context: str = "") -> Optional[str]:
+    """Bounded in-memory cache for LLM responses"""
+
+    def __init__(self, max_entries: int = None, max_bytes: int = None, ttl_seconds: float = None,
+                 normalize_queries: bool = None):
+        self.normalize_queries = (config.RESPONSE_CACHE_NORMALIZE_QUERIES
+                                  if normalize_queries is None else normalize_queries)
+        self._cache = TTLCache(
+            max_entries=max_entries or config.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl_seconds=ttl_seconds or config.CACHE_TTL_SECONDS,
+            name="llm_responses",
+            max_bytes=max_bytes or config.RESPONSE_CACHE_MAX_BYTES,
+            sizeof=_response_size
+        )
+
+    def _generate_key(self, query: str, financial_context: str, namespace: Optional[str]) -> Tuple[str, str]:
+        """Generate cache key from namespace, (normalized) query and the verbatim context"""
+        if self.normalize_queries:
+            query = normalize_query(query)
+        digest = hashlib.sha256(f"{query}\x00{financial_context}".encode("utf-8")).hexdigest()
+        return (namespace or _cache_namespace.get(), digest)
+
+    def get(self, query: str, financial_context: str = "", namespace: str = None) -> Optional[str]:
         """Get cached response if available and not expired"""
         if not config.ENABLE_RESPONSE_CACHING:
             return None
-            
-        key = self._generate_key(query, financial_context)
-        
-        if key in self._cache:
-            cache_entry = self._cache[key]
-            if time.time() - cache_entry['timestamp'] < config.CACHE_TTL_SECONDS:
-                return cache_entry['response']
-            else:
-                # Remove expired entry
-                del self._cache[key]
-        
-        return None
-    
-    def set(self, query: str, response: str, financial_context: str = ""):
+        return self._cache.get(self._generate_key(query, financial_context, namespace))
+
+    def set(self, query: str, response: str, financial_context: str = "", namespace: str = None):
         """Cache response"""
         if not config.ENABLE_RESPONSE_CACHING:
             return
-            
-        key = self._generate_key(query, financial_context)
-        self._cache[key] = {
-            'response': response,
-            'timestamp': time.time()
-        }
-    
+        self._cache.set(self._generate_key(query, financial_context, namespace), response)
+
     def clear(self):
         """Clear all cached responses"""
         self._cache.clear()
-    
-    def cleanup_expired(self):
+
+    def cleanup_expired(self) -> int:
         """Remove expired cache entries"""
-        current_time = time.time()
-        expired_keys = [
-            key for key, entry in self._cache.items()
-            if current_time - entry['timestamp'] >= config.CACHE_TTL_SECONDS
-        ]
-        
-        for key in expired_keys:
-            del self._cache[key]
+        return self._cache.purge_expired()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit ratio, entry count and approximate memory footprint"""
+        return {
+            **self._cache.get_stats(),
+            'enabled': config.ENABLE_RESPONSE_CACHING,
+            'normalize_queries': self.normalize_queries
+        }
+
 
 # Global cache instance
-response_cache = ResponseCache()
\ No newline at end of file
+response_cache = ResponseCache()
@@ -22,6 +22,8 @@ import bleach
 from pydantic import BaseModel, field_validator, ValidationError
 from fastapi import HTTPException, status
 
+from utils.injection_scanner import SQL_INJECTION, XSS, get_injection_scanner
+
 logger = logging.getLogger(__name__)
 
 class ValidationError(Exception):
@@ -88,19 +90,15 @@ class InputSanitizer:
     @staticmethod
     def _check_injection_patterns(text: str) -> None:
         """Check for common injection patterns"""
-        text_lower = text.lower()
-        
-        # Check SQL injection patterns
-        for pattern in InputSanitizer.SQL_INJECTION_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                logger.warning(f"Potential SQL injection attempt detected: {pattern}")
-                raise ValidationError("Invalid input detected", code="SECURITY_VIOLATION")
-        
-        # Check XSS patterns
-        for pattern in InputSanitizer.XSS_PATTERNS:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                logger.warning(f"Potential XSS attempt detected: {pattern}")
-                raise ValidationError("Invalid input detected", code="SECURITY_VIOLATION")
+        scanner = get_injection_scanner(
+            [(SQL_INJECTION, pattern) for pattern in InputSanitizer.SQL_INJECTION_PATTERNS]
+            + [(XSS, pattern) for pattern in InputSanitizer.XSS_PATTERNS]
+        )
+        category = scanner.scan(text)
+        if category:
+            label = "SQL injection" if category == SQL_INJECTION else "XSS"
+            logger.warning(f"Potential {label} attempt detected")
+            raise ValidationError("Invalid input detected", code="SECURITY_VIOLATION")
     
     @staticmethod
     def sanitize_filename(filename: str) -> str:
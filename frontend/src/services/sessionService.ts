@@ -83,6 +83,37 @@ class SessionService {
     }
   }
 
+  /**
+   * Retrieve several keys in one request; keys with no data map to null
+   */
+  async getManySessionData(keys: string[]): Promise<Record<string, any>> {
+    const empty = Object.fromEntries(keys.map((key) => [key, null]));
+    try {
+      const response = await fetch(`${this.API_BASE}/api/session/get-many`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        credentials: 'include',
+        body: JSON.stringify({
+          sessionId: this.sessionId,
+          keys
+        })
+      });
+
+      if (response.ok) {
+        const data = await response.json();
+        return Object.fromEntries(
+          keys.map((key) => [key, data.values?.[key] ? JSON.parse(data.values[key]) : null])
+        );
+      }
+      return empty;
+    } catch (error) {
+      console.error('Failed to get session data:', error);
+      return empty;
+    }
+  }
+
   /**
    * Remove specific session data
    */